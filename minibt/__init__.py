@@ -55,6 +55,7 @@ from .indicators import (
     TradingView,  # 从 indicators 子包导入
     # 指标构造器
     BtIndicator,
+    bt_jit,
     # 内置指标类型
     KLine,
     IndSeries,
@@ -103,7 +104,7 @@ __all__ = [
     # 数据
     'LocalDatas', 'KLine',
     # 指标，只保留常用指标
-    'BtIndicator', 'PandasTa', 'TaLib', 'BtInd', 'TqTa',
+    'BtIndicator', 'bt_jit', 'PandasTa', 'TaLib', 'BtInd', 'TqTa',
     'TqFunc', 'TuLip', 'FinTa', 'Pair', 'Factors', 'TradingView',
     'BtStop', 'Stop', 'IndicatorClass', 'CoreIndicators',
     # 工具
@@ -132,6 +133,3 @@ __all__ = [
     'OpConfig'
 ]
 
-
-# 初始化本地数据源
-LocalDatas.rewrite(True)
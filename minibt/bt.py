@@ -12,6 +12,9 @@ if TYPE_CHECKING:
     from .utils import GAOpConfig, OptunaConfig
     from .strategy.stats import Stats
     from .strategy.qs_plots import QSPlots
+    from .strategy.walkforward import WalkForwardResult
+    from .strategy.batch import BatchResult
+    from .strategy.chunked import ChunkedResult
     from bokeh.models import Tabs
 
 
@@ -45,6 +48,25 @@ def _run_single_strategy_process(strategy_class, strategy_id: int, period_ms: in
     bt.run(isplot=False, period_milliseconds=period_ms)
 
 
+# fork多进程回测：父进程在创建进程池前写入，子进程通过写时复制（copy-on-write）继承，无需序列化策略
+_FORK_STRATEGIES: list = []
+
+
+def _run_forked_strategy(index: int) -> dict:
+    """fork子进程入口：运行父进程继承的第index个策略，仅返回紧凑回测结果
+
+    Args:
+        index: 策略在_FORK_STRATEGIES中的索引
+
+    Returns:
+        dict: 紧凑回测结果（见StrategyBase._to_ledger）
+    """
+    strategy = _FORK_STRATEGIES[index]
+    strategy.config.isplot = False  # 子进程不整理绘图数据
+    strategy()
+    return strategy._to_ledger()
+
+
 class Bt:
     """
     ## 轻量级量化回测与实盘框架（minibt）核心类
@@ -1488,6 +1510,152 @@ class Bt:
 
         return best_trial.params  # 返回最优参数
 
+    def walk_forward(self, target: OPTTargetType = 'profit_ratio', weights: float | tuple[float] = 1.,
+                     train_size: int | float = .5, test_size: int | float = .1,
+                     step: int | float | None = None, anchored: bool = False,
+                     n_jobs: int | str = 1, show_bar: bool = True, isprint: bool = True, **kwargs) -> WalkForwardResult:
+        """## 滚动前进分析（样本内寻优 + 样本外评估）
+
+        - 每组候选参数只在全历史数据上初始化并回测一次，各折在权益序列上切片寻优与评估，
+          数据只加载一次、指标只计算一次
+        - 仅支持单策略（取第一个策略）
+
+        Args:
+            target (str, optional): 优化目标（QuantStats性能指标），默认'profit_ratio'
+            weights (float | tuple[float], optional): 优化方向，正数最大化，负数最小化. 默认1.
+            train_size (int | float, optional): 样本内窗口，int为K线根数，float为比例. 默认0.5
+            test_size (int | float, optional): 样本外窗口，int为K线根数，float为比例. 默认0.1
+            step (int | float | None, optional): 滚动步长，默认等于test_size
+            anchored (bool, optional): 是否为锚定窗口（样本内起点固定）. 默认False
+            n_jobs (int | str, optional): 候选参数回测的并行进程数（fork进程池），'max'为最大进程数. 默认1
+            show_bar (bool, optional): 是否显示回测进度. 默认True
+            isprint (bool, optional): 是否打印分析结果. 默认True
+            kwargs: 待优化参数（格式同optstrategy）
+
+        Returns:
+            WalkForwardResult: 滚动前进分析结果（各折明细、拼接样本外权益、Stats、各折耗时）
+
+        Examples:
+        >>> result = Bt().addstrategy(MA).walk_forward(
+                'sharpe', train_size=2000, test_size=500, length1=range(5, 30, 5), length2=[20, 40, 60])
+            result.equity.plot()
+        """
+        from .strategy.walkforward import WalkForward
+        if not self.strategies:
+            from .strategy.strategy import default_strategy
+            strategy_list = [s for s in Strategy.__subclasses__()
+                             if s is not default_strategy]
+            assert strategy_list, '请添加策略（通过addstrategy()）'
+            self.addstrategy(strategy_list[0])
+        if self.__datas:
+            Base._datas = self.__datas
+        if self._api:
+            Base._api = self._api
+        from .data.shared import shared_datas
+        with shared_datas.scope():
+            result = WalkForward(self.strategies[0], target, weights, train_size, test_size,
+                                 step, anchored, n_jobs, show_bar, **kwargs).run()
+        if isprint:
+            result.pprint()
+        self.__is_finish = True
+        return result
+
+    def batch_run(self, symbols: Iterable | dict, params: list[dict] | None = None,
+                  metrics: list[str] | None = None, n_jobs: int | str = 'max',
+                  show_bar: bool = True, isprint: bool = True, **kwargs) -> BatchResult:
+        """## 批量回测（策略 × 品种 × 参数矩阵）
+
+        - 以品种为单位在多进程中调度，每个品种只加载一次数据，该品种的各组参数复用已加载数据
+        - 单个品种或单组参数失败不影响其它任务，失败明细见结果的errors
+        - 批次品种替换策略首次调用get_kline的symbol
+        - 仅支持单策略（取第一个策略）
+
+        Args:
+            symbols (Iterable | dict): 品种列表（合约代码、LocalDatas数据或DataFrame），dict时键为品种标签
+            params (list[dict] | None, optional): 参数组列表，未提供的参数取策略默认值. 默认None
+            metrics (list[str] | None, optional): 输出指标（核心回测指标名或Stats方法名），默认全部核心指标
+            n_jobs (int | str, optional): 并行进程数，'max'为最大进程数. 默认'max'
+            show_bar (bool, optional): 是否显示进度. 默认True
+            isprint (bool, optional): 是否打印结果. 默认True
+            kwargs: 参数网格（格式同optstrategy），与params合并
+
+        Returns:
+            BatchResult: 批量回测结果（以(symbol, params)为索引的指标DataFrame、失败明细、耗时）
+
+        Examples:
+        >>> result = Bt().addstrategy(MA).batch_run(
+                [LocalDatas.v2601_60, LocalDatas.pp2601_60, LocalDatas.l2601_60], length1=[5, 10], length2=[20, 40])
+            result.best('sharpe')
+        """
+        from .strategy.batch import BatchRunner
+        if not self.strategies:
+            from .strategy.strategy import default_strategy
+            strategy_list = [s for s in Strategy.__subclasses__()
+                             if s is not default_strategy]
+            assert strategy_list, '请添加策略（通过addstrategy()）'
+            self.addstrategy(strategy_list[0])
+        if self.__datas:
+            Base._datas = self.__datas
+        if self._api:
+            Base._api = self._api
+        from .data.shared import shared_datas
+        with shared_datas.scope():
+            result = BatchRunner(self.strategies[0], symbols, params, metrics,
+                                 n_jobs, show_bar, **kwargs).run()
+        if isprint:
+            result.pprint()
+        self.__is_finish = True
+        return result
+
+    def chunked_run(self, chunk: str = '365D', warmup: int | None = None, warmup_factor: float = 10.,
+                    path: str | None = None, verify: bool = False, show_bar: bool = True,
+                    isprint: bool = True) -> ChunkedResult:
+        """## 分块回测（超长历史数据按时间分块，控制内存占用）
+
+        - 按时间分块回测，每块只加载本块区间及预热K线并重新计算指标，
+          Broker/BtAccount状态在块边界结转，账户历史逐块写入磁盘后拼接
+        - 预热K线根数默认自动确定（各指标开头NaN根数与min_start_length取大，乘以warmup_factor），
+          块边界指标值与上一块不一致时自动加倍
+        - 回测区间为策略config的start_time ~ end_time（未设置时为全部数据），不按data_length截取
+        - 本地K线历史库中的数据按区间读取；块边界的挂单与止盈止损状态不结转
+        - 仅支持单策略（取第一个策略）
+
+        Args:
+            chunk (str, optional): 每块时间跨度（pd.Timedelta格式，如'90D'）. 默认'365D'
+            warmup (int | None, optional): 预热K线根数，None为自动确定. 默认None
+            warmup_factor (float, optional): 自动确定预热长度的放大倍数. 默认10.
+            path (str | None, optional): 账户历史目录，None时在临时目录中创建. 默认None
+            verify (bool, optional): 是否与普通内存回测（run）比较结果. 默认False
+            show_bar (bool, optional): 是否显示进度. 默认True
+            isprint (bool, optional): 是否打印结果. 默认True
+
+        Returns:
+            ChunkedResult: 分块回测结果（各块明细、磁盘上的拼接账户历史、核心指标）
+
+        Examples:
+        >>> result = Bt().addstrategy(MA).chunked_run('180D', verify=True)
+            result.equity.plot()
+        """
+        from .strategy.chunked import ChunkedBacktest
+        if not self.strategies:
+            from .strategy.strategy import default_strategy
+            strategy_list = [s for s in Strategy.__subclasses__()
+                             if s is not default_strategy]
+            assert strategy_list, '请添加策略（通过addstrategy()）'
+            self.addstrategy(strategy_list[0])
+        if self.__datas:
+            Base._datas = self.__datas
+        if self._api:
+            Base._api = self._api
+        result = ChunkedBacktest(self.strategies[0], chunk, warmup, warmup_factor,
+                                 path, show_bar).run()
+        if isprint:
+            result.pprint()
+        if verify:
+            result.verify(isprint=isprint)
+        self.__is_finish = True
+        return result
+
     def run(self, isplot=True, isreport: bool = False, **kwargs) -> Bt:
         """## 策略执行入口函数（根据配置自动识别运行模式：实盘交易/参数优化/回测分析）
 
@@ -1515,9 +1683,10 @@ class Bt:
 
         Kwargs:
             #### 多策略并行参数
-            - model (str): 并行计算库选择，可选 ['sequential','dask','joblib','sklearn','multiprocessing']。
+            - model (str): 并行计算库选择，可选 ['sequential','dask','joblib','sklearn','fork','multiprocessing']。
                 - 'sequential': 顺序执行（默认，推荐！避免 TqApi 数据竞态导致多策略结果不一致）
                 - 'joblib': 线程并行（多策略共享 TqApi 时可能数据竞态）
+                - 'fork': fork多进程（Linux），子进程写时复制继承数据，仅返回紧凑回测结果（不支持画图）
 
             #### 可视化图表参数 (传递至 bokeh_plot)
             - trade_signal (bool): 是否显示交易信号标记（开仓/平仓点）。默认为 True
@@ -1592,6 +1761,8 @@ class Bt:
         # 5. 传递额外参数到所有策略（如画图开关、账户配置）
         for k, v in kwargs.items():
             [setattr(strategy, k, v) for strategy in self.strategies]
+        # 无图表回测（指标raw模式，见minibt.indicators.raw）
+        [setattr(strategy, '_headless', not isplot) for strategy in self.strategies]
 
         # 5.6 自动检测策略 op_config 优化配置（无需手动调用 optstrategy()）
         if not self.__isoptimize:
@@ -1621,11 +1792,13 @@ class Bt:
             # 清空全局策略实例集合，避免上次回测残留干扰优化
             from .utils import StrategyInstances
             Base._strategy_instances = StrategyInstances()
-            # 按优化方法执行（GA/Optuna）
-            if self.__op_method == 'optuna':
-                self.__optuna(self.strategies[0], isplot)  # Optuna优化（单策略）
-            elif self.__op_method == 'ga':
-                self.__optstrategy()  # GA优化（单策略）
+            # 按优化方法执行（GA/Optuna），共享数据集的作用域为本次优化
+            from .data.shared import shared_datas
+            with shared_datas.scope():
+                if self.__op_method == 'optuna':
+                    self.__optuna(self.strategies[0], isplot)  # Optuna优化（单策略）
+                elif self.__op_method == 'ga':
+                    self.__optstrategy()  # GA优化（单策略）
 
         # 8. 分支3：回测模式（默认分支）
         # 8.0 清空全局策略实例集合，避免上次回测残留导致 _converted_key 查找错误
@@ -1633,22 +1806,25 @@ class Bt:
         Base._strategy_instances = StrategyInstances()
 
         # 8.1 初始化策略实例（为每个策略分配唯一ID）
-        self.strategies = [s(_sid=i, _isoptimize=False, _isreplay=replay)
-                           for i, s in enumerate(self.strategies)]
-
-        # 8.2 单策略回测（含RL策略）
-        if num_strategy <= 1:
-            # 实例化策略并执行回测（调用策略__call__方法）
-            self.strategies = [s() for s in self.strategies]
-            # RL策略特殊处理：若开启随机策略测试，直接返回（不执行完整回测）
-            if self.strategies[0].rl and self.strategies[0]._rl_config.random_policy_test:
-                return self
+        # 共享数据集的作用域为本次运行（结束后释放，不跨运行复用）
+        from .data.shared import shared_datas
+        with shared_datas.scope():
+            self.strategies = [s(_sid=i, _isoptimize=False, _isreplay=replay)
+                               for i, s in enumerate(self.strategies)]
+
+            # 8.2 单策略回测（含RL策略）
+            if num_strategy <= 1:
+                # 实例化策略并执行回测（调用策略__call__方法）
+                self.strategies = [s() for s in self.strategies]
+                # RL策略特殊处理：若开启随机策略测试，直接返回（不执行完整回测）
+                if self.strategies[0].rl and self.strategies[0]._rl_config.random_policy_test:
+                    return self
 
-        # 8.3 多策略回测（默认顺序执行，避免 TqApi 数据竞态；可通过 model='joblib' 切换为并行）
-        else:
-            # 读取并行库参数（默认 sequential 顺序执行）
-            parallel_model = kwargs.pop('model', 'sequential')
-            self.strategies = self.__multi_run(parallel_model)
+            # 8.3 多策略回测（默认顺序执行，避免 TqApi 数据竞态；可通过 model='joblib' 切换为并行）
+            else:
+                # 读取并行库参数（默认 sequential 顺序执行）
+                parallel_model = kwargs.pop('model', 'sequential')
+                self.strategies = self.__multi_run(parallel_model)
 
         # 9. 回测完成后处理
         self.__is_finish = True  # 标记回测完成
@@ -1666,8 +1842,10 @@ class Bt:
                 self._strategy_replay(**kwargs)
             return self
         else:
-            # 9.2 生成图表（若isplot=True）
-            if isplot:
+            # 9.2 生成图表（若isplot=True，fork多进程回测仅返回紧凑结果，不支持画图）
+            if isplot and self.strategies[0]._ledger is not None:
+                print("fork多进程回测结果不包含绘图数据，已跳过画图")
+            elif isplot:
                 gui = kwargs.pop('gui', 'bokeh')
                 if gui == 'light_chart':
                     # 使用light_chart Qt图表展示模式（display_only，不逐K线回放）
@@ -1697,7 +1875,7 @@ class Bt:
         """私有方法：多策略并行回测（支持4种并行库，按需选择）
 
         Args:
-            model (str): 并行库标识（'dask'/'joblib'/'sklearn'/'multiprocessing'）
+            model (str): 并行库标识（'dask'/'joblib'/'sklearn'/'fork'/'multiprocessing'）
 
         Returns:
             list[Strategy]: 已完成回测的策略实例列表
@@ -1738,6 +1916,10 @@ class Bt:
             # Sequential：顺序执行（避免 TqApi 数据竞态，推荐多策略默认用此模式）
             results = [s() for s in self.strategies]
 
+        elif model == 'fork':
+            # Fork：子进程写时复制继承已加载的数据，仅返回紧凑回测结果（仅支持Linux/macOS）
+            results = self.__fork_run(max_workers)
+
         else:
             # 多进程（ProcessPoolExecutor）：适合CPU密集型任务
             from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
@@ -1756,6 +1938,35 @@ class Bt:
 
         return results
 
+    def __fork_run(self, max_workers: int) -> list[Strategy]:
+        """私有方法：基于fork的多进程回测
+
+        - 子进程通过写时复制继承父进程中的策略与已加载数据，无需序列化策略对象
+        - 子进程仅返回紧凑回测结果（账户历史数组、交易明细、核心指标），父进程恢复到原策略实例，
+          Stats/QSPlots在首次访问时创建
+        - 子进程不整理绘图数据，结果不支持bokeh图表
+        - 不支持fork的平台自动退回顺序执行
+
+        Args:
+            max_workers (int): 最大进程数
+
+        Returns:
+            list[Strategy]: 已恢复回测结果的策略实例列表
+        """
+        import multiprocessing as mp
+        if 'fork' not in mp.get_all_start_methods():
+            print("当前平台不支持fork，已切换为顺序执行")
+            return [s() for s in self.strategies]
+        global _FORK_STRATEGIES
+        _FORK_STRATEGIES = self.strategies
+        try:
+            with mp.get_context('fork').Pool(processes=max_workers) as pool:
+                ledgers = pool.map(_run_forked_strategy,
+                                   range(len(self.strategies)))
+        finally:
+            _FORK_STRATEGIES = []
+        return [s._from_ledger(ledger) for s, ledger in zip(self.strategies, ledgers)]
+
     def bokeh_plot(
             self,
             trade_signal: bool = True,
@@ -2332,6 +2543,18 @@ class Bt:
         return [t.get_results() for i, t in enumerate(self.strategies)
                 if 'all' in select_list or i in select_list]
 
+    def memory_report(self, display: bool = True) -> pd.DataFrame:
+        """## 共享数据集内存报告（多策略共享相同数据时节省的内存）
+
+        Args:
+            display (bool, optional): 是否打印报告. 默认True
+
+        Returns:
+            pd.DataFrame: 各共享数据集/派生数据的字节数、引用次数与节省的字节数
+        """
+        from .data.shared import shared_datas
+        return shared_datas.memory_report(display)
+
     def qs_stats(self, select: int = 0) -> Stats:
         """## 获取QuantStats性能统计对象（支持调用多种性能/风险指标方法）
 
@@ -2355,7 +2578,7 @@ class Bt:
         select = select if isinstance(
             select, int) and 0 <= select < self.__multi_num else 0
         # 返回选中策略的Stats对象
-        return self.strategies[select]._stats
+        return self.strategies[select].stats
 
     def qs_plot(self, select: int = 0) -> QSPlots:
         """## 获取QuantStats可视化对象（支持绘制多种回测结果图表）
@@ -2379,7 +2602,7 @@ class Bt:
         select = select if isinstance(
             select, int) and 0 <= select < self.__multi_num else 0
         # 返回选中策略的QSPlots对象
-        return self.strategies[select]._qs_plots
+        return self.strategies[select].qs_plots
 
     def qs_metrics(self, benchmark=None, rf=0., display=True,
                    mode='basic', sep=False, compounded=True,
@@ -245,8 +245,8 @@ class CoreFunc:
         arg, kwarg = self._get_column_(locals(), *FILED.C)
         return ZeroDivision(*arg, **kwarg)  # pyright: ignore[reportUnknownVariableType]
 
-    def pta_rolling_apply(self, func: Callable, window: int, prepend_nans: bool = True, n_jobs: int = 1, **kwargs) -> np.ndarray:  # pyright: ignore[reportMissingTypeArgument]
-        return rolling_apply(self, func, window, prepend_nans, n_jobs, **kwargs)  # pyright: ignore[reportUnknownVariableType]
+    def pta_rolling_apply(self, func: Callable, window: int, prepend_nans: bool = True, n_jobs: int = 1, engine: str | None = None, **kwargs) -> np.ndarray:  # pyright: ignore[reportMissingTypeArgument]
+        return rolling_apply(self, func, window, prepend_nans, n_jobs, engine, **kwargs)  # pyright: ignore[reportUnknownVariableType]
 
     def Linear_Regression_Candles(self, length=11, **kwargs):
         """# Linear_Regression_Candles
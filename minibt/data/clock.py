@@ -0,0 +1,174 @@
+from __future__ import annotations
+from typing import Iterator, Sequence
+import numpy as np
+
+
+__all__ = ["MasterClock"]
+
+
+class MasterClock:
+    """## 多合约主事件时钟
+
+    - `KLinesSet` 默认所有KLine共用同一个 `btindex` 推进，上市日期、交易时段不同或缺失K线的合约
+      须预先对齐并前向填充，既占内存又产生虚假K线
+    - 主事件时钟将各列（合约）的时间索引一次合并为升序去重的事件时间轴
+      （各列自身有序，稳定归并排序按有序段归并，即k路归并）
+    - 每列保存自身K线所在的事件位置，并以CSR结构（事件 → 本事件更新的列）存放，
+      总内存与K线总数成正比，不随列数×事件数增长
+    - 逐事件推进时只移动本事件有K线的列的游标：游标为该列当前K线索引，上市前为-1
+    - `columns` 将数据id映射到列：resample/replay数据跟随源数据所在列
+      （resample数据再经 `IndicatorsBase._align_map` 转换为自身索引）
+
+    Args:
+        datetimes (Sequence[np.ndarray]): 各列K线时间（datetime64，须升序）
+        columns (dict[int, int] | None): 数据id → 列索引. 默认None（数据id即列索引）
+
+    Examples:
+        >>> clock = MasterClock([kline1.datetime.values, kline2.datetime.values])
+        >>> for event in clock.events(start=-1):
+        ...     clock.index(1), clock.is_updated(1)
+    """
+
+    def __init__(self, datetimes: Sequence[np.ndarray], columns: dict[int, int] | None = None):
+        assert datetimes, "主事件时钟至少需要一列时间索引"
+        stamps = [np.asarray(dt).astype("datetime64[ns]").view(np.int64)
+                  for dt in datetimes]
+        merged = np.concatenate(stamps)
+        merged.sort(kind="mergesort")
+        if merged.size:
+            merged = merged[np.concatenate(([True], merged[1:] != merged[:-1]))]
+        self.times: np.ndarray = merged
+        # 各列每根K线所在的事件位置
+        self._bar_events: list[np.ndarray] = [
+            np.searchsorted(merged, stamp) for stamp in stamps]
+        # CSR：事件t更新的列为 _event_columns[_event_offsets[t]:_event_offsets[t+1]]
+        events = np.concatenate(self._bar_events)
+        column_ids = np.repeat(np.arange(len(stamps)), [s.size for s in stamps])
+        order = np.argsort(events, kind="stable")
+        self._event_columns: np.ndarray = column_ids[order]
+        self._event_offsets: np.ndarray = np.searchsorted(
+            events[order], np.arange(merged.size + 1))
+        self.columns: dict[int, int] = dict(columns) if columns else {
+            i: i for i in range(len(stamps))}
+        self.lengths: list[int] = [s.size for s in stamps]
+        self.event: int = -1
+        self.cursors: list[int] = [-1] * len(stamps)
+        self.updated: list[bool] = [False] * len(stamps)
+
+    def __len__(self) -> int:
+        return self.times.size
+
+    @property
+    def num(self) -> int:
+        """列数"""
+        return len(self.lengths)
+
+    @property
+    def datetime(self) -> np.datetime64 | None:
+        """当前事件时间"""
+        if 0 <= self.event < self.times.size:
+            return self.times[self.event].astype("datetime64[ns]")
+
+    def column(self, data_id: int) -> int:
+        """数据id所在列（未登记的数据id使用第0列）"""
+        return self.columns.get(data_id, 0)
+
+    def index(self, data_id: int) -> int:
+        """## 数据在当前事件的K线索引（上市前为-1）"""
+        return self.cursors[self.columns.get(data_id, 0)]
+
+    def is_updated(self, data_id: int) -> bool:
+        """## 数据在当前事件是否有真实K线更新"""
+        return self.updated[self.columns.get(data_id, 0)]
+
+    def seek(self, event: int) -> None:
+        """## 定位到第event个事件（各列游标以二分查找计算，本事件更新的列置为已更新）
+
+        Args:
+            event (int): 事件索引，-1为第一个事件之前
+        """
+        self.event = event
+        self.cursors = [int(np.searchsorted(bars, event, side="right")) - 1
+                        for bars in self._bar_events]
+        self.updated = [False] * self.num
+        if 0 <= event < self.times.size:
+            for column in self._event_columns[
+                    self._event_offsets[event]:self._event_offsets[event + 1]].tolist():
+                self.updated[column] = True
+
+    def start_event(self, start: int = -1) -> int:
+        """## 第一个有列K线索引超过start的事件（各列预热期结束），没有时返回事件数"""
+        events = [bars[start + 1] for bars in self._bar_events if bars.size > start + 1]
+        return int(min(events)) if events else self.times.size
+
+    def events(self, start: int = -1) -> Iterator[int]:
+        """## 逐事件推进游标
+
+        - 只产出至少有一列K线索引超过start（预热期之后）且本事件有更新的事件
+        - 产出时 `cursors`/`updated` 已指向该事件；预热期内的更新不计为已更新
+
+        Args:
+            start (int): 预热期最后一根K线的索引（与策略初始 `_btindex` 一致）. 默认-1
+
+        Yields:
+            int: 事件索引
+        """
+        first = self.start_event(start)
+        self.seek(first - 1)
+        cursors = self.cursors
+        offsets, event_columns = self._event_offsets.tolist(), self._event_columns
+        for event in range(first, self.times.size):
+            updated = [False] * len(cursors)
+            active = False
+            for column in event_columns[offsets[event]:offsets[event + 1]].tolist():
+                cursors[column] += 1
+                if cursors[column] > start:
+                    updated[column] = True
+                    active = True
+            if not active:
+                continue
+            self.event = event
+            self.updated = updated
+            yield event
+
+    def cursor_matrix(self) -> np.ndarray:
+        """## 各事件各列的K线索引矩阵（形状：事件数×列数，上市前为-1，用于分析与绘图对齐）"""
+        out = np.empty((self.times.size, self.num), dtype=np.int64)
+        events = np.arange(self.times.size)
+        for column, bars in enumerate(self._bar_events):
+            out[:, column] = np.searchsorted(bars, events, side="right") - 1
+        return out
+
+    @classmethod
+    def from_klines(cls, klines) -> MasterClock:
+        """## 由策略K线数据集创建（resample/replay数据跟随源数据列）
+
+        Args:
+            klines (KLinesSet): 策略K线数据集
+
+        Returns:
+            MasterClock: 主事件时钟
+        """
+        datetimes, columns, sources = [], {}, {}
+        for kline in klines.values():
+            if kline._indsetting.isresample or kline._indsetting.isreplay:
+                sources[kline.data_id] = kline.resample_id if kline._indsetting.isresample else kline.replay_id
+                continue
+            columns[kline.data_id] = len(datetimes)
+            datetimes.append(kline.pandas_object["datetime"].values)
+        for data_id, source in sources.items():
+            columns[data_id] = columns.get(source, 0)
+        return cls(datetimes, columns)
+
+    @staticmethod
+    def needed(klines) -> bool:
+        """## 各列（非resample/replay）K线时间索引是否不同（'auto'模式下据此启用时钟）"""
+        datetimes = [kline.pandas_object["datetime"].values for kline in klines.values()
+                     if not (kline._indsetting.isresample or kline._indsetting.isreplay)]
+        if len(datetimes) < 2:
+            return False
+        first = datetimes[0]
+        return any(dt.size != first.size or not np.array_equal(dt, first) for dt in datetimes[1:])
+
+    def __repr__(self) -> str:
+        return f"MasterClock(events={self.times.size}, columns={self.num}, lengths={self.lengths})"
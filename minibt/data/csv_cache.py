@@ -0,0 +1,200 @@
+from __future__ import annotations
+import os
+import json
+import hashlib
+import warnings
+import numpy as np
+import pandas as pd
+
+
+__all__ = ["CsvCache", "csv_cache"]
+
+
+class CsvCache:
+    """## 本地CSV数据的列式二进制缓存
+
+    - `LocalDatas` 的CSV文件每次加载都要 `read_csv` 并逐行转换时间，长历史数据加载很慢
+    - 首次加载时解析CSV（时间列以 `times_to_datetime` 向量化转换），
+      按dtype将各列合并为二维块，每块保存为一个 `.npy` 文件，另存清单 `manifest.json`
+    - 再次加载时以 `np.load(mmap_mode="c")` 内存映射各块并直接组装DataFrame，不解析CSV、不复制数据
+      （写时复制：修改数据只影响当前进程，不回写缓存）
+    - 以源文件的修改时间(mtime_ns)与大小作为失效依据，清单最后写入，写入中断不会留下可用的半成品
+    - 含非字符串对象（如缺失值）的对象列无法保存为定长字符串数组，此时只解析不缓存
+    - 缓存目录默认 `~/.minibt/csv_cache`，每个源文件一个子目录
+
+    Args:
+        path (str | None): 缓存目录. 默认 `~/.minibt/csv_cache`
+
+    Examples:
+        >>> from minibt.data.csv_cache import csv_cache
+        >>> df = csv_cache.read(LocalDatas.get_path("test"))
+        >>> csv_cache.clear()
+    """
+
+    version = 1
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.path.join(os.path.expanduser(
+            "~"), ".minibt", "csv_cache")
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, path: str | None = None) -> CsvCache:
+        """## 修改缓存目录"""
+        if path is not None:
+            self.path = path
+        return self
+
+    def _entry_dir(self, source: str, parse_datetime: bool) -> str:
+        key = f"{os.path.abspath(source)}|{int(parse_datetime)}"
+        name = os.path.splitext(os.path.basename(source))[0]
+        return os.path.join(self.path, f"{name}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}")
+
+    def read(self, source: str, parse_datetime: bool = True) -> pd.DataFrame:
+        """## 读取CSV文件（优先使用缓存）
+
+        Args:
+            source (str): CSV文件路径
+            parse_datetime (bool): 是否将datetime列转换为datetime64[ns]. 默认True
+
+        Returns:
+            pd.DataFrame: 与 `pd.read_csv(source)` 列顺序一致的数据
+        """
+        from ..utils import options
+        if not options._csv_cache:
+            return self._parse(source, parse_datetime)
+        stat = os.stat(source)
+        entry = self._entry_dir(source, parse_datetime)
+        manifest = self._manifest(entry)
+        if manifest is not None and manifest["mtime_ns"] == stat.st_mtime_ns and \
+                manifest["size"] == stat.st_size and manifest["version"] == self.version:
+            try:
+                frame = self._load(entry, manifest)
+            except (OSError, ValueError):
+                frame = None
+            if frame is not None:
+                self.hits += 1
+                return frame
+        self.misses += 1
+        frame = self._parse(source, parse_datetime)
+        try:
+            self._save(entry, frame, stat)
+        except OSError as e:
+            warnings.warn(f"CSV缓存写入失败（{entry}）：{e}")
+        return frame
+
+    @staticmethod
+    def _parse(source: str, parse_datetime: bool) -> pd.DataFrame:
+        frame = pd.read_csv(source)
+        if parse_datetime and "datetime" in frame.columns:
+            try:
+                from ..other import times_to_datetime
+                frame["datetime"] = times_to_datetime(frame["datetime"])
+            except Exception:
+                print(f"本地数据{os.path.splitext(os.path.basename(source))[0]}的时间数据无法处理")
+        return frame
+
+    @staticmethod
+    def _manifest(entry: str) -> dict | None:
+        path = os.path.join(entry, "manifest.json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _blocks(frame: pd.DataFrame) -> list[tuple[str, list[int]]] | None:
+        """按dtype分组的列位置，含无法保存的列时返回None"""
+        groups: dict[str, list[int]] = {}
+        for position, (_, column) in enumerate(frame.items()):
+            dtype = column.dtype
+            if dtype.kind in "biufM" and isinstance(dtype, np.dtype):
+                key = dtype.str if dtype.kind != "M" else "<M8[ns]"
+            elif dtype == object and all(isinstance(v, str) for v in column.values):
+                key = "str"
+            else:
+                return None
+            groups.setdefault(key, []).append(position)
+        return list(groups.items())
+
+    def _save(self, entry: str, frame: pd.DataFrame, stat: os.stat_result) -> None:
+        blocks = self._blocks(frame)
+        if blocks is None:
+            return
+        os.makedirs(entry, exist_ok=True)
+        manifest_path = os.path.join(entry, "manifest.json")
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        records = []
+        for i, (key, positions) in enumerate(blocks):
+            columns = [frame.iloc[:, p] for p in positions]
+            if key == "str":
+                values = np.vstack([c.to_numpy(dtype=str) for c in columns]) if len(frame) else \
+                    np.empty((len(positions), 0), dtype="<U1")
+            else:
+                values = np.vstack([c.to_numpy(dtype=np.dtype(key)) for c in columns]) if len(frame) else \
+                    np.empty((len(positions), 0), dtype=np.dtype(key))
+            file = f"block{i}.npy"
+            temp = os.path.join(entry, f"{file}.tmp")
+            with open(temp, "wb") as f:
+                np.save(f, np.ascontiguousarray(values))
+            os.replace(temp, os.path.join(entry, file))
+            records.append(dict(file=file, dtype=key, positions=positions))
+        manifest = dict(version=self.version, mtime_ns=stat.st_mtime_ns, size=stat.st_size,
+                        rows=len(frame), columns=[str(c) for c in frame.columns], blocks=records)
+        temp = f"{manifest_path}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(temp, manifest_path)
+
+    @classmethod
+    def _load(cls, entry: str, manifest: dict) -> pd.DataFrame | None:
+        blocks = []
+        for record in manifest["blocks"]:
+            values = np.load(os.path.join(entry, record["file"]), mmap_mode="c")
+            if record["dtype"] == "str":
+                values = values.astype(object)
+            blocks.append((values, record["positions"]))
+        columns = pd.Index(manifest["columns"])
+        index = pd.RangeIndex(manifest["rows"])
+        frame = cls._from_blocks(blocks, columns, index)
+        if frame is None:
+            frame = pd.DataFrame(
+                {columns[p]: values[i] for values, positions in blocks for i, p in enumerate(positions)},
+                index=index)
+            frame = frame[columns]
+        return frame
+
+    @staticmethod
+    def _from_blocks(blocks: list[tuple[np.ndarray, list[int]]], columns: pd.Index,
+                     index: pd.Index) -> pd.DataFrame | None:
+        """由二维块直接组装DataFrame（不复制），pandas内部接口不可用时返回None"""
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                from pandas.core.internals import BlockManager
+                from pandas.core.internals.api import make_block
+                manager = BlockManager(
+                    tuple(make_block(values, placement=positions, ndim=2) for values, positions in blocks),
+                    [columns, index])
+                if hasattr(pd.DataFrame, "_from_mgr"):
+                    return pd.DataFrame._from_mgr(manager, axes=manager.axes)
+                return pd.DataFrame(manager)
+        except Exception:
+            return None
+
+    def clear(self, source: str | None = None) -> None:
+        """## 删除缓存（source为None时删除全部）"""
+        import shutil
+        if source is None:
+            shutil.rmtree(self.path, ignore_errors=True)
+            return
+        for parse_datetime in (True, False):
+            shutil.rmtree(self._entry_dir(source, parse_datetime), ignore_errors=True)
+
+
+# 全局CSV缓存
+csv_cache = CsvCache()
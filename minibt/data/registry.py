@@ -0,0 +1,145 @@
+from __future__ import annotations
+import os
+import json
+import threading
+
+
+__all__ = ["LocalRegistry", "local_registry"]
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test")
+USER_DIR = os.path.join(os.path.expanduser("~"), ".minibt", "datas")
+
+
+class LocalRegistry:
+    """## 本地CSV数据集索引（惰性构建、增量刷新）
+
+    - 原实现在 `import minibt` 时glob全部CSV并可能重写 `data/utils.py`，
+      本地文件多时导入耗时数秒，只读安装（site-packages）下还会写入失败
+    - 按名称取数据时只检查 `<目录>/<名称>.csv` 是否存在（一次stat），不扫描目录
+    - 需要列出全部数据集时才扫描目录，结果连同目录修改时间保存到用户缓存目录的JSON清单，
+      目录修改时间不变时直接使用清单（增量：只重新扫描发生变化的目录）
+    - 不向包目录写入任何文件；保存的数据写入用户数据目录 `~/.minibt/datas`
+
+    Args:
+        dirs (list[str] | None): 数据目录（靠前的优先）. 默认[用户数据目录, 包内test目录]
+        manifest (str | None): 清单文件. 默认 `~/.minibt/local_datas.json`
+
+    Examples:
+        >>> from minibt.data.registry import local_registry
+        >>> local_registry.add_dir("D:/my_csv")
+        >>> local_registry.names()
+    """
+
+    def __init__(self, dirs: list[str] | None = None, manifest: str | None = None):
+        self.dirs: list[str] = list(dirs) if dirs else [USER_DIR, PACKAGE_DIR]
+        self.manifest = manifest or os.path.join(os.path.expanduser(
+            "~"), ".minibt", "local_datas.json")
+        self._index: dict[str, dict] | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def save_dir(self) -> str:
+        """保存数据的目录（用户数据目录）"""
+        return USER_DIR
+
+    def add_dir(self, path: str) -> LocalRegistry:
+        """## 添加数据目录（优先于已有目录）"""
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self.dirs:
+                self.dirs.insert(0, path)
+        return self
+
+    def path(self, name: str) -> str | None:
+        """## 数据集文件路径，不存在时返回None（不扫描目录）"""
+        for directory in self.dirs:
+            path = os.path.join(directory, f"{name}.csv")
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def default_path(self, name: str) -> str:
+        """## 数据集文件路径，不存在时返回保存目录中的路径"""
+        return self.path(name) or os.path.join(self.save_dir, f"{name}.csv")
+
+    def __contains__(self, name: str) -> bool:
+        return self.path(name) is not None
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            with open(self.manifest, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _dump(self, index: dict[str, dict]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.manifest), exist_ok=True)
+            temp = f"{self.manifest}.tmp"
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(temp, self.manifest)
+        except OSError:
+            ...
+
+    def refresh(self, force: bool = False) -> dict[str, str]:
+        """## 刷新索引（只重新扫描修改时间变化的目录）
+
+        Args:
+            force (bool): 是否重新扫描全部目录. 默认False
+
+        Returns:
+            dict[str, str]: 数据集名称 → 文件路径
+        """
+        with self._lock:
+            if self._index is None:
+                self._index = self._load()
+            changed = False
+            for directory in self.dirs:
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except OSError:
+                    if self._index.pop(directory, None) is not None:
+                        changed = True
+                    continue
+                record = self._index.get(directory)
+                if not force and record is not None and record.get("mtime_ns") == mtime:
+                    continue
+                with os.scandir(directory) as entries:
+                    names = sorted(os.path.splitext(entry.name)[0] for entry in entries
+                                   if entry.is_file() and entry.name.endswith(".csv"))
+                self._index[directory] = dict(mtime_ns=mtime, names=names)
+                changed = True
+            if changed:
+                self._dump(self._index)
+            return self._mapping()
+
+    def _mapping(self) -> dict[str, str]:
+        mapping: dict[str, str] = {}
+        for directory in reversed(self.dirs):
+            record = self._index.get(directory)
+            if record:
+                for name in record["names"]:
+                    mapping[name] = os.path.join(directory, f"{name}.csv")
+        return mapping
+
+    def names(self, directory: str | None = None) -> list[str]:
+        """## 数据集名称
+
+        Args:
+            directory (str | None): 只列出该目录中的数据集. 默认全部目录
+
+        Returns:
+            list[str]: 数据集名称
+        """
+        mapping = self.refresh()
+        if directory is None:
+            return sorted(mapping)
+        with self._lock:
+            record = self._index.get(os.path.abspath(directory))
+        return list(record["names"]) if record else []
+
+
+# 全局本地数据索引
+local_registry = LocalRegistry()
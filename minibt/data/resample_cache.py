@@ -0,0 +1,200 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+import numpy as np
+import pandas as pd
+
+
+__all__ = ["ResampleCache", "resample_cache"]
+
+
+class ResampleCache:
+    """## 周期转换结果缓存（跨策略、跨参数组）
+
+    - `Strategy._resample`/`_replay`（含KLine.resample/replay）与多周期K线对齐
+      在每次策略初始化时重复计算，参数优化每组参数、多策略运行每个策略各算一次
+    - 以(源数据内容指纹, 源周期, 目标周期, 时间规则, 转换类型)为键缓存结果，
+      与数据对象身份无关（每组参数重新生成的KLine同样命中）
+    - DataFrame结果的数值数组设为只读并以浅拷贝视图共享，np.ndarray结果返回副本
+      （由其重新创建的指标需要可写数组）
+    - LRU内存预算：超出 `max_bytes` 时淘汰最久未使用的结果
+    - 数据修补模式（options.set_data_patching）下K线数据会被原地修改，不缓存
+    - 线程安全：参数优化多线程试验共用缓存，读写LRU时加锁，转换计算在锁外进行
+      （同一键并发未命中时可能重复计算，只保留先写入的结果）
+
+    Args:
+        max_bytes (int): 内存预算（字节）. 默认256MB
+
+    Examples:
+        >>> from minibt.data.resample_cache import resample_cache
+        >>> resample_cache.configure(max_bytes=1 << 30)
+        >>> Bt().addstrategy(MyStrategy).optstrategy(...).run()
+        >>> resample_cache.report()
+    """
+
+    def __init__(self, max_bytes: int = 256 << 20):
+        self._entries: OrderedDict[tuple, list] = OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, max_bytes: int | None = None) -> ResampleCache:
+        """## 设置内存预算
+
+        Args:
+            max_bytes (int | None): 内存预算（字节），0为关闭缓存. 默认None（不变）
+        """
+        if max_bytes is not None:
+            with self._lock:
+                self.max_bytes = int(max_bytes)
+                self._evict()
+        return self
+
+    @property
+    def nbytes(self) -> int:
+        """当前占用字节数"""
+        return self._nbytes
+
+    @property
+    def hit_rate(self) -> float:
+        """命中率"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.
+
+    @staticmethod
+    def make_key(kind: str, *sources, **params) -> tuple | None:
+        """## 生成缓存键
+
+        Args:
+            kind (str): 转换类型（resample/replay/kline）
+            sources: 源数据（pd.DataFrame / pd.Series / np.ndarray），以内容指纹表示
+            params: 周期、时间规则等转换参数
+
+        Returns:
+            tuple | None: 缓存键，缓存关闭时返回None
+        """
+        from ..utils import options
+        if not options._resample_cache or options._data_patching:
+            return
+        from ..indicators.memo import fingerprint
+        return (kind, tuple(fingerprint(source) for source in sources),
+                tuple(sorted(params.items())))
+
+    def derive(self, key: tuple | None, func: Callable[[], Any]) -> Any:
+        """## 获取或计算周期转换结果
+
+        Args:
+            key (tuple | None): 缓存键，None时直接计算不缓存
+            func (Callable): 无参计算函数
+
+        Returns:
+            Any: 转换结果（DataFrame为共享只读数组的浅拷贝视图，ndarray为副本）
+        """
+        if key is None or self.max_bytes <= 0:
+            return func()
+        with self._lock:
+            record = self._entries.get(key)
+            if record is not None:
+                self.hits += 1
+                record[1] += 1
+                self._entries.move_to_end(key)
+        if record is None:
+            result = self._freeze(func())
+            nbytes = self._result_nbytes(result)
+            with self._lock:
+                self.misses += 1
+                record = self._entries.get(key)
+                if record is None:
+                    record = [result, 0, nbytes]
+                    if nbytes <= self.max_bytes:
+                        self._entries[key] = record
+                        self._nbytes += nbytes
+                        self._evict()
+        return self._view_result(record[0])
+
+    def _evict(self) -> None:
+        """淘汰最久未使用的结果（调用方持有锁）"""
+        while self._nbytes > self.max_bytes and self._entries:
+            _, record = self._entries.popitem(last=False)
+            self._nbytes -= record[2]
+            self.evictions += 1
+
+    @classmethod
+    def _freeze(cls, result: Any) -> Any:
+        """将结果的数值数组设为只读（object列除外：pandas统计object列内存需要可写缓冲区）"""
+        if isinstance(result, (pd.DataFrame, pd.Series)):
+            for block in result._mgr.blocks:
+                if isinstance(block.values, np.ndarray) and block.values.dtype != object:
+                    block.values.flags.writeable = False
+        elif isinstance(result, np.ndarray) and result.dtype != object:
+            result.flags.writeable = False
+        elif isinstance(result, tuple):
+            for r in result:
+                cls._freeze(r)
+        return result
+
+    @classmethod
+    def _view_result(cls, result: Any) -> Any:
+        if isinstance(result, (pd.DataFrame, pd.Series)):
+            return result.copy(deep=False)
+        if isinstance(result, np.ndarray):
+            return result.copy()
+        if isinstance(result, tuple):
+            return tuple(cls._view_result(r) for r in result)
+        if isinstance(result, list):
+            return list(result)
+        return result
+
+    @classmethod
+    def _result_nbytes(cls, result: Any) -> int:
+        if isinstance(result, (pd.DataFrame, pd.Series)):
+            usage = result.memory_usage(index=True, deep=True)
+            return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+        if isinstance(result, tuple):
+            return sum(cls._result_nbytes(r) for r in result)
+        if isinstance(result, np.ndarray):
+            return int(result.nbytes)
+        if isinstance(result, list):
+            return 8 * len(result)
+        return 0
+
+    def report(self, display: bool = True) -> pd.DataFrame:
+        """## 缓存报告
+
+        Args:
+            display (bool): 是否打印报告. 默认True
+
+        Returns:
+            pd.DataFrame: 各缓存结果的类型、参数、字节数与命中次数
+        """
+        with self._lock:
+            rows = [dict(kind=key[0], params=", ".join(f"{k}={v}" for k, v in key[2]),
+                         nbytes=nbytes, hits=hits)
+                    for key, (_, hits, nbytes) in self._entries.items()]
+        report = pd.DataFrame(rows, columns=["kind", "params", "nbytes", "hits"])
+        if display:
+            print(report.to_string(index=False))
+            print(f"周期转换缓存: {self._nbytes/1024**2:.2f}MB / {self.max_bytes/1024**2:.2f}MB  "
+                  f"命中: {self.hits}  未命中: {self.misses}  命中率: {self.hit_rate:.1%}  "
+                  f"淘汰: {self.evictions}")
+        return report
+
+    def clear(self):
+        """## 清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# 全局周期转换缓存
+resample_cache = ResampleCache()
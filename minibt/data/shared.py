@@ -0,0 +1,286 @@
+from __future__ import annotations
+import os
+from contextlib import contextmanager
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+import numpy as np
+import pandas as pd
+from ..other import FILED
+
+
+__all__ = ["SharedDatas", "shared_datas"]
+
+
+class SharedEntry:
+    """## 共享数据集条目
+
+    - data: 归一化后的K线数据（FILED.Quote字段，OHLCV为float64，datetime为datetime64）
+    - base: data[FILED.ALL]（各KLine的copy_object共享此对象）
+    - refs: 被引用次数（首次加载计1）
+    - source: 外部DataFrame数据源（保持引用，避免对象回收后id被复用而命中过期数据）
+    """
+    __slots__ = ("key", "data", "base", "refs", "source")
+
+    def __init__(self, key: tuple, data: pd.DataFrame, base: pd.DataFrame | None,
+                 source: pd.DataFrame | None = None):
+        self.key = key
+        self.data = data
+        self.base = base
+        self.refs = 1
+        self.source = source
+
+    @property
+    def nbytes(self) -> int:
+        nbytes = int(self.data.memory_usage(index=True, deep=True).sum())
+        if self.base is not None:
+            nbytes += int(self.base.memory_usage(index=True, deep=True).sum())
+        return nbytes
+
+
+class SharedDatas:
+    """## 共享数据集注册表（单次运行内多策略去重）
+
+    - 以(数据来源, 合约, 周期, 数据范围)为键，同一份K线数据只加载、只保存一次
+    - 各策略通过 `view` 获得共享底层数组的浅拷贝视图，K线对象的kline_object/copy_object直接引用共享数据
+    - resample/replay 等派生数据以(父键, 类型, 参数)为键共享
+    - `memory_report` 输出各数据集的引用次数与节省的内存
+    - 作用域为单次运行（`Bt.run` 等入口以 `scope()` 进入）：进入与退出时清空，
+      在线数据与外部DataFrame不会跨运行命中过期数据，注册表也不会跨运行驻留内存
+
+    ### 注意：
+    - 共享数据的数值列底层数组设为只读（writeable=False），原地修改视图内容会抛出异常
+    - 仅在回测模式下生效（实盘数据实时变化，不共享）
+
+    Examples:
+        >>> from minibt import options
+        >>> options.set_shared_datas = True  # 默认开启
+        >>> Bt().addstrategy(S1, S2, S3).run()
+        >>> from minibt.data.shared import shared_datas
+        >>> shared_datas.memory_report()
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[tuple, SharedEntry] = OrderedDict()
+        self._derived: OrderedDict[tuple, list] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # 上一次运行结束时的内存报告（报告, 命中, 未命中）
+        self._last_report: tuple[pd.DataFrame, int, int] | None = None
+
+    @contextmanager
+    def scope(self):
+        """## 单次运行作用域：进入时清空，退出时保存内存报告后清空"""
+        self.clear()
+        try:
+            yield self
+        finally:
+            self._last_report = (self.memory_report(False), self.hits, self.misses)
+            self.clear()
+
+    @staticmethod
+    def _freeze(frame: pd.DataFrame | pd.Series) -> None:
+        """将共享数据的底层数组设为只读（object列除外：pandas统计object列内存等操作需要可写缓冲区）"""
+        try:
+            arrays = frame._mgr.arrays
+        except AttributeError:
+            arrays = [frame.values]
+        for array in arrays:
+            if isinstance(array, np.ndarray) and array.dtype != object:
+                array.flags.writeable = False
+
+    @staticmethod
+    def make_key(symbol: Any, cycle: int, data_length: int | None, **kwargs) -> tuple | None:
+        """## 生成数据集键
+
+        Args:
+            symbol: get_kline的symbol参数（合约代码、文件路径或DataFrame）
+            cycle (int): 周期（秒）
+            data_length (int | None): 数据长度
+            kwargs: 影响数据内容的其它参数（如start_date/end_date/data_source/adjust）
+
+        Returns:
+            tuple | None: 数据集键，无法确定数据来源时返回None（不共享）
+        """
+        extra = tuple(sorted((k, v) for k, v in kwargs.items()
+                             if isinstance(v, Hashable) and v is not None))
+        if isinstance(symbol, pd.DataFrame):
+            if symbol.empty:
+                return
+            # 外部DataFrame：以对象身份、长度与首尾时间确定
+            datetime = symbol["datetime"] if "datetime" in symbol.columns else symbol.index
+            source = ("dataframe", id(symbol), len(symbol),
+                      str(datetime.iloc[0] if hasattr(datetime, "iloc") else datetime[0]),
+                      str(datetime.iloc[-1] if hasattr(datetime, "iloc") else datetime[-1]))
+        elif isinstance(symbol, str) and symbol:
+            from .registry import local_registry
+            from .store import bar_store
+            path = local_registry.path(symbol) or symbol
+            if bar_store.exists(symbol, cycle):
+                # 本地K线历史库：以数据文件修改时间与大小确定（追加后自动失效）
+                path = bar_store.path(symbol, cycle)
+                stat = os.stat(path)
+                source = ("store", os.path.abspath(path),
+                          stat.st_mtime_ns, stat.st_size)
+            elif os.path.exists(path):
+                # 本地文件：以路径、修改时间与文件大小确定（文件变化后自动失效）
+                stat = os.stat(path)
+                source = ("file", os.path.abspath(path),
+                          stat.st_mtime_ns, stat.st_size)
+            else:
+                source = ("online", symbol)
+        else:
+            return
+        return (source, int(cycle), data_length, extra)
+
+    def get(self, key: tuple | None) -> SharedEntry | None:
+        """## 获取共享数据集条目（命中时引用次数+1）"""
+        if key is None:
+            return
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return
+        self.hits += 1
+        entry.refs += 1
+        return entry
+
+    def add(self, key: tuple | None, data: pd.DataFrame,
+            source: pd.DataFrame | None = None) -> SharedEntry | None:
+        """## 注册共享数据集
+
+        - 具备FILED.Quote字段时归一化（与KLine内部处理一致），供KLine直接引用
+        - 注册的数据底层数组设为只读
+
+        Args:
+            key (tuple | None): 数据集键
+            data (pd.DataFrame): 已通过校验的K线数据
+            source (pd.DataFrame | None): 外部DataFrame数据源（键含其id时传入）. 默认None
+
+        Returns:
+            SharedEntry | None: 共享数据集条目
+        """
+        if key is None:
+            return
+        if set(data.columns).issuperset(FILED.Quote):
+            data = data[FILED.Quote].copy()
+            data[FILED.OHLCV] = data[FILED.OHLCV].astype(np.float64)
+            data["datetime"] = pd.to_datetime(data["datetime"])
+            base = data[FILED.ALL]
+        else:
+            data = data.copy()
+            base = None
+        self._freeze(data)
+        if base is not None:
+            self._freeze(base)
+        entry = SharedEntry(key, data, base, source)
+        self._entries[key] = entry
+        return entry
+
+    @staticmethod
+    def view(entry: SharedEntry) -> pd.DataFrame:
+        """## 返回共享数据的浅拷贝视图（共享底层数组）"""
+        return entry.data.copy(deep=False)
+
+    def derive(self, key: tuple | None, func: Callable[[], Any]) -> Any:
+        """## 获取或计算共享派生数据（resample/replay结果等）
+
+        Args:
+            key (tuple | None): 派生数据键，None时直接计算不共享
+            func (Callable): 无参计算函数
+
+        Returns:
+            Any: 派生数据（DataFrame结果返回浅拷贝视图）
+        """
+        if key is None:
+            return func()
+        if key in self._derived:
+            self.hits += 1
+            record = self._derived[key]
+            record[1] += 1
+        else:
+            self.misses += 1
+            record = [func(), 1]
+            self._freeze_result(record[0])
+            self._derived[key] = record
+        return self._view_result(record[0])
+
+    @classmethod
+    def _freeze_result(cls, result: Any) -> None:
+        if isinstance(result, (pd.DataFrame, pd.Series)):
+            cls._freeze(result)
+        elif isinstance(result, tuple):
+            for r in result:
+                cls._freeze_result(r)
+        elif isinstance(result, np.ndarray) and result.dtype != object:
+            result.flags.writeable = False
+
+    @classmethod
+    def _view_result(cls, result: Any) -> Any:
+        if isinstance(result, (pd.DataFrame, pd.Series)):
+            return result.copy(deep=False)
+        if isinstance(result, tuple):
+            return tuple(cls._view_result(r) for r in result)
+        return result
+
+    @staticmethod
+    def _result_nbytes(result: Any) -> int:
+        if isinstance(result, (pd.DataFrame, pd.Series)):
+            usage = result.memory_usage(index=True, deep=True)
+            return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+        if isinstance(result, tuple):
+            return sum(SharedDatas._result_nbytes(r) for r in result)
+        if isinstance(result, np.ndarray):
+            return int(result.nbytes)
+        return 0
+
+    def memory_report(self, display: bool = True) -> pd.DataFrame:
+        """## 共享数据内存报告
+
+        Args:
+            display (bool): 是否打印报告. 默认True
+
+        Returns:
+            pd.DataFrame: 各数据集的字节数、引用次数与节省的字节数（运行结束后为该次运行的报告）
+        """
+        if not self._entries and not self._derived and self._last_report is not None:
+            report, hits, misses = self._last_report
+            if display:
+                self._print_report(report, hits, misses)
+            return report
+        rows = []
+        for key, entry in self._entries.items():
+            nbytes = entry.nbytes
+            rows.append(dict(kind="data", key=str(key[0][1] if len(key[0]) > 1 else key[0]),
+                             cycle=key[1], rows=len(entry.data), refs=entry.refs,
+                             nbytes=nbytes, saved=nbytes*(entry.refs-1)))
+        for key, (result, refs) in self._derived.items():
+            nbytes = self._result_nbytes(result)
+            rows.append(dict(kind=key[1], key=str(key[0][0][1] if key[0] and len(key[0][0]) > 1 else key[0]),
+                             cycle=key[2], rows=len(result[-1]) if isinstance(result, tuple) else len(result),
+                             refs=refs, nbytes=nbytes, saved=nbytes*(refs-1)))
+        report = pd.DataFrame(
+            rows, columns=["kind", "key", "cycle", "rows", "refs", "nbytes", "saved"])
+        if display:
+            self._print_report(report, self.hits, self.misses)
+        return report
+
+    @staticmethod
+    def _print_report(report: pd.DataFrame, hits: int, misses: int) -> None:
+        total, saved = report.nbytes.sum(), report.saved.sum()
+        print(report.to_string(index=False))
+        print(f"共享数据: {total/1024**2:.2f}MB  节省: {saved/1024**2:.2f}MB  "
+              f"命中: {hits}  未命中: {misses}")
+
+    def clear(self):
+        """## 清空共享数据集"""
+        self._entries.clear()
+        self._derived.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# 全局共享数据集注册表
+shared_datas = SharedDatas()
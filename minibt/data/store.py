@@ -0,0 +1,310 @@
+from __future__ import annotations
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+
+
+__all__ = ["BarStore", "bar_store"]
+
+# 不随K线变化的合约信息字段，保存在元数据中
+META_FIELDS = ("symbol", "duration", "price_tick", "volume_multiple")
+
+
+def _to_ns(value, tz: str | None = None) -> int:
+    """时间（str/datetime/np.datetime64/纳秒时间戳）→ 纳秒时间戳（UTC），不带时区的时间按tz解释"""
+    if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+        return int(value)
+    value = pd.Timestamp(value)
+    if tz is not None and value.tzinfo is None:
+        value = value.tz_localize(tz)
+    return int(value.as_unit("ns").value)
+
+
+class BarStore:
+    """## 本地K线历史库（只追加、列式记录、内存映射按区间读取）
+
+    - 从CSV加载某段时间的数据需要读取整个文件再截取，长周期多品种的1分钟数据浪费内存与I/O
+    - 每个(合约, 周期)一个数据文件 `<symbol>_<cycle>.bars`：定长记录（datetime为int64纳秒，其余为float64），
+      只在末尾追加；元数据 `<symbol>_<cycle>.json` 保存字段、合约信息与稀疏索引块大小
+    - 稀疏时间索引 `<symbol>_<cycle>.idx.npy`：每 `block_size` 条记录取一个时间，
+      读取区间时先在稀疏索引中定位记录块，再以 `np.memmap` 只映射并二分查找这些块
+    - 追加时只写入时间不早于已有最后一根的K线：与最后一根时间相同的K线覆盖最后一根（未完成K线的更新），
+      重复追加同一数据是安全的
+    - 带时区的datetime按UTC纳秒保存，时区记录在元数据中，读取时恢复（与从CSV读取的数据类型一致）
+    - 支持从现有CSV目录布局导入（`import_csv`）与导出（`export_csv`）
+    - 默认目录 `~/.minibt/store`，`Strategy.get_kline` 回测时优先从历史库读取所需区间
+
+    Args:
+        root (str | None): 历史库目录. 默认 `~/.minibt/store`
+        block_size (int): 稀疏索引块大小（记录数）. 默认4096
+
+    Examples:
+        >>> from minibt.data.store import bar_store
+        >>> bar_store.import_csv(LocalDatas.get_path("v2601_60"))
+        >>> df = bar_store.read("v2601_60", 60, start="2025-09-01", end="2025-09-30")
+        >>> bar_store.append(new_bars, "v2601_60", 60)
+    """
+
+    def __init__(self, root: str | None = None, block_size: int = 4096):
+        self.root = root or os.path.join(os.path.expanduser(
+            "~"), ".minibt", "store")
+        assert block_size > 0, "block_size须为正整数"
+        self.block_size = int(block_size)
+        self._lock = threading.RLock()
+
+    def configure(self, root: str | None = None, block_size: int | None = None) -> BarStore:
+        """## 修改历史库目录与稀疏索引块大小（块大小只影响新建的数据文件）"""
+        if root is not None:
+            self.root = root
+        if block_size is not None:
+            assert block_size > 0, "block_size须为正整数"
+            self.block_size = int(block_size)
+        return self
+
+    # ------------------------------
+    # 文件与元数据
+    # ------------------------------
+    def path(self, symbol: str, cycle: int) -> str:
+        """数据文件路径"""
+        return os.path.join(self.root, f"{symbol}_{int(cycle)}.bars")
+
+    def exists(self, symbol: str, cycle: int) -> bool:
+        """(合约, 周期)是否已入库"""
+        return os.path.isfile(self.path(symbol, cycle)) and \
+            os.path.isfile(self._meta_path(symbol, cycle))
+
+    def _meta_path(self, symbol: str, cycle: int) -> str:
+        return os.path.join(self.root, f"{symbol}_{int(cycle)}.json")
+
+    def _index_path(self, symbol: str, cycle: int) -> str:
+        return os.path.join(self.root, f"{symbol}_{int(cycle)}.idx.npy")
+
+    def _meta(self, symbol: str, cycle: int) -> dict:
+        with open(self._meta_path(symbol, cycle), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _dtype(meta: dict) -> np.dtype:
+        return np.dtype([("datetime", "<i8")] + [(name, "<f8") for name in meta["fields"]])
+
+    def _records(self, symbol: str, cycle: int, meta: dict) -> np.ndarray:
+        """整个数据文件的只读内存映射（不读取数据，按需分页）"""
+        dtype = self._dtype(meta)
+        path = self.path(symbol, cycle)
+        rows = os.path.getsize(path) // dtype.itemsize
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+    def _sparse_index(self, symbol: str, cycle: int, records: np.ndarray, block_size: int) -> np.ndarray:
+        path = self._index_path(symbol, cycle)
+        if os.path.isfile(path):
+            index = np.load(path)
+            if index.size == -(-records.size // block_size):
+                return index
+        # 索引缺失或与数据不一致（如追加中断）时重建
+        index = np.ascontiguousarray(records["datetime"][::block_size])
+        np.save(path, index)
+        return index
+
+    def info(self, symbol: str, cycle: int) -> dict:
+        """## 入库信息（字段、合约信息、记录数、首尾时间）"""
+        meta = self._meta(symbol, cycle)
+        records = self._records(symbol, cycle, meta)
+        info = dict(meta, rows=records.size)
+        if records.size:
+            for key, stamp in (("first", records["datetime"][0]), ("last", records["datetime"][-1])):
+                stamp = pd.Timestamp(int(stamp))
+                info[key] = stamp.tz_localize("UTC").tz_convert(meta["tz"]) if meta.get("tz") else stamp
+        return info
+
+    def keys(self) -> list[tuple[str, int]]:
+        """## 已入库的(合约, 周期)"""
+        if not os.path.isdir(self.root):
+            return []
+        keys = []
+        for file in sorted(os.listdir(self.root)):
+            if file.endswith(".bars"):
+                symbol, _, cycle = file[:-5].rpartition("_")
+                if symbol and cycle.isdigit():
+                    keys.append((symbol, int(cycle)))
+        return keys
+
+    # ------------------------------
+    # 写入
+    # ------------------------------
+    def append(self, data: pd.DataFrame, symbol: str | None = None, cycle: int | None = None) -> int:
+        """## 追加K线（只写入时间不早于已有最后一根的K线，时间相同的覆盖最后一根）
+
+        Args:
+            data (pd.DataFrame): K线数据，须包含datetime列（datetime64或可被pd.to_datetime解析）
+            symbol (str | None): 合约名称. 默认None（取data的symbol列）
+            cycle (int | None): 周期（秒）. 默认None（取data的duration列）
+
+        Returns:
+            int: 追加的K线数（不含覆盖的最后一根）
+        """
+        assert "datetime" in data.columns, "K线数据须包含datetime列"
+        if symbol is None:
+            assert "symbol" in data.columns, "未指定symbol且数据中没有symbol列"
+            symbol = str(data["symbol"].iloc[0])
+        if cycle is None:
+            assert "duration" in data.columns, "未指定cycle且数据中没有duration列"
+            cycle = int(data["duration"].iloc[0])
+        symbol, cycle = str(symbol), int(cycle)
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            times = pd.to_datetime(data["datetime"])
+            if self.exists(symbol, cycle):
+                meta = self._meta(symbol, cycle)
+            else:
+                tz = times.dt.tz
+                fields = [c for c in data.columns if c != "datetime" and c not in META_FIELDS
+                          and pd.api.types.is_numeric_dtype(data[c])]
+                meta = dict(symbol=symbol, cycle=cycle, fields=fields, block_size=self.block_size,
+                            tz=None if tz is None else str(tz),
+                            info={k: (data[k].iloc[0].item() if hasattr(data[k].iloc[0], "item")
+                                      else data[k].iloc[0])
+                                  for k in META_FIELDS if k in data.columns and len(data)})
+                with open(self._meta_path(symbol, cycle), "w", encoding="utf-8") as f:
+                    json.dump(meta, f, ensure_ascii=False)
+                open(self.path(symbol, cycle), "wb").close()
+            if times.dt.tz is None and meta.get("tz"):
+                # 不带时区的K线追加到带时区的库：按库的时区解释
+                times = times.dt.tz_localize(meta["tz"])
+            stamps = times.dt.tz_convert("UTC").dt.tz_localize(None) if times.dt.tz is not None else times
+            stamps = stamps.to_numpy(dtype="datetime64[ns]").view(np.int64)
+            records = self._records(symbol, cycle, meta)
+            rows, replaced = records.size, 0
+            if rows:
+                last = int(records["datetime"][-1])
+                keep = stamps >= last
+                stamps = stamps[keep]
+                data = data.loc[keep]
+                if stamps.size and stamps.min() == last:
+                    # 与最后一根时间相同：覆盖最后一根（如上次写入时尚未完成的K线）
+                    rows, replaced = rows - 1, 1
+            if stamps.size == 0:
+                return 0
+            order = np.argsort(stamps, kind="stable")
+            out = np.empty(stamps.size, dtype=self._dtype(meta))
+            out["datetime"] = stamps[order]
+            for name in meta["fields"]:
+                out[name] = data[name].to_numpy(dtype=np.float64)[order] if name in data.columns else np.nan
+            del records
+            with open(self.path(symbol, cycle), "r+b") as f:
+                # 截去追加中断残留的不完整记录
+                f.truncate(rows * out.dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(out.tobytes())
+            records = self._records(symbol, cycle, meta)
+            block_size = meta["block_size"]
+            np.save(self._index_path(symbol, cycle),
+                    np.ascontiguousarray(records["datetime"][::block_size]))
+            return int(stamps.size) - replaced
+
+    def import_csv(self, path: str, symbol: str | None = None, cycle: int | None = None) -> int:
+        """## 从CSV文件导入（现有 `data/test/*.csv` 布局）
+
+        Args:
+            path (str): CSV文件路径
+            symbol (str | None): 入库名称. 默认None（取文件名，与LocalDatas名称一致）
+            cycle (int | None): 周期（秒）. 默认None（取duration列或相邻K线最小时间差）
+
+        Returns:
+            int: 追加的K线数
+        """
+        from .csv_cache import csv_cache
+        data = csv_cache.read(path)
+        if symbol is None:
+            symbol = os.path.splitext(os.path.basename(path))[0]
+        if cycle is None:
+            if "duration" in data.columns:
+                cycle = int(data["duration"].iloc[0])
+            else:
+                diff = np.diff(data["datetime"].to_numpy(dtype="datetime64[ns]").view(np.int64))
+                cycle = int(diff[diff > 0].min() // 1_000_000_000)
+        return self.append(data, symbol, cycle)
+
+    def export_csv(self, symbol: str, cycle: int, path: str | None = None,
+                   start=None, end=None) -> str:
+        """## 导出为CSV文件（可被LocalDatas按名称读取）
+
+        Args:
+            symbol (str): 合约名称
+            cycle (int): 周期（秒）
+            path (str | None): 导出路径. 默认None（用户数据目录下的 `<symbol>.csv`）
+            start, end: 导出时间范围. 默认None（全部）
+
+        Returns:
+            str: 导出路径
+        """
+        if path is None:
+            from .registry import local_registry
+            os.makedirs(local_registry.save_dir, exist_ok=True)
+            path = os.path.join(local_registry.save_dir, f"{symbol}.csv")
+        data = self.read(symbol, cycle, start, end)
+        data.to_csv(path, index=False)
+        return path
+
+    # ------------------------------
+    # 读取
+    # ------------------------------
+    def read(self, symbol: str, cycle: int, start=None, end=None, length: int | None = None) -> pd.DataFrame:
+        """## 按时间范围读取K线（只映射并读取所需记录块）
+
+        Args:
+            symbol (str): 合约名称
+            cycle (int): 周期（秒）
+            start: 开始时间（含，不带时区时按入库数据的时区解释）. 默认None
+            end: 结束时间（含，同上）. 默认None
+            length (int | None): 最多返回的K线数（取区间内最后length根）. 默认None
+
+        Returns:
+            pd.DataFrame: K线数据（datetime为datetime64[ns]，入库数据带时区时恢复时区；合约信息字段按元数据补齐）
+        """
+        meta = self._meta(symbol, cycle)
+        tz = meta.get("tz")
+        records = self._records(symbol, cycle, meta)
+        lo, hi = self._bounds(symbol, cycle, meta, records,
+                              None if start is None else _to_ns(start, tz),
+                              None if end is None else _to_ns(end, tz))
+        if length is not None and length > 0:
+            lo = max(lo, hi - int(length))
+        window = np.array(records[lo:hi])
+        times = pd.Series(window["datetime"].view("datetime64[ns]"))
+        if tz:
+            times = times.dt.tz_localize("UTC").dt.tz_convert(tz)
+        data = pd.DataFrame({"datetime": times})
+        for name in meta["fields"]:
+            data[name] = window[name]
+        for name, value in meta.get("info", {}).items():
+            data[name] = value
+        return data
+
+    def _bounds(self, symbol: str, cycle: int, meta: dict, records: np.ndarray,
+                start: int | None, end: int | None) -> tuple[int, int]:
+        """稀疏索引定位记录块，再在块内二分查找，返回[lo, hi)"""
+        rows = records.size
+        if rows == 0:
+            return 0, 0
+        block_size = meta["block_size"]
+        index = self._sparse_index(symbol, cycle, records, block_size)
+        lo, hi = 0, rows
+        if start is not None:
+            block = max(int(np.searchsorted(index, start, side="right")) - 1, 0)
+            base = block * block_size
+            window = records["datetime"][base:min(base + block_size, rows)]
+            lo = base + int(np.searchsorted(window, start, side="left"))
+        if end is not None:
+            block = max(int(np.searchsorted(index, end, side="right")) - 1, 0)
+            base = block * block_size
+            window = records["datetime"][base:min(base + block_size, rows)]
+            hi = base + int(np.searchsorted(window, end, side="right"))
+        return lo, max(lo, hi)
+
+
+# 全局K线历史库
+bar_store = BarStore()
@@ -0,0 +1,267 @@
+from __future__ import annotations
+import os
+import time
+from typing import Iterable, Iterator
+import numpy as np
+import pandas as pd
+
+
+__all__ = ["TickAggregator"]
+
+
+class TickAggregator:
+    """## 流式tick合成K线
+
+    - `get_kline` 只接受K线，用pandas预先合成需要把整个tick文件读入内存（每品种每年数十GB）
+    - 按块读取tick文件（CSV分块读取 / `.npy` 结构化数组内存映射），内存占用只与块大小有关
+    - 一次遍历同时合成多个周期的OHLCV（有持仓量列时含open_oi/close_oi），
+      每块内按周期分组以 `np.maximum/minimum/add.reduceat` 向量化聚合，
+      块末尚未结束的K线暂存，与下一块的同一根K线合并
+    - 完成的K线累计到 `flush_bars` 根后直接追加到本地K线历史库（`minibt.data.store`），
+      之后即可 `get_kline(symbol, cycle)` 读取
+    - 多次run()（如按日分割的tick文件）之间最后一根K线保持暂存：run()结束时写入历史库，
+      下一个文件的tick延续该K线时合并，完成后在历史库中覆盖更新
+    - 成交量为累计量（天勤tick）时按相邻差值计算，累计量回落（换日）时取当前值
+    - K线时间为周期起点（按本地时间向下取整，日线为自然日）
+    - 统计处理的tick数与每秒处理tick数
+
+    Args:
+        symbol (str): 入库名称
+        cycles (Iterable[int]): 合成周期（秒）. 默认(60,)
+        store (BarStore | None): K线历史库. 默认None（全局bar_store）
+        chunksize (int): 每块tick数. 默认1000000
+        time_col, price_col, volume_col, oi_col (str): tick时间、价格、成交量、持仓量列名.
+            默认"datetime"、"last_price"、"volume"、"open_interest"（与天勤tick一致，持仓量列缺失时不输出）
+        cumulative_volume (bool): 成交量是否为累计量. 默认True
+        price_tick, volume_multiple (float | None): 写入历史库元数据的合约信息. 默认None
+        flush_bars (int): 每个周期缓存多少根完成的K线后写入历史库. 默认100000
+
+    Examples:
+        >>> from minibt.data.ticks import TickAggregator
+        >>> aggregator = TickAggregator("rb2510", cycles=(60, 300, 900), price_tick=1., volume_multiple=10.)
+        >>> aggregator.run("D:/ticks/rb2510.csv")
+        >>> Strategy.get_kline("rb2510", 300)
+    """
+
+    def __init__(self, symbol: str, cycles: Iterable[int] = (60,), store=None, chunksize: int = 1_000_000,
+                 time_col: str = "datetime", price_col: str = "last_price", volume_col: str = "volume",
+                 oi_col: str = "open_interest", cumulative_volume: bool = True,
+                 price_tick: float | None = None, volume_multiple: float | None = None,
+                 flush_bars: int = 100_000):
+        cycles = sorted(set(int(c) for c in cycles))
+        assert cycles and cycles[0] > 0, "合成周期须为正整数（秒）"
+        assert chunksize > 0 and flush_bars > 0, "chunksize与flush_bars须为正整数"
+        if store is None:
+            from .store import bar_store
+            store = bar_store
+        self.symbol = str(symbol)
+        self.cycles = cycles
+        self.store = store
+        self.chunksize = int(chunksize)
+        self.time_col, self.price_col = time_col, price_col
+        self.volume_col, self.oi_col = volume_col, oi_col
+        self.cumulative_volume = cumulative_volume
+        self.price_tick, self.volume_multiple = price_tick, volume_multiple
+        self.flush_bars = int(flush_bars)
+        self.reset()
+
+    def reset(self) -> None:
+        """## 重置合成状态与统计"""
+        self._last_time: int | None = None
+        self._last_volume: float = np.nan
+        self._carry_volume: float = 0.
+        self._pending: dict[int, dict] = {}
+        self._buffers: dict[int, list[dict]] = {cycle: [] for cycle in self.cycles}
+        self._buffered: dict[int, int] = {cycle: 0 for cycle in self.cycles}
+        self.ticks = 0
+        self.bars: dict[int, int] = {cycle: 0 for cycle in self.cycles}
+        self.seconds = 0.
+
+    # ------------------------------
+    # 读取
+    # ------------------------------
+    def chunks(self, path: str) -> Iterator[pd.DataFrame]:
+        """## 按块读取tick文件（.csv分块读取，.npy以内存映射按块切片）"""
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".npy":
+            ticks = np.load(path, mmap_mode="r")
+            assert ticks.dtype.names, ".npy tick文件须为结构化数组（字段名即列名）"
+            for start in range(0, ticks.size, self.chunksize):
+                block = ticks[start:start + self.chunksize]
+                yield pd.DataFrame({name: np.asarray(block[name]) for name in ticks.dtype.names})
+        else:
+            usecols = lambda c: c in (self.time_col, self.price_col, self.volume_col, self.oi_col)
+            yield from pd.read_csv(path, chunksize=self.chunksize, usecols=usecols)
+
+    def run(self, path: str, display: bool = True) -> dict:
+        """## 合成整个tick文件并写入历史库
+
+        Args:
+            path (str): tick文件路径（.csv 或 结构化数组 .npy）
+            display (bool): 是否打印统计. 默认True
+
+        Returns:
+            dict: 统计（tick数、耗时、每秒tick数、各周期K线数）
+        """
+        chunks = self.chunks(path)
+        while True:
+            # 读取耗时计入统计（每秒tick数为端到端吞吐）
+            begin = time.perf_counter()
+            chunk = next(chunks, None)
+            self.seconds += time.perf_counter() - begin
+            if chunk is None:
+                break
+            self.feed(chunk)
+        return self.finish(display)
+
+    # ------------------------------
+    # 合成
+    # ------------------------------
+    def _times(self, column: pd.Series) -> np.ndarray:
+        if pd.api.types.is_numeric_dtype(column):
+            from ..other import times_to_datetime
+            values = times_to_datetime(column)
+        else:
+            values = pd.to_datetime(column).to_numpy(dtype="datetime64[ns]")
+        return values.view(np.int64)
+
+    def _volumes(self, chunk: pd.DataFrame, size: int) -> np.ndarray:
+        if self.volume_col not in chunk.columns:
+            return np.zeros(size)
+        volume = chunk[self.volume_col].to_numpy(dtype=np.float64)
+        if not self.cumulative_volume:
+            return np.nan_to_num(volume)
+        previous = np.concatenate(([self._last_volume], volume[:-1]))
+        delta = volume - previous
+        reset = delta < 0.
+        delta[reset] = volume[reset]
+        delta[np.isnan(delta)] = 0.
+        self._last_volume = volume[-1]
+        return delta
+
+    def feed(self, chunk: pd.DataFrame) -> int:
+        """## 合成一块tick（须按时间升序）
+
+        Args:
+            chunk (pd.DataFrame): tick数据块
+
+        Returns:
+            int: 本块tick数
+        """
+        begin = time.perf_counter()
+        size = len(chunk)
+        if size == 0:
+            return 0
+        times = self._times(chunk[self.time_col])
+        assert not (np.diff(times) < 0).any() and \
+            (self._last_time is None or times[0] >= self._last_time), "tick须按时间升序"
+        self._last_time = int(times[-1])
+        price = chunk[self.price_col].to_numpy(dtype=np.float64)
+        volume = self._volumes(chunk, size)
+        oi = chunk[self.oi_col].to_numpy(dtype=np.float64) if self.oi_col in chunk.columns else None
+        volume[0] += self._carry_volume
+        self._carry_volume = 0.
+        valid = ~np.isnan(price)
+        if not valid.all():
+            # 无成交价的tick只累计成交量（并入下一笔有效tick，块末剩余的并入下一块）
+            carry = np.cumsum(volume)
+            total, carry = carry[-1], carry[valid]
+            self._carry_volume = total - (carry[-1] if carry.size else 0.)
+            volume = np.diff(np.concatenate(([0.], carry)))
+            times, price = times[valid], price[valid]
+            oi = None if oi is None else oi[valid]
+        if times.size:
+            for cycle in self.cycles:
+                self._aggregate(cycle, times, price, volume, oi)
+        self.ticks += size
+        self.seconds += time.perf_counter() - begin
+        return size
+
+    def _aggregate(self, cycle: int, times: np.ndarray, price: np.ndarray,
+                   volume: np.ndarray, oi: np.ndarray | None) -> None:
+        step = cycle * 1_000_000_000
+        bar = times // step
+        starts = np.flatnonzero(np.concatenate(([True], bar[1:] != bar[:-1])))
+        ends = np.append(starts[1:], bar.size) - 1
+        bars = dict(
+            bar=bar[starts],
+            open=price[starts],
+            high=np.maximum.reduceat(price, starts),
+            low=np.minimum.reduceat(price, starts),
+            close=price[ends],
+            volume=np.add.reduceat(volume, starts),
+        )
+        if oi is not None:
+            bars["open_oi"], bars["close_oi"] = oi[starts], oi[ends]
+        pending = self._pending.get(cycle)
+        if pending is not None:
+            if pending["bar"] == bars["bar"][0]:
+                # 上一块末尾的K线延续到本块
+                bars["open"][0] = pending["open"]
+                bars["high"][0] = max(pending["high"], bars["high"][0])
+                bars["low"][0] = min(pending["low"], bars["low"][0])
+                bars["volume"][0] += pending["volume"]
+                if oi is not None and "open_oi" in pending:
+                    bars["open_oi"][0] = pending["open_oi"]
+            else:
+                self._emit(cycle, {k: np.array([v]) for k, v in pending.items()})
+        # 最后一根K线可能在下一块继续，暂存
+        self._pending[cycle] = {k: v[-1].item() for k, v in bars.items()}
+        if bars["bar"].size > 1:
+            self._emit(cycle, {k: v[:-1] for k, v in bars.items()})
+
+    def _emit(self, cycle: int, bars: dict[str, np.ndarray]) -> None:
+        self._buffers[cycle].append(bars)
+        self._buffered[cycle] += bars["bar"].size
+        if self._buffered[cycle] >= self.flush_bars:
+            self._flush(cycle)
+
+    def _flush(self, cycle: int) -> None:
+        buffers = self._buffers[cycle]
+        if not buffers:
+            return
+        columns = buffers[0].keys()
+        merged = {k: np.concatenate([b[k] for b in buffers if k in b]) for k in columns}
+        step = cycle * 1_000_000_000
+        data = pd.DataFrame({"datetime": (merged.pop("bar") * step).view("datetime64[ns]")})
+        for name, values in merged.items():
+            data[name] = values
+        data["symbol"] = self.symbol
+        data["duration"] = cycle
+        if self.price_tick is not None:
+            data["price_tick"] = float(self.price_tick)
+        if self.volume_multiple is not None:
+            data["volume_multiple"] = float(self.volume_multiple)
+        self.bars[cycle] += self.store.append(data, self.symbol, cycle)
+        self._buffers[cycle] = []
+        self._buffered[cycle] = 0
+
+    def finish(self, display: bool = True) -> dict:
+        """## 写入全部缓存及暂存的最后一根K线
+        - 最后一根K线仍保持暂存：之后feed/run的tick延续该K线时继续合并，历史库中的该K线被覆盖更新
+
+        Args:
+            display (bool): 是否打印统计. 默认True
+
+        Returns:
+            dict: 统计（tick数、耗时、每秒tick数、各周期K线数）
+        """
+        begin = time.perf_counter()
+        for cycle in self.cycles:
+            pending = self._pending.get(cycle)
+            if pending is not None:
+                self._emit(cycle, {k: np.array([v]) for k, v in pending.items()})
+            self._flush(cycle)
+        self.seconds += time.perf_counter() - begin
+        report = self.report()
+        if display:
+            bars = "  ".join(f"{cycle}s: {count}" for cycle, count in report["bars"].items())
+            print(f"tick合成K线 {self.symbol}: {report['ticks']} ticks  耗时: {report['seconds']:.2f}s  "
+                  f"{report['ticks_per_sec']:,.0f} ticks/s  K线 {bars}")
+        return report
+
+    def report(self) -> dict:
+        """## 统计（tick数、耗时、每秒tick数、各周期已写入的K线数）"""
+        return dict(ticks=self.ticks, seconds=self.seconds,
+                    ticks_per_sec=self.ticks / self.seconds if self.seconds else 0.,
+                    bars=dict(self.bars))
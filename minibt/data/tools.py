@@ -1,9 +1,9 @@
 from __future__ import annotations
 import os
-import glob
 from typing import TYPE_CHECKING
-from pandas import DataFrame, read_csv
-from ..other import time_to_datetime
+from pandas import DataFrame
+from .csv_cache import csv_cache
+from .registry import local_registry, PACKAGE_DIR
 
 
 __all__ = ["base", "DataString"]
@@ -18,17 +18,12 @@ class DataString(str):
     
     @property
     def dataframe(self) -> DataFrame | None:
-        path = os.path.join(BASE_DIR, "test", f"{self}.csv")
-        if not os.path.exists(path):
+        path = local_registry.path(self)
+        if path is None:
             path = str(self)
         if not os.path.exists(path):
             return
-        df = read_csv(path, index_col=0).reset_index()
-        try:
-            df.datetime = df.datetime.apply(time_to_datetime)
-        except:
-            print(f"本地数据{self}的时间数据无法处理")
-        return df
+        return csv_cache.read(path)
 
     def __kline(self):
         global _kline
@@ -39,113 +34,77 @@ class DataString(str):
 
     @property
     def kline(self) -> KLine | None:
-        if self.dataframe is None:
+        df = self.dataframe
+        if df is None:
             return None
-        return self.__kline()(self.dataframe, height=400)
+        return self.__kline()(df, height=400)
 
 
 class base:
+    """## 本地CSV数据集合
+    - 数据集名称由 `local_registry` 惰性解析（见 `minibt.data.registry`），
+      导入时不扫描目录，也不向包目录写入任何文件
+    """
 
     def update(self) -> LocalDatas | base:
-        """更新本地文件"""
+        """更新本地文件索引"""
         self.rewrite()
         return self
 
     def deleter(self, *args) -> LocalDatas | base:
         """删除目标文件"""
-        if args:
-            t = False
-            for name in args:
-                path = os.path.join(BASE_DIR, "test", f"{name}.csv")
-                if os.path.exists(path):
-                    t = True
-                    os.remove(path)
-            if t:
-                self.rewrite()
+        for name in args:
+            path = local_registry.path(name)
+            if path is not None:
+                os.remove(path)
+                csv_cache.clear(path)
         return self
 
     def keep(self, *args) -> LocalDatas | base:
-        """保留目标文件，其余的删除"""
+        """保留目标文件，删除包内test目录中的其余文件（用户数据目录及add_dir添加的目录不受影响）"""
         if args:
-            attr = {k: v for k, v in vars(
-                self.__class__).items() if not k.startswith("_")}
-            delete_names = [k for k, v in attr.items() if k not in args]
-            t = False
-            for name in delete_names:
-                path = os.path.join(BASE_DIR, "test", f"{name}.csv")
-                if os.path.exists(path):
-                    t = True
-                    os.remove(path)
-            if t:
-                self.rewrite()
+            for name in local_registry.names(PACKAGE_DIR):
+                if name not in args:
+                    path = os.path.join(PACKAGE_DIR, f"{name}.csv")
+                    if os.path.isfile(path):
+                        os.remove(path)
+                        csv_cache.clear(path)
         return self
 
     def rename(self, old_name: str = "", new_name: str = "") -> LocalDatas | base:
         if all([old_name, new_name]) and all([isinstance(old_name, str), isinstance(new_name, str)]):
-            old_path = os.path.join(BASE_DIR, "test", f"{old_name}.csv")
-            if os.path.exists(old_path):
+            old_path = local_registry.path(old_name)
+            if old_path is not None:
                 os.rename(old_path, os.path.join(
-                    BASE_DIR, "test", f"{new_name}.csv"))
-                self.rewrite()
+                    os.path.dirname(old_path), f"{new_name}.csv"))
+                csv_cache.clear(old_path)
         return self
 
     @staticmethod
     def rewrite(check=False):
-        # 获取当前目录下所有CSV文件名
-
-        csv_files = glob.glob(os.path.join(BASE_DIR, "test", "*.csv"))
-        py_file_path = os.path.join(BASE_DIR, "utils.py")
-
-        names = [os.path.splitext(os.path.basename(file))[0]
-                 for file in csv_files]
-        if check:
-            try:
-                from .utils import LocalDatas
-                # 1. 获取LocalDatas的类（排除实例干扰）
-                local_datas_cls = LocalDatas.__class__
-                # 2. 仅获取当前类自定义的非__开头属性（排除继承属性）
-                current_attrs = [
-                    k for k in local_datas_cls.__dict__.keys() if not k.startswith("__")]
-                # 3. 准确判断是否需要重写
-                need_rewrite = set(current_attrs) != set(names)
-            except (ImportError, AttributeError):
-                # 若LocalDatas未定义/导入失败，直接需要重写
-                need_rewrite = True
-        else:
-            need_rewrite = False
-        if need_rewrite:
-            class_content = ['from .tools import *', "", "",
-                             'class LocalDatas(base):', '    """本地CSV数据"""']
-            for name in names:
-                class_content.append(f'    {name} = DataString("{name}")')
-            class_content.extend(["", ""])
-            class_content.append('LocalDatas=LocalDatas()')
-            with open(py_file_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(class_content))
+        """刷新本地数据索引（兼容旧接口，不再生成utils.py）"""
+        local_registry.refresh(force=not check)
 
     def __getitem__(self, key: str) -> str | LocalDatas:
         assert key and isinstance(key, str), "key为非空字符串"
         return key
 
-    def __getattr__(self, name: str) -> str | LocalDatas | KLine:
-        try:
-            return super().__getattr__(name)
-        except:
-            setattr(self, name, name)
-            return name
+    def __getattr__(self, name: str) -> DataString:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name in local_registry:
+            return DataString(name)
+        raise AttributeError(f"本地数据集 {name} 不存在")
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(local_registry.names()))
 
     @staticmethod
     def get_path(name: str) -> str:
-        return os.path.join(BASE_DIR, "test", f"{name}.csv")
+        return local_registry.default_path(name)
 
     def get_dataframe(self, name: str) -> DataFrame:
-        df = read_csv(self.get_path(name))
-        try:
-            from ..other import time_to_datetime
-            df.datetime = df.datetime.apply(time_to_datetime)
-        except:
-            ...
-        return df
+        return csv_cache.read(self.get_path(name))
 
     def get(self, name) -> str:
         return getattr(self, name)
@@ -2,7 +2,7 @@ from .tools import *
 
 
 class LocalDatas(base):
-    """本地CSV数据"""
+    """本地CSV数据（包内自带数据集，其余数据集按名称惰性解析，见 `minibt.data.registry`）"""
     l2601_60 = DataString("l2601_60")
     l2609_60 = DataString("l2609_60")
     pp2601_60 = DataString("pp2601_60")
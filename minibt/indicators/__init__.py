@@ -19,6 +19,7 @@ from .pair import *
 from .factors import *
 from .core import *
 from .tradingview import *  # TradingView
+from .jit import bt_jit
 
 # 导出所有公共接口
 __all__ = [
@@ -44,6 +45,7 @@ __all__ = [
     "TradingView",
     # 其他
     "BtIndicator",
+    "bt_jit",
     "IndicatorClass",
     "BtIndType",
     "KLineType",
@@ -14,6 +14,15 @@ from ..utils import \
      ewm_method, Expanding, expanding_method, options, SPECIAL_FUNC,)
 from ..other import get_func_args_dict, timedelta
 from pandas.core.indexing import _iLocIndexer, _LocIndexer
+from .streaming import current_streaming
+from .memo import indicator_cache
+from .multiparam import multi_param_lookup
+from .cse import current_cse
+from .lazy import lazy_operator
+from .raw import is_raw
+
+# raw模式指标延迟创建的元数据属性（见minibt.indicators.raw）
+_RAW_FIELDS = frozenset(("_indsetting", "_plotinfo", "_dataset", "cache"))
 
 # Pandas 2.0+ Copy-on-Write 兼容性处理
 _PANDAS_VERSION = tuple(map(int, pd.__version__.split('.')[:2]))
@@ -35,6 +44,7 @@ if TYPE_CHECKING:
     from .tulip import TuLip
     from .btind import BtInd
     from .finta import FinTa
+    from .dispatch import FastestTa
     from .tqfunc import TqFunc
     from .tqta import TqTa
     from .pair import Pair
@@ -366,8 +376,13 @@ def tobtind(lines: list[str] | dict[str, bool] | None = None, overlap: dict | bo
                 _source_for_ind = _source_for_ind._df
 
             # 2. 从数据源继承指标属性（_indsetting），如已有 ID、绘图开关等
-            source_indsetting = _source.get_indicator_kwargs(isindicator=True) if hasattr(
-                _source, "_indsetting") else {}
+            #    raw模式（参数优化/无图表回测）只继承回测循环需要的设置，不读取绘图信息
+            _raw = is_raw()
+            if _raw and hasattr(_source, "_inherited_settings"):
+                source_indsetting = _source._inherited_settings()
+            else:
+                source_indsetting = _source.get_indicator_kwargs(isindicator=True) if hasattr(
+                    _source, "_indsetting") else {}
 
             # 3. 判断是否自定义指标 —— 自定义指标默认使用本地函数自身，不查 ta 库
             myself = kwargs_.pop('myself', False)
@@ -445,6 +460,18 @@ def tobtind(lines: list[str] | dict[str, bool] | None = None, overlap: dict | bo
             # 6. 提取指标参数（去掉第一个数据源位置参数后，剩余均为指标参数）
             ind_params = list(args[1:])
 
+            # 7. 公共子表达式消除：策略初始化期间相同(数据源, 指标, 参数, 显示设置)的调用
+            #    直接返回首次计算的指标对象
+            _cse = current_cse()
+            _cse_key = None
+            if _cse is not None and not isreplay:
+                _cse_key = _cse.make_key(
+                    _source_for_ind, func, func_name, ind_params, kwargs,
+                    (sname, category, isplot, ismain, lines, overlap, light_chart, index))
+                _reused = _cse.get(_cse_key)
+                if _reused is not None:
+                    return _reused
+
             # ==================================================================
             # 阶段三：执行指标计算（重放模式 vs 正常模式）
             # ==================================================================
@@ -548,22 +575,51 @@ def tobtind(lines: list[str] | dict[str, bool] | None = None, overlap: dict | bo
 
                 else:
                     # —— 库函数指标分支（如 PandasTa）——
-                    if _use_source_arg:
-                        ind_data = ind_func(source, *ind_params, **kwargs)   # 未绑定方法，需传 source
+                    # 实盘流式更新：支持的指标只重算末端K线，否则全量计算并建立流式状态
+                    # 参数优化：相同(数据, 指标, 参数)直接复用其它参数组的计算结果
+                    # 周期参数为列表（或处于批量优化试验中）：多周期批量计算
+                    _stream = current_streaming()
+                    _memo_key = None
+                    reused = multi_param_lookup(
+                        func_name, source, ind_params, kwargs, lines,
+                        None if _stream is not None else (
+                            lambda: ind_func(source, *ind_params, **kwargs) if _use_source_arg
+                            else ind_func(*ind_params, **kwargs)))
+                    if reused is None and _stream is not None:
+                        _stream_key = _stream.next_key(func_name)
+                        reused = _stream.update(
+                            _stream_key, func_name, source, ind_params, kwargs)
+                    elif reused is None and indicator_cache.active:
+                        _memo_key = indicator_cache.make_key(
+                            source, _lib, func_name, ind_params, {**kwargs, "lines": lines})
+                        if _memo_key is not None:
+                            reused = indicator_cache.get(_memo_key)
+
+                    if reused is not None:
+                        ind_data, lines = reused
                     else:
-                        ind_data = ind_func(*ind_params, **kwargs)           # 已绑定方法
-
-                    # DataFrame 结果：若未显式提供 lines 或数量不匹配，从列名自动推导
-                    if isinstance(ind_data, pd.DataFrame):
-                        _actual_cols = ind_data.shape[1]
-                        if lines is None or (isinstance(lines, Iterable) and len(lines) != _actual_cols):
-                            _orig_lines = lines
-                            lines = [_sanitize_column_name(col) for col in ind_data.columns]
-                            if _orig_lines is not None:
-                                warnings.warn(
-                                    f"【{func_name}】传入的 lines({_orig_lines}, {len(_orig_lines)}列) "
-                                    f"与实际数据列数({_actual_cols}列)不匹配，已自动修正为: {lines}",
-                                    UserWarning, stacklevel=3)
+                        if _use_source_arg:
+                            ind_data = ind_func(source, *ind_params, **kwargs)   # 未绑定方法，需传 source
+                        else:
+                            ind_data = ind_func(*ind_params, **kwargs)           # 已绑定方法
+
+                        # DataFrame 结果：若未显式提供 lines 或数量不匹配，从列名自动推导
+                        if isinstance(ind_data, pd.DataFrame):
+                            _actual_cols = ind_data.shape[1]
+                            if lines is None or (isinstance(lines, Iterable) and len(lines) != _actual_cols):
+                                _orig_lines = lines
+                                lines = [_sanitize_column_name(col) for col in ind_data.columns]
+                                if _orig_lines is not None:
+                                    warnings.warn(
+                                        f"【{func_name}】传入的 lines({_orig_lines}, {len(_orig_lines)}列) "
+                                        f"与实际数据列数({_actual_cols}列)不匹配，已自动修正为: {lines}",
+                                        UserWarning, stacklevel=3)
+
+                        if _stream is not None:
+                            _stream.init(_stream_key, func_name, source,
+                                         ind_params, kwargs, ind_data, lines)
+                        elif _memo_key is not None:
+                            indicator_cache.put(_memo_key, ind_data, lines)
 
             # ==================================================================
             # 阶段四：数据类型校验、规整与合拢
@@ -599,6 +655,10 @@ def tobtind(lines: list[str] | dict[str, bool] | None = None, overlap: dict | bo
             # 阶段五：封装为 minibt 指标类型
             # ==================================================================
 
+            # raw模式：只保留数值数据，元数据（指标设置、绘图信息、数据集）在首次访问时创建
+            if _raw:
+                linestyle, signalstyle = {}, {}
+
             if len(data.shape) > 1:
                 # —— IndFrame（多线指标）——
                 from .core import IndFrame
@@ -610,7 +670,8 @@ def tobtind(lines: list[str] | dict[str, bool] | None = None, overlap: dict | bo
                                 category=category, isplot=isplot, ismain=ismain,
                                 isreplay=isreplay, isresample=isresample,
                                 overlap=overlap, isindicator=isindicator, iscustom=iscustom,
-                                linestyle=linestyle, signalstyle=signalstyle, source=_source_for_ind)
+                                linestyle=linestyle, signalstyle=signalstyle, source=_source_for_ind,
+                                _raw=_raw)
             else:
                 # —— IndSeries（单线指标）——
                 from .core import IndSeries
@@ -619,7 +680,7 @@ def tobtind(lines: list[str] | dict[str, bool] | None = None, overlap: dict | bo
                                  category=category, isplot=isplot, ismain=ismain,
                                  isreplay=isreplay, isresample=isresample,
                                  overlap=overlap, isindicator=isindicator, iscustom=iscustom,
-                                 linestyle=linestyle, source=_source_for_ind)
+                                 linestyle=linestyle, source=_source_for_ind, _raw=_raw)
 
             # 轻量图表模式：拼接时间列
             if light_chart:
@@ -629,10 +690,12 @@ def tobtind(lines: list[str] | dict[str, bool] | None = None, overlap: dict | bo
                 data.overlap = overlap
 
             # 多周期场景：返回 (index, data) 元组供调用方配对
-            if index is not None:
-                return index, data
+            result = (index, data) if index is not None else data
+            if _cse_key is not None:
+                _cse.put(_cse_key, result, _source_for_ind,
+                         func_name, ind_params, kwargs)
 
-            return data
+            return result
 
         # 将闭包参数挂载到 wrapper 上，供外部反射读取（如获取默认 overlap）
         wrapper._decorator_args = {
@@ -2834,6 +2897,34 @@ class IndicatorsBase(Base):
     __factors:Factors | None=None
     __tradingsystem:TradingSystem | None=None
 
+    # ------------------------------
+    # raw模式（见minibt.indicators.raw）
+    # ------------------------------
+    def __getattr__(self, name: str):
+        """raw模式指标首次访问元数据（指标设置、绘图信息、数据集、IndFrame的各列Line）时创建"""
+        meta = self.__dict__.get("_rawmeta")
+        if meta is not None and (name in _RAW_FIELDS or (
+                name[:1] == "_" and self.ndim > 1 and name[1:] in self.columns)):
+            del self.__dict__["_rawmeta"]
+            self._init_meta(*meta, True)
+            return getattr(self, name)
+        return super().__getattr__(name)
+
+    def _inherited_settings(self) -> dict:
+        """## raw模式下派生指标从数据源继承的设置（id、isresample、isreplay），不创建元数据"""
+        meta = self.__dict__.get("_rawmeta")
+        if meta is None:
+            setting = self._indsetting
+            btid, isresample, isreplay = setting.id, setting.isresample, setting.isreplay
+        else:
+            kwargs = meta[1]
+            btid, isresample, isreplay = kwargs.get("id"), kwargs.get(
+                "isresample", False), kwargs.get("isreplay", False)
+        settings = dict(isresample=isresample, isreplay=isreplay)
+        if btid is not None:
+            settings["id"] = btid.copy() if isinstance(btid, BtID) else btid
+        return settings
+
     def _pandas_ta(self)->PandasTa:
         if self.__pandas_ta is None:
             from .core import PandasTa
@@ -3087,7 +3178,15 @@ class IndicatorsBase(Base):
             - Addict[str, Any]: 整合后的指标参数字典（Addict类型，支持属性式访问）
         """
         # 合并配置：指标设置 → 绘图配置 → 用户参数（优先级递增）
-        result = Addict({**self._indsetting.vars, **self._plotinfo.vars})
+        meta = self.__dict__.get("_rawmeta")
+        if meta is None:
+            result = Addict({**self._indsetting.vars, **self._plotinfo.vars})
+        else:
+            # raw模式：由构造参数与继承设置合成，不创建元数据
+            values = {**meta[1], **self._inherited_settings()}
+            values["lines"] = list(self.columns) if self.ndim > 1 else list(
+                values.get("lines", ["line"]))
+            result = Addict(values)
         # 对于值为字典的执行字典更新
         if kwargs:
             key = []
@@ -3789,6 +3888,10 @@ class IndicatorsBase(Base):
             pd.DataFrame | pd.Series | corefunc: 原生Pandas对象
         """
         """## pandas数据"""
+        if "_rawmeta" in self.__dict__:
+            # raw模式：与指标共享数据，不创建数据集
+            return pd.DataFrame(self.values, columns=self.columns, copy=False) if self.ndim > 1 \
+                else pd.Series(self.values, copy=False)
         try:
             return self._dataset.pandas_object
         except:
@@ -4109,6 +4212,18 @@ class IndicatorsBase(Base):
         """
         return self._finta()(self)
 
+    @property
+    def fastest(self) -> FastestTa:
+        """## 获取通用指标接口（属性接口）
+        - sma/ema/rsi/atr/macd/bbands/kama 自动路由到已安装指标库中最快且与pandas_ta结果一致的实现
+        - 标定结果缓存在磁盘，可按指标固定后端（见 minibt.indicators.dispatch）
+
+        Returns:
+            FastestTa: 通用指标包装对象
+        """
+        from .dispatch import FastestTa
+        return FastestTa(self)
+
     @property
     def tqfunc(self) -> TqFunc:
         """## 获取天勤函数接口（属性接口）
@@ -4373,13 +4488,45 @@ class IndicatorsBase(Base):
     def btindex(self) -> int:
         """## 获取当前回测索引（属性接口）
         - 同步策略的_btindex，标识当前处理到的K线位置
+        - 启用主事件时钟时返回本数据所在列的游标（见 `minibt.data.clock`）
 
         Returns:
             int: 回测当前索引（从-1开始）
         """
         if not self._strategy_instances:
             return self.shape[0]-1
-        return self.strategy_instance._btindex
+        strategy = self.strategy_instance
+        clock = strategy._clock
+        if clock is not None:
+            return clock.index(self.data_id)
+        return strategy._btindex
+
+    @property
+    def _align_map(self) -> np.ndarray | None:
+        """## 跨周期对齐映射（主周期K线索引 → 本数据索引），非跨周期数据为None
+        - 由策略按(主周期KLine, 大周期KLine)计算一次（见 `Strategy._alignment_map`）
+        - 上采样后与主周期等长的数据不需要映射
+        """
+        if not self._indsetting.isresample or not self._strategy_instances:
+            return None
+        alignment_map = getattr(self.strategy_instance, "_alignment_map", None)
+        if alignment_map is None:
+            return None
+        align = alignment_map(self.resample_id, self.data_id)
+        if align is None or align.size == self.shape[0]:
+            return None
+        return align
+
+    @property
+    def _data_index(self) -> int:
+        """## 当前回测K线在本数据中的索引（跨周期数据经对齐映射O(1)转换）"""
+        btindex = self.btindex
+        if btindex < 0:
+            return btindex
+        align = self._align_map
+        if align is None:
+            return btindex
+        return int(align[min(btindex, align.size - 1)])
 
     @property
     def islivetrading(self) -> bool:
@@ -4516,7 +4663,7 @@ class IndicatorsBase(Base):
             self.ma5.history(2, 2)   # 10-20周期前的MA5值（不含最新）
             self.ma5.iloc[-4:-2])
         """
-        return self.__history(lookback, size, self.btindex)
+        return self.__history(lookback, size, self._data_index)
 
     @cachedmethod(attrgetter('cache'))
     def __history(self, lookback=0, size=1, btindex=0):
@@ -4536,6 +4683,12 @@ class IndicatorsBase(Base):
         # 非维度匹配数据：限制索引不超过最后有效索引
         if not self._indsetting.dim_match:
             index = min(self.shape[0]-1, index)
+        # 当前位置之前没有数据（如大周期尚无已完成K线）：返回nan，不回绕取末尾数据
+        if index < 0:
+            shape = self.values.shape[1:]
+            if size > 1:
+                return np.full((size, *shape), np.nan)
+            return np.full(shape, np.nan) if shape else np.nan
         # 多数据点：返回切片（size个数据）
         if size > 1:
             return self.values[index + 1 - size:index + 1]
@@ -4922,6 +5075,12 @@ class IndicatorsBase(Base):
         Returns:
         >>> IndFrame  | IndSeries | np.ndarray : 运算结果（指标对象或原生类型）
         """
+        # 惰性运算模式：单线指标运算只记录运算图，需要数值时融合求值
+        if options._lazy_operators:
+            node = lazy_operator(self, other, op, reverse)
+            if node is not None:
+                return node
+
         # 处理运算对象：提取Pandas对象（若为指标）
         other = other.pandas_object if hasattr(
             other, 'pandas_object') else other
@@ -5694,7 +5853,7 @@ class IndicatorsBase(Base):
     # 滚动窗口自定义函数计算
     # ------------------------------
     @tobtind(lib="pta")
-    def rolling_apply(self, func: Callable, window: int | pd.Series | np.ndarray | list[int], prepend_nans: bool = True, n_jobs: int = 1, **kwargs) -> IndFrame | IndSeries:
+    def rolling_apply(self, func: Callable, window: int | pd.Series | np.ndarray | list[int], prepend_nans: bool = True, n_jobs: int = 1, engine: str | None = None, **kwargs) -> IndFrame | IndSeries:
         """## 滚动窗口自定义函数计算（方法接口）
         - 在滚动窗口上应用自定义函数，支持并行计算，结果自动转为框架内置指标对象，
         - 解决Pandas rolling.apply不支持多输出、效率低的问题，适用于复杂指标计算。
@@ -5702,7 +5861,8 @@ class IndicatorsBase(Base):
         ### 核心优势：
         - 可变窗口支持：窗口大小可为整数（固定窗口）或序列（每个位置自定义窗口大小）
         - 多输出支持：自定义函数可返回多个值（如同时计算均值、标准差），自动生成多线条指标
-        - 并行加速：通过n_jobs控制并行线程数，处理大规模数据时提升效率
+        - 并行加速：通过n_jobs控制并行进程数（输入数据经共享内存传给子进程），处理大规模数据时提升效率
+        - 零拷贝窗口：固定窗口以滑动窗口视图传给func（只读，不复制数据）；engine='numba'时整个循环编译执行
         - 类型兼容：自动适配一维（IndSeries）/多维（IndFrame）输入，返回对应类型的指标对象
 
         Args:
@@ -5716,10 +5876,14 @@ class IndicatorsBase(Base):
             prepend_nans (bool, optional): 滚动数组长度不足时是否在数组前填充NaN. Defaults to True.
                 - True：前window-1个滚动数组长度不足的在其前面填充NaN（默认，符合技术指标习惯）
                 - False：滚动数组无Nna值
-            n_jobs (int, optional): 并行计算的线程数. Defaults to 1.
-                - 1：单线程（默认，避免线程开销）
-                - >1：多线程（需func线程安全，适合CPU密集型计算）
+            n_jobs (int, optional): 并行计算的进程数. Defaults to 1.
+                - 1：单进程（默认，避免进程开销）
+                - >1：多进程（func需可pickle，否则改用joblib分块计算，适合CPU密集型计算）
                 - -1：使用所有可用CPU核心
+            engine (str | None, optional): 计算引擎. Defaults to None.
+                - None：Python逐窗口调用func（func为numba函数时自动使用numba）
+                - 'numba'：以numba编译func与窗口循环（func须返回标量，不支持额外参数，
+                  未安装numba或无法编译时给出警告并改用Python计算）
             **kwargs: 扩展参数（如lines=[]指定线条名称、overlap=True设置主图叠加）
 
         Returns:
@@ -5965,9 +6129,12 @@ class IndicatorsBase(Base):
 
         # 1. 处理整数索引（正/负）：按行位置取值，使用iloc
         if isinstance(key, int):
-            # 适配框架内部btindex，处理偏移逻辑
+            # 适配框架内部btindex（跨周期数据经对齐映射），处理偏移逻辑
             if key < 0:
-                key += self.btindex + 1
+                key += self._data_index + 1
+                # 当前位置之前没有数据：返回nan，不回绕取末尾数据
+                if key < 0:
+                    return pd.Series(np.nan, index=self.columns) if self.isMDim else np.nan
             # 整数作为行索引，调用iloc取值
             data = self.iloc[key]
 
@@ -5989,12 +6156,12 @@ class IndicatorsBase(Base):
 
             # 处理负数start
             if isinstance(start, int) and start < 0:
-                new_start = self.btindex + 1 + start
+                new_start = max(self._data_index + 1 + start, 0)
                 need_convert = True
 
-            # 处理负数stop
+            # 处理负数stop（转换后不足0时为空切片，不回绕）
             if isinstance(stop, int) and stop < 0:
-                new_stop = self.btindex + 1 + stop
+                new_stop = max(self._data_index + 1 + stop, 0)
                 need_convert = True
 
             # 情况1：有负数索引 → 用iloc+转换后的正数切片
@@ -29,6 +29,7 @@ from ..utils import \
 from ..other import ProcessedAttribute
 from pandas.core.indexing import _iLocIndexer, _LocIndexer
 from .base import tobtind
+from .raw import is_raw
 
 
 if TYPE_CHECKING:
@@ -473,8 +474,19 @@ class IndFrame(IndicatorsBase, PandasDataFrame, PandasTa, TaLib):
                 kwargs['lines'] = list(data.columns)
         if hasattr(data, "pandas_object"):
             data = data.pandas_object
+        # raw模式：只保留数值数据，元数据在首次访问时创建（见minibt.indicators.raw）
+        # 含交易信号线时立即创建（信号字段有类属性默认值，无法延迟）
+        raw = kwargs.pop("_raw", False)
         super().__init__(data, columns=kwargs.pop("lines"))
-        # assert lines in kwargs
+        if raw and not any(string in self.columns for string in SIGNAL_Str):
+            # 绑定列属性（类级别），列访问时再创建Line
+            [set_property(self.__class__, attr) for attr in self.columns]
+            self._rawmeta = (data, kwargs)
+            return
+        self._init_meta(data, kwargs, raw)
+
+    def _init_meta(self, data, kwargs: dict, raw: bool = False) -> None:
+        """## 创建指标元数据（指标设置、绘图信息、数据集、各列Line）"""
         btid = kwargs.pop("id", BtID())
         if isinstance(btid, dict):
             btid = BtID(**btid)
@@ -560,17 +572,18 @@ class IndFrame(IndicatorsBase, PandasDataFrame, PandasTa, TaLib):
                     ind_name=ind_name, lines=[
                         lines[i],], category=Category.Any,
                     isplot=_isplot, ismain=ismain, isreplay=isreplay,
-                    isresample=isresample, overlap=_overlap))
+                    isresample=isresample, overlap=_overlap, _raw=raw))
         # 邦定property函数,IndFrame每列返回的是Line指标数据
         [set_property(self.__class__, attr) for attr in lines]
         kline = kwargs.pop("kline", None)
         if kline is not None and hasattr(kline, "_indsetting"):
             self._indsetting.id = kline._indsetting.id.copy()
+        pandas_object = self.copy(deep=not raw)
         self._dataset = DataFrameSet(
-            pandas_object=self.copy(),
+            pandas_object=pandas_object,
             kline_object=kline,
             source_object=kwargs.pop("source", None),
-            copy_object=self.copy())
+            copy_object=pandas_object if raw else self.copy())
         if self._indsetting.iscustom:
             self._dataset.custom_object = self.values
         self.cache = Cache(maxsize=np.inf)
@@ -2135,6 +2148,12 @@ class IndFrame(IndicatorsBase, PandasDataFrame, PandasTa, TaLib):
                 else:
                     raise ValueError(f"optimize_params['{k}'] 格式错误，需要 (low,high) / (low,high,step) / [选项列表]")
 
+            # 多周期批量试验：按整数参数分组保存候选值，试验中以单个周期调用的常用滚动指标
+            # 只与该周期所属参数的候选值一起批量计算（见 multiparam.py）
+            from .multiparam import multi_param_batch
+            _batch_periods = {k: list(range(pd_['low'], pd_['high'] + 1, max(pd_['step'], 1)))
+                              for k, pd_ in param_defs.items() if pd_['type'] == 'int'}
+
             # ---- 解析优化目标和方向 ----
             if isinstance(_opt_target, str):
                 targets = [_opt_target]
@@ -2225,19 +2244,20 @@ class IndFrame(IndicatorsBase, PandasDataFrame, PandasTa, TaLib):
                 if n_jobs in (-1, 'max'):
                     import os as _os_
                     n_jobs = min(_os_.cpu_count() or 4, n_combos)
-                if n_jobs <= 1 or n_combos <= 1:
-                    for i, p in enumerate(param_combos):
-                        all_results.append(_single_trial(p, i))
-                else:
-                    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
-                        futures = {executor.submit(_single_trial, p, i): i for i, p in enumerate(param_combos)}
-                        for fut in as_completed(futures):
-                            try:
-                                all_results.append(fut.result())
-                            except Exception as exc:
-                                idx = futures[fut]
-                                all_results.append({'params': param_combos[idx], 'trial': idx,
-                                                     'error': str(exc)})
+                with multi_param_batch(_batch_periods):
+                    if n_jobs <= 1 or n_combos <= 1:
+                        for i, p in enumerate(param_combos):
+                            all_results.append(_single_trial(p, i))
+                    else:
+                        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                            futures = {executor.submit(_single_trial, p, i): i for i, p in enumerate(param_combos)}
+                            for fut in as_completed(futures):
+                                try:
+                                    all_results.append(fut.result())
+                                except Exception as exc:
+                                    idx = futures[fut]
+                                    all_results.append({'params': param_combos[idx], 'trial': idx,
+                                                         'error': str(exc)})
 
                 # 过滤错误结果并排序
                 valid_results = [r for r in all_results if 'error' not in r]
@@ -2358,8 +2378,9 @@ class IndFrame(IndicatorsBase, PandasDataFrame, PandasTa, TaLib):
                 weights_info = ", ".join(f"{t}({'max' if w>=0 else 'min'},w={abs(w):.1f})"
                                           for t, w in zip(targets, _opt_weights))
                 print(f"Optuna 优化：n_trials={n_trials}, targets={targets}, 权重=[{weights_info}], n_jobs={n_jobs}")
-                study.optimize(_objective, n_trials=n_trials, n_jobs=n_jobs,
-                               show_progress_bar=_cfg.get('show_progress_bar', True))
+                with multi_param_batch(_batch_periods):
+                    study.optimize(_objective, n_trials=n_trials, n_jobs=n_jobs,
+                                   show_progress_bar=_cfg.get('show_progress_bar', True))
 
                 # 提取最优结果
                 if len(targets) == 1:
@@ -3679,6 +3700,8 @@ class KLine(IndFrame):
     _kline_setting: KLineSetting
     # 交易代理（关联Broker，处理下单、手续费计算等）
     _broker: Broker | None
+    # 共享数据集键（由共享数据集注册表创建时设置，见minibt.data.shared）
+    _shared_key: tuple | None = None
 
     def __init__(self, data: pd.DataFrame | dict, **kwargs) -> None:
         if isinstance(data, dict):
@@ -3739,7 +3762,9 @@ class KLine(IndFrame):
         self._indsetting.isindicator = False
         self._dataset = DataFrameSet(data[FILED.ALL], kline_object=kwargs.pop("kline_object", data), source_object=kwargs.pop(
             "source_object", self), conversion_object=kwargs.pop("conversion_object", None), custom_object=kwargs.pop("custom_object", None),
-            tq_object=kwargs.pop("tq_object", None), tq_tick=kwargs.pop("tq_tick", None), copy_object=data.copy()[FILED.ALL])
+            tq_object=kwargs.pop("tq_object", None), tq_tick=kwargs.pop("tq_tick", None), copy_object=kwargs.pop("copy_object", None))
+        if self._dataset.copy_object is None:
+            self._dataset.copy_object = data.copy()[FILED.ALL]
         self._plotinfo.set_default_candles(current_close[-1], self.height)
         self._source_index = kwargs.get("source_index", None)
         self._broker = None
@@ -3870,37 +3895,37 @@ class KLine(IndFrame):
     @property
     def current_open(self) -> float | None:
         """## 当前开盘价"""
-        if self.btindex < self.length:
+        if 0 <= self.btindex < self.length:
             return self._klinesetting.current_open[self.btindex]
 
     @property
     def current_high(self) -> float | None:
         """## 当前开盘价"""
-        if self.btindex < self.length:
+        if 0 <= self.btindex < self.length:
             return self._klinesetting.current_high[self.btindex]
 
     @property
     def current_low(self) -> float | None:
         """## 当前收盘价"""
-        if self.btindex < self.length:
+        if 0 <= self.btindex < self.length:
             return self._klinesetting.current_low[self.btindex]
 
     @property
     def current_close(self) -> float | None:
         """## 当前收盘价"""
-        if self.btindex < self.length:
+        if 0 <= self.btindex < self.length:
             return self._klinesetting.current_close[self.btindex]
 
     @property
     def current_datetime(self) -> str | None:
         """## 当前日期"""
-        if self.btindex < self.length:
+        if 0 <= self.btindex < self.length:
             return self._klinesetting.current_datetime[self.btindex]
 
     @property
     def current_time(self) -> datetime.datetime | None:
         """## 当前日期"""
-        if self.btindex < self.length:
+        if 0 <= self.btindex < self.length:
             return self._klinesetting.current_time[self.btindex]
 
     @property
@@ -4888,7 +4913,18 @@ class IndSeries(IndicatorsBase, PandasSeries, PandasTa, TaLib):
             kwargs.update(dict(iscustom=True))
         if hasattr(data, "pandas_object"):
             data = data.pandas_object
+        # raw模式：只保留数值数据，元数据在首次访问时创建（见minibt.indicators.raw）
+        raw = kwargs.pop("_raw", None)
+        if raw is None:
+            raw = is_raw() and not kwargs.get("iscustom", False)
         super().__init__(data)
+        if raw:
+            self._rawmeta = (data, kwargs)
+            return
+        self._init_meta(data, kwargs)
+
+    def _init_meta(self, data, kwargs: dict, raw: bool = False) -> None:
+        """## 创建指标元数据（指标设置、绘图信息、数据集）"""
         btid = kwargs.pop("id", BtID())
         if isinstance(btid, dict):
             btid = BtID(**btid)
@@ -4950,11 +4986,12 @@ class IndSeries(IndicatorsBase, PandasSeries, PandasTa, TaLib):
         kline = kwargs.pop("kline", None)
         if kline is not None and hasattr(kline, "_indsetting"):
             self._indsetting.id = kline._indsetting.id.copy()
+        pandas_object = self.copy(deep=not raw)
         self._dataset = DataFrameSet(
-            self.copy(),
+            pandas_object,
             kline_object=kline,
             source_object=kwargs.pop("source", None),
-            copy_object=self.copy())
+            copy_object=pandas_object if raw else self.copy())
         if self._indsetting.iscustom:
             self._dataset.custom_object = data
         self.cache = Cache(maxsize=np.inf)
@@ -5268,10 +5305,13 @@ class Line(IndSeries):
     >>> long_line.isplot = True  # 开启信号线绘图，父级 kline 的 "long_signal" 列绘图状态同步开启"""
 
     def __init__(self, source: IndFrame | KLine, data, **kwargs: IndSetting | dict) -> None:
-        super().__init__(data, **kwargs)
+        super().__init__(data, source=source, **kwargs)
         self.__source = source  # IndFrame数据
-        self._issignal: bool = self.sname in source.signallines
-        self._dataset.source_object = source
+
+    @property
+    def _issignal(self) -> bool:
+        """是否为父级的交易信号线"""
+        return self.sname in self.__source.signallines
 
     @property
     def line_style(self) -> LineStyle | None:
@@ -6415,6 +6455,8 @@ class BtIndicator(CustomBase, KLine):
         - 参数 `self`：通常为 `KLine` 实例，可直接访问其字段（如 `self.close` 获取收盘价序列）
         - 返回值：支持多种数据类型，框架会自动转换为 `IndSeries`（单列）或 `IndFrame`（多列）
         - 示例：返回 `self.close.rolling(5).mean()` 实现5期均线
+        - 逐元素循环（如状态机）建议写成只操作数组的函数并以 `@bt_jit` 装饰（见 `minibt.indicators.jit`），
+          输入指标自动转换为数组，循环以numba编译执行
 
     ### 使用示例：
     >>> # 1. 定义简单移动平均线指标
@@ -6612,6 +6654,12 @@ class Stop(metaclass=StopMeta):
         self.stop_price.new = new_stop_price
         self.target_price.new = new_target_price
 
+    ### 编译内核（内置停止器）
+        >>> 声明 _kernel（见minibt.stop.kernels.STOP_KINDS）并实现 _kernel_params/_kernel_state 的停止器，
+        回测中（options.set_compiled_stops）以编译状态机逐K线更新，只读写numpy数组；
+        重写了long/short的子类、数据修补模式及实盘仍执行Python实现
+        stop.path(entries, sides) 一次预计算整条停止价/目标价路径及平仓K线
+
     ### Examples
     ```python
     class SegmentationTracking(Stop):
@@ -6724,6 +6772,8 @@ class Stop(metaclass=StopMeta):
     _price_tick: float
     _volume_multiple: float
     _is_stop_processed: bool
+    _kernel: str | None = None
+    _engine: tuple | bool | None = None
 
     def __init__(self, ** kwargs):
         raise NotImplementedError("子类必须实现__init__方法")
@@ -6793,11 +6843,135 @@ class Stop(metaclass=StopMeta):
         """## 空头停止计算"""
         ...
 
+    def _kernel_params(self) -> list[float]:
+        """## 编译内核参数（声明 _kernel 的子类实现）"""
+        raise NotImplementedError(f"{type(self).__name__} 未实现编译内核参数")
+
+    def _kernel_state(self) -> list[float]:
+        """## 编译内核初始状态（由当前实例属性生成）"""
+        return []
+
+    def _kernel_atr(self) -> np.ndarray | None:
+        """## 编译内核使用的波动率指标数组"""
+        atr = getattr(self, "_atr", None)
+        if atr is None:
+            return None
+        return np.ascontiguousarray(atr.values, dtype=np.float64)
+
+    @classmethod
+    def _kernel_kind(cls) -> int | None:
+        """## 编译内核编号（未声明或long/short被子类重写时为None）"""
+        owner = next(klass for klass in cls.__mro__ if "_kernel" in klass.__dict__)
+        if owner._kernel is None or cls.long is not owner.long or cls.short is not owner.short:
+            return None
+        from ..stop.kernels import STOP_KINDS
+        return STOP_KINDS.get(owner._kernel)
+
+    def _build_engine(self) -> tuple | bool:
+        """## 构建逐K线编译更新所需的数组（不可用时返回False）"""
+        kind = self._kernel_kind()
+        if kind is None:
+            return False
+        from ..stop.kernels import get_stop_kernels
+        setting = self.kline._klinesetting
+        stop_lines = setting.stop_lines
+        stop_line, target_line = stop_lines.stop_price, stop_lines.target_price
+        stop = stop_line._mgr.blocks[0].values
+        target = target_line._mgr.blocks[0].values
+        if stop.dtype != np.float64 or target.dtype != np.float64:
+            return False
+        high, low, close = (np.ascontiguousarray(values, dtype=np.float64) for values in (
+            setting.current_high, setting.current_low, setting.current_close))
+        atr = self._kernel_atr()
+        # 与Line.new的赋值一致：同步写入停止线源数据及其pandas对象
+        mirrors = [(stop_lines._mgr.blocks[0].values, stop_lines.lines.index(name))
+                   for name in (stop_line.lines[0], target_line.lines[0])]
+        pandas_object = stop_lines.pandas_object
+        if pandas_object._mgr.nblocks == 1:
+            values = pandas_object._mgr.blocks[0].values
+            mirrors += [(values, 0), (values, 1)]
+        else:
+            mirrors = None
+        return (get_stop_kernels()[0], kind,
+                np.asarray(self._kernel_params(), dtype=np.float64),
+                np.asarray(self._kernel_state(), dtype=np.float64),
+                high, low, close, close if atr is None else atr,
+                stop, target, mirrors, (stop_line, target_line))
+
+    def _compiled_update(self, pos: float) -> bool:
+        """## 以编译内核更新当前K线（不可用时返回False，由Python实现处理）"""
+        kline = self.kline
+        if not options._compiled_stops or options._data_patching or kline._is_live_trading:
+            return False
+        engine = self._engine
+        if engine is None:
+            engine = self._engine = self._build_engine()
+        if engine is False:
+            return False
+        (update, kind, params, state, high, low, close, atr,
+         stop, target, mirrors, lines) = engine
+        index = kline.btindex
+        closed = update(kind, params, state, float(pos), index, kline.open_price, self._price_tick,
+                      high, low, close, atr, stop, target)
+        if mirrors is None:
+            lines[0].new, lines[1].new = stop[index], target[index]
+        else:
+            for (values, row), value in zip(mirrors, (stop[index], target[index]) * 2):
+                values[row][index] = value
+            for line in lines:
+                line.cache.clear()
+        if closed:
+            kline.set_target_size()
+        return True
+
+    def path(self, entries: Sequence[int] | np.ndarray, sides: Sequence[float] | np.ndarray | float,
+             open_prices: Sequence[float] | np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """## 预计算停止路径（编译内核）
+        - 入场信号已知时一次求出整条停止价/目标价路径及每笔交易的平仓K线，无需逐K线回测
+        - 第k笔交易从entries[k]开始，触发平仓或下一笔交易开始时结束（entries须递增）
+        - 使用停止器的初始状态，不影响回测中的实例状态
+
+        Args:
+            entries (Sequence[int] | np.ndarray): 开仓K线索引
+            sides (Sequence[float] | np.ndarray | float): 每笔交易方向（>0多头，<0空头），标量时所有交易相同
+            open_prices (Sequence[float] | np.ndarray | None): 每笔交易开仓价. 默认开仓K线收盘价
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: (停止价, 目标价, 平仓K线索引（未触发为-1）)
+
+        Examples:
+            >>> stop_price, target_price, exits = self.data.stop.path(entries, 1.)
+        """
+        kind = self._kernel_kind()
+        if kind is None:
+            raise NotImplementedError(f"{type(self).__name__} 没有编译内核，无法预计算停止路径")
+        from ..stop.kernels import get_stop_kernels
+        setting = self.kline._klinesetting
+        high, low, close = (np.ascontiguousarray(values, dtype=np.float64) for values in (
+            setting.current_high, setting.current_low, setting.current_close))
+        entries = np.ascontiguousarray(entries, dtype=np.int64)
+        assert entries.ndim == 1 and (np.diff(entries) > 0).all(), "entries须为递增的一维K线索引"
+        assert not entries.size or (entries[0] >= 0 and entries[-1] < close.size), "entries超出K线范围"
+        sides = np.ascontiguousarray(np.broadcast_to(np.asarray(sides, dtype=np.float64), entries.shape))
+        if open_prices is None:
+            open_prices = close[entries]
+        open_prices = np.ascontiguousarray(np.broadcast_to(
+            np.asarray(open_prices, dtype=np.float64), entries.shape))
+        atr = self._kernel_atr()
+        stop, target = np.full(close.size, np.nan), np.full(close.size, np.nan)
+        exits = get_stop_kernels()[1](
+            kind, np.asarray(self._kernel_params(), dtype=np.float64),
+            np.asarray(self._kernel_state(), dtype=np.float64), entries, sides, open_prices,
+            self._price_tick, high, low, close, close if atr is None else atr, stop, target)
+        return stop, target, exits
+
     def update(self) -> bool:
         """## 更新
         """
         pos = self.kline.position.pos
         if pos:
+            if self._compiled_update(pos):
+                return
             if pos > 0:
                 self.long()
                 if self.close[-1] <= self.stop_price[-1] or self.close[-1] >= self.target_price[-1]:
@@ -0,0 +1,116 @@
+# -*- encoding: utf-8 -*-
+"""
+## 指标公共子表达式消除（CSE）
+
+策略 `__init__`（及其中的自定义指标）经常多次计算相同的指标，例如多处调用
+`self.data.close.ema(20)`，或多个自定义 `BtIndicator` 内部各自计算 `atr(14)`。
+每次调用都经过 `tobtind` 重新计算并分配完整的指标对象。
+
+本模块在一次 `_strategy_init()` 执行期间记录 `tobtind` 的调用：
+相同 (数据源对象, 指标函数, 参数, 显示设置) 的调用直接返回首次计算得到的同一指标对象。
+
+- 数据源按对象身份比较（同一个 Line/IndSeries/KLine），参数按值比较，
+  数据类参数（Series/ndarray等）与其它对象按身份比较
+- 重放模式（isreplay）的指标不参与复用
+- 复用次数通过 `Strategy.indicator_reuse_report()` 查看，
+  开启调试日志时在初始化结束后输出
+
+### 注意：
+- 复用返回的是同一对象，原地修改其中一个会同时影响所有引用
+- 同一指标对象赋值给多个策略属性时只注册、绘制一次（以首个属性名命名）
+- 通过 `options.set_indicator_cse = False` 关闭
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any
+import numpy as np
+import pandas as pd
+
+__all__ = ["CSEContext", "cse", "current_cse"]
+
+
+class CSEContext:
+    """## 单次 `_strategy_init()` 的指标复用上下文
+
+    - _entries: 键 -> [指标对象, 复用次数, 描述]
+    - _refs: 键中按身份比较的对象（保持引用，避免对象回收后id被复用）
+    """
+
+    def __init__(self):
+        self._entries: dict[tuple, list] = {}
+        self._refs: list = []
+
+    def _freeze(self, value) -> Any:
+        if isinstance(value, (list, tuple)):
+            return tuple(self._freeze(v) for v in value)
+        if isinstance(value, dict):
+            return tuple(sorted((str(k), self._freeze(v)) for k, v in value.items()))
+        if value is None or isinstance(value, (str, bool, int, float, complex)):
+            return type(value).__name__, value
+        if isinstance(value, np.generic):
+            return type(value).__name__, value.item()
+        self._refs.append(value)
+        return "obj", id(value)
+
+    def make_key(self, source, func, func_name: str, ind_params: list, kwargs: dict, settings: tuple) -> tuple:
+        """生成复用键：(数据源身份, 指标函数, 函数名, 参数, 关键字参数, 显示设置)"""
+        return (self._freeze(source), self._freeze(func), func_name, self._freeze(list(ind_params)),
+                self._freeze(kwargs), self._freeze(settings))
+
+    def get(self, key: tuple) -> Any:
+        """命中时返回首次计算的指标对象并累计复用次数，未命中返回None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry[1] += 1
+        return entry[0]
+
+    def put(self, key: tuple, value: Any, source, func_name: str, ind_params: list, kwargs: dict) -> None:
+        """记录首次计算的指标对象"""
+        params = [repr(v) for v in ind_params]
+        params.extend(f"{k}={v!r}" for k, v in kwargs.items()
+                      if k not in ("isindicator", "iscustom", "linestyle", "signalstyle", "id"))
+        source_name = getattr(source, "sname", None) or type(source).__name__
+        self._entries[key] = [value, 0, (func_name, ", ".join(params), source_name)]
+
+    @property
+    def reuses(self) -> int:
+        """总复用次数"""
+        return sum(entry[1] for entry in self._entries.values())
+
+    def report(self) -> pd.DataFrame:
+        """## 指标复用报告
+
+        Returns:
+            pd.DataFrame: 列为 indicator、params、source、calls、reuses，按复用次数降序
+        """
+        rows = [dict(indicator=func_name, params=params, source=source, calls=reuses + 1, reuses=reuses)
+                for _, reuses, (func_name, params, source) in self._entries.values()]
+        report = pd.DataFrame(
+            rows, columns=["indicator", "params", "source", "calls", "reuses"])
+        return report.sort_values("reuses", ascending=False, kind="stable").reset_index(drop=True)
+
+
+_CURRENT: CSEContext | None = None
+
+
+def current_cse() -> CSEContext | None:
+    """当前生效的指标复用上下文（未处于策略初始化中时为None）"""
+    return _CURRENT
+
+
+@contextmanager
+def cse(context: CSEContext):
+    """## 在上下文内启用指标复用
+
+    Examples:
+        >>> with cse(CSEContext()) as context:
+        ...     self._strategy_init()
+        >>> context.report()
+    """
+    global _CURRENT
+    previous, _CURRENT = _CURRENT, context
+    try:
+        yield context
+    finally:
+        _CURRENT = previous
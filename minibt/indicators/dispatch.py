@@ -0,0 +1,498 @@
+# -*- encoding: utf-8 -*-
+"""
+## 指标库自动路由（最快后端）
+
+同一指标（EMA、RSI、ATR、MACD、布林带等）在 `talib.py`、`tulip.py`、`pandas_ta.py`、
+`finta.py`、`btind.py` 中各有一份实现，速度相差10~100倍。本模块提供统一入口：
+
+- `IndicatorsBase.fastest`：`self.data.close.fastest.ema(20)` 按标定结果路由到最快的已安装后端
+- 标定（calibrate）：在合成K线上计时各后端的计算函数（CoreFunc，不含框架封装开销），
+  并以 pandas_ta 原生实现（talib=False）为参照校验数值一致性，
+  只有在参照有效的每个位置都一致（rtol=1e-6, atol=1e-8）的后端才参与路由
+- 标定只在默认参数下进行；自动路由时，每组新参数首次调用会在合成K线上复核路由后端，
+  不一致则该组参数回退到参照后端（复核结果按参数组合缓存在内存中）
+- 标定结果缓存在磁盘（默认 `~/.minibt/backend_calibration.json`），
+  各指标首次路由时标定一次；已安装库的版本变化后自动重新标定
+- 按指标固定后端：`backend_dispatch.pin("rsi", "talib")`，或单次调用传入 `backend="talib"`
+  （固定的后端不做一致性校验）
+
+多输出指标的线名统一（如布林带 bb_lower/bb_mid/bb_upper），各后端的额外输出保留。
+
+### 示例：
+```python
+from minibt.indicators.dispatch import backend_dispatch
+
+ema = self.data.close.fastest.ema(20)
+bands = self.data.close.fastest.bbands(20, 2.)      # bands.bb_upper
+backend_dispatch.report()                           # 各指标各后端耗时与校验结果
+backend_dispatch.pin("atr", "talib")                # 固定ATR使用talib
+```
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+import warnings
+from importlib import import_module
+from typing import Callable, TYPE_CHECKING
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from .core import IndFrame, IndSeries
+
+__all__ = ["GENERIC_INDICATORS", "BackendDispatch",
+           "backend_dispatch", "FastestTa"]
+
+# 后端 -> (依赖库模块名, 指标对象上的接口属性, CoreFunc函数名前缀)
+BACKENDS: dict[str, tuple[str | None, str, str]] = {
+    "talib": ("talib", "talib", "talib_"),
+    "tulip": ("tulipy", "tulip", "ti_"),
+    "pandas_ta": ("pandas_ta", "pta", "pta_"),
+    "finta": ("finta", "finta", "finta_"),
+    "btind": (None, "btind", "btind_"),
+}
+"""后端名称 -> (依赖库模块名, 指标接口属性, CoreFunc前缀)"""
+
+REFERENCE_BACKEND = "pandas_ta"
+"""数值一致性校验的参照后端"""
+
+
+class _Route:
+    """某后端对通用指标的实现：接口方法名、参数映射、按后端原始顺序的统一线名"""
+
+    def __init__(self, backend: str, method: str, params: Callable[[dict], dict],
+                 lines: tuple[str, ...] | None = None):
+        self.backend = backend
+        self.method = method
+        self.params = params
+        self.lines = lines
+
+    @property
+    def func_name(self) -> str:
+        return BACKENDS[self.backend][2] + self.method
+
+
+class _Generic:
+    """通用指标：统一参数（含默认值）、统一输出线名、各后端实现"""
+
+    def __init__(self, defaults: dict, outputs: tuple[str, ...] | None, routes: list[_Route]):
+        self.defaults = defaults
+        self.outputs = outputs
+        self.routes = {route.backend: route for route in routes}
+
+
+_BB = ("bb_lower", "bb_mid", "bb_upper")
+_MACD = ("macd", "macd_signal", "macd_hist")
+
+GENERIC_INDICATORS: dict[str, _Generic] = {
+    "sma": _Generic(dict(length=10), None, [
+        _Route("talib", "SMA", lambda p: dict(timeperiod=p["length"])),
+        _Route("tulip", "sma", lambda p: dict(period=p["length"])),
+        _Route("pandas_ta", "sma", lambda p: dict(
+            length=p["length"], talib=False)),
+        _Route("finta", "SMA", lambda p: dict(period=p["length"])),
+    ]),
+    "ema": _Generic(dict(length=10), None, [
+        _Route("talib", "EMA", lambda p: dict(timeperiod=p["length"])),
+        _Route("tulip", "ema", lambda p: dict(period=p["length"])),
+        _Route("pandas_ta", "ema", lambda p: dict(
+            length=p["length"], talib=False)),
+        _Route("finta", "EMA", lambda p: dict(
+            period=p["length"], adjust=False)),
+    ]),
+    "rsi": _Generic(dict(length=14), None, [
+        _Route("talib", "RSI", lambda p: dict(timeperiod=p["length"])),
+        _Route("tulip", "rsi", lambda p: dict(period=p["length"])),
+        _Route("pandas_ta", "rsi", lambda p: dict(
+            length=p["length"], talib=False)),
+        _Route("finta", "RSI", lambda p: dict(
+            period=p["length"], adjust=False)),
+    ]),
+    "atr": _Generic(dict(length=14), None, [
+        _Route("talib", "ATR", lambda p: dict(timeperiod=p["length"])),
+        _Route("tulip", "atr", lambda p: dict(period=p["length"])),
+        _Route("pandas_ta", "atr", lambda p: dict(
+            length=p["length"], talib=False)),
+        _Route("finta", "ATR", lambda p: dict(period=p["length"])),
+    ]),
+    "macd": _Generic(dict(fast=12, slow=26, signal=9), _MACD, [
+        _Route("talib", "MACD", lambda p: dict(fastperiod=p["fast"], slowperiod=p["slow"],
+                                               signalperiod=p["signal"]), _MACD),
+        _Route("tulip", "macd", lambda p: dict(short_period=p["fast"], long_period=p["slow"],
+                                               signal_period=p["signal"]), _MACD),
+        _Route("pandas_ta", "macd", lambda p: dict(fast=p["fast"], slow=p["slow"], signal=p["signal"],
+                                                   talib=False), ("macd", "macd_hist", "macd_signal")),
+    ]),
+    "bbands": _Generic(dict(length=20, std=2.), _BB, [
+        _Route("talib", "BBANDS", lambda p: dict(timeperiod=p["length"], nbdevup=p["std"],
+                                                 nbdevdn=p["std"]), _BB[::-1]),
+        _Route("tulip", "bbands", lambda p: dict(
+            period=p["length"], stddev=p["std"]), _BB),
+        _Route("pandas_ta", "bbands", lambda p: dict(length=p["length"], std=p["std"], talib=False),
+               _BB + ("bb_width", "bb_percent")),
+        _Route("finta", "BBANDS", lambda p: dict(period=p["length"], std_multiplier=p["std"]),
+               _BB[::-1]),
+    ]),
+    "kama": _Generic(dict(length=10), None, [
+        _Route("talib", "KAMA", lambda p: dict(timeperiod=p["length"])),
+        _Route("tulip", "kama", lambda p: dict(period=p["length"])),
+        _Route("pandas_ta", "kama", lambda p: dict(length=p["length"])),
+        _Route("btind", "kama", lambda p: dict(length=p["length"])),
+    ]),
+}
+"""通用指标名 -> 各后端实现"""
+
+
+def _installed(backend: str) -> bool:
+    module = BACKENDS[backend][0]
+    if module is None:
+        return True
+    try:
+        import_module(module)
+        return True
+    except Exception:
+        return False
+
+
+def _versions() -> dict[str, str | None]:
+    """已安装后端的版本（未安装为None），版本变化时标定结果失效"""
+    versions = {}
+    for backend, (module, _, _) in BACKENDS.items():
+        if module is None:
+            continue
+        try:
+            versions[backend] = str(
+                getattr(import_module(module), "__version__", "unknown"))
+        except Exception:
+            versions[backend] = None
+    return versions
+
+
+def _synthetic_kline(size: int, seed: int = 0) -> pd.DataFrame:
+    """标定用合成K线（随机游走）"""
+    random = np.random.RandomState(seed)
+    close = 100. * np.exp(np.cumsum(random.normal(0., 0.01, size)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(random.normal(0., 0.004, (2, size)))
+    high = np.maximum(open_, close) * (1. + spread[0])
+    low = np.minimum(open_, close) * (1. - spread[1])
+    volume = random.randint(100, 10000, size).astype(np.float64)
+    return pd.DataFrame(dict(open=open_, high=high, low=low, close=close, volume=volume))
+
+
+def _outputs(result, size: int) -> list[np.ndarray]:
+    """CoreFunc结果统一为按后端原始顺序排列的一维float64数组列表"""
+    if isinstance(result, pd.DataFrame):
+        return [result[column].to_numpy(dtype=np.float64) for column in result.columns]
+    if isinstance(result, pd.Series):
+        return [result.to_numpy(dtype=np.float64)]
+    if isinstance(result, (list, tuple)):
+        return [np.asarray(getattr(r, "values", r), dtype=np.float64) for r in result]
+    values = np.asarray(result, dtype=np.float64)
+    if values.ndim == 1:
+        return [values]
+    return list(values.T) if values.shape[0] == size else list(values)
+
+
+def _equivalent(reference: dict[str, np.ndarray], outputs: dict[str, np.ndarray],
+                rtol: float = 1e-6, atol: float = 1e-8) -> bool:
+    """参照有效的每个位置，后端结果均有效且在误差范围内一致"""
+    for name, expected in reference.items():
+        values = outputs.get(name)
+        if values is None or values.shape != expected.shape:
+            return False
+        valid = np.isfinite(expected)
+        if not np.isfinite(values[valid]).all() or \
+                not np.allclose(values[valid], expected[valid], rtol=rtol, atol=atol):
+            return False
+    return True
+
+
+class BackendDispatch:
+    """## 通用指标的后端路由与标定
+
+    Args:
+        path (str | None): 标定结果缓存文件. 默认 `~/.minibt/backend_calibration.json`
+        size (int): 标定数据长度. 默认20000
+        repeat (int): 每个后端计时次数（取最短）. 默认3
+    """
+
+    def __init__(self, path: str | None = None, size: int = 20000, repeat: int = 3):
+        self.path = path or os.path.join(os.path.expanduser(
+            "~"), ".minibt", "backend_calibration.json")
+        self.size = int(size)
+        self.repeat = int(repeat)
+        self._pins: dict[str, str] = {}
+        self._results: dict[str, dict] | None = None
+        self._checked: dict[tuple, bool] = {}
+        self._kline: pd.DataFrame | None = None
+        self._lock = threading.RLock()
+
+    def configure(self, path: str | None = None, size: int | None = None, repeat: int | None = None) -> BackendDispatch:
+        """## 修改标定配置（修改后重新读取缓存）"""
+        with self._lock:
+            if path is not None:
+                self.path = path
+            if size is not None:
+                self.size = int(size)
+            if repeat is not None:
+                self.repeat = int(repeat)
+            self._results = None
+            self._checked.clear()
+            self._kline = None
+        return self
+
+    # ------------------------------
+    # 固定后端
+    # ------------------------------
+    def pin(self, name: str, backend: str) -> None:
+        """## 固定通用指标使用的后端
+
+        Args:
+            name (str): 通用指标名（见 `GENERIC_INDICATORS`）
+            backend (str): 后端名称
+        """
+        self._check_route(name, backend)
+        self._pins[name] = backend
+
+    def unpin(self, name: str | None = None) -> None:
+        """## 取消固定（name为None时全部取消）"""
+        if name is None:
+            self._pins.clear()
+        else:
+            self._pins.pop(name, None)
+
+    def _check_route(self, name: str, backend: str) -> _Route:
+        assert name in GENERIC_INDICATORS, f"未知的通用指标：{name}，可选{list(GENERIC_INDICATORS)}"
+        route = GENERIC_INDICATORS[name].routes.get(backend)
+        assert route is not None, f"{backend}不提供{name}，可选{list(GENERIC_INDICATORS[name].routes)}"
+        assert _installed(backend), f"后端{backend}未安装"
+        return route
+
+    # ------------------------------
+    # 标定
+    # ------------------------------
+    def _load(self) -> dict[str, dict]:
+        if self._results is None:
+            self._results = {}
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    cache = json.load(f)
+                if cache.get("versions") == _versions() and cache.get("size") == self.size:
+                    self._results = dict(cache.get("indicators", {}))
+            except (OSError, ValueError):
+                ...  # 无缓存或缓存损坏时重新标定
+        return self._results
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dict(versions=_versions(), size=self.size,
+                               indicators=self._results), f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            warnings.warn(f"标定结果写入{self.path}失败：{e}", UserWarning)
+
+    @staticmethod
+    def _compute(route: _Route, outputs: tuple[str, ...], kline: pd.DataFrame, params: dict,
+                 repeat: int = 1) -> tuple[float, dict[str, np.ndarray]] | None:
+        """以CoreFunc计算后端结果，返回(最短耗时, 统一线名 -> 数组)，失败时返回None"""
+        func = getattr(kline.ta, route.func_name, None)
+        if func is None:
+            return None
+        kwargs = route.params(params)
+        try:
+            costs = []
+            for _ in range(max(repeat, 1)):
+                start = time.perf_counter()
+                result = func(**kwargs)
+                costs.append(time.perf_counter() - start)
+        except Exception:
+            return None
+        arrays = _outputs(result, len(kline))
+        if len(arrays) < len(outputs):
+            return None
+        names = route.lines or outputs
+        return min(costs), {n: a for n, a in zip(names, arrays) if n in outputs}
+
+    def _calibrate_one(self, name: str, kline: pd.DataFrame) -> dict:
+        generic = GENERIC_INDICATORS[name]
+        outputs = generic.outputs or (name,)
+        timings, results = {}, {}
+        for backend, route in generic.routes.items():
+            if not _installed(backend):
+                continue
+            computed = self._compute(
+                route, outputs, kline, generic.defaults, self.repeat)
+            if computed is not None:
+                timings[backend], results[backend] = computed
+        reference = results.get(REFERENCE_BACKEND)
+        verified = {backend: backend == REFERENCE_BACKEND or (
+            reference is not None and _equivalent(reference, values)) for backend, values in results.items()}
+        eligible = [b for b in timings if verified[b]]
+        return dict(backend=min(eligible, key=timings.get) if eligible else REFERENCE_BACKEND,
+                    timings=timings, verified=verified)
+
+    def _synthetic(self) -> pd.DataFrame:
+        if self._kline is None or len(self._kline) != self.size:
+            self._kline = _synthetic_kline(self.size)
+        return self._kline
+
+    def verify(self, name: str, backend: str, params: dict) -> bool:
+        """## 在给定参数下校验后端与参照后端的数值一致性（按参数组合缓存）
+
+        标定只在默认参数下校验，路由的后端在每组新参数首次调用时以本方法复核
+
+        Args:
+            name (str): 通用指标名
+            backend (str): 后端名称
+            params (dict): 完整的统一参数
+
+        Returns:
+            bool: 是否一致（参照后端恒为True）
+        """
+        if backend == REFERENCE_BACKEND:
+            return True
+        from .memo import _freeze
+        generic = GENERIC_INDICATORS[name]
+        key = (name, backend, _freeze(params))
+        with self._lock:
+            if key not in self._checked:
+                outputs = generic.outputs or (name,)
+                kline = self._synthetic()
+                with np.errstate(all="ignore"), warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    reference = self._compute(
+                        generic.routes[REFERENCE_BACKEND], outputs, kline, params)
+                    computed = self._compute(
+                        generic.routes[backend], outputs, kline, params)
+                self._checked[key] = reference is not None and computed is not None and \
+                    _equivalent(reference[1], computed[1])
+            return self._checked[key]
+
+    def calibrate(self, names: list[str] | None = None, force: bool = False) -> dict[str, dict]:
+        """## 标定通用指标的各后端（结果写入磁盘缓存）
+
+        Args:
+            names (list[str] | None): 通用指标名，None为全部. 默认None
+            force (bool): 是否忽略缓存重新标定. 默认False
+
+        Returns:
+            dict: 指标名 -> {backend: 路由后端, timings: 各后端耗时（秒）, verified: 各后端一致性}
+        """
+        names = list(GENERIC_INDICATORS) if names is None else list(names)
+        with self._lock:
+            results = self._load()
+            missing = [n for n in names if force or n not in results]
+            if missing:
+                kline = self._synthetic()
+                self._checked.clear()
+                with np.errstate(all="ignore"), warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    for name in missing:
+                        results[name] = self._calibrate_one(name, kline)
+                self._save()
+            return {name: results[name] for name in names}
+
+    def choose(self, name: str) -> str:
+        """## 通用指标当前路由的后端（固定后端优先，其次为标定的最快后端）"""
+        assert name in GENERIC_INDICATORS, f"未知的通用指标：{name}，可选{list(GENERIC_INDICATORS)}"
+        if name in self._pins:
+            return self._pins[name]
+        return self.calibrate([name])[name]["backend"]
+
+    def report(self) -> pd.DataFrame:
+        """## 标定报告
+
+        Returns:
+            pd.DataFrame: 列为 indicator、backend、seconds、verified、selected，按指标与耗时排序
+        """
+        rows = []
+        for name, result in self.calibrate().items():
+            selected = self._pins.get(name, result["backend"])
+            for backend, seconds in result["timings"].items():
+                rows.append(dict(indicator=name, backend=backend, seconds=seconds,
+                                 verified=result["verified"].get(backend, False), selected=backend == selected))
+        report = pd.DataFrame(
+            rows, columns=["indicator", "backend", "seconds", "verified", "selected"])
+        return report.sort_values(["indicator", "seconds"], kind="stable").reset_index(drop=True)
+
+    # ------------------------------
+    # 路由调用
+    # ------------------------------
+    def call(self, source, name: str, params: dict, backend: str | None = None, **kwargs) -> IndFrame | IndSeries:
+        """## 以路由后端计算通用指标
+
+        Args:
+            source: 指标数据源（KLine/IndFrame/IndSeries/Line）
+            name (str): 通用指标名
+            params (dict): 统一参数（未提供的使用默认值）
+            backend (str | None): 本次调用固定的后端. 默认None（自动路由）
+            **kwargs: 传递给指标的框架参数（如overlap、isplot）
+
+        Returns:
+            IndFrame | IndSeries: 指标
+        """
+        generic = GENERIC_INDICATORS.get(name)
+        assert generic is not None, f"未知的通用指标：{name}，可选{list(GENERIC_INDICATORS)}"
+        params = {**generic.defaults, **
+                  {k: v for k, v in params.items() if v is not None}}
+        if backend is None:
+            backend = self.choose(name)
+            # 自动路由的后端在该组参数下与参照不一致时回退到参照后端
+            if name not in self._pins and not self.verify(name, backend, params):
+                backend = REFERENCE_BACKEND
+        route = self._check_route(name, backend)
+        if route.lines and "lines" not in kwargs:
+            kwargs["lines"] = list(route.lines)
+        method = getattr(getattr(source, BACKENDS[route.backend][1]), route.method)
+        return method(**route.params(params), **kwargs)
+
+
+backend_dispatch = BackendDispatch()
+"""全局后端路由器"""
+
+
+class FastestTa:
+    """## 通用指标接口（自动路由到最快的已安装后端）
+
+    通过 `self.data.close.fastest` / `self.data.fastest` 获取，见 `minibt.indicators.dispatch`。
+    每个方法的 backend 参数可固定本次调用的后端。
+    自动路由的后端在每组新参数首次调用时与参照后端复核一致性，不一致时回退到pandas_ta；
+    固定的后端（pin或backend参数）不做复核。
+    """
+
+    def __init__(self, data):
+        self._df = data
+
+    def sma(self, length: int = 10, backend: str | None = None, **kwargs) -> IndSeries:
+        """## 简单移动平均（通用）"""
+        return backend_dispatch.call(self._df, "sma", dict(length=length), backend, **kwargs)
+
+    def ema(self, length: int = 10, backend: str | None = None, **kwargs) -> IndSeries:
+        """## 指数移动平均（通用，以前length根均值为种子）"""
+        return backend_dispatch.call(self._df, "ema", dict(length=length), backend, **kwargs)
+
+    def rsi(self, length: int = 14, backend: str | None = None, **kwargs) -> IndSeries:
+        """## 相对强弱指数（通用）"""
+        return backend_dispatch.call(self._df, "rsi", dict(length=length), backend, **kwargs)
+
+    def atr(self, length: int = 14, backend: str | None = None, **kwargs) -> IndSeries:
+        """## 平均真实波幅（通用，需要high/low/close）"""
+        return backend_dispatch.call(self._df, "atr", dict(length=length), backend, **kwargs)
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9, backend: str | None = None, **kwargs) -> IndFrame:
+        """## MACD（通用），线名为 macd、macd_signal、macd_hist"""
+        return backend_dispatch.call(self._df, "macd", dict(fast=fast, slow=slow, signal=signal), backend, **kwargs)
+
+    def bbands(self, length: int = 20, std: float = 2., backend: str | None = None, **kwargs) -> IndFrame:
+        """## 布林带（通用），线名为 bb_lower、bb_mid、bb_upper"""
+        return backend_dispatch.call(self._df, "bbands", dict(length=length, std=std), backend, **kwargs)
+
+    def kama(self, length: int = 10, backend: str | None = None, **kwargs) -> IndSeries:
+        """## 考夫曼自适应均线（通用）"""
+        return backend_dispatch.call(self._df, "kama", dict(length=length), backend, **kwargs)
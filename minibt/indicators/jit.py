@@ -0,0 +1,176 @@
+# -*- encoding: utf-8 -*-
+"""
+## 自定义指标循环编译（bt_jit）
+
+`BtIndicator.next` 中常见的逐元素状态机循环（如 `cci_state[i] = cci[i] > upper and 1. or ...`）
+每次 `cci[i]` 都经过指标对象的索引逻辑，长历史数据上非常慢。
+
+`bt_jit` 装饰只操作数组的循环函数：
+
+- 调用时自动提取输入数组：IndSeries/Line/pd.Series → 一维float64数组，
+  IndFrame/pd.DataFrame → 二维float64数组，标量与其它参数原样传入
+- 循环以numba nopython模式编译（首次调用时编译，默认缓存到磁盘）
+- 返回的一维数组（长度与输入指标一致）自动封装为IndSeries，可继续调用 `cross_up` 等指标方法，
+  或直接作为 `next` 的返回值写入指标线
+- 未安装numba或函数无法在nopython模式编译时给出一次警告（含原因），
+  之后以Python执行同一函数（输入已是numpy数组，仍快于逐元素访问指标对象）
+- 作为 `BtIndicator` 的类属性定义时与staticmethod一致，可通过 `self.xxx(...)` 调用
+
+### 示例：
+```python
+class CCI(BtIndicator):
+    params = dict(length=10, upper=100, lower=-100)
+
+    @bt_jit
+    def cci_state(cci, start, upper, lower):
+        state = np.ones(cci.size)
+        for i in range(start, cci.size):
+            if cci[i] > upper:
+                state[i] = 1.
+            elif cci[i] < lower:
+                state[i] = -1.
+            else:
+                state[i] = state[i - 1]
+        return state
+
+    def next(self):
+        cci = self.close.cci(self.params.length)
+        state = self.cci_state(cci, self.params.length + 1, self.params.upper, self.params.lower)
+        return cci, state.cross_up(0.), state.cross_down(0.)
+```
+"""
+from __future__ import annotations
+import functools
+import warnings
+from typing import Any, Callable
+import numpy as np
+import pandas as pd
+
+__all__ = ["bt_jit", "BtJitFunction"]
+
+
+def _is_numba_error(error: Exception) -> bool:
+    try:
+        from numba.core.errors import NumbaError
+    except ImportError:
+        return False
+    return isinstance(error, NumbaError)
+
+
+class BtJitFunction:
+    """## bt_jit 装饰后的函数
+
+    Args:
+        func (Callable): 只操作数组与标量的循环函数
+        wrap (bool): 是否将一维数组结果封装为IndSeries. 默认True
+        fallback (bool): 无法编译时是否回退为Python执行（False时抛出异常）. 默认True
+        cache (bool): 是否缓存编译结果到磁盘. 默认True
+    """
+
+    def __init__(self, func: Callable, wrap: bool = True, fallback: bool = True, cache: bool = True):
+        if isinstance(func, staticmethod):
+            func = func.__func__
+        functools.update_wrapper(self, func)
+        self.py_func = func
+        self.wrap = wrap
+        self.fallback = fallback
+        self.cache = cache
+        self._compiled: Callable | None = None
+        self._error: str | None = None
+
+    def __get__(self, instance, owner=None):
+        # 与staticmethod一致：通过实例或类访问时不绑定self
+        return self
+
+    @property
+    def compiled(self) -> bool:
+        """是否以numba编译执行（首次调用前为False）"""
+        return self._compiled is not None and self._error is None
+
+    def _arguments(self, args: tuple, kwargs: dict) -> tuple[tuple, dict, int | None]:
+        """提取输入数组，返回 (位置参数, 关键字参数, 输入指标长度)"""
+        length = None
+
+        def convert(value):
+            nonlocal length
+            data = getattr(value, "pandas_object", value)
+            if isinstance(data, (pd.Series, pd.DataFrame)):
+                values = np.ascontiguousarray(data.values, dtype=np.float64)
+                if length is None:
+                    length = len(values)
+                return values
+            if isinstance(value, (list, tuple)) and value and all(isinstance(v, (int, float)) for v in value):
+                return np.asarray(value, dtype=np.float64)
+            return value
+
+        return (tuple(convert(v) for v in args), {k: convert(v) for k, v in kwargs.items()}, length)
+
+    def _fail(self, reason: str) -> None:
+        self._error = reason
+        warnings.warn(f"bt_jit: 函数 {self.__name__} 无法以numba nopython模式编译，已回退为Python执行"
+                      f"（输入已转换为numpy数组）。原因：{reason}", UserWarning, stacklevel=4)
+
+    def _run(self, args: tuple, kwargs: dict) -> Any:
+        if self._error is not None:
+            return self.py_func(*args, **kwargs)
+        if self._compiled is None:
+            try:
+                from numba import njit
+            except ImportError:
+                if not self.fallback:
+                    raise
+                self._fail("未安装numba")
+                return self.py_func(*args, **kwargs)
+            self._compiled = njit(cache=self.cache)(self.py_func)
+        try:
+            return self._compiled(*args, **kwargs)
+        except Exception as e:
+            if self.cache and not _is_numba_error(e) and "cache" in str(e).lower():
+                # 交互环境等无法定位源文件时不能缓存，改为不缓存重新编译
+                from numba import njit
+                self.cache = False
+                self._compiled = njit(cache=False)(self.py_func)
+                return self._run(args, kwargs)
+            if not _is_numba_error(e) or not self.fallback:
+                raise
+            self._fail(str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__)
+            return self.py_func(*args, **kwargs)
+
+    def _wrap(self, value, length: int | None):
+        if isinstance(value, tuple):
+            return tuple(self._wrap(v, length) for v in value)
+        if isinstance(value, np.ndarray) and value.ndim == 1 and len(value) == length:
+            from .core import IndSeries
+            return IndSeries(value)
+        return value
+
+    def __call__(self, *args, **kwargs):
+        args, kwargs, length = self._arguments(args, kwargs)
+        result = self._run(args, kwargs)
+        return self._wrap(result, length) if self.wrap and length is not None else result
+
+    def __repr__(self) -> str:
+        state = "numba" if self.compiled else (
+            "python" if self._error else "未编译")
+        return f"<bt_jit {self.__name__} ({state})>"
+
+
+def bt_jit(func: Callable | None = None, *, wrap: bool = True, fallback: bool = True,
+           cache: bool = True) -> BtJitFunction | Callable[[Callable], BtJitFunction]:
+    """## 编译自定义指标循环的装饰器
+
+    Args:
+        func (Callable | None): 被装饰的函数
+        wrap (bool): 是否将一维数组结果封装为IndSeries. 默认True
+        fallback (bool): 无法编译时是否回退为Python执行（False时抛出异常）. 默认True
+        cache (bool): 是否缓存编译结果到磁盘. 默认True
+
+    Examples:
+        >>> @bt_jit
+        ... def state_machine(x, upper, lower): ...
+        >>> @bt_jit(wrap=False)
+        ... def raw_loop(x): ...
+    """
+    if func is None:
+        return lambda f: BtJitFunction(f, wrap, fallback, cache)
+    return BtJitFunction(func, wrap, fallback, cache)
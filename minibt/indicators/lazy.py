@@ -0,0 +1,238 @@
+# -*- encoding: utf-8 -*-
+"""
+## 指标运算惰性表达式图
+
+默认情况下 `IndSeries`/`IndFrame` 的每个运算符（`_create_operator_func` → `_apply_operator`）
+都会立即分配完整长度的pandas结果并封装为带元数据的新指标，
+`(a - b) / (c + 1e-9) * 100 > d` 会产生5个临时指标。
+
+开启 `options.set_lazy_operators` 后，单线指标（IndSeries/Line）之间及与标量的运算
+返回 `LazyExpr` 节点，只记录运算图；在需要数值时（访问属性/索引/赋值给策略属性等）
+一次性融合求值，并且只封装最终结果为指标：
+
+- 安装numexpr时整条表达式编译为一个numexpr表达式单次遍历求值（多线程、无中间数组）
+- 未安装numexpr或表达式含numexpr不支持的运算（如 `//`）时以numpy逐节点求值，
+  中间结果为numpy数组，不创建中间指标
+- 结果与立即求值一致（元数据继承自表达式最左侧的指标，与逐步运算相同）
+- 多线指标（IndFrame）、长度不一致的数据或其它类型的运算对象仍立即求值
+
+### 示例：
+```python
+with minibt.options.context(set_lazy_operators=True):
+    self.signal = (self.a - self.b) / (self.c + 1e-9) * 100 > self.d
+```
+"""
+from __future__ import annotations
+from typing import Any
+import numpy as np
+
+__all__ = ["LazyExpr", "lazy_operator"]
+
+_SCALAR_TYPES = (int, float, bool, np.generic)
+# numexpr不支持的运算
+_NUMPY_ONLY_OPS = {"//", "invert"}
+_BINARY_FUNCS = {
+    "+": np.add, "-": np.subtract, "*": np.multiply, "/": np.true_divide,
+    "//": np.floor_divide, "%": np.mod, "**": np.power,
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "==": np.equal, "!=": np.not_equal, "&": np.logical_and, "|": np.logical_or,
+}
+_UNARY_FUNCS = {"-": np.negative, "+": np.positive,
+                "abs": np.abs, "~": np.logical_not}
+
+
+def _numexpr():
+    try:
+        import numexpr
+        return numexpr
+    except ImportError:
+        return None
+
+
+class LazyExpr:
+    """## 惰性运算节点
+
+    Args:
+        anchor: 表达式最左侧的指标（结果元数据来源）
+        op (str): 运算符（二元运算符或 'neg'/'pos'/'abs'/'invert'）
+        operands (tuple): 运算对象（LazyExpr / np.ndarray / 标量）
+    """
+    __slots__ = ("_anchor", "_op", "_operands", "_result")
+
+    def __init__(self, anchor, op: str, operands: tuple):
+        self._anchor = anchor
+        self._op = op
+        self._operands = operands
+        self._result = None
+
+    # ------------------------------
+    # 求值
+    # ------------------------------
+    def _leaves(self, leaves: dict[str, Any], names: dict[int, str]) -> str:
+        """生成numexpr表达式字符串，收集叶子数据"""
+        parts = []
+        for operand in self._operands:
+            if isinstance(operand, LazyExpr):
+                if operand._result is not None:
+                    operand = operand._result.values
+                else:
+                    parts.append(operand._leaves(leaves, names))
+                    continue
+            key = id(operand)
+            if key not in names:
+                names[key] = f"v{len(names)}"
+                leaves[names[key]] = operand
+            parts.append(names[key])
+        if len(parts) == 1:
+            # 一元运算先转为浮点数，取反先转为布尔值（与立即求值一致）
+            return {"neg": f"(0.0 - {parts[0]})", "pos": f"({parts[0]} * 1.0)",
+                    "abs": f"abs({parts[0]} * 1.0)", "invert": f"(~({parts[0]} != 0))"}[self._op]
+        if self._op in ("&", "|"):
+            parts = [f"({p} != 0)" for p in parts]
+        return f"({parts[0]} {self._op} {parts[1]})"
+
+    def _ops(self) -> set[str]:
+        ops = {self._op}
+        for operand in self._operands:
+            if isinstance(operand, LazyExpr) and operand._result is None:
+                ops |= operand._ops()
+        return ops
+
+    def _eval_numpy(self) -> np.ndarray:
+        values = [operand._eval_numpy() if isinstance(operand, LazyExpr) and operand._result is None
+                  else (operand._result.values if isinstance(operand, LazyExpr) else operand)
+                  for operand in self._operands]
+        if len(values) == 1:
+            value = values[0]
+            if self._op == "invert":
+                return ~np.asarray(value, dtype=np.bool_)
+            func = _UNARY_FUNCS["abs" if self._op ==
+                                "abs" else {"neg": "-", "pos": "+"}[self._op]]
+            return func(np.asarray(value, dtype=np.float64))
+        if self._op in ("&", "|"):
+            values = [np.asarray(v, dtype=np.bool_) for v in values]
+        return _BINARY_FUNCS[self._op](*values)
+
+    def evaluate(self) -> np.ndarray:
+        """## 融合求值，返回numpy数组（不封装为指标）"""
+        numexpr = _numexpr()
+        with np.errstate(all="ignore"):
+            if numexpr is not None and not (self._ops() & _NUMPY_ONLY_OPS):
+                leaves: dict[str, Any] = {}
+                expression = self._leaves(leaves, {})
+                try:
+                    return np.asarray(numexpr.evaluate(expression, local_dict=leaves))
+                except Exception:
+                    ...  # numexpr不支持的类型组合（如布尔值参与算术运算）
+            return self._eval_numpy()
+
+    def materialize(self):
+        """## 求值并封装为指标（结果缓存，多次调用返回同一指标）"""
+        if self._result is None:
+            anchor = self._anchor
+            self._result = anchor._get_indseries()(
+                self.evaluate(), **anchor.get_indicator_kwargs(isindicator=True))
+            self._operands = ()
+        return self._result
+
+    # ------------------------------
+    # 惰性运算
+    # ------------------------------
+    def _binary(self, other, op: str, reverse: bool = False):
+        operand = _as_operand(other, len(self))
+        if operand is None:
+            # 无法惰性处理的运算对象：先求值再按指标运算
+            return self.materialize()._apply_operator(other, op, reverse)
+        operands = (operand, self) if reverse else (self, operand)
+        return LazyExpr(self._anchor, op, operands)
+
+    def __len__(self) -> int:
+        return len(self._anchor)
+
+    def __add__(self, other): return self._binary(other, "+")
+    def __sub__(self, other): return self._binary(other, "-")
+    def __mul__(self, other): return self._binary(other, "*")
+    def __truediv__(self, other): return self._binary(other, "/")
+    def __floordiv__(self, other): return self._binary(other, "//")
+    def __mod__(self, other): return self._binary(other, "%")
+    def __pow__(self, other): return self._binary(other, "**")
+    def __and__(self, other): return self._binary(other, "&")
+    def __or__(self, other): return self._binary(other, "|")
+    def __radd__(self, other): return self._binary(other, "+", True)
+    def __rsub__(self, other): return self._binary(other, "-", True)
+    def __rmul__(self, other): return self._binary(other, "*", True)
+    def __rtruediv__(self, other): return self._binary(other, "/", True)
+    def __rfloordiv__(self, other): return self._binary(other, "//", True)
+    def __rmod__(self, other): return self._binary(other, "%", True)
+    def __rpow__(self, other): return self._binary(other, "**", True)
+    def __rand__(self, other): return self._binary(other, "&", True)
+    def __ror__(self, other): return self._binary(other, "|", True)
+    def __lt__(self, other): return self._binary(other, "<")
+    def __le__(self, other): return self._binary(other, "<=")
+    def __gt__(self, other): return self._binary(other, ">")
+    def __ge__(self, other): return self._binary(other, ">=")
+    def __eq__(self, other): return self._binary(other, "==")
+    def __ne__(self, other): return self._binary(other, "!=")
+    def __neg__(self): return LazyExpr(self._anchor, "neg", (self,))
+    def __pos__(self): return LazyExpr(self._anchor, "pos", (self,))
+    def __abs__(self): return LazyExpr(self._anchor, "abs", (self,))
+    def __invert__(self): return LazyExpr(self._anchor, "invert", (self,))
+    __hash__ = object.__hash__
+
+    # ------------------------------
+    # 需要数值时自动求值
+    # ------------------------------
+    def __getattr__(self, name: str):
+        if name in LazyExpr.__slots__ or name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.materialize(), name)
+
+    def __getitem__(self, key):
+        return self.materialize()[key]
+
+    def __iter__(self):
+        return iter(self.materialize())
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.materialize().values
+        return values if dtype is None else values.astype(dtype)
+
+    def __bool__(self):
+        return bool(self.materialize())
+
+    def __repr__(self) -> str:
+        if self._result is not None:
+            return repr(self._result)
+        return f"LazyExpr{self._leaves({}, {})}"
+
+
+def _as_operand(other, length: int):
+    """转换为惰性运算对象，无法惰性处理时返回None"""
+    if isinstance(other, LazyExpr):
+        return other if len(other) == length else None
+    if isinstance(other, _SCALAR_TYPES):
+        return other
+    if isinstance(other, np.ndarray):
+        return other if other.ndim == 1 and len(other) == length else None
+    pandas_object = getattr(other, "pandas_object", other)
+    if getattr(pandas_object, "ndim", None) == 1 and len(pandas_object) == length \
+            and hasattr(pandas_object, "values"):
+        return np.asarray(pandas_object.values)
+    return None
+
+
+def lazy_operator(indicator, other, op: str, reverse: bool = False):
+    """## 指标运算的惰性版本（供 `_apply_operator` 调用）
+
+    Returns:
+        LazyExpr | None: 惰性节点，不支持惰性求值时返回None（立即求值）
+    """
+    if indicator.pandas_object.ndim != 1:
+        return None
+    length = len(indicator)
+    other = _as_operand(other, length)
+    if other is None:
+        return None
+    this = np.asarray(indicator.pandas_object.values)
+    operands = (other, this) if reverse else (this, other)
+    return LazyExpr(indicator, op, operands)
@@ -0,0 +1,244 @@
+# -*- encoding: utf-8 -*-
+"""
+## 跨参数组指标缓存
+
+参数优化（以及批量回测、滚动优化）每组参数都会重新执行 `_strategy_init()`，
+未参与优化的指标（如固定的200周期均线）在每组参数中重复计算。
+
+本模块提供进程级指标缓存（`indicator_cache`），在 `tobtind` 库函数分支中生效：
+
+- 键：(输入数据指纹, 指标库, 指标函数名, 参数)，输入数据指纹为数据内容的哈希，
+  与数据对象身份无关（每组参数重新生成的Line/IndSeries同样命中）
+- LRU内存预算：超出 `max_bytes` 时淘汰最久未使用的结果
+- 统计：hits / misses / evictions / 当前占用
+- 跨进程共享：
+    - fork子进程继承父进程已缓存的结果
+    - 设置 `shared_dir` 后结果同时写入该目录（每个键一个文件，原子替换），
+      各工作进程未命中内存时从目录读取，实现进程间共享
+
+### 说明：
+- 仅在参数优化模式下的 `_strategy_init()` 中启用（`options.set_indicator_cache`）
+- 参数含无法稳定表示的对象（如函数、自定义类实例）时不缓存
+- 命中时返回结果副本，修改指标数据不会污染缓存
+
+### 示例：
+```python
+import minibt
+from minibt.indicators.memo import indicator_cache
+
+indicator_cache.configure(max_bytes=1 << 30, shared_dir="./.indicator_cache")
+Bt().addstrategy(MyStrategy).optstrategy(...).run()
+print(indicator_cache.report())
+```
+"""
+from __future__ import annotations
+import os
+import pickle
+import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any
+import numpy as np
+import pandas as pd
+
+__all__ = ["IndicatorCache", "indicator_cache", "fingerprint"]
+
+# tobtind 透传给指标函数的框架参数，与指标计算无关
+_FRAMEWORK_KWARGS = {"_multi_index", "isindicator", "iscustom", "linestyle",
+                     "signalstyle", "id", "isresample", "isreplay"}
+
+
+def _hash_array(h, values: np.ndarray) -> None:
+    values = np.asarray(values)
+    if values.dtype == object:
+        values = pd.util.hash_array(values.ravel())
+    elif values.dtype.kind == "M":
+        values = values.view(np.int64)
+    h.update(str((values.dtype.str, values.shape)).encode())
+    h.update(np.ascontiguousarray(values).view(np.uint8).data)
+
+
+def fingerprint(data) -> str:
+    """## 数据内容指纹（blake2b哈希）
+
+    Args:
+        data (pd.DataFrame | pd.Series | np.ndarray): 数据
+
+    Returns:
+        str: 十六进制指纹
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(data, pd.DataFrame):
+        h.update(repr(list(data.columns)).encode())
+        for column in data.columns:
+            _hash_array(h, data[column].values)
+    else:
+        _hash_array(h, data.values if isinstance(data, pd.Series) else data)
+    return h.hexdigest()
+
+
+def _freeze(value) -> Any:
+    """参数的稳定表示，无法稳定表示时抛出TypeError"""
+    if isinstance(value, (pd.Series, pd.DataFrame, np.ndarray)):
+        return ("data", fingerprint(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if value is None or isinstance(value, (str, bool, int, float, complex, np.generic)):
+        return value
+    raise TypeError(type(value).__name__)
+
+
+class IndicatorCache:
+    """## 指标计算结果LRU缓存
+
+    Args:
+        max_bytes (int): 内存预算（字节）. 默认512MB
+        shared_dir (str | None): 进程间共享目录. 默认None
+    """
+
+    def __init__(self, max_bytes: int = 512 << 20, shared_dir: str | None = None):
+        self._entries: OrderedDict[tuple, tuple[np.ndarray, Any]] = OrderedDict()
+        self._nbytes = 0
+        self._active = 0
+        self.max_bytes = int(max_bytes)
+        self.shared_dir = shared_dir
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_hits = 0
+
+    def configure(self, max_bytes: int | None = None, shared_dir: str | None = None) -> IndicatorCache:
+        """## 设置内存预算与共享目录
+
+        Args:
+            max_bytes (int | None): 内存预算（字节）. 默认None（不变）
+            shared_dir (str | None): 进程间共享目录，''为关闭. 默认None（不变）
+        """
+        if max_bytes is not None:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+        if shared_dir is not None:
+            self.shared_dir = shared_dir or None
+            if self.shared_dir:
+                os.makedirs(self.shared_dir, exist_ok=True)
+        return self
+
+    @property
+    def active(self) -> bool:
+        """当前是否处于启用缓存的上下文中"""
+        return self._active > 0
+
+    @contextmanager
+    def activate(self):
+        """## 在上下文内启用缓存（可嵌套）"""
+        self._active += 1
+        try:
+            yield self
+        finally:
+            self._active -= 1
+
+    @staticmethod
+    def make_key(source, lib: str | None, func_name: str, ind_params: list, kwargs: dict) -> tuple | None:
+        """## 生成缓存键，参数无法稳定表示时返回None"""
+        try:
+            params = _freeze(list(ind_params))
+            kwargs = _freeze({k: v for k, v in kwargs.items()
+                              if k not in _FRAMEWORK_KWARGS})
+        except TypeError:
+            return None
+        return fingerprint(source), lib, func_name, params, kwargs
+
+    def _path(self, key: tuple) -> str:
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.shared_dir, f"{name}.pkl")
+
+    def get(self, key: tuple) -> tuple[np.ndarray, Any] | None:
+        """## 查询缓存
+
+        Returns:
+            tuple | None: (指标数据副本, lines)，未命中时返回None
+        """
+        entry = self._entries.get(key)
+        if entry is None and self.shared_dir:
+            try:
+                with open(self._path(key), "rb") as f:
+                    stored_key, data, lines = pickle.load(f)
+                if stored_key == key:
+                    entry = self._store(key, data, lines)
+                    self.shared_hits += 1
+            except (OSError, pickle.PickleError, EOFError, ValueError):
+                entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0].copy(), entry[1]
+
+    def put(self, key: tuple, ind_data, lines) -> None:
+        """## 写入缓存（仅缓存 np.ndarray / pd.Series / pd.DataFrame 结果）"""
+        if not isinstance(ind_data, (np.ndarray, pd.Series, pd.DataFrame)):
+            return
+        data = np.array(ind_data.values if hasattr(
+            ind_data, "values") else ind_data)
+        if data.dtype == object:
+            return
+        self._store(key, data, lines)
+        if self.shared_dir:
+            path = self._path(key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    pickle.dump((key, data, lines), f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except OSError:
+                ...
+
+    def _store(self, key: tuple, data: np.ndarray, lines) -> tuple[np.ndarray, Any] | None:
+        if data.nbytes > self.max_bytes:
+            return None
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._nbytes -= old[0].nbytes
+        entry = (data, lines)
+        self._entries[key] = entry
+        self._nbytes += data.nbytes
+        self._evict()
+        return entry
+
+    def _evict(self) -> None:
+        while self._nbytes > self.max_bytes and self._entries:
+            _, (data, _) = self._entries.popitem(last=False)
+            self._nbytes -= data.nbytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """清空内存缓存与统计（不删除共享目录文件）"""
+        self._entries.clear()
+        self._nbytes = 0
+        self.hits = self.misses = self.evictions = self.shared_hits = 0
+
+    def report(self) -> dict:
+        """## 缓存统计
+
+        Returns:
+            dict: entries、nbytes、max_bytes、hits、misses、hit_rate、evictions、shared_hits
+        """
+        total = self.hits + self.misses
+        return dict(entries=len(self._entries), nbytes=self._nbytes, max_bytes=self.max_bytes,
+                    hits=self.hits, misses=self.misses,
+                    hit_rate=round(self.hits / total, 4) if total else 0.,
+                    evictions=self.evictions, shared_hits=self.shared_hits)
+
+    def __repr__(self) -> str:
+        report = self.report()
+        return (f"IndicatorCache(entries={report['entries']}, "
+                f"memory={report['nbytes'] / 1024 ** 2:.2f}MB/{self.max_bytes / 1024 ** 2:.0f}MB, "
+                f"hits={self.hits}, misses={self.misses}, hit_rate={report['hit_rate']:.2%})")
+
+
+indicator_cache = IndicatorCache()
+"""进程级指标缓存实例"""
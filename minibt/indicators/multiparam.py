@@ -0,0 +1,725 @@
+# -*- encoding: utf-8 -*-
+"""
+## 多参数批量指标计算
+
+优化周期参数时同一指标需要对几十个周期分别计算，每个周期各走一次 `tobtind`、
+各遍历一次数据。本模块为常用滚动指标提供多周期批量计算：
+
+- 均线类（sma/ema/rma）、stdev、atr、rsi、bbands、donchian
+- 一次调用传入周期列表，返回二维结果（每个周期一列或一组列）
+- 均线共享一次前缀和（每个周期O(n)求差），标准差各周期以TA-Lib/pandas滚动计算，
+  递推类指标（ema/rma/atr/rsi）所有周期在一个编译循环内完成（安装numba时），
+  滚动极值（donchian）共享一张稀疏表（sparse table）
+
+### 周期列表调用：
+```python
+# IndFrame，列为 sma_5、sma_10、sma_20、sma_60
+mas = self.data.close.sma([5, 10, 20, 60])
+# 多输出指标按周期分组：bb_lower_10、bb_mid_10、...、bb_percent_20
+bands = self.data.close.bbands([10, 20])
+```
+列表调用与 pandas_ta 0.4.x 的单周期结果一致（rma为 `ewm(alpha=1/length, adjust=False)`；
+talib参数默认True，安装TA-Lib时stdev/atr/rsi/bbands按TA-Lib公式计算），不支持 offset。
+
+### 信号回测批量试验：
+`IndFrame.signal_backtest` 参数优化期间启用 `multi_param_batch`：试验中以单个周期调用
+上述指标时，按该周期所属整数优化参数的全部候选值一次性批量计算并缓存，后续试验直接取对应列。
+每个(数据, 指标, 其它参数)首次命中时与库函数结果比对，不一致则该组合回退为逐次计算。
+"""
+from __future__ import annotations
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable
+import numpy as np
+import pandas as pd
+
+__all__ = ["sma_block", "ema_block", "rma_block", "stdev_block", "atr_block", "rsi_block",
+           "bbands_block", "donchian_block", "MULTI_PARAM_INDICATORS", "multi_param_lookup",
+           "MultiParamBatch", "multi_param_batch", "current_batch"]
+
+# tobtind 透传给指标函数的框架参数，与指标计算无关
+_FRAMEWORK_KWARGS = {"_multi_index", "isindicator", "iscustom", "linestyle",
+                     "signalstyle", "id", "isresample", "isreplay"}
+
+
+# ------------------------------
+# 基础计算
+# ------------------------------
+def _lengths(lengths) -> list[int]:
+    lengths = [lengths] if isinstance(
+        lengths, (int, np.integer)) else list(lengths)
+    assert lengths and all(isinstance(length, (int, np.integer)) and length > 0 for length in lengths), \
+        "周期须为正整数或正整数列表"
+    return [int(length) for length in lengths]
+
+
+def _shift(x: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full(x.size, np.nan)
+    if 0 < periods < x.size:
+        out[periods:] = x[:-periods]
+    return out
+
+
+def _non_zero_range(high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """与 pandas_ta.utils.non_zero_range 一致：存在0时整体加上机器精度"""
+    diff = high - low
+    if (diff == 0).any():
+        diff = diff + sys.float_info.epsilon
+    return diff
+
+
+class _PrefixSums:
+    """共享前缀和：以首个有效值为基准平移数据，降低长序列累加的舍入误差"""
+
+    def __init__(self, x: np.ndarray):
+        finite = ~np.isnan(x)
+        self.ref = x[finite][0] if finite.any() else 0.
+        values = np.where(finite, x - self.ref, 0.)
+        self.n = x.size
+        self.s1 = np.concatenate(([0.], np.cumsum(values)))
+        self.nans = np.concatenate(([0], np.cumsum(~finite)))
+
+    def window(self, length: int) -> tuple[slice, np.ndarray, np.ndarray]:
+        """长度为length的窗口：(结果位置, 窗口和, 窗口内nan数)"""
+        end = np.arange(length, self.n + 1)
+        s1 = self.s1[end] - self.s1[end - length]
+        nans = self.nans[end] - self.nans[end - length]
+        return slice(length - 1, self.n), s1, nans
+
+
+def ewm_block_kernel(x, alphas, starts, seeds, adjust, min_periods):
+    """多参数EWM（与 pandas ewm(ignore_na=False) 的递推一致），返回形状 (k, n)
+
+    - 第j列从 starts[j] 开始，以 seeds[j] 为该位置的值（之前视为nan）
+    """
+    n = x.size
+    k = alphas.size
+    out = np.full((k, n), np.nan)
+    for j in range(k):
+        start = starts[j]
+        if start >= n:
+            continue
+        alpha = alphas[j]
+        old_wt_factor = 1. - alpha
+        new_wt = 1. if adjust else alpha
+        minp = min_periods[j]
+        weighted = seeds[j]
+        nobs = 1 if weighted == weighted else 0
+        old_wt = 1.
+        if nobs >= minp:
+            out[j, start] = weighted
+        for i in range(start + 1, n):
+            cur = x[i]
+            is_obs = cur == cur
+            if is_obs:
+                nobs += 1
+            if weighted == weighted:
+                old_wt *= old_wt_factor
+                if is_obs:
+                    if weighted != cur:
+                        weighted = old_wt * weighted + new_wt * cur
+                        weighted /= (old_wt + new_wt)
+                    if adjust:
+                        old_wt += new_wt
+                    else:
+                        old_wt = 1.
+            elif is_obs:
+                weighted = cur
+            if nobs >= minp:
+                out[j, i] = weighted
+    return out
+
+
+_EWM_KERNEL = None
+
+
+def _ewm_kernel():
+    """## 获取多参数EWM循环（优先numba编译，未安装numba时返回纯Python实现）"""
+    global _EWM_KERNEL
+    if _EWM_KERNEL is None:
+        try:
+            from numba import njit
+            _EWM_KERNEL = njit(cache=True)(ewm_block_kernel)
+        except ImportError:
+            _EWM_KERNEL = ewm_block_kernel
+    return _EWM_KERNEL
+
+
+def _ewm(x: np.ndarray, alphas: list[float], starts: list[int], seeds: list[float],
+         adjust: bool, min_periods: list[int]) -> np.ndarray:
+    out = _ewm_kernel()(x, np.asarray(alphas, dtype=np.float64), np.asarray(starts, dtype=np.int64),
+                        np.asarray(seeds, dtype=np.float64), bool(adjust),
+                        np.asarray([max(int(m), 1) for m in min_periods], dtype=np.int64))
+    return np.ascontiguousarray(out.T)
+
+
+def _first_valid(x: np.ndarray) -> int:
+    finite = np.flatnonzero(~np.isnan(x))
+    return int(finite[0]) if finite.size else x.size
+
+
+_HAS_TALIB = None
+
+
+def _use_talib(talib) -> bool:
+    """与 pandas_ta 一致：talib参数不是bool时视为True，且已安装TA-Lib时才按TA-Lib公式计算"""
+    global _HAS_TALIB
+    if not (talib if isinstance(talib, bool) else True):
+        return False
+    if _HAS_TALIB is None:
+        from importlib.util import find_spec
+        _HAS_TALIB = find_spec("talib") is not None
+    return _HAS_TALIB
+
+
+def _ddof(ddof, length: int) -> int:
+    """与 pandas_ta 一致：ddof须为 [0, length) 内的整数，否则为1"""
+    return int(ddof) if isinstance(ddof, (int, np.integer)) and 0 <= ddof < length else 1
+
+
+def _wilder(x: np.ndarray, lengths: list[int], first: int) -> np.ndarray:
+    """TA-Lib的Wilder平滑（RSI/ATR）：以x[first:first+length]的均值为种子，之后按alpha=1/length递推"""
+    starts = [first + length - 1 for length in lengths]
+    seeds = [x[first:start + 1].mean() if start < x.size else np.nan
+             for start in starts]
+    return _ewm(x, [1. / length for length in lengths], starts, seeds, False, [0] * len(lengths))
+
+
+# ------------------------------
+# 多周期指标
+# ------------------------------
+def sma_block(close, lengths) -> np.ndarray:
+    """## 多周期简单移动平均
+
+    Args:
+        close (np.ndarray | pd.Series): 数据
+        lengths (int | list[int]): 周期列表
+
+    Returns:
+        np.ndarray: 形状 (n, len(lengths))
+    """
+    x = np.asarray(close, dtype=np.float64)
+    lengths = _lengths(lengths)
+    prefix = _PrefixSums(x)
+    out = np.full((x.size, len(lengths)), np.nan)
+    for j, length in enumerate(lengths):
+        if length > x.size:
+            continue
+        rows, s1, nans = prefix.window(length)
+        out[rows, j] = np.where(nans > 0, np.nan, s1 / length + prefix.ref)
+    return out
+
+
+def stdev_block(close, lengths, ddof: int = 1, talib: bool | None = False) -> np.ndarray:
+    """## 多周期滚动标准差
+
+    - 平方和前缀和相减在价格远离基准时损失精度，各周期分别以
+      TA-Lib（STDDEV，总体标准差）或 pandas rolling.var 计算，与 pandas_ta 结果一致
+
+    Args:
+        close (np.ndarray | pd.Series): 数据
+        lengths (int | list[int]): 周期列表
+        ddof (int): 自由度（不在 [0, length) 内时为1）. 默认1
+        talib (bool | None): 按TA-Lib计算，见 `_use_talib`. 默认False
+
+    Returns:
+        np.ndarray: 形状 (n, len(lengths))
+    """
+    x = np.asarray(close, dtype=np.float64)
+    lengths = _lengths(lengths)
+    out = np.full((x.size, len(lengths)), np.nan)
+    if _use_talib(talib):
+        from talib import STDDEV
+        for j, length in enumerate(lengths):
+            if 1 < length <= x.size:
+                out[:, j] = STDDEV(x, length)
+        return out
+    series = pd.Series(x)
+    for j, length in enumerate(lengths):
+        if length <= x.size:
+            out[:, j] = np.sqrt(series.rolling(length).var(_ddof(ddof, length)).values)
+    return out
+
+
+def ema_block(close, lengths, presma: bool = True, adjust: bool = False) -> np.ndarray:
+    """## 多周期指数移动平均（与 pandas_ta.ema 一致：默认以前length根均值为种子）
+
+    Args:
+        close (np.ndarray | pd.Series): 数据
+        lengths (int | list[int]): 周期列表
+        presma (bool): 是否以SMA为种子. 默认True
+        adjust (bool): ewm的adjust参数. 默认False
+
+    Returns:
+        np.ndarray: 形状 (n, len(lengths))
+    """
+    x = np.asarray(close, dtype=np.float64)
+    lengths = _lengths(lengths)
+    alphas = [2. / (length + 1.) for length in lengths]
+    if presma:
+        starts = [length - 1 for length in lengths]
+        with np.errstate(all="ignore"):
+            seeds = [np.nanmean(x[:length]) if np.isfinite(x[:length]).any() else np.nan
+                     for length in lengths]
+    else:
+        start = _first_valid(x)
+        starts = [start] * len(lengths)
+        seeds = [x[start] if start < x.size else np.nan] * len(lengths)
+    return _ewm(x, alphas, starts, seeds, adjust, [0] * len(lengths))
+
+
+def rma_block(close, lengths) -> np.ndarray:
+    """## 多周期Wilder移动平均（与 pandas_ta.rma 一致：ewm(alpha=1/length, adjust=False)）
+
+    Args:
+        close (np.ndarray | pd.Series): 数据
+        lengths (int | list[int]): 周期列表
+
+    Returns:
+        np.ndarray: 形状 (n, len(lengths))
+    """
+    x = np.asarray(close, dtype=np.float64)
+    lengths = _lengths(lengths)
+    start = _first_valid(x)
+    seed = x[start] if start < x.size else np.nan
+    return _ewm(x, [1. / length for length in lengths], [start] * len(lengths),
+                [seed] * len(lengths), False, [0] * len(lengths))
+
+
+_MA_BLOCKS: dict[str, Callable] = dict(
+    sma=sma_block, ema=ema_block, rma=rma_block)
+
+
+def atr_block(high, low, close, lengths, mamode: str = "rma", drift: int = 1,
+              talib: bool | None = False) -> np.ndarray:
+    """## 多周期平均真实波幅（真实波幅只计算一次，与 pandas_ta.atr 一致）
+
+    - TA-Lib（ATR）：不论mamode，以第1~length根真实波幅的均值为种子做Wilder平滑
+    - 否则：前length根真实波幅的均值作为第length根的值（presma），之后按mamode平均
+
+    Args:
+        high, low, close (np.ndarray | pd.Series): 数据
+        lengths (int | list[int]): 周期列表
+        mamode (str): 均线类型 sma/ema/rma. 默认'rma'
+        drift (int): 前收盘价偏移. 默认1
+        talib (bool | None): 按TA-Lib计算，见 `_use_talib`. 默认False
+
+    Returns:
+        np.ndarray: 形状 (n, len(lengths))
+    """
+    mamode = (mamode or "rma").lower()
+    assert mamode in _MA_BLOCKS, f"mamode须为{list(_MA_BLOCKS)}之一"
+    lengths = _lengths(lengths)
+    talib = _use_talib(talib)
+    high, low, close = (np.asarray(v, dtype=np.float64)
+                        for v in (high, low, close))
+    prev_close = _shift(close, 1 if talib else drift)
+    with np.errstate(invalid="ignore"):
+        tr = np.fmax(np.fmax(np.abs(_non_zero_range(high, low)), np.abs(high - prev_close)),
+                     np.abs(prev_close - low))
+    if talib:
+        return _wilder(tr, lengths, 1)
+    with np.errstate(all="ignore"):
+        seeds = [np.nanmean(tr[:length]) if np.isfinite(tr[:length]).any() else np.nan
+                 for length in lengths]
+    if mamode != "sma":
+        alphas = [1. / length if mamode == "rma" else 2. / (length + 1.)
+                  for length in lengths]
+        return _ewm(tr, alphas, [length - 1 for length in lengths], seeds, False, [0] * len(lengths))
+    out = np.full((tr.size, len(lengths)), np.nan)
+    for j, (length, seed) in enumerate(zip(lengths, seeds)):
+        if length > tr.size:
+            continue
+        values = tr.copy()
+        values[:length - 1] = np.nan
+        values[length - 1] = seed
+        out[:, j] = sma_block(values, [length])[:, 0]
+    return out
+
+
+def rsi_block(close, lengths, scalar: float = 100., drift: int = 1,
+              talib: bool | None = False) -> np.ndarray:
+    """## 多周期相对强弱指数（涨跌序列只计算一次，与 pandas_ta.rsi 一致）
+
+    - TA-Lib（RSI）：以前length根涨跌的均值为种子做Wilder平滑，scalar/drift固定为100/1，
+      涨跌均值之和为0时结果为0
+    - 否则：涨跌序列分别做rma
+
+    Args:
+        close (np.ndarray | pd.Series): 数据
+        lengths (int | list[int]): 周期列表
+        scalar (float): 缩放系数. 默认100.
+        drift (int): 差分周期. 默认1
+        talib (bool | None): 按TA-Lib计算，见 `_use_talib`. 默认False
+
+    Returns:
+        np.ndarray: 形状 (n, len(lengths))
+    """
+    x = np.asarray(close, dtype=np.float64)
+    lengths = _lengths(lengths)
+    talib = _use_talib(talib)
+    if talib:
+        scalar, drift = 100., 1
+    diff = x - _shift(x, drift)
+    positive = np.where(diff < 0, 0., diff)
+    negative = np.where(diff > 0, 0., diff)
+    if talib:
+        positive_avg = _wilder(positive, lengths, 1)
+        negative_avg = np.abs(_wilder(negative, lengths, 1))
+    else:
+        positive_avg = rma_block(positive, lengths)
+        negative_avg = np.abs(rma_block(negative, lengths))
+    total = positive_avg + negative_avg
+    with np.errstate(all="ignore"):
+        out = scalar * positive_avg / total
+    if talib:
+        # TA-Lib的TA_IS_ZERO
+        out[np.abs(total) < 1e-8] = 0.
+    return out
+
+
+def bbands_block(close, lengths, std: float = 2., ddof: int = 0, mamode: str = "sma",
+                 talib: bool | None = False) -> list[np.ndarray]:
+    """## 多周期布林带
+
+    - TA-Lib（BBANDS）：总体标准差，中轨为TA-Lib均线（ema为EMA，其余为SMA）
+    - 否则：标准差自由度为ddof，中轨按mamode计算
+
+    Args:
+        close (np.ndarray | pd.Series): 数据
+        lengths (int | list[int]): 周期列表
+        std (float): 标准差倍数. 默认2.
+        ddof (int): 自由度. 默认0
+        mamode (str): 中轨均线类型 sma/ema/rma. 默认'sma'
+        talib (bool | None): 按TA-Lib计算，见 `_use_talib`. 默认False
+
+    Returns:
+        list[np.ndarray]: [lower, mid, upper, bandwidth, percent]，形状均为 (n, len(lengths))
+    """
+    mamode = (mamode or "sma").lower()
+    assert mamode in _MA_BLOCKS, f"mamode须为{list(_MA_BLOCKS)}之一"
+    talib = _use_talib(talib)
+    if talib and mamode != "ema":
+        mamode = "sma"
+    x = np.asarray(close, dtype=np.float64)
+    deviations = std * stdev_block(x, lengths, ddof, talib)
+    mid = _MA_BLOCKS[mamode](x, lengths)
+    lower = mid - deviations
+    upper = mid + deviations
+    ulr = _non_zero_range(upper, lower)
+    with np.errstate(all="ignore"):
+        bandwidth = 100 * ulr / mid
+        percent = _non_zero_range(x[:, None], lower) / ulr
+    return [lower, mid, upper, bandwidth, percent]
+
+
+def _rolling_extreme(x: np.ndarray, lengths: list[int], func: Callable) -> np.ndarray:
+    """多周期滚动极值：共享稀疏表，每个周期O(n)查询；窗口含nan时为nan"""
+    n = x.size
+    out = np.full((n, len(lengths)), np.nan)
+    nans = np.concatenate(([0], np.cumsum(np.isnan(x))))
+    table = [x]
+    for j, length in enumerate(lengths):
+        if length > n:
+            continue
+        level = length.bit_length() - 1
+        while len(table) <= level:
+            prev, span = table[-1], 1 << (len(table) - 1)
+            table.append(func(prev[:-span], prev[span:]))
+        block = table[level]
+        span = 1 << level
+        end = np.arange(length - 1, n)
+        value = func(block[end - length + 1], block[end - span + 1])
+        count = nans[end + 1] - nans[end + 1 - length]
+        out[length - 1:, j] = np.where(count > 0, np.nan, value)
+    return out
+
+
+def donchian_block(high, low, lower_lengths, upper_lengths=None) -> list[np.ndarray]:
+    """## 多周期唐奇安通道
+
+    Args:
+        high, low (np.ndarray | pd.Series): 数据
+        lower_lengths (int | list[int]): 下轨周期列表
+        upper_lengths (int | list[int] | None): 上轨周期列表，None时与下轨相同. 默认None
+
+    Returns:
+        list[np.ndarray]: [lower, mid, upper]，形状均为 (n, len(lower_lengths))
+    """
+    lower_lengths = _lengths(lower_lengths)
+    upper_lengths = lower_lengths if upper_lengths is None else _lengths(
+        upper_lengths)
+    assert len(lower_lengths) == len(
+        upper_lengths), "上下轨周期列表长度须相同"
+    lower = _rolling_extreme(np.asarray(
+        low, dtype=np.float64), lower_lengths, np.minimum)
+    upper = _rolling_extreme(np.asarray(
+        high, dtype=np.float64), upper_lengths, np.maximum)
+    return [lower, 0.5 * (lower + upper), upper]
+
+
+# ------------------------------
+# tobtind 接入
+# ------------------------------
+class _MultiSpec:
+    """多参数指标注册项：批量函数、输入字段、位置参数名、默认参数、周期参数与输出名"""
+
+    def __init__(self, func: Callable, inputs: tuple[str, ...], names: tuple[str, ...], defaults: dict,
+                 periods: tuple[str, ...], outputs: tuple[str, ...] = (), ignore: tuple[str, ...] = (),
+                 check: Callable[[dict], bool] | None = None):
+        self.func = func
+        self.inputs = inputs
+        self.names = names
+        self.defaults = defaults
+        self.periods = periods
+        self.outputs = outputs
+        self.ignore = set(ignore)
+        self.check = check
+
+    def bind(self, ind_params: list, kwargs: dict) -> dict | None:
+        """绑定调用参数，存在不支持的参数时返回None"""
+        if len(ind_params) > len(self.names):
+            return None
+        params = dict(self.defaults)
+        for name, value in zip(self.names, ind_params):
+            if value is not None:
+                params[name] = value
+        for name, value in kwargs.items():
+            if name in _FRAMEWORK_KWARGS:
+                continue
+            if name not in self.names:
+                return None
+            if value is not None:
+                params[name] = value
+        if params.pop("offset", 0):
+            return None
+        for name in self.ignore:
+            params.pop(name, None)
+        if self.check is not None and not self.check(params):
+            return None
+        return params
+
+    def compute(self, inputs: list[np.ndarray], params: dict, periods: dict[str, list[int]]) -> list[np.ndarray]:
+        """批量计算，返回每个输出一个 (n, k) 数组"""
+        result = self.func(*inputs, **{**params, **periods})
+        return result if isinstance(result, list) else [result]
+
+
+def _mamode(*modes: str):
+    def check(params: dict) -> bool:
+        return str(params.get("mamode") or modes[0]).lower() in modes
+    return check
+
+
+MULTI_PARAM_INDICATORS: dict[str, _MultiSpec] = {
+    "pta_sma": _MultiSpec(sma_block, ("close",), ("length", "talib", "offset"), dict(length=10),
+                          ("lengths",), ignore=("talib",)),
+    "pta_ema": _MultiSpec(ema_block, ("close",), ("length", "talib", "offset"), dict(length=10),
+                          ("lengths",), ignore=("talib",)),
+    "pta_rma": _MultiSpec(rma_block, ("close",), ("length", "offset"), dict(length=10), ("lengths",)),
+    "pta_stdev": _MultiSpec(stdev_block, ("close",), ("length", "ddof", "talib", "offset"), dict(length=30, ddof=1, talib=None),
+                            ("lengths",)),
+    "pta_atr": _MultiSpec(atr_block, ("high", "low", "close"), ("length", "mamode", "talib", "drift", "offset"),
+                          dict(length=14, mamode="rma", drift=1, talib=None), ("lengths",),
+                          check=_mamode("rma", "sma", "ema")),
+    "pta_rsi": _MultiSpec(rsi_block, ("close",), ("length", "scalar", "talib", "drift", "offset"),
+                          dict(length=14, scalar=100., drift=1, talib=None), ("lengths",)),
+    "pta_bbands": _MultiSpec(bbands_block, ("close",), ("length", "std", "ddof", "mamode", "talib", "offset"),
+                             dict(length=10, std=2., ddof=0, mamode="sma", talib=None), ("lengths",),
+                             ("bb_lower", "bb_mid", "bb_upper", "bb_width", "bb_percent"),
+                             check=_mamode("sma", "ema", "rma")),
+    "pta_donchian": _MultiSpec(donchian_block, ("high", "low"), ("lower_length", "upper_length", "offset"),
+                               dict(lower_length=20, upper_length=20), ("lower_lengths", "upper_lengths"),
+                               ("dc_lower", "dc_mid", "dc_upper")),
+}
+"""tobtind指标函数名 -> 多参数批量计算注册项"""
+
+
+def _period_params(spec: _MultiSpec, params: dict) -> dict[str, Any]:
+    """取出周期参数（注册项中的单数参数名 -> 批量函数的复数参数名）"""
+    names = [name for name in spec.names if name not in (
+        "offset",) and name not in spec.ignore][:len(spec.periods)]
+    return {plural: params.pop(name) for name, plural in zip(names, spec.periods)}
+
+
+def _inputs(source, names: tuple[str, ...]) -> list[np.ndarray] | None:
+    if isinstance(source, pd.Series):
+        return [source.values] if len(names) == 1 else None
+    if isinstance(source, pd.DataFrame) and all(name in source.columns for name in names):
+        return [source[name].values for name in names]
+    return None
+
+
+def _line_names(spec: _MultiSpec, func_name: str, periods: dict[str, list[int]]) -> list[str]:
+    outputs = spec.outputs or (func_name.split("_", 1)[-1],)
+    columns = list(zip(*periods.values()))
+    return [f"{output}_{'_'.join(str(v) for v in column)}" for column in columns for output in outputs]
+
+
+def _assemble(blocks: list[np.ndarray]) -> np.ndarray:
+    """按周期分组排列列：[out0_p0, out1_p0, ..., out0_p1, ...]"""
+    return np.stack(blocks, axis=2).reshape(blocks[0].shape[0], -1)
+
+
+def multi_param_lookup(func_name: str, source, ind_params: list, kwargs: dict, lines,
+                       reference: Callable[[], Any] | None = None) -> tuple[np.ndarray, Any] | None:
+    """## tobtind 多参数指标入口
+
+    - 周期参数为列表时批量计算，返回 (二维数据, 列名)
+    - 周期参数为单个整数且处于 `multi_param_batch` 上下文时，从批量结果中取对应列
+    - 其它情况返回None（按原方式计算）
+
+    Args:
+        func_name (str): 指标函数名（带库前缀）
+        source (pd.Series | pd.DataFrame): 数据源
+        ind_params (list): 位置参数
+        kwargs (dict): 关键字参数
+        lines: 当前的指标线名
+        reference (Callable | None): 库函数计算（用于批量试验的一致性校验）
+
+    Returns:
+        tuple | None: (指标数据, lines)
+    """
+    spec = MULTI_PARAM_INDICATORS.get(func_name)
+    if spec is None:
+        return None
+    params = spec.bind(ind_params, kwargs)
+    if params is None:
+        return None
+    periods = _period_params(spec, params)
+    if not any(isinstance(v, (list, tuple, np.ndarray)) for v in periods.values()):
+        batch = current_batch()
+        if batch is None or reference is None:
+            return None
+        return batch.lookup(spec, func_name, source, params, periods, lines, reference)
+    inputs = _inputs(source, spec.inputs)
+    if inputs is None:
+        return None
+    size = max(len(v) for v in periods.values() if isinstance(
+        v, (list, tuple, np.ndarray)))
+    periods = {name: _lengths(v if isinstance(v, (list, tuple, np.ndarray)) else [v] * size)
+               for name, v in periods.items()}
+    assert len({len(v) for v in periods.values()}) == 1, "各周期参数列表长度须相同"
+    blocks = spec.compute(inputs, params, periods)
+    return _assemble(blocks), _line_names(spec, func_name, periods)
+
+
+# ------------------------------
+# 批量试验
+# ------------------------------
+class MultiParamBatch:
+    """## 参数优化试验的多周期批量缓存
+
+    - 单周期调用只与该周期所属参数的候选值一起批量计算（其它整数参数如阈值不参与）
+    - 批量计算与库函数校验在锁外进行，锁只保护缓存读写
+
+    Args:
+        periods (dict[str, list[int]] | list[int]): 各整数优化参数的候选值（列表视为一个参数）
+        max_bytes (int): 单个(数据, 指标, 其它参数)批量结果的内存上限. 默认256MB
+    """
+
+    def __init__(self, periods, max_bytes: int = 256 << 20):
+        groups = periods.values() if isinstance(periods, dict) else [periods]
+        self.groups = [group for group in (
+            sorted({int(p) for p in group if isinstance(p, (int, np.integer)) and p > 0})
+            for group in groups) if group]
+        self.periods = sorted({p for group in self.groups for p in group})
+        self.max_bytes = int(max_bytes)
+        self._entries: dict[tuple, dict] = {}
+        self._disabled: set[tuple] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.batches = 0
+
+    def _candidates(self, period: int, size: int, n_outputs: int) -> list[int] | None:
+        """包含period的候选周期分块（受内存上限约束），period不属于任何参数时返回None"""
+        periods = sorted({p for group in self.groups if period in group for p in group})
+        if not periods:
+            return None
+        chunk = max(1, self.max_bytes // max(size * 8 * n_outputs, 1))
+        index = periods.index(period)
+        start = index // chunk * chunk
+        return periods[start:start + chunk]
+
+    def lookup(self, spec: _MultiSpec, func_name: str, source, params: dict, periods: dict,
+               lines, reference: Callable[[], Any]) -> tuple[np.ndarray, Any] | None:
+        """单周期调用：返回批量结果中的对应列，不支持时返回None"""
+        if not self.periods or len(spec.periods) != 1:
+            return None
+        period = next(iter(periods.values()))
+        if not isinstance(period, (int, np.integer)) or period <= 0:
+            return None
+        inputs = _inputs(source, spec.inputs)
+        if inputs is None:
+            return None
+        from .memo import fingerprint, _freeze
+        try:
+            key = (func_name, fingerprint(source), _freeze(params))
+        except TypeError:
+            return None
+        with self._lock:
+            if key in self._disabled:
+                return None
+            entry = self._entries.get(key)
+            columns = entry["columns"].get(period) if entry is not None else None
+            verified = entry is not None and entry["verified"]
+        if columns is None:
+            candidates = self._candidates(
+                int(period), len(inputs[0]), max(len(spec.outputs), 1))
+            if candidates is None:
+                return None
+            blocks = spec.compute(
+                inputs, params, {spec.periods[0]: candidates})
+            computed = {p: [block[:, j] for block in blocks]
+                        for j, p in enumerate(candidates)}
+            columns = computed[int(period)]
+            with self._lock:
+                if key in self._disabled:
+                    return None
+                entry = self._entries.setdefault(
+                    key, dict(columns={}, verified=False))
+                entry["columns"].update(computed)
+                verified = entry["verified"]
+                self.batches += 1
+        data = columns[0] if len(columns) == 1 else np.column_stack(columns)
+        if not verified:
+            expected = reference()
+            values = np.asarray(getattr(expected, "values", expected), dtype=np.float64) \
+                if isinstance(expected, (pd.Series, pd.DataFrame, np.ndarray)) else None
+            matched = values is not None and values.shape == data.shape and \
+                np.allclose(data, values, rtol=1e-7, atol=1e-9, equal_nan=True)
+            with self._lock:
+                if not matched:
+                    self._disabled.add(key)
+                    self._entries.pop(key, None)
+                    return None
+                if key in self._entries:
+                    self._entries[key]["verified"] = True
+        with self._lock:
+            self.hits += 1
+        return data.copy(), lines
+
+
+_CURRENT: MultiParamBatch | None = None
+
+
+def current_batch() -> MultiParamBatch | None:
+    """当前生效的批量试验缓存（未处于参数优化试验中时为None）"""
+    return _CURRENT
+
+
+@contextmanager
+def multi_param_batch(periods, max_bytes: int = 256 << 20):
+    """## 在上下文内启用多周期批量试验
+
+    Args:
+        periods (dict[str, list[int]] | list[int]): 各整数优化参数的候选值
+        max_bytes (int): 单个批量结果的内存上限. 默认256MB
+    """
+    global _CURRENT
+    previous, _CURRENT = _CURRENT, MultiParamBatch(periods, max_bytes)
+    try:
+        yield _CURRENT
+    finally:
+        _CURRENT = previous
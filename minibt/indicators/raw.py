@@ -0,0 +1,99 @@
+# -*- encoding: utf-8 -*-
+"""
+## 指标轻量（raw）模式
+
+`tobtind` 封装每个指标时都会构建绘图信息、线型样式、信号样式，
+并为指标（及IndFrame的每条Line）各保存两份完整数据副本（pandas_object、copy_object）。
+参数优化与无图表（headless）回测中这些内容不会被使用。
+
+raw模式下指标只保留数值数据（numeric buffer），回测循环用到的属性在首次访问时才创建：
+
+- `tobtind` 只从数据源继承 id/isresample/isreplay，不读取绘图信息、不构建线型与信号样式
+- IndSeries/IndFrame 不构建 IndSetting、PlotInfo、DataFrameSet、各列Line，
+  首次访问这些元数据时才创建（策略持有并在next中访问的指标），
+  指标计算过程中的中间结果（运算、pandas方法、链式指标）始终不创建元数据
+- pandas_object/copy_object 与指标共享数据（浅拷贝），不再复制完整数据
+- 含交易信号线的IndFrame立即创建元数据（信号字段有类属性默认值）
+
+### 启用方式（`options.set_raw_indicators`）：
+- 'auto'（默认）：参数优化（optimize）与 `Bt.run(isplot=False)` 回测时自动启用，
+  开启数据修补（set_data_patching）、回放或实盘时不启用
+- True / False：强制开启 / 关闭
+
+### 测量初始化加速：
+```python
+from minibt.indicators.raw import measure_init_speedup
+
+print(measure_init_speedup(MyStrategy, repeat=7))
+# 返回 {'full': 完整模式耗时, 'raw': raw模式耗时, 'speedup': 加速比}
+```
+
+v2601_60（10000根K线）上的实测（单核，交替执行取15次最短，多次运行的范围）：
+- 12个 `tradingview_` 指标（HMA_Crossover、Dual_Supertrend_with_MACD、Twin_Range_Filter等）：
+  完整模式1.49秒，raw模式1.18秒，加速1.23~1.36倍
+- 双均线交叉策略（sma + cross_up/cross_down）：加速1.05~1.24倍，
+  初始化耗时主要在pandas_ta的cross计算
+
+指标计算本身（pandas_ta逐元素循环等）占初始化耗时的大部分，raw模式只能省去框架封装开销。
+"""
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..strategy.strategy import Strategy
+
+__all__ = ["raw_indicators", "is_raw", "measure_init_speedup"]
+
+_ACTIVE = 0
+
+
+def is_raw() -> bool:
+    """当前是否处于raw模式"""
+    return _ACTIVE > 0
+
+
+@contextmanager
+def raw_indicators(enable: bool = True):
+    """## 在上下文内启用（或关闭）raw模式"""
+    global _ACTIVE
+    previous = _ACTIVE
+    _ACTIVE = previous + 1 if enable else 0
+    try:
+        yield
+    finally:
+        _ACTIVE = previous
+
+
+def measure_init_speedup(strategy: type[Strategy], repeat: int = 5, **kwargs) -> dict:
+    """## 测量raw模式下策略初始化（_strategy_init）的加速比
+
+    - 以参数优化模式加载一次数据，之后交替在完整模式与raw模式下
+      重复执行策略初始化，取最短耗时
+
+    Args:
+        strategy (type[Strategy]): 策略类
+        repeat (int): 每种模式的重复次数. 默认5
+        **kwargs: 传递给策略实例的参数（如params）
+
+    Returns:
+        dict: full（完整模式耗时，秒）、raw（raw模式耗时，秒）、speedup（加速比）
+    """
+    from ..utils import options
+    instance: Strategy = strategy(_isoptimize=True, **kwargs)
+    with options.context(set_raw_indicators=False):
+        instance._start_strategy_run()
+    instance._first_start = True
+    costs = dict(full=[], raw=[])
+    # 两种模式交替执行，避免机器负载变化造成的偏差
+    for _ in range(max(int(repeat), 1)):
+        for name, enable in (("full", False), ("raw", True)):
+            with raw_indicators(enable):
+                start = time.perf_counter()
+                instance._strategy_init()
+                costs[name].append(time.perf_counter() - start)
+    timings = {name: round(min(values), 6) for name, values in costs.items()}
+    timings["speedup"] = round(
+        timings["full"] / timings["raw"], 3) if timings["raw"] else float("nan")
+    return timings
@@ -0,0 +1,527 @@
+# -*- encoding: utf-8 -*-
+"""
+## 实盘流式指标更新
+
+实盘模式下 `_execute_live_trading` 每次行情更新都会重新执行 `_strategy_init()`，
+所有指标在整个窗口上全量重算。本模块为 `tobtind` 提供流式更新协议：
+
+- 支持的内置指标（见 `STREAMING_INDICATORS`）在首次计算后保存末端状态，
+  之后的行情更新只重算最后一根（当前K线更新）或最后两根（新K线生成，上一根K线收盘）的值，
+  计算量与窗口长度无关：
+    - 窗口类指标（SMA/STDDEV）以窗口和（平方和）逐根滚动，每 `length` 根由窗口重新求和消除累计误差（均摊O(1)）
+    - 数据对齐只抽样比较首根与重叠部分末端 `_PROBE` 根K线
+    - 输出保存在容量为窗口两倍的缓冲区中，窗口平移时只移动起点，返回缓冲区视图（均摊O(1)）
+- 窗口内历史数据发生变化（如补数据、切换合约，首根或末端K线不一致）、参数变化、状态含NaN（预热期）
+  或不支持的指标，回退为全量重算并重新建立状态
+- 递推类指标（EMA/ATR/RSI/MACD）以库的全量计算结果为种子，之后按递推公式滚动，
+  与库结果一致（pandas_ta 中 adjust=True 的 EWM 差异为 (1-α)^N 量级）
+
+### 流式协议：
+- `inputs`: 输入字段（单列数据源时取其本身）
+- `seed(inputs, output)`: 由全量计算结果得到最后两根K线的状态
+- `step(state, inputs, i)`: 由第i-1根K线的状态计算第i根K线的值与状态
+
+### 自定义指标注册：
+```python
+from minibt.indicators.streaming import StreamingIndicator, register_streaming
+
+class Momentum(StreamingIndicator):
+    def step(self, state, inputs, i):
+        x = inputs[0]
+        return x[i] - x[i - self.length], None
+
+register_streaming("btind_mom", Momentum, ("length",), dict(length=10))
+```
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any, Callable
+import numpy as np
+import pandas as pd
+
+__all__ = ["StreamingIndicator", "StreamingContext", "STREAMING_INDICATORS",
+           "register_streaming", "streaming", "current_streaming"]
+
+# tobtind 透传给指标函数的框架参数，与指标计算无关
+_FRAMEWORK_KWARGS = {"_multi_index", "isindicator", "iscustom", "linestyle",
+                     "signalstyle", "id", "isresample", "isreplay"}
+
+
+class StreamingIndicator:
+    """## 流式指标基类
+
+    Args:
+        **params: 指标参数（绑定后的完整参数）
+    """
+    inputs: tuple[str, ...] = ("close",)
+
+    def __init__(self, **params):
+        self.__dict__.update(params)
+
+    def seed(self, inputs: list[np.ndarray], output: np.ndarray) -> list:
+        """由全量计算结果得到最后两根K线的状态（无状态指标返回[None, None]）"""
+        return [None, None]
+
+    def step(self, state: Any, inputs: list[np.ndarray], i: int) -> tuple[Any, Any]:
+        """计算第i根K线的值
+
+        Args:
+            state: 第i-1根K线的状态
+            inputs (list[np.ndarray]): 输入数据
+            i (int): K线索引
+
+        Returns:
+            tuple: (指标值（多线指标为tuple）, 第i根K线的状态)
+        """
+        raise NotImplementedError
+
+
+def _window_sums(x: np.ndarray, i: int, length: int) -> tuple[float, float]:
+    """以第i根K线结尾的窗口和与平方和（窗口不足时为NaN）"""
+    start = i - length + 1
+    if start < 0:
+        return np.nan, np.nan
+    window = x[start:i+1]
+    return float(window.sum()), float(np.dot(window, window))
+
+
+def _rolling_sums(state: tuple[float, float], x: np.ndarray, i: int, length: int) -> tuple[float, float]:
+    """窗口和与平方和逐根滚动（加入x[i]、移出x[i-length]），每length根重新求和消除累计误差"""
+    total, square = state
+    if i < length or i % length == 0 or np.isnan(total):
+        return _window_sums(x, i, length)
+    new, old = x[i], x[i - length]
+    return total + new - old, square + new * new - old * old
+
+
+class RollingMean(StreamingIndicator):
+    """简单移动平均：窗口均值，状态为(窗口和, 平方和)"""
+
+    def seed(self, inputs, output):
+        x = inputs[0]
+        return [_window_sums(x, len(x) - 2, self.length), _window_sums(x, len(x) - 1, self.length)]
+
+    def step(self, state, inputs, i):
+        state = _rolling_sums(state, inputs[0], i, self.length)
+        return state[0] / self.length, state
+
+
+class RollingStd(StreamingIndicator):
+    """标准差：窗口标准差 × scale，状态为(窗口和, 平方和)"""
+    ddof: int = 0
+    scale: float = 1.
+
+    def seed(self, inputs, output):
+        x = inputs[0]
+        return [_window_sums(x, len(x) - 2, self.length), _window_sums(x, len(x) - 1, self.length)]
+
+    def step(self, state, inputs, i):
+        state = _rolling_sums(state, inputs[0], i, self.length)
+        total, square = state
+        length = self.length
+        if length - self.ddof <= 0:
+            return np.nan, state
+        variance = max((square - total * total / length) / (length - self.ddof), 0.)
+        return np.sqrt(variance) * self.scale, state
+
+
+class ExponentialMean(StreamingIndicator):
+    """指数移动平均：y = y' + α(x - y')，状态为上一根K线的输出"""
+    wilder: bool = False
+
+    def seed(self, inputs, output):
+        return [output[-2], output[-1]]
+
+    def step(self, state, inputs, i):
+        alpha = 1. / self.length if self.wilder else 2. / (self.length + 1.)
+        value = state + alpha * (inputs[0][i] - state)
+        return value, value
+
+
+class AverageTrueRange(StreamingIndicator):
+    """平均真实波幅：真实波幅的Wilder平滑，状态为上一根K线的输出"""
+    inputs = ("high", "low", "close")
+
+    def seed(self, inputs, output):
+        return [output[-2], output[-1]]
+
+    def step(self, state, inputs, i):
+        high, low, close = inputs
+        pre_close = close[i-1]
+        tr = max(high[i] - low[i], abs(high[i] - pre_close),
+                 abs(low[i] - pre_close))
+        value = state + (tr - state) / self.length
+        return value, value
+
+
+class RelativeStrength(StreamingIndicator):
+    """相对强弱：涨跌幅的Wilder平滑，状态为(平均涨幅, 平均跌幅)"""
+    scalar: float = 100.
+
+    def seed(self, inputs, output):
+        diff = pd.Series(inputs[0]).diff()
+        alpha = 1. / self.length
+        gain = diff.clip(lower=0.).ewm(alpha=alpha, adjust=False).mean().values
+        loss = (-diff).clip(lower=0.).ewm(alpha=alpha, adjust=False).mean().values
+        states = []
+        for j in (-2, -1):
+            # 以库输出校准涨跌比例（仅保留涨跌幅之和的量级）
+            total = gain[j] + loss[j]
+            avg_gain = total * output[j] / self.scalar
+            states.append((avg_gain, total - avg_gain))
+        return states
+
+    def step(self, state, inputs, i):
+        x = inputs[0]
+        diff = x[i] - x[i-1]
+        avg_gain, avg_loss = state
+        avg_gain += (max(diff, 0.) - avg_gain) / self.length
+        avg_loss += (max(-diff, 0.) - avg_loss) / self.length
+        total = avg_gain + avg_loss
+        value = self.scalar * avg_gain / total if total else 0.
+        return value, (avg_gain, avg_loss)
+
+
+class MovingAverageConvergenceDivergence(StreamingIndicator):
+    """MACD：快慢EMA之差及其信号线，状态为(快线EMA, 慢线EMA, 信号线)
+
+    order为输出列顺序（'macd'/'hist'/'signal'的排列）
+    """
+    order: tuple[str, ...] = ("macd", "hist", "signal")
+
+    def seed(self, inputs, output):
+        fast_ema = pd.Series(inputs[0]).ewm(
+            span=self.fast, adjust=False).mean().values
+        macd_col = self.order.index("macd")
+        signal_col = self.order.index("signal")
+        # 以库输出校准慢线（快线-慢线=库的MACD值）
+        return [(fast_ema[j], fast_ema[j] - output[j, macd_col], output[j, signal_col])
+                for j in (-2, -1)]
+
+    def step(self, state, inputs, i):
+        x = inputs[0][i]
+        fast_ema, slow_ema, signal = state
+        fast_ema += 2. / (self.fast + 1.) * (x - fast_ema)
+        slow_ema += 2. / (self.slow + 1.) * (x - slow_ema)
+        macd = fast_ema - slow_ema
+        signal += 2. / (self.signal + 1.) * (macd - signal)
+        values = dict(macd=macd, hist=macd - signal, signal=signal)
+        return tuple(values[k] for k in self.order), (fast_ema, slow_ema, signal)
+
+
+class _StreamingSpec:
+    """流式指标注册项：指标类、位置参数名、默认参数及参数校验"""
+
+    def __init__(self, cls: type[StreamingIndicator], names: tuple[str, ...], defaults: dict,
+                 ignore: tuple[str, ...] = (), check: Callable[[dict], dict | None] | None = None):
+        self.cls = cls
+        self.names = names
+        self.defaults = defaults
+        self.ignore = set(ignore)
+        self.check = check
+
+    def bind(self, ind_params: list, kwargs: dict) -> dict | None:
+        """绑定调用参数，存在不支持的参数时返回None"""
+        if len(ind_params) > len(self.names):
+            return None
+        params = dict(self.defaults)
+        for name, value in zip(self.names, ind_params):
+            if value is not None:
+                params[name] = value
+        for name, value in kwargs.items():
+            if name in _FRAMEWORK_KWARGS or name in self.ignore:
+                continue
+            if name not in self.names:
+                return None
+            if value is not None:
+                params[name] = value
+        if params.pop("offset", 0):
+            return None
+        for name in self.ignore:
+            params.pop(name, None)
+        if self.check is not None:
+            params = self.check(params)
+        return params
+
+
+def _check_length(*names: str):
+    """周期参数须为正整数"""
+    def check(params: dict) -> dict | None:
+        for name in names:
+            value = params.get(name)
+            if not isinstance(value, (int, np.integer)) or value <= 0:
+                return None
+        return params
+    return check
+
+
+def _check_pta_stdev(params: dict) -> dict | None:
+    from .multiparam import _ddof, _use_talib
+    talib = params.pop("talib", None)
+    params = _check_length("length")(params)
+    if params is not None:
+        # 已安装TA-Lib时pandas_ta按TA-Lib的STDDEV计算（ddof=0，忽略ddof参数）
+        params["ddof"] = 0 if _use_talib(talib) else _ddof(params["ddof"], params["length"])
+    return params
+
+
+def _check_pta_atr(params: dict) -> dict | None:
+    if params.pop("mamode", "rma") not in (None, "rma", "RMA") or params.pop("drift", 1) not in (None, 1):
+        return None
+    return _check_length("length")(params)
+
+
+def _check_pta_rsi(params: dict) -> dict | None:
+    if params.pop("drift", 1) not in (None, 1):
+        return None
+    return _check_length("length")(params)
+
+
+def _check_talib_stddev(params: dict) -> dict | None:
+    params = _check_length("length")(params)
+    if params is not None:
+        params["scale"] = float(params.pop("nbdev"))
+    return params
+
+
+def _rename(mapping: dict, check: Callable[[dict], dict | None]):
+    """将库参数名映射为流式指标参数名"""
+    def rename(params: dict) -> dict | None:
+        params = {mapping.get(k, k): v for k, v in params.items()}
+        return check(params)
+    return rename
+
+
+_length = _check_length("length")
+_macd = _check_length("fast", "slow", "signal")
+
+STREAMING_INDICATORS: dict[str, _StreamingSpec] = {
+    # PandasTa
+    "pta_sma": _StreamingSpec(RollingMean, ("length", "talib", "offset"), dict(length=10), ("talib",), _length),
+    "pta_ema": _StreamingSpec(ExponentialMean, ("length", "talib", "offset"), dict(length=10), ("talib",), _length),
+    "pta_rma": _StreamingSpec(ExponentialMean, ("length", "offset"), dict(length=10, wilder=True), (), _length),
+    "pta_stdev": _StreamingSpec(RollingStd, ("length", "ddof", "talib", "offset"), dict(length=30, ddof=1), (), _check_pta_stdev),
+    "pta_atr": _StreamingSpec(AverageTrueRange, ("length", "mamode", "talib", "drift", "offset"), dict(length=14), ("talib",), _check_pta_atr),
+    "pta_rsi": _StreamingSpec(RelativeStrength, ("length", "scalar", "talib", "drift", "offset"), dict(length=14, scalar=100.), ("talib",), _check_pta_rsi),
+    "pta_macd": _StreamingSpec(MovingAverageConvergenceDivergence, ("fast", "slow", "signal", "talib", "offset"),
+                               dict(fast=12, slow=26, signal=9, order=("macd", "hist", "signal")), ("talib",), _macd),
+    # TA-Lib
+    "talib_SMA": _StreamingSpec(RollingMean, ("timeperiod",), dict(timeperiod=30), (), _rename(dict(timeperiod="length"), _length)),
+    "talib_EMA": _StreamingSpec(ExponentialMean, ("timeperiod",), dict(timeperiod=30), (), _rename(dict(timeperiod="length"), _length)),
+    "talib_STDDEV": _StreamingSpec(RollingStd, ("timeperiod", "nbdev"), dict(timeperiod=5, nbdev=1.), (), _rename(dict(timeperiod="length"), _check_talib_stddev)),
+    "talib_ATR": _StreamingSpec(AverageTrueRange, ("timeperiod",), dict(timeperiod=14), (), _rename(dict(timeperiod="length"), _length)),
+    "talib_RSI": _StreamingSpec(RelativeStrength, ("timeperiod",), dict(timeperiod=14), (), _rename(dict(timeperiod="length"), _length)),
+    "talib_MACD": _StreamingSpec(MovingAverageConvergenceDivergence, ("fastperiod", "slowperiod", "signalperiod"),
+                                 dict(fastperiod=12, slowperiod=26, signalperiod=9, order=("macd", "signal", "hist")), (),
+                                 _rename(dict(fastperiod="fast", slowperiod="slow", signalperiod="signal"), _macd)),
+    # TuLip
+    "ti_sma": _StreamingSpec(RollingMean, ("period",), dict(period=10), (), _rename(dict(period="length"), _length)),
+    "ti_ema": _StreamingSpec(ExponentialMean, ("period",), dict(period=10), (), _rename(dict(period="length"), _length)),
+    "ti_stddev": _StreamingSpec(RollingStd, ("period",), dict(period=10), (), _rename(dict(period="length"), _length)),
+    "ti_atr": _StreamingSpec(AverageTrueRange, ("period",), dict(period=10), (), _rename(dict(period="length"), _length)),
+    "ti_rsi": _StreamingSpec(RelativeStrength, ("period",), dict(period=10), (), _rename(dict(period="length"), _length)),
+    # FinTa
+    "finta_SMA": _StreamingSpec(RollingMean, ("period",), dict(period=41), (), _rename(dict(period="length"), _length)),
+}
+
+
+def register_streaming(func_name: str, cls: type[StreamingIndicator], names: tuple[str, ...],
+                       defaults: dict | None = None, check: Callable[[dict], dict | None] | None = None):
+    """## 注册流式指标
+
+    Args:
+        func_name (str): tobtind中的指标函数名（带库前缀，如'btind_smoothrng'）
+        cls (type[StreamingIndicator]): 流式指标类
+        names (tuple[str, ...]): 指标函数的位置参数名（按顺序）
+        defaults (dict | None): 默认参数. 默认None
+        check (Callable | None): 参数校验/转换函数，返回None时回退全量计算. 默认None
+    """
+    assert issubclass(cls, StreamingIndicator), "cls须为StreamingIndicator子类"
+    STREAMING_INDICATORS[func_name] = _StreamingSpec(
+        cls, tuple(names), dict(defaults or {}), (), check)
+
+
+class _StreamingState:
+    """单个指标调用的流式状态
+
+    - 输出保存在缓冲区 `buffer[start:start+length]` 中，容量为窗口长度的两倍：
+      窗口平移只移动起点，缓冲区用尽时整体搬移到开头（均摊O(1)）
+    """
+    __slots__ = ("func_name", "params", "indicator",
+                 "inputs", "buffer", "start", "length", "states", "lines")
+
+    def __init__(self, func_name, params, indicator, inputs, output, states, lines):
+        self.func_name = func_name
+        self.params = params
+        self.indicator: StreamingIndicator = indicator
+        self.inputs: list[np.ndarray] = inputs
+        self.buffer: np.ndarray = np.empty((2 * len(output), *output.shape[1:]))
+        self.buffer[:len(output)] = output
+        self.start = 0
+        self.length = len(output)
+        self.states: list = states
+        self.lines = lines
+
+    def resize(self, drop: int, length: int, keep: int) -> np.ndarray:
+        """丢弃开头drop根、保留其后keep根，长度调整为length，返回输出视图"""
+        start = self.start + drop
+        if start + length > len(self.buffer):
+            buffer = self.buffer if 2 * length <= len(self.buffer) else \
+                np.empty((2 * length, *self.buffer.shape[1:]))
+            buffer[:keep] = self.buffer[start:start+keep]
+            self.buffer, start = buffer, 0
+        self.start, self.length = start, length
+        return self.buffer[start:start+length]
+
+
+# 对齐校验比较的重叠部分末端K线数
+_PROBE = 3
+
+
+def _aligned(inputs: list[np.ndarray], prev: list[np.ndarray], stop: int, prev_stop: int, prev_first: int) -> bool:
+    """抽样校验数据对齐：x[0]与p[prev_first]、x[:stop]末端与p[:prev_stop]末端_PROBE根一致"""
+    k = min(_PROBE, stop, prev_stop - prev_first)
+    for x, p in zip(inputs, prev):
+        if not (x[0] == p[prev_first] or (np.isnan(x[0]) and np.isnan(p[prev_first]))):
+            return False
+        if not np.array_equal(x[stop-k:stop], p[prev_stop-k:prev_stop], equal_nan=True):
+            return False
+    return True
+
+
+def _is_valid(value) -> bool:
+    """状态不含NaN"""
+    if value is None:
+        return True
+    if isinstance(value, tuple):
+        return all(_is_valid(v) for v in value)
+    return not np.isnan(value)
+
+
+class StreamingContext:
+    """## 流式指标上下文（每个策略实例一个）
+
+    - 以指标在 `_strategy_init` 中的调用顺序和函数名为键保存流式状态
+    - stats: streamed（流式更新次数）、full（全量计算次数）
+    """
+
+    def __init__(self):
+        self._states: dict[tuple[int, str], _StreamingState] = {}
+        self._ordinal = 0
+        self.stats = dict(streamed=0, full=0)
+
+    def begin(self):
+        """开始新一轮 `_strategy_init`"""
+        self._ordinal = 0
+
+    def next_key(self, func_name: str) -> tuple[int, str]:
+        self._ordinal += 1
+        return self._ordinal, func_name
+
+    @staticmethod
+    def _inputs(indicator: StreamingIndicator, source) -> list[np.ndarray] | None:
+        if len(source.shape) == 1:
+            if len(indicator.inputs) != 1:
+                return None
+            return [np.asarray(source, dtype=np.float64)]
+        columns = list(source.columns)
+        if not all(field in columns for field in indicator.inputs):
+            return None
+        return [np.asarray(source[field], dtype=np.float64) for field in indicator.inputs]
+
+    def update(self, key: tuple[int, str], func_name: str, source,
+               ind_params: list, kwargs: dict) -> tuple[np.ndarray, Any] | None:
+        """## 流式更新
+
+        Returns:
+            tuple | None: (指标数据（流式缓冲区视图，下次更新时被覆盖）, lines)，
+                不可流式更新时返回None（需全量计算）
+        """
+        state = self._states.get(key)
+        if state is None or state.func_name != func_name:
+            return None
+        spec = STREAMING_INDICATORS.get(func_name)
+        if spec is None or spec.bind(ind_params, kwargs) != state.params:
+            return None
+        inputs = self._inputs(state.indicator, source)
+        if inputs is None:
+            return None
+        prev = state.inputs
+        n, m = state.length, len(inputs[0])
+        if n < 3 or m < 3:
+            return None
+        # 对齐：当前K线更新 / 固定窗口新K线 / 增长窗口新K线
+        if m == n and _aligned(inputs, prev, m - 1, n - 1, 0):
+            drop, tail = 0, 1
+        elif m == n and _aligned(inputs, prev, m - 2, n - 1, 1):
+            drop, tail = 1, 2
+        elif m == n + 1 and _aligned(inputs, prev, m - 2, n - 1, 0):
+            drop, tail = 0, 2
+        else:
+            return None
+        base = state.states[-2]
+        if not _is_valid(base):
+            return None
+        output = state.resize(drop, m, m - tail)
+        states = [base] if tail == 1 else []
+        indicator = state.indicator
+        for i in range(m - tail, m):
+            value, base = indicator.step(base, inputs, i)
+            output[i] = value
+            states.append(base)
+        state.inputs, state.states = inputs, states[-2:]
+        self.stats["streamed"] += 1
+        return output, state.lines
+
+    def init(self, key: tuple[int, str], func_name: str, source, ind_params: list,
+             kwargs: dict, ind_data, lines) -> None:
+        """全量计算后建立流式状态（不支持的指标只记录全量计算次数）"""
+        self.stats["full"] += 1
+        self._states.pop(key, None)
+        spec = STREAMING_INDICATORS.get(func_name)
+        if spec is None or not isinstance(ind_data, (np.ndarray, pd.Series, pd.DataFrame)):
+            return
+        params = spec.bind(ind_params, kwargs)
+        if params is None:
+            return
+        indicator = spec.cls(**params)
+        inputs = self._inputs(indicator, source)
+        output = np.asarray(ind_data, dtype=np.float64)
+        if inputs is None or len(inputs[0]) < 3 or len(output) != len(inputs[0]):
+            return
+        try:
+            states = indicator.seed(inputs, output)
+        except Exception:
+            return
+        self._states[key] = _StreamingState(
+            func_name, params, indicator, inputs, output, list(states), lines)
+
+    def clear(self):
+        """清空所有流式状态"""
+        self._states.clear()
+        self._ordinal = 0
+
+
+_CURRENT: StreamingContext | None = None
+
+
+def current_streaming() -> StreamingContext | None:
+    """当前生效的流式指标上下文（未处于实盘指标更新中时为None）"""
+    return _CURRENT
+
+
+@contextmanager
+def streaming(context: StreamingContext):
+    """## 在上下文内启用流式指标更新
+
+    Examples:
+        >>> with streaming(self._streaming_context):
+        ...     self._strategy_init()
+    """
+    global _CURRENT
+    previous, _CURRENT = _CURRENT, context
+    context.begin()
+    try:
+        yield context
+    finally:
+        _CURRENT = previous
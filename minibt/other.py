@@ -8,7 +8,6 @@ from types import ModuleType
 import re
 from functools import partial
 from inspect import signature
-import glob
 import sys
 import io
 from contextlib import AbstractContextManager, contextmanager
@@ -279,26 +278,11 @@ def save_and_generate_utils(data: pd.DataFrame, base_dir: str, save: str | None,
     if "." in file_name:
         file_name = file_name.split(".")[1]
     file_name = f"{file_name}.csv"
-    # 保存路径（BASE_DIR/data/test/）
-    path = os.path.join(base_dir, "data", "test", file_name)
+    # 保存路径（用户数据目录 ~/.minibt/datas，不写入包目录；保存后即可通过LocalDatas按名称访问）
+    from .data.registry import local_registry
+    os.makedirs(local_registry.save_dir, exist_ok=True)
+    path = os.path.join(local_registry.save_dir, file_name)
     data.to_csv(path, index=False)
-    # 自动更新本地数据工具类（生成utils.py，包含所有CSV数据的引用）
-    csv_files = glob.glob(os.path.join(
-        base_dir, "data", "test", "*.csv"))
-    py_file_path = os.path.join(base_dir, "data", "utils.py")
-    # 生成工具类内容
-    class_content = [
-        'from .tools import *', "", "",
-        'class LocalDatas(base):', '    """本地CSV数据"""']
-    for file in csv_files:
-        file_name = os.path.splitext(os.path.basename(file))[0]
-        class_content.append(
-            f'    {file_name} = DataString("{file_name}")')
-    class_content.extend(["", ""])
-    class_content.append('LocalDatas=LocalDatas()')
-    # 写入文件
-    with open(py_file_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(class_content))
 
 
 def find_pth_files(cwd=None, file_extension=".pth"):
@@ -618,6 +602,41 @@ def time_to_datetime(input_time):
     return dt
 
 
+def times_to_datetime(values) -> np.ndarray:
+    """
+    time_to_datetime 的向量化版本，整列转换为 datetime64[ns] 数组（本地时间，无时区）
+
+    Args:
+        values (pd.Series/ np.ndarray/ list): 需要转换的时间列:
+
+            * 数值: 纳秒级或秒级时间戳（> 2**32 视为纳秒），按本地时区转换
+
+            * str: %Y-%m-%d %H:%M:%S 格式的时间
+
+            * datetime64: 统一为纳秒精度
+
+    Returns:
+        np.ndarray : datetime64[ns] 数组
+
+    Example::
+
+        df.datetime = times_to_datetime(df.datetime)
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, "tz", None) is not None:
+            series = series.dt.tz_convert(
+                datetime.now().astimezone().tzinfo).dt.tz_localize(None)
+        return series.to_numpy(dtype="datetime64[ns]")
+    if pd.api.types.is_numeric_dtype(series):
+        stamps = series.to_numpy(dtype=np.float64)
+        stamps = np.where(stamps > 2 ** 32, stamps, stamps * 1e9).astype(np.int64)
+        local = pd.to_datetime(stamps, utc=True).tz_convert(
+            datetime.now().astimezone().tzinfo).tz_localize(None)
+        return local.to_numpy(dtype="datetime64[ns]")
+    return pd.to_datetime(series, format="%Y-%m-%d %H:%M:%S").to_numpy(dtype="datetime64[ns]")
+
+
 def timestamp_to_time(input_time):
     raise time_to_datetime(input_time).time()
 
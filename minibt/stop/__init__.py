@@ -43,6 +43,8 @@ class BtStop(base, metaclass=Meta):
     2. **参数可配置**: 每种策略都提供丰富的参数调节选项
     3. **易于扩展**: 基于元类的设计便于添加新的止损策略
     4. **统一接口**: 所有策略都遵循相同的调用接口，便于在回测系统中切换使用
+    5. **编译内核**: 除AnotherATRTrailingStop外均有编译状态机内核（见 `minibt.stop.kernels`），
+       回测中逐K线O(1)更新，并可通过 `stop.path(entries, sides)` 预计算整条停止路径
     """
 
     # CAC40指数专用止损策略，采用分段利润跟踪机制
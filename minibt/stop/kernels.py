@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+## 内置停止器的编译状态机内核
+
+`minibt.stop.stop` 中的停止器以Python实现 `long()`/`short()`，每根K线通过指标对象
+读取 `close[-1]`、`stop_price[-2]` 并以 `stop_price.new = ...` 写入，
+开启停止器后回测循环对每个KLine每根K线都要经过多次pandas索引。
+
+本模块将这些停止器改写为只操作 float64 `np.ndarray` 的状态机：
+
+- 停止器参数打包为一维数组 `params`，跨K线的可变状态（如CAC40的y1/y2、
+  TimeSegmentationTracking的持仓计数）保存在一维数组 `state` 中，原地更新
+- `stop_update` 计算第i根K线的停止价/目标价（O(1)），写入停止线数组并返回是否触发平仓
+- `stop_path` 预计算模式：给定开仓K线索引、方向与开仓价，一次求出整条停止价/目标价路径
+  及每笔交易的平仓K线索引（入场信号已知的向量化回测中使用）
+- 安装numba时以 `njit(cache=True, error_model="numpy")` 编译，未安装时以纯Python执行同一函数
+- 语义与Python实现逐K线一致（包括前值取 `[i-1]`、未赋值时保留当前值等细节），
+  Python版 `long()`/`short()` 保留为参照实现
+
+### 示例：
+```python
+from minibt.stop.kernels import get_stop_kernels, STOP_KINDS
+stop_update, stop_path = get_stop_kernels()
+exits = stop_path(STOP_KINDS["FixedStop"], params, state, entries, sides, open_prices,
+                  price_tick, high, low, close, atr, stop, target)
+```
+"""
+from __future__ import annotations
+from typing import Callable
+import numpy as np
+
+__all__ = ["STOP_KINDS", "get_stop_kernels", "stop_update", "stop_path"]
+
+
+STOP_KINDS: dict[str, int] = {
+    "CAC40": 1,
+    "SegmentationTracking": 2,
+    "TimeSegmentationTracking": 3,
+    "TrailingStopLoss": 4,
+    "FixedStop": 5,
+    "FSStop": 6,
+    "FTStop": 7,
+}
+"""停止器名称 -> 内核编号"""
+
+
+def _cac40(params, state, side, open_price, price_tick, high, low, stop, target, prev_target):
+    """CAC40：params=[trailstart, basepercent, stepsize, percentinc, roundto, pricedistance]，
+    state=[y1, y2, ProfitPerCent1, ProfitPerCent2]"""
+    trailstart, basepercent, stepsize = params[0], params[1], params[2]
+    percentinc, roundto, pricedistance = params[3], params[4], params[5]
+    if side > 0.:
+        y, pct = state[0], state[2]
+        if low > open_price + y * price_tick:
+            x = (low - open_price) / price_tick
+            if x >= trailstart:
+                chunks = (x - trailstart) / stepsize + roundto
+                if not chunks > 0.:
+                    chunks = 0.
+                profit = basepercent * (1. + chunks * percentinc)
+                capped = 100.
+                if profit < capped:
+                    capped = profit
+                if capped > pct:
+                    pct = capped
+                value = x * pct
+                if y > value:
+                    value = y
+                state[0], state[2] = value, pct
+                if value > 0.:
+                    return stop, open_price + value * price_tick + pricedistance
+        return stop, prev_target
+    y, pct = state[1], state[3]
+    if high < open_price - y * price_tick:
+        x = (open_price - high) / price_tick
+        if x >= trailstart:
+            chunks = (x - trailstart) / stepsize + roundto
+            if not chunks > 0.:
+                chunks = 0.
+            profit = basepercent * (1. + chunks * percentinc)
+            capped = 100.
+            if profit < capped:
+                capped = profit
+            if capped > pct:
+                pct = capped
+            value = x * pct
+            if y > value:
+                value = y
+            state[1], state[3] = value, pct
+            if value > 0.:
+                return stop, open_price - value * price_tick - pricedistance
+    return stop, prev_target
+
+
+def _segmentation(params, side, open_price, high, low, close, prev_close, atr, stop, prev_stop):
+    """SegmentationTracking：params=[mult, a0, a1, a2, a3, min_distance]"""
+    if np.isnan(atr):
+        return stop
+    mult, min_distance = params[0], params[5]
+    if side > 0.:
+        if np.isnan(prev_stop):
+            return low - mult * atr
+        price = prev_stop
+        range_ = abs(prev_close - close)
+        if close > prev_close:
+            diff_price = close - open_price
+            atr *= mult
+            if price < open_price:
+                price += params[1] * range_
+            elif diff_price < atr:
+                price += params[2] * range_
+            elif diff_price < 2. * atr:
+                price += params[3] * range_
+            else:
+                price += params[4] * range_
+        elif min_distance:
+            price += min_distance * range_
+        return price
+    if np.isnan(prev_stop):
+        return high + mult * atr
+    price = prev_stop
+    range_ = abs(prev_close - close)
+    if prev_close > close:
+        diff_price = open_price - close
+        atr *= mult
+        if price > open_price:
+            price -= params[1] * range_
+        elif diff_price < atr:
+            price -= params[2] * range_
+        elif diff_price < 2. * atr:
+            price -= params[3] * range_
+        else:
+            price -= params[4] * range_
+    elif min_distance:
+        # 与Python实现一致（空单价格未下跌时同样上移）
+        price += min_distance * range_
+    return price
+
+
+def _time_segmentation(params, state, side, high, low, close, prev_close, atr, stop, prev_stop):
+    """TimeSegmentationTracking：params=[mult, a0, a1, a2, a3, min_distance, d0, d1, d2]，state=[count]"""
+    if np.isnan(atr):
+        return stop
+    mult, min_distance = params[0], params[5]
+    if np.isnan(prev_stop):
+        state[0] = 0.
+        return low - mult * atr if side > 0. else high + mult * atr
+    state[0] += 1.
+    count = state[0]
+    price = prev_stop
+    range_ = close - prev_close if side > 0. else prev_close - close
+    if range_ > 0.:
+        if count <= params[6]:
+            move = params[1] * range_
+        elif count <= params[7]:
+            move = params[2] * range_
+        elif count <= params[8]:
+            move = params[3] * range_
+        else:
+            move = params[4] * range_
+    else:
+        move = min_distance * abs(range_)
+    return price + move if side > 0. else price - move
+
+
+def _trailing(params, side, open_price, price_tick, close, target, prev_target):
+    """TrailingStopLoss：params=[trailingstart, trailingstep]"""
+    trailingstart, trailingstep = params[0], params[1]
+    if side > 0.:
+        if np.isnan(prev_target):
+            if close - open_price >= trailingstart * price_tick:
+                return close + trailingstep * price_tick
+            return target
+        value = close + trailingstep * price_tick
+        return prev_target if prev_target < value else value
+    if np.isnan(prev_target):
+        if open_price - close >= trailingstart * price_tick:
+            return close - trailingstep * price_tick
+        return target
+    value = close - trailingstep * price_tick
+    return prev_target if prev_target > value else value
+
+
+def _fixed(distance, side, price_tick, high, low, prev, isstop):
+    """FixedStop/FSStop/FTStop：前值为nan时以最新高低点加减固定距离初始化，否则保持前值"""
+    if not np.isnan(prev):
+        return prev
+    if (side > 0.) == isstop:
+        return low - distance * price_tick
+    return high + distance * price_tick
+
+
+def stop_update(kind, params, state, side, i, open_price, price_tick,
+                high, low, close, atr, stop, target):
+    """## 第i根K线的停止价/目标价更新（O(1)）
+
+    Args:
+        kind (int): 内核编号（见 `STOP_KINDS`）
+        params (np.ndarray): 停止器参数
+        state (np.ndarray): 停止器状态（原地更新）
+        side (float): 持仓方向（>0多头，<0空头）
+        i (int): K线索引
+        open_price (float): 开仓价
+        price_tick (float): 最小变动单位
+        high, low, close (np.ndarray): 最高价、最低价、收盘价
+        atr (np.ndarray): 停止器使用的波动率指标（不使用时传入任意等长数组）
+        stop, target (np.ndarray): 停止价、目标价（原地写入第i个元素）
+
+    Returns:
+        bool: 收盘价是否触及停止价或目标价（需要平仓）
+    """
+    prev_stop, prev_target = stop[i - 1], target[i - 1]
+    new_stop, new_target = stop[i], target[i]
+    if kind == 1:
+        new_stop, new_target = _cac40(params, state, side, open_price, price_tick,
+                                      high[i], low[i], new_stop, new_target, prev_target)
+    elif kind == 2:
+        new_stop = _segmentation(params, side, open_price, high[i], low[i], close[i],
+                                 close[i - 1], atr[i], new_stop, prev_stop)
+    elif kind == 3:
+        new_stop = _time_segmentation(params, state, side, high[i], low[i], close[i],
+                                      close[i - 1], atr[i], new_stop, prev_stop)
+    elif kind == 4:
+        new_target = _trailing(params, side, open_price, price_tick, close[i],
+                               new_target, prev_target)
+    elif kind == 5:
+        new_stop = _fixed(params[0], side, price_tick, high[i], low[i], prev_stop, True)
+        new_target = _fixed(params[1], side, price_tick, high[i], low[i], prev_target, False)
+    elif kind == 6:
+        new_stop = _fixed(params[0], side, price_tick, high[i], low[i], prev_stop, True)
+    elif kind == 7:
+        new_target = _fixed(params[0], side, price_tick, high[i], low[i], prev_target, False)
+    stop[i], target[i] = new_stop, new_target
+    price = close[i]
+    if side > 0.:
+        return price <= new_stop or price >= new_target
+    return price >= new_stop or price <= new_target
+
+
+def stop_path(kind, params, state, entries, sides, open_prices, price_tick,
+              high, low, close, atr, stop, target):
+    """## 预计算整条停止价/目标价路径
+
+    - 第k笔交易从 `entries[k]` 开始逐K线调用 `stop_update`，
+      直到触发平仓或下一笔交易开始（entries须递增）
+    - 平仓K线之后、下一笔交易之前的停止线保持原值（与回测循环中无持仓时不更新一致）
+
+    Args:
+        kind (int): 内核编号
+        params, state (np.ndarray): 停止器参数与状态
+        entries (np.ndarray[int64]): 开仓K线索引
+        sides (np.ndarray[float64]): 每笔交易方向
+        open_prices (np.ndarray[float64]): 每笔交易开仓价
+        price_tick (float): 最小变动单位
+        high, low, close, atr (np.ndarray): 行情与波动率数组
+        stop, target (np.ndarray): 停止价、目标价（原地写入，通常以nan初始化）
+
+    Returns:
+        np.ndarray[int64]: 每笔交易的平仓K线索引（未触发为-1）
+    """
+    n, m = close.size, entries.size
+    exits = np.full(m, -1, dtype=np.int64)
+    for k in range(m):
+        end = entries[k + 1] if k + 1 < m else n
+        if end > n:
+            end = n
+        for i in range(entries[k], end):
+            if stop_update(kind, params, state, sides[k], i, open_prices[k], price_tick,
+                           high, low, close, atr, stop, target):
+                exits[k] = i
+                break
+    return exits
+
+
+_KERNELS: tuple[Callable, Callable] | None = None
+
+
+def get_stop_kernels() -> tuple[Callable, Callable]:
+    """## 获取停止器内核（优先numba编译，未安装numba时返回纯Python实现）
+
+    Returns:
+        tuple[Callable, Callable]: (stop_update, stop_path)
+    """
+    global _KERNELS
+    if _KERNELS is None:
+        try:
+            from numba import njit
+        except ImportError:
+            _KERNELS = stop_update, stop_path
+        else:
+            # 被调用的函数先于调用者编译，编译时按模块全局名解析为已编译版本
+            scope = globals()
+            for name in ("_cac40", "_segmentation", "_time_segmentation", "_trailing",
+                         "_fixed", "stop_update", "stop_path"):
+                scope[name] = njit(cache=True, error_model="numpy")(scope[name])
+            _KERNELS = scope["stop_update"], scope["stop_path"]
+    return _KERNELS
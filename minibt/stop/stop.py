@@ -6,6 +6,7 @@ from ..indicators import Stop, Literal  # 导入基础止损类
 
 class CAC40(Stop):
     """CAC40止损策略类，继承自基础Stop类"""
+    _kernel = "CAC40"
 
     def __init__(self, trailstart: float = 3., basepercent: float = 0.094, stepsize: float = 3.,
                  percentinc: float = 0.102, roundto: float = -0.5, pricedistance: float = 5.) -> None:
@@ -21,6 +22,13 @@ class CAC40(Stop):
         self.ProfitPerCent1 = basepercent  # 多单利润百分比
         self.ProfitPerCent2 = basepercent  # 空单利润百分比
 
+    def _kernel_params(self) -> list[float]:
+        return [self.trailstart, self.basepercent, self.stepsize,
+                self.percentinc, self.roundto, self.pricedistance]
+
+    def _kernel_state(self) -> list[float]:
+        return [self.y1, self.y2, self.ProfitPerCent1, self.ProfitPerCent2]
+
     def long(self) -> None:
         """多单止损计算逻辑"""
         low = self.low[-1]  # 获取最新低点
@@ -89,6 +97,7 @@ class SegmentationTracking(Stop):
         acceleration (list[float], optional): 分段乘数. Defaults to [0.382, 0.5, 0.618, 1.0].
         min_distance (float, optional): 最小距离. Defaults to 0..
     """
+    _kernel = "SegmentationTracking"
 
     def __init__(self, length: int = 14, mult: float = 1., method: Literal["atr", "std", "smoothrng"] = "atr",
                  acceleration: list[float] = [0.382, 0.5, 0.618, 1.0], min_distance: float = 0.) -> None:
@@ -110,6 +119,9 @@ class SegmentationTracking(Stop):
             self._atr = self.kline.btind.smoothrng(
                 self.length)
 
+    def _kernel_params(self) -> list[float]:
+        return [self.mult, *self.acceleration[:4], self.min_distance]
+
     def long(self):
         """多单分段跟踪止损计算"""
         _atr = self._atr[-1]
@@ -198,6 +210,7 @@ class TimeSegmentationTracking(Stop):
         acceleration (list[float], optional): 分段乘数. Defaults to [0.382, 0.5, 0.618, 1.0].
         min_distance (float, optional): 最小距离. Defaults to 1..
     """
+    _kernel = "TimeSegmentationTracking"
 
     def __init__(self, length: int = 14, mult: float = 1., method: Literal["atr", "std", "smoothrng"] = "atr",
                  days: list[int] = [3, 8, 13], acceleration: list[float] = [0.382, 0.5, 0.618, 1.0],
@@ -221,6 +234,12 @@ class TimeSegmentationTracking(Stop):
             self._atr = self.kline.close.btind.smoothrng(
                 self.length)
 
+    def _kernel_params(self) -> list[float]:
+        return [self.mult, *self.acceleration[:4], self.min_distance, *self.days[:3]]
+
+    def _kernel_state(self) -> list[float]:
+        return [self.count]
+
     def long(self):
         """多单时间分段跟踪止损计算"""
         _atr = self._atr[-1]
@@ -286,11 +305,15 @@ class TimeSegmentationTracking(Stop):
 
 class TrailingStopLoss(Stop):
     """跟踪目标值策略，当价格向有利方向移动一定幅度后，调整目标值"""
+    _kernel = "TrailingStopLoss"
 
     def __init__(self, trailingstart=3., trailingstep=3.) -> None:
         self.trailingstart = trailingstart  # 开始跟踪的初始幅度
         self.trailingstep = trailingstep  # 每次调整的步长
 
+    def _kernel_params(self) -> list[float]:
+        return [self.trailingstart, self.trailingstep]
+
     def long(self):
         """多单跟踪止损计算"""
         per_target_price = self.target_price[-2]
@@ -336,11 +359,15 @@ class FixedStop(Stop):
         stop_distance (float, optional): 固定止损价距离（最小变动单位）. Defaults to 5..
         target_distance (float, optional): 固定目标价距离（最小变动单位）. Defaults to 5..
     """
+    _kernel = "FixedStop"
 
     def __init__(self, stop_distance: float = 5., target_distance: float = 5.) -> None:
         self.stop_distance = stop_distance  # 止损距离（最小变动单位）
         self.target_distance = target_distance  # 目标距离（最小变动单位）
 
+    def _kernel_params(self) -> list[float]:
+        return [self.stop_distance, self.target_distance]
+
     def long(self):
         """多单固定止损和目标价计算"""
         per_target_price = self.target_price[-2]
@@ -384,10 +411,14 @@ class FSStop(Stop):
     ## Args:
         stop_distance (float, optional): 固定止损价距离（点数）. Defaults to 5..
     """
+    _kernel = "FSStop"
 
     def __init__(self, stop_distance: float = 5.) -> None:
         self.stop_distance = stop_distance  # 止损距离（点数）
 
+    def _kernel_params(self) -> list[float]:
+        return [self.stop_distance]
+
     def long(self):
         """多单固定止损计算"""
         per_stop_price = self.stop_price[-2]
@@ -417,10 +448,14 @@ class FTStop(Stop):
     ## Args:
         target_distance (float, optional): 固定目标价距离（点数）. Defaults to 5..
     """
+    _kernel = "FTStop"
 
     def __init__(self, target_distance: float = 5.) -> None:
         self.target_distance = target_distance  # 目标距离（点数）
 
+    def _kernel_params(self) -> list[float]:
+        return [self.target_distance]
+
     def long(self):
         """多单固定目标价计算"""
         per_target_price = self.target_price[-2]
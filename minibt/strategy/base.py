@@ -9,18 +9,36 @@ from ..utils import (cache, np, Callable,
                      os,  partial, Literal, FilteredOutputRedirector,
                      Config, get_cycle, read_unknown_file,
                      format_3col_report, qs_stats, FILED, loadData,
-                     save_and_generate_utils,)
+                     save_and_generate_utils, options)
 from .stats import Stats
 from .qs_plots import QSPlots
+from ..data.shared import shared_datas
+from ..data.clock import MasterClock
+from ..data.csv_cache import csv_cache
+from ..data.registry import local_registry
+from ..data.store import bar_store
+from ..indicators.streaming import StreamingContext, streaming
+from ..indicators.memo import indicator_cache
+from ..indicators.cse import CSEContext, cse
+from ..indicators.raw import raw_indicators
+from contextlib import ExitStack
 import inspect
 import ast
 from ..order import OrderType
 from ..other import SizeType, CommissionType, time_to_ns_timestamp,time_to_s_timestamp
 
+# 影响数据内容的get_kline参数（参与共享数据集键）
+_SHARED_KEY_KWARGS = ("data_source", "start_date", "end_date",
+                      "period", "adjust", "fields", "adj_type")
+# 仅用于数据获取的get_kline参数（命中共享数据集时弹出）
+_FETCH_KWARGS = ("user_name", "password", "chart_id", "adj_type", "data_source", "ip", "port",
+                 "start_date", "end_date", "period", "adjust", "fields", "timeout")
+
 if TYPE_CHECKING:
     from ..indicators import IndSeries, IndFrame, TqAccount, Line
     from .strategy import Strategy
     from ..utils import TqApi, BtAccount, BtPosition, Position, TqObjs, Params, OpConfig
+    from .chunked import ChunkWindow
     from ..elegantrl.train.config import Config as RlConfig
     from pytdx.hq import TdxHq_API
     import baostock as bs
@@ -101,6 +119,8 @@ class StrategyBase:
     _results: list[pd.DataFrame]  # 回测结果=[]
     # 回测当前索引（迭代K线数据用）
     _btindex: int = -1  # 索引
+    # 多合约主事件时钟（回测循环期间有效，见minibt.data.clock）
+    _clock: MasterClock | None = None
     # 策略初始化状态（True表示初始化完成）
     _in_next_context: bool = False  # 策略初始化状态
     # 图表保存名称（默认'plot'）
@@ -156,6 +176,20 @@ class StrategyBase:
     _isbacktrader_form_signals: bool = False
     _bt_from_signals_func: Callable | None = None
     _light_chart: bool = False
+    # 紧凑回测结果（fork多进程回测时由子进程返回，见_to_ledger/_from_ledger）
+    _ledger: dict | None = None
+    # 批量回测品种（Bt.batch_run时替换策略首个get_kline的symbol）
+    _batch_symbol: str | pd.DataFrame | None = None
+    # 分块回测数据区间（Bt.chunked_run时get_kline只取本块区间及预热K线）
+    _chunk_window: ChunkWindow | None = None
+    # 目标仓位模式（__init__返回目标仓位数组时启用，见_set_target_positions）
+    _target_positions: np.ndarray | None = None
+    # 实盘流式指标状态（见minibt.indicators.streaming）
+    _streaming_context: StreamingContext | None = None
+    # 最近一次策略初始化的指标复用记录（见minibt.indicators.cse）
+    _cse_context: CSEContext | None = None
+    # 无图表回测（Bt.run(isplot=False)），options.set_raw_indicators='auto'时启用raw模式
+    _headless: bool = False
     
     @classmethod
     def copy(cls, **kwargs) -> Strategy:
@@ -530,13 +564,14 @@ class StrategyBase:
         - 自动生成KLine唯一标识ID，关联策略与数据索引，确保多策略/多数据源场景下数据不混淆
 
         ### 数据源优先级（回测模式）：
-        1. 本地CSV文件（BASE_DIR/data/test/{symbol}.csv）
-        2. symbol路径直接引用的文件（如绝对路径）
-        3. TQSDK在线获取期货数据（需user_name+password，支持自动初始化_api）
-        4. 外部传入的pd.DataFrame（需包含OHLCV字段，缺失字段自动补充）
-        5. 股票在线数据源（akshare/pytdx/baostock，通过data_source参数切换）
-        6. 已缓存的_api中的期货数据（无需重复输入账号密码）
-        7. _datas中已加载的原始数据（按名称匹配）
+        1. 本地K线历史库（minibt.data.store，按(symbol, 周期)只读取所需区间）
+        2. 本地CSV文件（LocalDatas，见minibt.data.registry）
+        3. symbol路径直接引用的文件（如绝对路径）
+        4. TQSDK在线获取期货数据（需user_name+password，支持自动初始化_api）
+        5. 外部传入的pd.DataFrame（需包含OHLCV字段，缺失字段自动补充）
+        6. 股票在线数据源（akshare/pytdx/baostock，通过data_source参数切换）
+        7. 已缓存的_api中的期货数据（无需重复输入账号密码）
+        8. _datas中已加载的原始数据（按名称匹配）
 
         Args:
             symbol (str | pd.DataFrame, optional): 数据标识，支持三种形式
@@ -608,7 +643,8 @@ class StrategyBase:
                 - e. _datas中有已加载数据 → 按名称匹配后复制
         6. 若指定 ``save`` 参数：将数据保存为CSV至本地（``BASE_DIR/data/test/``），
            并自动更新 ``data/utils.py``（生成 ``LocalDatas`` 引用工具类）
-        7. 数据截取：取最新 ``data_length`` 根K线（确保不小于最小要求）
+        7. 数据截取：取最新 ``data_length`` 根K线（确保不小于最小要求）；
+           分块回测时改为截取本块区间及预热K线
         8. 数据校验三重断言：
             - 类型必须是 ``pd.DataFrame``
             - 数据不能为空
@@ -669,16 +705,42 @@ class StrategyBase:
         # 防御性初始化：确保 data 变量在所有路径下都有定义
         # （正常情况下 data 必定在实盘/回测分支中被赋值，此处仅为代码分析器友好）
         data: pd.DataFrame | None = None
+        # 数据是否来自本地CSV（需按config起止时间截取）
+        from_csv = False
 
         # -------------------------- 4. 生成KLine唯一标识ID --------------------------
         # btid 用于关联策略ID（_sid）、数据索引（num）、图表索引，确保多策略/多数据源不混淆
         id = self._btklinedataset.num
+        # 批量回测（Bt.batch_run）：策略的首个K线数据替换为当前批次品种
+        if self._batch_symbol is not None and id == 0:
+            symbol = self._batch_symbol
         btid = BtID(self._sid, id, id)
         # name 记录原始symbol（字符串形式），用于KLine命名和save保存的文件名
         name = None
 
-        # -------------------------- 5. 模式分支：实盘 vs 回测 --------------------------
-        if self._is_live_trading:
+        # -------------------------- 5. 共享数据集（回测模式多策略去重） --------------------------
+        # 相同(数据来源, 合约, 周期, 数据范围)的数据只加载一次，命中时直接返回共享数据的视图
+        shared_key, shared_entry = None, None
+        # 外部DataFrame的键含其id，注册时保持对数据源的引用
+        shared_source = symbol if isinstance(symbol, pd.DataFrame) else None
+        if options._shared_datas and not self._is_live_trading and not save and self._chunk_window is None:
+            shared_key = shared_datas.make_key(
+                symbol, duration_seconds,
+                data_length if (data_length is not None and data_length >= 300) else 10000,
+                **{k: kwargs.get(k) for k in _SHARED_KEY_KWARGS},
+                # 历史库按config起止时间读取区间
+                store_start=self.config.start_time, store_end=self.config.end_time)
+            shared_entry = shared_datas.get(shared_key)
+
+        # -------------------------- 6. 模式分支：共享数据 vs 实盘 vs 回测 --------------------------
+        if shared_entry is not None:
+            data = shared_datas.view(shared_entry)
+            name = symbol if isinstance(symbol, str) and symbol else None
+            # 弹出仅用于数据获取的参数，避免传入KLine
+            for k in _FETCH_KWARGS:
+                kwargs.pop(k, None)
+
+        elif self._is_live_trading:
             # ========== 4a. 实盘模式：从TQSDK实时获取K线 ==========
             # 实盘对数据长度要求低（只需满足指标计算窗口），默认300根保证足够长度
             # 若用户传入有效值（>=10），则尊重用户指定的数据量
@@ -704,11 +766,24 @@ class StrategyBase:
             # ---- 4b.1 处理symbol为字符串的情况（期货/股票代码或文件路径） ----
             if isinstance(symbol, str) and symbol:
                 name = symbol  # 记录原始symbol字符串，用于后续命名
-                # 策略一：优先加载本地CSV文件（最快，不需要网络）
-                symbol_path = os.path.join(
-                    BASE_DIR, "data", "test", f"{symbol}.csv")
-                if os.path.exists(symbol_path):
-                    symbol = pd.read_csv(symbol_path)
+                symbol_path = local_registry.path(symbol)
+                # 策略零：本地K线历史库，只读取所需区间（config起止时间内最后data_length根）
+                if bar_store.exists(symbol, duration_seconds):
+                    if self._chunk_window is not None:
+                        # 分块回测：只读取本块区间及预热K线
+                        symbol = self._chunk_window.read_store(
+                            bar_store, symbol, duration_seconds, id == 0)
+                    else:
+                        symbol = bar_store.read(
+                            symbol, duration_seconds, start=self.config.start_time,
+                            end=self.config.end_time, length=data_length)
+                    # 与本地CSV一致：不带时区的时间按UTC处理（见__check_and_add_fileds）
+                    if symbol["datetime"].dt.tz is None:
+                        symbol["datetime"] = symbol["datetime"].dt.tz_localize("UTC")
+                # 策略一：加载本地CSV文件（不需要网络）
+                elif symbol_path is not None:
+                    symbol = csv_cache.read(symbol_path, parse_datetime=False)
+                    from_csv = True
                 # 策略二：symbol本身是一个已存在的文件路径（如绝对路径）
                 elif os.path.exists(symbol):
                     symbol = read_unknown_file(symbol)
@@ -789,21 +864,27 @@ class StrategyBase:
                     f"请检查symbol参数是否正确，或提供user_name/password连接TQSDK。"
                 )
 
-        # -------------------------- 6. 数据保存到本地CSV --------------------------
+        # -------------------------- 7. 数据保存到本地CSV --------------------------
         if save and isinstance(data, pd.DataFrame):
-            # 保存数据文件到 BASE_DIR/data/test/ 目录，
-            # 并自动更新 data/utils.py 生成 LocalDatas 引用
+            # 保存数据文件到用户数据目录（~/.minibt/datas），保存后可通过 LocalDatas 按名称访问
             save_and_generate_utils(data, BASE_DIR, save, name)
             # 对保存的数据执行预处理（消除跳空、截取日期范围等）
             data = self.__process_data(data)
 
-        # -------------------------- 7. 数据截取 --------------------------
+        # 本地CSV与历史库一致：按config起止时间截取后再取最后data_length根（历史库读取时已截取）
+        if from_csv and self._chunk_window is None:
+            data = self.__get_datetime_segment(data)
+
+        # -------------------------- 8. 数据截取 --------------------------
         # 回测模式下取最新 data_length 根K线（实盘模式已在TQSDK调用中指定长度，无需二次截取）
         # 仅在 data_length >= 300 时才执行截取，避免对极小数据集误截断
-        if isinstance(data_length, int) and data_length >= 300 and len(data) > data_length:
+        # 分块回测（Bt.chunked_run）按本块区间截取（含预热K线），不按 data_length 截取
+        if self._chunk_window is not None and isinstance(data, pd.DataFrame):
+            data = self._chunk_window.slice(data, id == 0)
+        elif isinstance(data_length, int) and data_length >= 300 and len(data) > data_length:
             data = data[-data_length:]
 
-        # -------------------------- 8. 数据校验（三重断言防线） --------------------------
+        # -------------------------- 9. 数据校验（三重断言防线） --------------------------
         assert isinstance(
             data, pd.DataFrame
         ), f"数据类型 {type(data).__name__}，非pd.DataFrame类型，请检查数据获取逻辑"
@@ -817,10 +898,22 @@ class StrategyBase:
             f"实际数据列为:{list(data.columns)}，"
             f"缺失列:{set(FILED.ALL) - set(data.columns)}")
 
-        # -------------------------- 9. 封装为KLine对象 --------------------------
+        # -------------------------- 10. 注册共享数据集 --------------------------
+        if shared_key is not None and shared_entry is None:
+            shared_entry = shared_datas.add(shared_key, data, shared_source)
+            data = shared_datas.view(shared_entry)
+        if shared_entry is not None and shared_entry.base is not None:
+            # KLine的原始数据与备份数据直接引用共享数据，不再各自复制
+            kwargs.update(dict(kline_object=shared_entry.data,
+                          copy_object=shared_entry.base))
+
+        # -------------------------- 11. 封装为KLine对象 --------------------------
         # 生成KLine的名称：有原始symbol则用 {symbol}_{周期} 格式，否则用 datas{plot_id} 格式
         name = f"{name}_{duration_seconds}" if name else f"datas{btid.plot_id}"
-        return KLine(data, id=btid, sname=name, ind_name=name, **kwargs)
+        kline = KLine(data, id=btid, sname=name, ind_name=name, **kwargs)
+        if shared_entry is not None:
+            kline._shared_key = shared_key
+        return kline
 
     def __check_and_add_fileds(self, data: pd.DataFrame, price_tick=1e-2, volume_multiple=1.) -> pd.DataFrame:
         """
@@ -1257,8 +1350,8 @@ class StrategyBase:
         # 3. 实时更新K线数据（从TQSDK同步最新数据）
         [kline._inplace_values()
             for kline in self._btklinedataset.values()]
-        # 4. 策略初始化（重新计算指标，适应实时数据）
-        self._strategy_init()
+        # 4. 策略初始化（重新计算指标，适应实时数据；支持的内置指标流式更新末端K线）
+        self._run_strategy_init()
 
         # 5. RL模式：获取智能体动作（无梯度计算，避免性能消耗）
         if self.rl:
@@ -1319,26 +1412,34 @@ class StrategyBase:
         else:
             if self._isbacktrader_form_signals:
                 self.__signal_results = self._bt_from_signals_func()
+            elif self._target_positions is not None:
+                # 目标仓位模式：跳过next()，由撮合循环逐根执行目标仓位
+                self.__run_target_positions(start_index, end_index)
             else:
-                # 优化：减少属性访问开销，直接使用局部变量
-                btklinedataset = self._btklinedataset
-                btindicatordataset = self._btindicatordataset
-                account = self._account
-                data_patching = self._data_patching
-                # 优化：使用for循环替代list(map(...))，减少函数调用开销
-                for i in range(start_index, end_index):
-                    self._btindex += 1
-                    if data_patching:
-                        btklinedataset.update_values()
-                        btindicatordataset.update_values()
-                    self.step()
-                    # 每次迭代检查 self._isstop，因为止损可能在 step() 中被设置
-                    if self._isstop:
-                        # 优化：使用for循环替代列表推导式，减少函数调用开销
-                        for data in btklinedataset.values():
-                            if data._klinesetting.isstop:
-                                data.stop.update()
-                    account.update_history()
+                clock = self._build_master_clock()
+                if clock is not None:
+                    # 多合约主事件时钟：各KLine只在自身有K线的事件上前进
+                    self.__run_master_clock(clock, start_index, max_length)
+                else:
+                    # 优化：减少属性访问开销，直接使用局部变量
+                    btklinedataset = self._btklinedataset
+                    btindicatordataset = self._btindicatordataset
+                    account = self._account
+                    data_patching = self._data_patching
+                    # 优化：使用for循环替代list(map(...))，减少函数调用开销
+                    for i in range(start_index, end_index):
+                        self._btindex += 1
+                        if data_patching:
+                            btklinedataset.update_values()
+                            btindicatordataset.update_values()
+                        self.step()
+                        # 每次迭代检查 self._isstop，因为止损可能在 step() 中被设置
+                        if self._isstop:
+                            # 优化：使用for循环替代列表推导式，减少函数调用开销
+                            for data in btklinedataset.values():
+                                if data._klinesetting.isstop:
+                                    data.stop.update()
+                        account.update_history()
 
         # 4. 回测收尾：执行策略停止逻辑、获取结果、初始化分析工具
         self.stop()          # 策略停止钩子（子类重写，如平仓、释放资源）
@@ -1347,6 +1448,226 @@ class StrategyBase:
         # 5. 标记回测结束，重置初始化状态
         self._in_next_context = False
         
+    def _build_master_clock(self) -> MasterClock | None:
+        """
+        ## 按options.set_master_clock创建多合约主事件时钟
+        - 'auto'：各合约（非resample/replay）K线时间索引不同时启用
+        - 数据修补模式下K线数据逐根替换，不启用
+
+        Returns:
+            MasterClock | None: 主事件时钟，不启用时为None
+        """
+        mode = options._master_clock
+        if not mode or self._data_patching:
+            return None
+        klines = self._btklinedataset
+        if mode == 'auto' and not MasterClock.needed(klines):
+            return None
+        return MasterClock.from_klines(klines)
+
+    def __run_master_clock(self, clock: MasterClock, start_index: int, max_length: int):
+        """
+        ## 按主事件时钟逐事件回测
+        - 每个事件执行一次step()，各KLine（及其指标）的btindex为自身游标，只在自身有K线的事件上前进
+        - 停止器更新、订单撮合与账户历史只针对本事件真实更新的KLine，
+          各Broker历史记录长度与所属KLine长度一致，没有前向填充的虚假K线
+        - 结束后恢复按索引访问（_btindex为最长数据的末尾索引）
+
+        Args:
+            clock (MasterClock): 主事件时钟
+            start_index (int): 预热期最后一根K线的索引
+            max_length (int): 最长K线数据长度
+        """
+        btklinedataset = self._btklinedataset
+        account = self._account
+        self._clock = clock
+        try:
+            for event in clock.events(start_index):
+                self._btindex = event
+                self.step()
+                if self._isstop:
+                    for data in btklinedataset.values():
+                        if data._klinesetting.isstop and clock.is_updated(data.data_id):
+                            data.stop.update()
+                account.update_history(clock)
+        finally:
+            self._clock = None
+            self._btindex = max_length - 1
+
+    def _run_strategy_init(self) -> Any:
+        """
+        ## 执行用户初始化逻辑（_strategy_init），按运行模式启用指标复用
+        - 初始化期间相同(数据源, 指标, 参数)的调用返回同一指标对象（options.set_indicator_cse）
+        - 实盘：支持的内置指标流式更新末端K线（options.set_streaming_indicators）
+        - 参数优化：相同(数据, 指标, 参数)的计算结果跨参数组复用（options.set_indicator_cache）
+        - 参数优化/无图表回测：指标以raw模式创建（options.set_raw_indicators）
+
+        Returns:
+            Any: _strategy_init的返回值（目标仓位模式下为目标仓位）
+        """
+        with ExitStack() as stack:
+            if options._indicator_cse:
+                self._cse_context = stack.enter_context(cse(CSEContext()))
+            if self._is_live_trading and options._streaming_indicators:
+                if self._streaming_context is None:
+                    self._streaming_context = StreamingContext()
+                stack.enter_context(streaming(self._streaming_context))
+            elif self._isoptimize and options._indicator_cache:
+                stack.enter_context(indicator_cache.activate())
+            if self._use_raw_indicators():
+                stack.enter_context(raw_indicators())
+            result = self._strategy_init()
+        if self._cse_context is not None and self._cse_context.reuses and not self._is_live_trading:
+            self.logger.debug(
+                f"指标复用：{self._cse_context.reuses}次\n{self._cse_context.report().to_string()}")
+        return result
+
+    def _use_raw_indicators(self) -> bool:
+        """是否以raw模式创建指标（options.set_raw_indicators，见minibt.indicators.raw）"""
+        mode = options._raw_indicators
+        if mode != 'auto':
+            return bool(mode)
+        if self._is_live_trading or self._isreplay or options._data_patching:
+            return False
+        return bool(self._isoptimize or self._headless)
+
+    def indicator_reuse_report(self) -> pd.DataFrame:
+        """
+        ## 指标复用报告（公共子表达式消除）
+        - 最近一次策略初始化中各指标调用的次数与复用次数（options.set_indicator_cse）
+
+        Returns:
+            pd.DataFrame: 列为 indicator、params、source、calls、reuses，按复用次数降序
+        """
+        if self._cse_context is None:
+            return CSEContext().report()
+        return self._cse_context.report()
+
+    def _set_target_positions(self, targets: Any) -> None:
+        """
+        ## 设置目标仓位模式（策略__init__的返回值）
+        - 返回None时为常规事件驱动模式；返回目标仓位数组时跳过next()，由撮合循环执行
+
+        Args:
+            targets: 目标仓位（正数多头，负数空头，0平仓，NaN不交易）
+                - 单个数组（np.ndarray / pd.Series / IndSeries / list）：对应主合约
+                - list/tuple[数组]：按K线数据添加顺序（不含resample/replay数据）对应各合约
+                - dict[KLine | str, 数组]：按K线对象或名称指定合约
+        """
+        self._target_positions = None
+        if targets is None or self._is_live_trading or self.rl:
+            return
+        brokers = self._account.brokers
+        assert brokers, "目标仓位模式需要回测账户"
+
+        def get_broker(kline) -> int:
+            if isinstance(kline, str):
+                assert kline in self._btklinedataset, f"K线数据{kline}不存在"
+                kline = self._btklinedataset[kline]
+            data = kline.source_object if kline.isresample or kline.isreplay else kline
+            assert data._broker in brokers, "目标仓位对应的K线数据未关联账户"
+            return brokers.index(data._broker)
+
+        if isinstance(targets, dict):
+            items = [(get_broker(k), v) for k, v in targets.items()]
+        elif isinstance(targets, (list, tuple)) and targets and not np.isscalar(targets[0]):
+            assert len(targets) <= len(brokers), \
+                f"目标仓位数量{len(targets)}大于合约数量{len(brokers)}"
+            items = list(enumerate(targets))
+        else:
+            items = [(get_broker(self._btklinedataset.default_kline), targets)]
+
+        length = max(broker.length for broker in brokers)
+        matrix = np.full((length, len(brokers)), np.nan)
+        for index, target in items:
+            target = np.asarray(getattr(target, "values", target), dtype=np.float64)
+            assert target.ndim == 1, "目标仓位须为一维数组"
+            assert len(target) == brokers[index].length, \
+                f"目标仓位长度{len(target)}与K线数据长度{brokers[index].length}不一致"
+            # 与set_target_size一致：目标仓位按int()截断
+            matrix[:len(target), index] = np.trunc(target)
+        self._target_positions = matrix
+
+    def __run_target_positions(self, start_index: int, end_index: int):
+        """
+        ## 目标仓位模式回测循环（跳过next()）
+        - 无停止器、无交易日志且非回放模式时使用编译撮合循环，结果写入账户历史
+        - 否则逐根调用set_target_size并更新停止器（与事件驱动路径逐行一致）
+        """
+        account = self._account
+        brokers = account.brokers
+        targets = self._target_positions
+        if self._isstop or self.config.islog or account._isreplay:
+            btklinedataset = self._btklinedataset
+            for _ in range(start_index, end_index):
+                self._btindex += 1
+                index = self._btindex
+                for broker, target in zip(brokers, targets.T):
+                    if index < broker.length and not np.isnan(target[index]):
+                        self._set_target_size_back_trading(
+                            broker.kline, target[index])
+                if self._isstop:
+                    for data in btklinedataset.values():
+                        if data._klinesetting.isstop:
+                            data.stop.update()
+                account.update_history()
+            return
+
+        from .target import get_target_positions_engine, COMMISSION_TYPES
+        num, rows = len(brokers), end_index - start_index
+        close = np.full(targets.shape, np.nan)
+        for k, broker in enumerate(brokers):
+            close[:broker.length, k] = broker.kline._klinesetting.current_close
+        # 当前逐笔持仓（容量：已有笔数+每根K线至多一笔）
+        capacity = max(len(broker.mpsc.queue) for broker in brokers) + rows + 1
+        lots = np.zeros((num, capacity, 4))
+        nlots = np.zeros(num, dtype=np.int64)
+        for k, broker in enumerate(brokers):
+            for j, lot in enumerate(broker.mpsc.queue):
+                lots[k, j] = lot
+            nlots[k] = len(broker.mpsc.queue)
+        direction = np.array([broker.position.value for broker in brokers], dtype=np.int64)
+        cum_profits = np.array([broker.cum_profits for broker in brokers], dtype=np.float64)
+        broker_commission = np.array(
+            [broker.total_commission for broker in brokers], dtype=np.float64)
+        history = np.zeros((rows, num, 6))
+        engine = get_target_positions_engine()
+        available, total_profit, total_commission, fails = engine(
+            close, targets,
+            np.array([broker.length for broker in brokers], dtype=np.int64),
+            start_index, end_index, float(account._available),
+            float(account._total_profit), float(account._total_commission),
+            np.array([broker.margin_rate for broker in brokers], dtype=np.float64),
+            np.array([broker.volume_multiple for broker in brokers], dtype=np.float64),
+            np.array([broker.slip_point for broker in brokers], dtype=np.float64),
+            np.array([broker.commission_value for broker in brokers], dtype=np.float64),
+            np.array([COMMISSION_TYPES[list(broker.commission)[0]]
+                     for broker in brokers], dtype=np.int64),
+            direction, lots, nlots, cum_profits, broker_commission, history)
+
+        # 同步账户与Broker最终状态
+        self._btindex = end_index
+        account._available = available
+        account._total_profit = total_profit
+        account._total_commission = total_commission
+        for k, broker in enumerate(brokers):
+            broker.position = getattr(broker.poscreator, {1: "LONG", -1: "SHORT"}.get(
+                int(direction[k]), "FLAT"))(broker)
+            broker.mpsc.queue.clear()
+            broker.mpsc.queue.extend([m, p, int(size), c]
+                                     for m, p, size, c in lots[k, :nlots[k]].tolist())
+            broker.profit = 0.
+            broker.cum_profits = float(cum_profits[k])
+            broker.total_commission = float(broker_commission[k])
+            # 账户历史（仓位方向与手数为整数，与update_history一致）
+            result = history[:, k]
+            broker.history_queue.queue.extend(map(list, zip(
+                result[:, 0].tolist(), result[:, 1].astype(np.int64).tolist(),
+                result[:, 2].astype(np.int64).tolist(), result[:, 3].tolist(),
+                result[:, 4].tolist(), result[:, 5].tolist())))
+        if fails:
+            self.logger.warning(f"目标仓位模式：资金不足未成交{fails}次")
+
     def bt_from_signals(self,
                         entries:IndSeries | list[IndSeries],
                         exits:IndSeries | list[IndSeries],
@@ -2065,12 +2386,74 @@ class StrategyBase:
         }
         return self._backtest_metrics
 
+    def _to_ledger(self) -> dict:
+        """
+        ## 导出紧凑回测结果（供fork多进程回测时子进程返回）
+        - 仅包含账户历史数组、收益序列、交易明细与核心指标，不含K线与指标数据，进程间传输开销极小
+
+        Returns:
+            dict: 紧凑回测结果
+                - results: 各Broker账户历史数组（列见Broker.cols）
+                - index/profits: 收益序列的时间索引与数值
+                - trades: 各Broker仓位变化明细（[索引, 仓位, 手数, 累计盈亏]）
+                - metrics: 回测核心统计指标（见_compute_backtest_metrics）
+                - account: 账户摘要（权益、累计收益、累计手续费）
+        """
+        results = [result.values.astype(np.float64) for result in self._get_result()]
+        trades = []
+        for result in results:
+            positions = result[:, 1]
+            change = np.flatnonzero(np.diff(positions, prepend=0.) != 0.)
+            trades.append(np.column_stack(
+                [change, positions[change], result[change, 2], result[change, 4]]))
+        account = self._account
+        return dict(
+            sid=self._sid,
+            results=results,
+            index=np.asarray(self.profits.index),
+            profits=self.profits.values.astype(np.float64),
+            trades=trades,
+            metrics=self._compute_backtest_metrics(),
+            account=dict(balance=float(account.balance),
+                         total_profit=float(account._total_profit),
+                         total_commission=float(account._total_commission)),
+        )
+
+    def _from_ledger(self, ledger: dict) -> Strategy:
+        """
+        ## 由紧凑回测结果恢复策略回测结果（父进程调用）
+        - 恢复账户历史、收益序列、交易明细与核心指标
+        - Stats与QSPlots在首次访问时才创建（见stats/qs_plots属性）
+
+        Args:
+            ledger (dict): _to_ledger导出的紧凑回测结果
+
+        Returns:
+            Strategy: 当前策略实例
+        """
+        from ..utils import Broker
+        self._ledger = ledger
+        self._results = [pd.DataFrame(result, columns=Broker.cols)
+                         for result in ledger["results"]]
+        self.profits = pd.Series(
+            ledger["profits"], index=pd.Index(ledger["index"]))
+        self._net_worth = self.profits.pct_change()[1:]
+        self._trades = [pd.DataFrame(trade, columns=["index", "positions", "sizes", "cum_profits"])
+                        for trade in ledger["trades"]]
+        self._backtest_metrics = ledger["metrics"]
+        self._stats = None
+        self._qs_plots = None
+        return self
+
     @property
     def richprint(self):
         self.logger.print_strategy(self)
         
     @property
     def _print_account(self):
+        if self._ledger is not None:
+            # fork多进程回测仅返回账户摘要
+            return print(self._ledger["account"])
         self.logger.print_account(self._account,self._isbacktrader_form_signals)
 
     @property
@@ -2671,30 +3054,32 @@ class StrategyBase:
             pd.DataFrame: 按日期过滤后的K线数据
 
         ### 核心逻辑：
-        1. 日期格式统一：将字符串格式转换为datetime类型
+        1. 日期格式统一：datetime列与起止日期均转换为pd.Timestamp（本地CSV未解析时datetime列为字符串），
+           带时区的数据按其时区解释不带时区的起止日期（与K线历史库 `bar_store.read` 一致）
         2. 按日期过滤：保留在[start, end]范围内的数据
         3. 重置索引：确保过滤后索引连续
         """
+        start, end = self.config.start_time, self.config.end_time
+        if not (start or end):
+            return data
         try:
-            # 1. 按开始日期过滤
-            start = self.config.start_time
+            times = pd.to_datetime(data.datetime)
+            tz = times.dt.tz
+            keep = np.ones(len(times), dtype=bool)
+            # 1. 按开始日期过滤（保留>=开始日期的数据）
             if start:
-                # 统一日期格式（字符串转datetime）
-                if not isinstance(start, datetime):
-                    start = time_to_datetime(start)
-                # 保留>=开始日期的数据
-                data = data[data.datetime >= start]
-                data.reset_index(drop=True, inplace=True)
-
-            # 2. 按结束日期过滤
-            end = self.config.end_time
+                start = pd.Timestamp(start)
+                if tz is not None and start.tzinfo is None:
+                    start = start.tz_localize(tz)
+                keep &= (times >= start).to_numpy()
+            # 2. 按结束日期过滤（保留<=结束日期的数据）
             if end:
-                # 统一日期格式
-                if not isinstance(end, datetime):
-                    end = time_to_datetime(end)
-                # 保留<=结束日期的数据
-                data = data[data.datetime <= end]
-                data.reset_index(drop=True, inplace=True)
+                end = pd.Timestamp(end)
+                if tz is not None and end.tzinfo is None:
+                    end = end.tz_localize(tz)
+                keep &= (times <= end).to_numpy()
+            if not keep.all():
+                data = data[keep].reset_index(drop=True)
         except Exception:
             # 捕获所有异常，避免日期格式错误影响后续流程
             pass
@@ -2898,6 +3283,10 @@ class StrategyBase:
             Stats: 统计分析对象（未初始化则返回None）
         """
         """分析器"""
+        if self._stats is None and self._ledger is not None:
+            # fork多进程回测结果：首次访问时创建
+            self._stats = Stats(self.profits, index=self.profits.index,
+                                name='profit', available=self.config.value)
         return self._stats
 
     @property
@@ -2910,6 +3299,9 @@ class StrategyBase:
             QSPlots: 绘图对象（未初始化则返回None）
         """
         """qs中的plot"""
+        if self._qs_plots is None and self._ledger is not None:
+            self._qs_plots = QSPlots(
+                self.profits, index=self.profits.index, name='net_worth')
         return self._qs_plots
 
     @property
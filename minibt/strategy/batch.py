@@ -0,0 +1,275 @@
+# -*- encoding: utf-8 -*-
+"""
+## 批量回测（策略 × 品种 × 参数矩阵）
+
+- 同一策略类在多个品种、多组参数上批量回测，无需逐个 `addstrategy`
+- 以品种为调度单元：每个品种在一个进程内只加载一次数据，
+  该品种的所有参数组在同一策略实例上以优化模式复用数据依次回测
+- 多品种在进程池中并行执行，按完成顺序打印进度
+- 失败隔离：单个品种加载失败或单组参数回测异常只影响对应行，不中断整个批次
+- 输出以 (symbol, params) 为索引的指标 DataFrame
+
+### 说明：
+- 批次品种替换策略 `__init__` 中首次调用 `get_kline` 的 symbol，
+  其余 `get_kline`（如辅助品种）保持不变
+- 子进程优先以fork方式创建（继承父进程的数据与接口），
+  不支持fork的平台以spawn方式创建，策略类需定义在可导入的模块中
+"""
+from __future__ import annotations
+import time
+from typing import TYPE_CHECKING, Iterable
+from ..utils import Addict, Base, np, pd, MAX_WORKERS
+from .walkforward import param_grid
+
+if TYPE_CHECKING:
+    from .strategy import Strategy
+
+
+def _params_label(params: dict, keys: Iterable[str]) -> str:
+    """参数组标签（仅包含批次中变化的参数），用作结果索引"""
+    label = ",".join(f"{k}={params[k]}" for k in keys if k in params)
+    return label or "default"
+
+
+def _collect_metrics(strategy: Strategy, metrics: list[str] | None) -> dict:
+    """提取单组参数回测的核心指标（见StrategyBase._compute_backtest_metrics）"""
+    strategy._backtest_metrics = None
+    result = dict(strategy._compute_backtest_metrics() or {})
+    result.pop('formatted', None)
+    result['final_value'] = float(strategy.profits.values[-1])
+    if not metrics:
+        return result
+    row = {}
+    for metric in metrics:
+        if metric in result:
+            row[metric] = result[metric]
+            continue
+        # 非核心指标：从Stats获取
+        try:
+            value = getattr(strategy._stats, metric)()
+            value = value if isinstance(
+                value, (float, int)) else list(value)[-1]
+            row[metric] = float(value) if value else 0.
+        except Exception:
+            row[metric] = np.nan
+    return row
+
+
+def _run_symbol_batch(strategy: type[Strategy], symbol: str | pd.DataFrame,
+                      candidates: list[dict], metrics: list[str] | None) -> list[tuple]:
+    """## 单品种批量回测（进程池任务）
+
+    - 首组参数完成数据加载与回测，后续参数组复用已加载的数据（优化模式）
+
+    Returns:
+        list[tuple]: [(参数序号, 指标字典 | None, 错误信息 | None, 耗时), ...]
+    """
+    from ..utils import StrategyInstances
+    Base._strategy_instances = StrategyInstances()
+    rows = []
+    instance = None
+    for i, params in enumerate(candidates):
+        start_time = time.perf_counter()
+        try:
+            if instance is None:
+                instance: Strategy = strategy(
+                    _isoptimize=True, _batch_symbol=symbol, params=Addict(params))
+                instance._start_strategy_run()
+                # 数据已加载，后续参数组的get_kline直接复用
+                instance._first_start = True
+            else:
+                instance._run_single_param_set(Addict(params))
+            rows.append((i, _collect_metrics(instance, metrics), None,
+                         time.perf_counter()-start_time))
+        except Exception as e:
+            rows.append((i, None, f"{type(e).__name__}: {e}",
+                         time.perf_counter()-start_time))
+            if instance is not None and not instance._first_start:
+                instance = None  # 数据加载失败，下一组参数重新尝试
+    if instance is not None and hasattr(instance._api, "close"):
+        instance._api.close()
+    Base._strategy_instances = StrategyInstances()
+    return rows
+
+
+class BatchResult:
+    """## 批量回测结果容器
+
+    通过 :meth:`Bt.batch_run` 创建，无需手动实例化。
+
+    ### 核心属性：
+    - ``metrics``: 以 (symbol, params) 为索引的指标 DataFrame（失败行为NaN）
+    - ``errors``: 失败明细 DataFrame（symbol、params、error）
+    - ``params``: 参数组标签到完整参数字典的映射
+    - ``total_time``: 总耗时（秒）
+
+    ### 分析接口：
+    - ``.pprint()``: 格式化打印结果
+    - ``.to_dataframe()``: 返回指标 DataFrame
+    - ``.best(metric, n)``: 按指标排序取前n行
+    """
+
+    def __init__(self, metrics: pd.DataFrame, errors: pd.DataFrame,
+                 params: dict[str, dict], total_time: float = 0.):
+        self.metrics = metrics
+        self.errors = errors
+        self.params = params
+        self.total_time = total_time
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """返回以 (symbol, params) 为索引的指标 DataFrame"""
+        return self.metrics.copy()
+
+    def best(self, metric: str = 'final_return', n: int = 10, ascending: bool = False) -> pd.DataFrame:
+        """按指标排序取前n行
+
+        Args:
+            metric (str): 排序指标. 默认'final_return'
+            n (int): 行数. 默认10
+            ascending (bool): 是否升序. 默认False
+        """
+        assert metric in self.metrics.columns, f"指标{metric}不存在，可选{list(self.metrics.columns)}"
+        return self.metrics.sort_values(metric, ascending=ascending).head(n)
+
+    def pprint(self):
+        """格式化打印批量回测结果与失败明细"""
+        symbols = self.metrics.index.get_level_values(
+            'symbol').unique() if len(self.metrics) else []
+        print(f"\n{'='*60}")
+        print(f" 批量回测  |  品种: {len(symbols)}  |  任务: {len(self.metrics)}  |  失败: {len(self.errors)}")
+        print(f"{'='*60}")
+        with pd.option_context('display.max_columns', None, 'display.width', 200):
+            print(self.metrics)
+            if len(self.errors):
+                print(f"{'-'*60}")
+                print(self.errors.to_string(index=False))
+        print(f"{'='*60}")
+        print(f" 总耗时: {self.total_time:.2f}秒")
+        print(f"{'='*60}")
+
+
+class BatchRunner:
+    """## 批量回测执行器
+
+    Args:
+        strategy (type[Strategy]): 策略类（非实例）
+        symbols (Iterable | dict): 品种列表（合约代码、LocalDatas数据或DataFrame），
+            dict时键为结果中的品种标签
+        params (list[dict] | None): 参数组列表，未提供的参数取策略默认值. 默认None
+        metrics (list[str] | None): 输出指标，默认全部核心指标
+            （可为_compute_backtest_metrics中的键或Stats方法名）
+        n_jobs (int | str): 并行进程数，'max'或-1为最大进程数. 默认'max'
+        show_bar (bool): 是否打印进度. 默认True
+        **grid: 参数网格，格式同 `Bt.optstrategy`，与params合并
+    """
+
+    def __init__(self, strategy: type[Strategy], symbols: Iterable | dict,
+                 params: list[dict] | None = None, metrics: list[str] | None = None,
+                 n_jobs: int | str = 'max', show_bar: bool = True, **grid):
+        if isinstance(symbols, dict):
+            labels, symbols = list(symbols.keys()), list(symbols.values())
+        else:
+            symbols = [symbols,] if isinstance(
+                symbols, (str, pd.DataFrame)) else list(symbols)
+            labels = [self._symbol_label(symbol, i)
+                      for i, symbol in enumerate(symbols)]
+        assert symbols, "品种列表不能为空"
+        assert len(set(labels)) == len(labels), "品种标签重复，请使用dict指定标签"
+        if isinstance(metrics, str):
+            metrics = [metrics,]
+        self.strategy = strategy
+        self.symbols = symbols
+        self.labels = labels
+        self.metrics = list(metrics) if metrics else None
+        self.n_jobs = MAX_WORKERS if n_jobs in (
+            'max', -1) else max(int(n_jobs), 1)
+        self.show_bar = show_bar
+        self.candidates = self._candidates(params, grid)
+
+    @staticmethod
+    def _symbol_label(symbol: str | pd.DataFrame, i: int) -> str:
+        if isinstance(symbol, str):
+            return str(symbol)
+        name = getattr(symbol, "name", None)
+        return name if isinstance(name, str) and name else f"data{i}"
+
+    def _candidates(self, params: list[dict] | None, grid: dict) -> list[dict]:
+        """合并参数组列表与参数网格"""
+        default_params = dict(self.strategy.params or {})
+        candidates = []
+        if params:
+            if isinstance(params, dict):
+                params = [params,]
+            for p in params:
+                assert isinstance(p, dict), "params须为dict列表"
+                candidates.append({**default_params, **p})
+        if grid:
+            candidates.extend(dict(p)
+                              for p in param_grid(default_params, grid))
+        return candidates or [default_params]
+
+    def run(self) -> BatchResult:
+        """## 执行批量回测
+
+        ### 执行步骤：
+        1. 以品种为单位提交进程池任务（每品种数据只加载一次）
+        2. 按完成顺序收集结果并打印进度，单个任务失败不影响其它任务
+        3. 整理为以 (symbol, params) 为索引的指标 DataFrame
+
+        Returns:
+            BatchResult: 批量回测结果
+        """
+        total_start = time.perf_counter()
+        keys = [k for k in self.candidates[0]
+                if len({repr(p.get(k)) for p in self.candidates}) > 1]
+        param_labels = [_params_label(p, keys) for p in self.candidates]
+        num = len(self.symbols)
+        results: dict[int, list[tuple]] = {}
+
+        def update(index: int, rows: list[tuple]):
+            results[index] = rows
+            if self.show_bar:
+                failed = sum(row[2] is not None for rows in results.values()
+                             for row in rows)
+                print(f"\r批量回测进度：{len(results)}/{num} 品种  失败: {failed}", end="")
+
+        n_jobs = min(self.n_jobs, num)
+        if n_jobs > 1:
+            import multiprocessing as mp
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            method = 'fork' if 'fork' in mp.get_all_start_methods() else 'spawn'
+            with ProcessPoolExecutor(n_jobs, mp_context=mp.get_context(method)) as executor:
+                futures = {executor.submit(_run_symbol_batch, self.strategy, symbol,
+                                           self.candidates, self.metrics): i
+                           for i, symbol in enumerate(self.symbols)}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        rows = future.result()
+                    except Exception as e:
+                        # 进程级失败（如子进程崩溃、结果无法序列化）
+                        rows = [(i, None, f"{type(e).__name__}: {e}", 0.)
+                                for i in range(len(self.candidates))]
+                    update(index, rows)
+        else:
+            for index, symbol in enumerate(self.symbols):
+                update(index, _run_symbol_batch(
+                    self.strategy, symbol, self.candidates, self.metrics))
+        if self.show_bar:
+            print()
+
+        records, errors, index = [], [], []
+        for i, label in enumerate(self.labels):
+            for j, row, error, cost in results[i]:
+                index.append((label, param_labels[j]))
+                records.append({**(row or {}), 'time': round(cost, 4)})
+                if error is not None:
+                    errors.append(dict(symbol=label, params=param_labels[j], error=error))
+        metrics = pd.DataFrame(records, index=pd.MultiIndex.from_tuples(
+            index, names=['symbol', 'params']))
+        if self.metrics:
+            metrics = metrics.reindex(columns=[*self.metrics, 'time'])
+        return BatchResult(metrics,
+                           pd.DataFrame(errors, columns=['symbol', 'params', 'error']),
+                           dict(zip(param_labels, self.candidates)),
+                           round(time.perf_counter()-total_start, 4))
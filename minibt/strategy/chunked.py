@@ -0,0 +1,517 @@
+# -*- encoding: utf-8 -*-
+"""
+## 分块回测（Out-of-Core Chunked Backtest）
+
+- 长周期（如十年1分钟）多品种回测需要同时在内存中保存全部K线、指标与账户历史，
+  数据量大时内存不足
+- 按时间将回测区间切分为若干块，每块新建策略实例，只加载本块区间及其前面的预热K线，
+  在本块数据上重新执行 `_strategy_init`（重新计算指标）与交易循环
+- 预热长度自动确定：首块初始化后取各指标开头连续NaN的最大根数
+  （与 `min_start_length` 取大）乘以 `warmup_factor`（默认10，EMA等递归类指标约需10倍周期才收敛），
+  之后每块比较预热末根K线（即上一块最后一根）的指标值与上一块是否一致，不一致时预热长度加倍并重新加载本块
+- Broker/BtAccount状态（持仓方向、逐笔持仓、可用资金、累计盈亏与手续费）在块边界结转到下一块
+- 每块只保留块区间内（去掉预热部分）的账户历史，按Broker追加写入磁盘（定长记录），
+  回测结束后以 `np.memmap` 拼接读取，不在内存中累积
+- `verify()` 以普通内存回测（`Bt.run`）为基准，逐Broker比较拼接后的账户历史
+
+### 说明：
+- 本地K线历史库（`minibt.data.store`）中的数据按区间读取，每块只读取所需记录；
+  其它数据源（本地CSV、DataFrame）仍整体加载后按区间截取，只节省指标与账户历史的内存
+- 块边界上尚未成交的挂单（限价/止损单）、停止器（止盈止损）状态不结转
+- 预热收敛只比较与首个K线数据等长的指标（其它周期的指标使用同一预热长度）
+- 非最后一块不调用策略的 `stop()`（避免策略在块边界平仓）
+- 仅支持单策略（取第一个策略），不支持强化学习模式
+"""
+from __future__ import annotations
+import os
+import gc
+import copy
+import time
+import shutil
+import tempfile
+import warnings
+import contextlib
+from io import StringIO
+from functools import partial
+from queue import LifoQueue
+from typing import TYPE_CHECKING
+from ..utils import Base, BtPosition, StrategyInstances, np, pd
+
+if TYPE_CHECKING:
+    from .strategy import Strategy
+    from ..data.store import BarStore
+
+
+def _stamps(column: pd.Series) -> np.ndarray:
+    """时间列 → int64纳秒时间戳（带时区的时间去掉时区）"""
+    stamps = pd.to_datetime(column)
+    if getattr(stamps.dt, "tz", None) is not None:
+        stamps = stamps.dt.tz_localize(None)
+    return stamps.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _to_ns(value) -> int | None:
+    return None if value is None else int(pd.Timestamp(value).as_unit("ns").value)
+
+
+class ChunkWindow:
+    """## 分块回测的数据区间（由 `Strategy.get_kline` 使用）
+
+    - 首个K线数据（id为0）绑定数据源的时间范围，并在未指定时确定本块起止时间
+    - 每个K线数据取 [start, end] 内的全部K线，及start之前最多 `warmup` 根预热K线
+
+    Args:
+        start (int | None): 本块开始时间（纳秒，含）. None为数据开头
+        freq (int | None): 块时间跨度（纳秒），None为到数据末尾. 默认None
+        warmup (int): 预热K线根数. 默认0
+        limit (int | None): 回测结束时间（纳秒，含）. 默认None
+    """
+
+    def __init__(self, start: int | None = None, freq: int | None = None,
+                 warmup: int = 0, limit: int | None = None):
+        self.start = start
+        self.end: int | None = None
+        self.freq = freq
+        self.warmup = max(int(warmup), 0)
+        self.limit = limit
+        # 首个K线数据源的首尾时间
+        self.first: int | None = None
+        self.last: int | None = None
+        self._resolve()
+
+    def _resolve(self) -> None:
+        """由开始时间、块跨度与回测结束时间确定本块结束时间"""
+        if self.start is None or self.end is not None:
+            return
+        if self.freq is not None:
+            self.end = self.start + self.freq - 1
+            if self.limit is not None:
+                self.end = min(self.end, self.limit)
+        else:
+            self.end = self.limit
+
+    def _bind(self, first: int, last: int) -> None:
+        # 只绑定一次：从历史库读取的数据在get_kline中仍会经过slice，不能以本块区间覆盖数据源范围
+        if self.last is not None:
+            return
+        self.first, self.last = first, last
+        if self.start is None:
+            self.start = first
+            self._resolve()
+
+    def read_store(self, store: BarStore, symbol: str, cycle: int, primary: bool) -> pd.DataFrame:
+        """## 从K线历史库读取本块区间及预热K线（只映射所需记录块）"""
+        if primary:
+            info = store.info(symbol, cycle)
+            if info["rows"]:
+                self._bind(*map(int, _stamps(pd.Series([info["first"], info["last"]]))))
+        # 区间为不带时区的纳秒时间戳（见_stamps），以Timestamp传入由历史库按入库时区解释
+        start = None if self.start is None else pd.Timestamp(self.start)
+        end = None if self.end is None else pd.Timestamp(self.end)
+        data = store.read(symbol, cycle, start=start, end=end)
+        if self.warmup and start is not None:
+            head = store.read(symbol, cycle, end=start - pd.Timedelta(1), length=self.warmup)
+            if len(head):
+                data = pd.concat([head, data], ignore_index=True)
+        return data
+
+    def slice(self, data: pd.DataFrame, primary: bool) -> pd.DataFrame:
+        """## 截取本块区间及预热K线"""
+        stamps = _stamps(data["datetime"])
+        if primary and stamps.size:
+            self._bind(int(stamps[0]), int(stamps[-1]))
+        lo = 0 if self.start is None else int(np.searchsorted(stamps, self.start, side="left"))
+        hi = stamps.size if self.end is None else int(np.searchsorted(stamps, self.end, side="right"))
+        lo = max(lo - self.warmup, 0)
+        if lo == 0 and hi == stamps.size:
+            return data
+        return data.iloc[lo:hi].reset_index(drop=True)
+
+    @property
+    def is_last(self) -> bool:
+        """本块是否已到达数据末尾或回测结束时间"""
+        if self.end is None or self.last is None or self.end >= self.last:
+            return True
+        return self.limit is not None and self.end >= self.limit
+
+    def __repr__(self) -> str:
+        start = None if self.start is None else pd.Timestamp(self.start)
+        end = None if self.end is None else pd.Timestamp(self.end)
+        return f"ChunkWindow(start={start}, end={end}, warmup={self.warmup})"
+
+
+def _indicator_warmup(strategy: Strategy) -> int:
+    """指标开头连续NaN的最大根数"""
+    lead = 0
+    for indicator in strategy._btindicatordataset.values():
+        try:
+            values = np.asarray(getattr(indicator, "pandas_object", indicator), dtype=np.float64)
+        except (TypeError, ValueError):
+            continue
+        if values.ndim == 0 or values.shape[0] == 0:
+            continue
+        valid = ~np.isnan(values.reshape(values.shape[0], -1))
+        columns = valid.any(axis=0)
+        if columns.any():
+            lead = max(lead, int(valid.argmax(axis=0)[columns].max()))
+    return lead
+
+
+def _indicator_rows(strategy: Strategy, index: int) -> list[np.ndarray | None]:
+    """与首个K线数据等长的各指标第index根K线的值（其它指标为None）"""
+    size = len(strategy._btklinedataset.default_kline.pandas_object)
+    rows = []
+    for indicator in strategy._btindicatordataset.values():
+        row = None
+        try:
+            values = np.asarray(getattr(indicator, "pandas_object", indicator), dtype=np.float64)
+            if values.ndim and values.shape[0] == size:
+                row = values[index].ravel().copy()
+        except (TypeError, ValueError):
+            ...
+        rows.append(row)
+    return rows
+
+
+def _capture_state(strategy: Strategy) -> dict:
+    """块结束时的账户与各Broker状态"""
+    account = strategy._account
+    brokers = []
+    for broker in account.brokers:
+        if broker._pending_orders or broker._active_orders:
+            warnings.warn(f"{broker.__name__} 在块边界有未成交订单，分块回测不结转挂单")
+        brokers.append(dict(
+            position=int(broker.position),
+            mpsc=[list(item) for item in broker.mpsc.queue],
+            cum_profits=broker.cum_profits,
+            total_commission=broker.total_commission,
+        ))
+    return dict(
+        account=dict(_available=account._available, _total_profit=account._total_profit,
+                     _total_commission=account._total_commission),
+        brokers=brokers)
+
+
+def _restore_state(strategy: Strategy, state: dict) -> None:
+    """将上一块结束时的状态结转到本块账户"""
+    account = strategy._account
+    assert len(account.brokers) == len(state["brokers"]), "各块的Broker数量不一致，无法结转账户状态"
+    for name, value in state["account"].items():
+        setattr(account, name, value)
+    for broker, record in zip(account.brokers, state["brokers"]):
+        broker.position = BtPosition(record["position"])(broker)
+        broker.mpsc = LifoQueue()
+        for item in record["mpsc"]:
+            broker.mpsc.put(list(item))
+        broker.cum_profits = record["cum_profits"]
+        broker.total_commission = record["total_commission"]
+
+
+def _run_chunk(strategy: type[Strategy], window: ChunkWindow, state: dict | None,
+               on_init=None) -> Strategy | None:
+    """## 在一个数据区间上回测
+
+    Args:
+        strategy (type[Strategy]): 策略类
+        window (ChunkWindow): 数据区间
+        state (dict | None): 上一块结束时的账户状态，None为首块
+        on_init (Callable | None): 指标初始化完成后的回调（首块用于确定预热长度，
+            之后的块用于检查预热是否充分，返回False时不回测）
+
+    Returns:
+        Strategy | None: 回测完成的策略实例，on_init返回False时为None
+    """
+    Base._strategy_instances = StrategyInstances()
+    instance: Strategy = strategy(config=copy.copy(strategy.config), _chunk_window=window)
+    instance._init_basic_components_before_start()
+    instance._set_target_positions(instance._run_strategy_init())
+    if on_init is not None and on_init(instance) is False:
+        return None
+    if state is not None:
+        # 预热K线不交易：从本块起点开始执行策略
+        data = instance._btklinedataset.default_kline
+        instance.min_start_length = int(np.searchsorted(
+            _stamps(data.pandas_object["datetime"]), window.start, side="left"))
+    instance._init_strategy_data()
+    if state is not None:
+        _restore_state(instance, state)
+    instance.start()
+    if not window.is_last:
+        # 非最后一块不调用策略的stop()，避免在块边界平仓
+        object.__setattr__(instance, "stop", lambda: None)
+    instance._execute_core_trading_loop()
+    return instance
+
+
+class ChunkedResult:
+    """## 分块回测结果容器
+
+    通过 :meth:`Bt.chunked_run` 创建，无需手动实例化。账户历史保存在磁盘上，按需内存映射读取。
+
+    ### 核心属性：
+    - ``path``: 账户历史目录（每个Broker一个 ``broker{i}.bin``）
+    - ``columns``: 账户历史列名
+    - ``names``: 各Broker名称
+    - ``chunks``: 各块明细 DataFrame（起止时间、K线数、耗时）
+    - ``warmup``: 预热K线根数
+    - ``total_time``: 总耗时（秒）
+
+    ### 分析接口：
+    - ``.history(i)``: 第i个Broker拼接后的账户历史（datetime索引）
+    - ``.equity``: 账户权益序列
+    - ``.summary()``: 核心指标（最终权益、收益率、最大回撤、手续费）
+    - ``.verify()``: 与普通内存回测（``Bt.run``）比较
+    - ``.pprint()``: 格式化打印结果
+    - ``.cleanup()``: 删除磁盘上的账户历史
+    """
+
+    def __init__(self, strategy: type[Strategy], path: str, columns: list[str], names: list[str],
+                 chunks: pd.DataFrame, warmup: int, start: int | None, end: int | None,
+                 total_time: float = 0.):
+        self.strategy = strategy
+        self.path = path
+        self.columns = columns
+        self.names = names
+        self.chunks = chunks
+        self.warmup = warmup
+        self.start = start
+        self.end = end
+        self.total_time = total_time
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype([("datetime", "<i8")] + [(name, "<f8") for name in self.columns])
+
+    def _records(self, i: int) -> np.ndarray:
+        path = os.path.join(self.path, f"broker{i}.bin")
+        rows = os.path.getsize(path) // self.dtype.itemsize
+        if rows == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(path, dtype=self.dtype, mode="r", shape=(rows,))
+
+    def history(self, i: int = 0) -> pd.DataFrame:
+        """## 第i个Broker拼接后的账户历史（列同 `Broker.cols`，datetime索引）"""
+        records = self._records(i)
+        return pd.DataFrame({name: records[name] for name in self.columns},
+                            index=pd.DatetimeIndex(records["datetime"].view("datetime64[ns]"),
+                                                   name="datetime"))
+
+    @property
+    def equity(self) -> pd.Series:
+        """## 账户权益序列"""
+        return self.history(0)["total_profit"]
+
+    def summary(self) -> dict:
+        """## 核心指标（K线数、最终权益、收益率、最大回撤、总手续费）"""
+        equity = self.equity.values
+        if equity.size == 0:
+            return dict(bars=0)
+        peak = np.maximum.accumulate(equity)
+        total_fee = sum(float(self._records(i)["total_fee"][-1])
+                        for i in range(len(self.names)) if self._records(i).size)
+        return dict(
+            bars=int(equity.size),
+            final_value=float(equity[-1]),
+            final_return=float(equity[-1] / equity[0] - 1.) if equity[0] else np.nan,
+            max_drawdown=float(((peak - equity) / peak).max()),
+            total_commission=total_fee,
+        )
+
+    def verify(self, atol: float = 1e-6, rtol: float = 1e-9, isprint: bool = True) -> pd.DataFrame:
+        """## 与普通内存回测（`Bt.run`）比较
+        - 策略的K线数据须未被 `get_kline` 的data_length截取（覆盖整个回测区间），否则两者区间不同
+
+        Args:
+            atol (float): 绝对容差. 默认1e-6
+            rtol (float): 相对容差. 默认1e-9
+            isprint (bool): 是否打印比较结果. 默认True
+
+        Returns:
+            pd.DataFrame: 各Broker各列的K线数与最大绝对误差，equal列为是否一致
+        """
+        from ..bt import Bt
+        with contextlib.nullcontext() if isprint else contextlib.redirect_stdout(StringIO()):
+            bt = Bt().addstrategy(self.strategy)
+            bt.run(isplot=False)
+        instance = bt.strategies[0]
+        memory = instance._account._get_history_results()
+        rows = []
+        for i, frame in enumerate(memory):
+            kline = instance._account.brokers[i].kline
+            stamps = _stamps(kline.pandas_object["datetime"])[-len(frame):]
+            stitched = self._records(i)
+            common, left, right = np.intersect1d(
+                stamps, stitched["datetime"], assume_unique=True, return_indices=True)
+            for name in self.columns:
+                a = frame[name].to_numpy(dtype=np.float64)[left]
+                b = np.asarray(stitched[name][right], dtype=np.float64)
+                rows.append(dict(
+                    broker=self.names[i], column=name, bars=int(common.size),
+                    missing=int(len(frame) - common.size + stitched.size - common.size),
+                    max_abs_diff=float(np.abs(a - b).max()) if common.size else 0.,
+                    equal=bool(common.size == len(frame) == stitched.size and
+                               np.allclose(a, b, rtol=rtol, atol=atol, equal_nan=True))))
+        del instance, bt
+        Base._strategy_instances = StrategyInstances()
+        result = pd.DataFrame(rows)
+        if isprint:
+            print(f"\n{'='*60}")
+            print(f" 分块回测一致性校验  |  {'一致' if result['equal'].all() else '不一致'}")
+            print(f"{'='*60}")
+            with pd.option_context('display.max_columns', None, 'display.width', 200):
+                print(result.to_string(index=False))
+            print(f"{'='*60}")
+        return result
+
+    def cleanup(self) -> None:
+        """## 删除磁盘上的账户历史"""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def pprint(self):
+        """格式化打印分块回测结果"""
+        summary = self.summary()
+        print(f"\n{'='*60}")
+        print(f" 分块回测  |  块数: {len(self.chunks)}  |  K线: {summary.get('bars', 0)}  |  预热: {self.warmup}")
+        print(f"{'='*60}")
+        with pd.option_context('display.max_columns', None, 'display.width', 200):
+            print(self.chunks.to_string(index=False))
+        print(f"{'-'*60}")
+        for k, v in summary.items():
+            print(f" {k}: {v:.4f}" if isinstance(v, float) else f" {k}: {v}")
+        print(f"{'='*60}")
+        print(f" 总耗时: {self.total_time:.2f}秒  账户历史: {self.path}")
+        print(f"{'='*60}")
+
+
+class ChunkedBacktest:
+    """## 分块回测执行器
+
+    Args:
+        strategy (type[Strategy]): 策略类（非实例）
+        chunk (str | pd.Timedelta): 每块时间跨度（如'90D'）. 默认'365D'
+        warmup (int | None): 预热K线根数，None为自动确定（块边界指标不收敛时自动加倍）. 默认None
+        warmup_factor (float): 自动确定预热长度时的放大倍数. 默认10.
+        path (str | None): 账户历史目录，None时在临时目录中创建. 默认None
+        show_bar (bool): 是否打印进度. 默认True
+    """
+
+    def __init__(self, strategy: type[Strategy], chunk: str | pd.Timedelta = '365D',
+                 warmup: int | None = None, warmup_factor: float = 10.,
+                 path: str | None = None, show_bar: bool = True):
+        freq = pd.Timedelta(chunk)
+        assert freq > pd.Timedelta(0), "块时间跨度须为正"
+        assert warmup is None or warmup >= 0, "预热K线根数须为非负整数"
+        assert warmup_factor >= 1., "warmup_factor须不小于1"
+        assert not strategy.rl, "分块回测不支持强化学习模式"
+        self.strategy = strategy
+        self.freq = int(freq.value)
+        self.warmup = warmup
+        # 自动确定的预热长度在块边界指标不收敛时加倍
+        self.adaptive = warmup is None
+        self.warmup_factor = warmup_factor
+        self.path = path
+        self.show_bar = show_bar
+
+    def _auto_warmup(self, instance: Strategy) -> None:
+        if self.warmup is None:
+            lead = max(_indicator_warmup(instance), instance.min_start_length)
+            self.warmup = max(int(np.ceil(lead * self.warmup_factor)), 1)
+
+    def _converged(self, instance: Strategy, window: ChunkWindow, tail: list[np.ndarray | None]) -> bool:
+        """本块预热末根K线（即上一块最后一根）的指标值与上一块一致时预热充分"""
+        stamps = _stamps(instance._btklinedataset.default_kline.pandas_object["datetime"])
+        index = int(np.searchsorted(stamps, window.start, side="left"))
+        if index == 0 or index < window.warmup:
+            # 预热K线已取到数据开头
+            return True
+        for row, last in zip(_indicator_rows(instance, index - 1), tail):
+            if row is not None and last is not None and row.shape == last.shape and \
+                    not np.allclose(row, last, rtol=1e-9, atol=1e-6, equal_nan=True):
+                return False
+        return True
+
+    def _spill(self, instance: Strategy, window: ChunkWindow, dtype: np.dtype) -> int:
+        """本块区间内（去掉预热部分）的账户历史按Broker追加写入磁盘"""
+        bars = 0
+        for i, (broker, frame) in enumerate(zip(instance._account.brokers,
+                                                instance._account._get_history_results())):
+            if len(frame) == 0:
+                continue
+            stamps = _stamps(broker.kline.pandas_object["datetime"])[-len(frame):]
+            keep = slice(int(np.searchsorted(stamps, window.start, side="left")), None)
+            out = np.empty(stamps[keep].size, dtype=dtype)
+            out["datetime"] = stamps[keep]
+            for name in broker.cols:
+                out[name] = frame[name].to_numpy(dtype=np.float64)[keep]
+            with open(os.path.join(self.path, f"broker{i}.bin"), "ab") as f:
+                f.write(out.tobytes())
+            if i == 0:
+                bars = out.size
+        return bars
+
+    def run(self) -> ChunkedResult:
+        """## 执行分块回测
+
+        ### 执行步骤：
+        1. 首块从回测区间开头（config.start_time）开始，初始化后自动确定预热长度
+        2. 逐块新建策略实例：加载本块区间及预热K线 → 重新计算指标 → 结转上一块账户状态 → 交易循环
+        3. 本块账户历史写入磁盘，释放策略实例后进入下一块
+        4. 到达数据末尾（或config.end_time）后结束
+
+        Returns:
+            ChunkedResult: 分块回测结果
+        """
+        total_start = time.perf_counter()
+        config = self.strategy.config
+        start, end = _to_ns(config.start_time), _to_ns(config.end_time)
+        if self.path is None:
+            self.path = tempfile.mkdtemp(prefix="minibt_chunked_")
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            for file in os.listdir(self.path):
+                if file.startswith("broker") and file.endswith(".bin"):
+                    os.remove(os.path.join(self.path, file))
+        state, tail, records, columns, names = None, None, [], [], []
+        chunk_start, first = start, None
+        while True:
+            begin = time.perf_counter()
+            while True:
+                window = ChunkWindow(chunk_start, self.freq, 0 if state is None else self.warmup, end)
+                if state is None:
+                    on_init = self._auto_warmup
+                elif self.adaptive:
+                    on_init = partial(self._converged, window=window, tail=tail)
+                else:
+                    on_init = None
+                instance = _run_chunk(self.strategy, window, state, on_init)
+                if instance is not None:
+                    break
+                # 预热不足（块边界指标未收敛）：加倍后重新加载本块
+                self.warmup *= 2
+            if state is None:
+                first = window.start
+                columns = list(instance._account.brokers[0].cols)
+                names = [broker.__name__ for broker in instance._account.brokers]
+            dtype = np.dtype([("datetime", "<i8")] + [(name, "<f8") for name in columns])
+            bars = self._spill(instance, window, dtype)
+            is_last = window.is_last
+            state = None if is_last else _capture_state(instance)
+            tail = None if is_last else _indicator_rows(instance, -1)
+            records.append(dict(start=pd.Timestamp(window.start),
+                                end=pd.Timestamp(min(window.end, window.last)),
+                                bars=bars, warmup=window.warmup,
+                                time=round(time.perf_counter()-begin, 4)))
+            # 释放本块的K线、指标与账户历史
+            del instance
+            Base._strategy_instances = StrategyInstances()
+            gc.collect()
+            if self.show_bar:
+                print(f"\r分块回测进度：第{len(records)}块  至{records[-1]['end']}", end="")
+            if is_last:
+                break
+            chunk_start = window.end + 1
+        if self.show_bar:
+            print()
+        return ChunkedResult(self.strategy, self.path, columns, names, pd.DataFrame(records),
+                             self.warmup or 0, first, end,
+                             round(time.perf_counter()-total_start, 4))
@@ -14,6 +14,9 @@ from ..utils import (reduce, Addict, storeData,
                      options)
 from ..indicators import (KLine, Line, IndSeries, IndFrame,
                           BtIndType, KLineType)
+from ..data.shared import shared_datas
+from ..data.resample_cache import resample_cache
+from ..indicators.lazy import LazyExpr
 
 
 class StrategyMeta(type):
@@ -199,7 +202,8 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
         4. start()：策略启动钩子（用户可重写，用于指标预计算等）
         """
         self._init_basic_components_before_start()  # 1. 基础组件初始化
-        self._strategy_init()                       # 2. 用户自定义初始化（子类逻辑）
+        # 2. 用户自定义初始化（子类逻辑，返回目标仓位数组时启用目标仓位模式）
+        self._set_target_positions(self._run_strategy_init())
         self._init_strategy_data()                  # 3. 策略数据初始化
         self.start()                                # 4. 启动钩子（用户可重写）
         return self
@@ -285,6 +289,21 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
         4. 初始化策略：调用启动钩子→用户自定义初始化→执行回测
         5. 计算目标值：返回优化指标结果（供参数优化器筛选最优参数）
         """
+        # 1-4. 应用参数组并执行回测
+        self._run_single_param_set(params)
+        # 5. 计算并返回优化目标值
+        return self._calculate_optimization_targets(is_maximize, target_metrics)
+
+    def _run_single_param_set(self: Strategy, params: dict) -> Strategy:
+        """
+        ## 以指定参数组在已加载的数据上重新回测（优化模式下复用数据，不重新获取K线）
+
+        Args:
+            params (dict): 单组参数
+
+        Returns:
+            Strategy: 策略实例自身
+        """
         # 1. 应用当前待优化参数组
         self.params = params
         # 2. 重置优化状态（清空历史记录、仓位等）
@@ -295,11 +314,9 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
 
         # 4. 初始化并执行回测
         self.start()                      # 启动钩子（指标预计算）
-        self._strategy_init()             # 应用新参数重新初始化策略
+        self._set_target_positions(self._run_strategy_init())  # 应用新参数重新初始化策略
         self._execute_core_trading_loop()  # 执行回测循环
-
-        # 5. 计算并返回优化目标值
-        return self._calculate_optimization_targets(is_maximize, target_metrics)
+        return self
 
     def _init_basic_components_before_start(self):
         """
@@ -487,10 +504,8 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
 
         ### 流程说明：
         1. 获取指标ID与主周期数据：确定指标对应的主周期K线数据（main_data）
-        2. 数据格式统一：将IndSeries转换为IndFrame，添加datetime列用于时间对齐
-        3. 创建主周期时间框架：生成与主周期K线时间一致的空数据框（datas）
-        4. 数据合并：通过datetime列合并大周期指标与主周期时间框架，填充NaN
-        5. 数据清洗：排序、去重、前向填充NaN，返回处理后的数据
+        2. 获取对齐映射：主周期K线索引 → 大周期K线索引（`_alignment_map`，每对KLine只计算一次）
+        3. 大周期指标前向填充NaN后按映射取值，返回主周期长度的二维数组
         """
         _id = data.data_id  # 指标对应的主周期数据ID
         rid = data.resample_id  # 指标的原始周期ID
@@ -500,51 +515,58 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
         if len(data) == len(main_data):
             return
 
-        # 大周期指标对应的原始K线数据
-        multi_data = self._btklinedataset[_id].pandas_object
-        # 判断是否为单列指标（IndSeries）
-        isIndSeries = isinstance(data, IndSeries)
-
-        # 数据格式统一：IndSeries→IndFrame，添加datetime列
-        raw_cols = isIndSeries and data.lines or list(data.columns)
-        data = pd.DataFrame(
-            data.values, columns=raw_cols) if isIndSeries else data
-        data['datetime'] = multi_data.datetime.values  # 添加大周期指标的时间列
-        data = data[['datetime'] + raw_cols]  # 重新排列列：datetime在前，指标列在后
-
-        # 创建主周期时间框架（空数据，仅含主周期datetime）
-        cols = list(data.columns)
-        datetime = main_data["datetime"].values
-        datas = pd.DataFrame(
-            np.full((len(datetime), data.shape[1]), np.nan), columns=cols
-        )
-        datas['datetime'] = datetime
-
-        # 合并数据：通过datetime对齐大周期指标与主周期时间
-        df = pd.merge(datas, data, how='outer', on='datetime')
-
-        # 填充合并后的NaN（优先用主周期数据，无则用大周期数据）
-        for col in cols[1:]:
-            df[col] = df.apply(
-                lambda x: x[f'{col}_y'] if pd.isna(
-                    x[f'{col}_x']) else x[f'{col}_x'],
-                axis=1
-            )
-
-        # 数据清洗：排序、去重、前向填充
-        df = df[cols]
-        df.sort_values(by=cols[:2], na_position='first',
-                       ignore_index=True, inplace=True)
-        df.drop_duplicates('datetime', keep='last',
-                           ignore_index=True, inplace=True)
+        # 对齐映射：主周期第i根K线 → 其收盘时最后一根已完成的大周期K线
+        align = self._alignment_map(rid, _id)
+        if align is None:
+            return
+        # 大周期指标先前向填充，再按映射取值（之前无已完成大周期K线的主周期K线为NaN）
+        values = np.asarray(data.values)
+        values = pd.DataFrame(values.reshape(len(values), -1)).ffill().values
+        result = values[np.maximum(align, 0)]
+        if align.size and align[0] < 0:
+            if result.dtype.kind not in "fc":
+                result = result.astype(np.float64)
+            result[align < 0] = np.nan
+        return result
+
+    def _alignment_map(self, base_id: int, data_id: int) -> np.ndarray | None:
+        """
+        ## 跨周期对齐映射（主周期K线索引 → 大周期K线索引）
+        - 每对(主周期KLine, 大周期KLine)以 `np.searchsorted` 在datetime64上计算一次，
+          数据长度变化（实盘更新）时重建
+        - 大周期K线以起始时间标记，主周期K线所在的大周期K线在该组最后一根主周期K线收盘前尚未完成
+          （其收盘价等包含之后的主周期K线），map[i] 为主周期第i根K线收盘时最后一根已完成的大周期K线索引：
+          第i根K线是所在组的最后一根（下一根属于新的大周期K线，或已是最后一根）时为所在组，否则为前一组；
+          之前没有已完成的大周期K线时为-1
+        - 回测循环中跨周期数据的 `.new`/`[-n]` 经此映射O(1)定位，不再比较时间
 
-        # 确保数据长度与主周期一致
-        if len(datetime) != df.shape[0]:
-            df = df[~pd.isna(df.datetime)]
-            df.reset_index(drop=True, inplace=True)
+        Args:
+            base_id (int): 主周期KLine的data_id
+            data_id (int): 大周期KLine的data_id
 
-        # 前向填充NaN（大周期指标在主周期内的数值延续）
-        return df.ffill()[cols[1:]].values
+        Returns:
+            np.ndarray | None: int64映射数组，数据不存在时为None
+        """
+        maps: dict = self.__dict__.setdefault("_alignment_maps", {})
+        klines = self._btklinedataset
+        if base_id == data_id or base_id >= klines.num or data_id >= klines.num:
+            return None
+        base, data = klines[base_id], klines[data_id]
+        record = maps.get((base_id, data_id))
+        if record is None or record[0] is not base or record[1] is not data or \
+                record[2].size != len(base) or record[3] != len(data):
+            base_datetime = np.asarray(
+                base.pandas_object.datetime.values, dtype="datetime64[ns]")
+            datetime = np.asarray(
+                data.pandas_object.datetime.values, dtype="datetime64[ns]")
+            # 主周期K线所在的大周期K线（可能尚未完成）
+            align = np.searchsorted(datetime, base_datetime,
+                                    side="right").astype(np.int64) - 1
+            # 不是所在组最后一根的主周期K线退回到前一根大周期K线
+            closes = np.append(align[1:] != align[:-1], True)
+            align = np.where(closes, align, np.maximum(align - 1, -1))
+            record = maps[(base_id, data_id)] = (base, data, align, len(data))
+        return record[2]
 
     def __multi_data_resample(self, data: KLine, if_replay: bool = False) -> pd.DataFrame:
         """
@@ -567,12 +589,22 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
         5. 补充合约信息：添加symbol、cycle等合约字段，返回完整K线数据
         """
         id = data.isresample  # 主周期ID
+        datetime = self._btklinedataset[id-1]["datetime"].values
+        # 相同(大周期K线, 主周期时间, 回放模式)的转换结果跨策略、跨参数组缓存
+        return resample_cache.derive(
+            resample_cache.make_key("kline", data.pandas_object, datetime, if_replay=if_replay,
+                                    symbol=data.symbol, cycle=data.cycle, price_tick=data.price_tick,
+                                    volume_multiple=data.volume_multiple),
+            lambda: self._align_multi_data(data, datetime, if_replay))
+
+    @staticmethod
+    def _align_multi_data(data: KLine, datetime: np.ndarray, if_replay: bool = False) -> pd.DataFrame:
+        """## 大周期K线按datetime合并到主周期时间框架（未缓存的计算实现）"""
         data_ = data.pandas_object.copy()   # 复制原始K线数据
         data_['datetime_'] = data_.datetime.values  # 备份原始时间列
         cols = list(data_.columns)
 
         # 创建主周期时间框架（空数据，仅含主周期datetime）
-        datetime = self._btklinedataset[id-1]["datetime"].values
         datas = pd.DataFrame(
             np.full((len(datetime), data_.shape[1]), np.nan), columns=cols
         )
@@ -636,114 +668,91 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
         3. 数据聚合：按倍数分组，聚合生成高周期OHLCV（open=首根开价，high=组内最高价等）
         4. 处理剩余数据：聚合最后一组不足倍数的K线
         """
+        # 相同(源数据, 周期, 时间规则)的重采样结果跨策略、跨参数组缓存
+        return resample_cache.derive(
+            resample_cache.make_key("resample", data, cycle1=cycle1, cycle2=cycle2, rule=rule),
+            lambda: cls._resample_groups(cycle1, cycle2, data, rule))
+
+    @classmethod
+    def _resample_groups(cls, cycle1: int, cycle2: int, data: pd.DataFrame, rule: str = "") -> tuple[list[int], pd.DataFrame]:
+        """## 周期重采样分组聚合（未缓存的计算实现，参数与返回值同 `_resample`）"""
         multi = int(cycle2 / cycle1)  # 重采样倍数（如300→900秒，multi=3）
-        # 计算相邻K线的时间差（秒），用于检测周期异常
-        time_diff = data.datetime.diff().apply(
-            lambda x: x.seconds if not pd.isna(x) else 0).values
-        datetime_series = data.datetime.values  # 原始时间序列
-        start = datetime_series[0]  # 原始数据起始时间
-
-        # 时间对齐：找到目标周期的第一个起点（如900秒周期的0分0秒）
-        i = 0  # 第一个符合条件的K线索引
-        max_search_idx = min(multi, len(datetime_series))  # 兜底：避免超出数组范围
-        if "S" in rule:  # 秒级周期（如"300S"）
-            for idx in range(max_search_idx):
-                dt = datetime_series[idx]
-                if pd.Timestamp(dt).second % cycle2 == 0:
-                    i = idx
-                    break
-        elif "T" in rule:  # 分钟级周期（如"15T"）
-            target_minute_interval = int(cycle2 / 60)  # 转为整数，避免浮点数取模精度问题
-            for idx in range(max_search_idx):
-                dt = datetime_series[idx]
-                _dt = pd.Timestamp(dt)
-                # 秒数为0，且分钟数是目标间隔的整数倍
-                if _dt.second == 0 and (_dt.minute % target_minute_interval) == 0:
-                    i = idx
-                    break
-        else:
-            pass  # 其他周期（如小时/日）预留逻辑
-
-        # 初始化结果容器
-        array = data.values  # 原始K线数据（numpy数组）
-        result = []
-        plot_index: list[int] = []  # 重采样数据在原始数据中的索引
-
-        # 处理第一个完整分组前的K线（不足multi根）
-        if i > 0:  # 仅当i>0时，才存在前置不足分组的K线
-            first_data = array[:i, :]  # 第一个分组前的K线
-            # 聚合第一个分组前的K线（生成一根高周期K线）
-            first_ohlcv = [
-                start,  # 时间：取起始时间
-                first_data[:, 1][0],  # open：首根开价
-                first_data[:, 2].max(),  # high：组内最高价
-                first_data[:, 3].min(),  # low：组内最低价
-                first_data[:, 4][-1],  # close：最后一根收盘价
-                first_data[:, 5].sum()  # volume：组内成交量总和
-            ]
-            result.append(first_ohlcv)
-            plot_index.append(0)  # 记录索引：前置数据对应原始数据第0个索引
-            # 更新剩余数据与时间差
-            array = array[i:, :]
-            time_diff = time_diff[i:] if len(time_diff) > i else []
+        size = len(data)
+        # 相邻K线的时间差（秒），用于检测周期异常（交易时段切换）
+        time_diff = cls._time_diff_seconds(data.datetime)
+        time_diff[:1] = 0
+        # 时间对齐：第一个符合目标周期起点的K线（如900秒周期的0分0秒），无则为0
+        i = cls._first_bar_index(data.datetime.values, multi, cycle2, rule)
+        if i < 0:
+            i = 0
+
+        # 分组起点：对齐后每multi根K线，或时间差异常处（对齐后前multi根内不切分）
+        # 对齐前不足multi根的K线单独聚合为第一根
+        length = size - i
+        offset = np.arange(length)
+        mask = np.zeros(length, dtype=bool)
+        mask[:1] = True
+        mask[multi:] = (offset[multi:] % multi == 0) | (
+            time_diff[i + multi:] != cycle1)
+        starts = np.flatnonzero(mask) + i
+        if i > 0:
+            starts = np.concatenate(([0], starts))
+        ends = np.append(starts[1:], size)
+
+        # 按分组聚合：open=首根开价，high=组内最高价，low=组内最低价，close=末根收盘价，volume=成交量总和
+        resample_df = pd.DataFrame({
+            "datetime": data.datetime.values[starts],
+            "open": data.open.values[starts],
+            "high": np.maximum.reduceat(data.high.values, starts) if size else data.high.values,
+            "low": np.minimum.reduceat(data.low.values, starts) if size else data.low.values,
+            "close": data.close.values[ends - 1],
+            "volume": np.add.reduceat(data.volume.values, starts) if size else data.volume.values,
+        }, columns=FILED.ALL)
+        # 重采样数据在原始数据中的索引（各分组首根K线）
+        return starts.tolist(), resample_df
+
+    @staticmethod
+    def _time_diff_seconds(datetime: pd.Series) -> np.ndarray:
+        """
+        ## 相邻K线时间差（秒）
+        - 与 `Timedelta.seconds` 一致：只取秒分量（不含天数），第一根为nan
+
+        Args:
+            datetime (pd.Series): 时间序列
+
+        Returns:
+            np.ndarray: 时间差（float64）
+        """
+        values = pd.to_datetime(datetime).values.astype("datetime64[ns]").view(np.int64)
+        diff = np.full(values.size, np.nan)
+        if values.size > 1:
+            diff[1:] = (np.diff(values) // 1_000_000_000) % 86400
+        return diff
+
+    @staticmethod
+    def _first_bar_index(datetime: np.ndarray, multi: int, cycle2: int, rule: str, replay: bool = False) -> int:
+        """
+        ## 时间对齐：前multi根K线中第一个符合目标周期起点的K线索引
+
+        Args:
+            datetime (np.ndarray): 时间序列
+            multi (int): 周期倍数
+            cycle2 (int): 高周期（秒）
+            rule (str): 时间规则（"S"秒级、"T"分钟级，其它不对齐）
+            replay (bool): 回放模式的分钟取模使用cycle2/60（与原实现一致）. Defaults to False.
+
+        Returns:
+            int: K线索引，无符合条件的K线时为-1
+        """
+        head = pd.DatetimeIndex(datetime[:multi])
+        if "S" in rule:
+            hits = np.flatnonzero(head.second % cycle2 == 0)
+        elif "T" in rule:
+            interval = cycle2 / 60 if replay else int(cycle2 / 60)
+            hits = np.flatnonzero((head.second == 0) & (head.minute % interval == 0))
         else:
-            pass  # i=0时，无前置数据，直接处理后续完整分组
-
-        #fr = True  # 是否从第一根K线开始重采样（修正后仅作为标记，避免重复添加）
-        index = 0  # 当前分组起始索引
-        array_len = len(array)  # 剩余数据长度
-
-        # 按倍数分组，聚合高周期K线（修正：消除重复添加逻辑）
-        for j in range(multi, array_len + 1):  # j到array_len，确保最后一个完整分组被处理
-            # 分组条件：达到倍数或时间差异常（非原始周期）
-            if (j % multi == 0) or (j < array_len and time_diff[j] != cycle1):
-                length = j - index  # 当前分组长度
-                if length <= 0:  # 跳过无效分组（长度为0或负数）
-                    index = j
-                    continue
-                values = array[index:j, :]  # 当前分组数据
-                # 聚合分组数据（仅添加一次，消除重复）
-                group_ohlcv = [
-                    values[:, 0][0],  # 时间：首根时间
-                    values[:, 1][0],  # open：首根开价
-                    values[:, 2].max(),  # high：组内最高价
-                    values[:, 3].min(),  # low：组内最低价
-                    values[:, 4][-1],  # close：最后一根收盘价
-                    values[:, 5].sum()   # volume：组内成交量总和
-                ]
-                result.append(group_ohlcv)
-                # 记录索引：对应原始数据的索引（需加上之前跳过的i）
-                plot_index.append(index + i)
-                # 更新索引
-                index = j
-                #fr = False  # 首次分组后，标记为非起始状态
-
-        # 处理最后一组不足倍数的K线（修正：索引判断更严谨）
-        if index < array_len:
-            values = array[index:, :]
-            if len(values) > 0:  # 仅当有剩余数据时才聚合
-                last_ohlcv = [
-                    values[:, 0][0],
-                    values[:, 1][0],
-                    values[:, 2].max(),
-                    values[:, 3].min(),
-                    values[:, 4][-1],
-                    values[:, 5].sum()
-                ]
-                result.append(last_ohlcv)
-                plot_index.append(index + i)  # 记录最后一组对应的原始索引
-
-        # 确保plot_index与result长度一致（兜底处理）
-        if len(plot_index) > len(result):
-            plot_index = plot_index[:len(result)]
-        elif len(plot_index) < len(result):
-            # 补充缺失索引（若存在，取最后一个索引补全）
-            last_idx = plot_index[-1] if plot_index else (len(data)-1)
-            plot_index.extend([last_idx] * (len(result) - len(plot_index)))
-
-        # 转换为DataFrame并返回
-        resample_df = pd.DataFrame(result, columns=FILED.ALL)
-        return plot_index, resample_df
+            return 0
+        return int(hits[0]) if hits.size else -1
 
     def resample(self, cycle: int, data: KLine = None, rule: str = None, **kwargs) -> KLine:
         """
@@ -780,6 +789,7 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
         # 参数校验：目标周期必须大于原始周期且为倍数
         assert cycle > main_cycle and cycle % main_cycle == 0, '周期不能低于主周期并且为主周期的倍数'
 
+        shared_key = None  # 共享派生数据键（仅本地重采样时使用）
         # 在线获取多周期数据（实盘或需要最新数据时）
         if self._api and kwargs.pop('online', True):
             # 从TQApi获取目标周期K线
@@ -828,9 +838,11 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
                 f"{cycle}S" if cycle < 60 else (
                     f"{int(cycle/60)}T" if cycle < 3600 else f"{int(cycle/3600)}H"
             )
-            # 调用核心重采样逻辑
-            plot_index, rdata = self._resample(
-                main_cycle, cycle, df[FILED.ALL], cycle_string)
+            # 调用核心重采样逻辑（源数据为共享数据集时，重采样结果在各策略间共享）
+            shared_key = self.__shared_derived_key(
+                data, "resample", cycle, cycle_string)
+            plot_index, rdata = shared_datas.derive(shared_key, lambda: self._resample(
+                main_cycle, cycle, df[FILED.ALL], cycle_string))
 
         # 生成新的指标ID（关联主数据ID，标记为高周期数据）
         _id = self._btklinedataset.num
@@ -851,7 +863,25 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
         )
 
         # 创建并返回高周期KLine实例（标记为isresample=True）
-        return KLine(rdata, id=id, isresample=True, name=f"datas{_id}", **kwargs)
+        kline = KLine(rdata, id=id, isresample=True,
+                      name=f"datas{_id}", **kwargs)
+        if shared_key is not None:
+            kline._shared_key = shared_key
+        return kline
+
+    def __shared_derived_key(self, data: KLine, kind: str, cycle: int, rule: str) -> tuple | None:
+        """
+        ## 共享派生数据键
+        - 仅当源K线来自共享数据集且未经特殊蜡烛图转换时共享resample/replay结果
+
+        Returns:
+            tuple | None: 派生数据键，不可共享时返回None
+        """
+        if not options._shared_datas or data._shared_key is None:
+            return
+        if "candles" in data.category and data.follow:
+            return
+        return (data._shared_key, kind, cycle, rule)
 
     def __rolling_window(self, v: np.ndarray, window: int = 1, if_index=False) -> np.ndarray:
         """
@@ -920,65 +950,42 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
         3. 数据拆分：将每根高周期K线拆分为multi根低周期K线，实时更新OHLCV（如high取累计最高价）
         4. 处理剩余数据：拆分最后一根高周期K线
         """
-        multi = int(cycle2 / cycle1)  # 回放倍数（如900→300秒，multi=3）
-        # 计算相邻K线的时间差（秒）
-        time_diff = data.datetime.diff().apply(lambda x: x.seconds).values
-        datetime = data.datetime.values  # 原始时间序列
+        # 相同(源数据, 周期, 时间规则)的回放结果跨策略、跨参数组缓存
+        return resample_cache.derive(
+            resample_cache.make_key("replay", data, cycle1=cycle1, cycle2=cycle2, rule=rule),
+            lambda: cls._replay_groups(cycle1, cycle2, data, rule))
 
-        # 时间对齐：找到目标低周期的第一个起点
-        i = 0
-        if "S" in rule:
-            for i, dt in enumerate(datetime[:multi]):
-                if pd.Timestamp(dt).second % cycle2 == 0:
-                    break
-        elif "T" in rule:
-            for i, dt in enumerate(datetime[:multi]):
-                _dt = pd.Timestamp(dt)
-                if _dt.second == 0 and _dt.minute % (cycle2 / 60) == 0:
-                    break
-        else:
-            ...
-
-        # 初始化结果容器
-        array = data.values  # 原始高周期数据（numpy数组）
-        result = []
-
-        # 处理第一个完整分组前的K线（拆分为低周期）
-        if i:
-            first_data = array[:i, :]  # 第一个分组前的高周期K线
-            for ix in range(i):
-                # 提取当前低周期K线数据
-                dtime, _open, _high, _low, close, _volumn = first_data[ix]
-                # 累计更新OHLCV（模拟实时行情）
-                if ix:
-                    high = max(high, _high)  # 累计最高价
-                    low = min(low, _low)      # 累计最低价
-                    volumn += _volumn         # 累计成交量
-                else:
-                    open, high, low, volumn = _open, _high, _low, _volumn
-                # 添加到回放结果
-                result.append([dtime, open, high, low, close, volumn])
-            # 更新剩余数据与时间差
-            array = array[i:, :]
-            time_diff = time_diff[i:]
-
-        # 拆分高周期K线为低周期回放数据
-        for j, row in enumerate(array):
-            dtime, _open, _high, _low, close, _volumn = row
-            # 分组条件：新的高周期K线或时间差异常
-            if j % multi == 0 or time_diff[j] != cycle1:
-                # 初始化新分组的OHLCV
-                open, high, low, volumn = _open, _high, _low, _volumn
-            else:
-                # 累计更新当前分组的OHLCV
-                high = max(high, _high)
-                low = min(low, _low)
-                volumn += _volumn
-            # 添加到回放结果
-            result.append([dtime, open, high, low, close, volumn])
-
-        # 转换为DataFrame并返回
-        return pd.DataFrame(result, columns=FILED.ALL)
+    @classmethod
+    def _replay_groups(cls, cycle1: int, cycle2: int, data: pd.DataFrame, rule: str = "") -> pd.DataFrame:
+        """## 回放分组累计（未缓存的计算实现，参数与返回值同 `_replay`）"""
+        multi = int(cycle2 / cycle1)  # 回放倍数（如900→300秒，multi=3）
+        size = len(data)
+        # 相邻K线的时间差（秒），第一根为nan（视为异常，开始新分组）
+        time_diff = cls._time_diff_seconds(data.datetime)
+        # 时间对齐：第一个符合目标低周期起点的K线，无则取前multi根的最后一根（与原实现一致）
+        i = cls._first_bar_index(data.datetime.values, multi, cycle2, rule, replay=True)
+        if i < 0:
+            i = max(min(multi, size) - 1, 0)
+
+        # 分组起点：对齐后每multi根K线，或时间差异常处；对齐前的K线为第一组
+        offset = np.arange(size - i)
+        mask = np.zeros(size, dtype=bool)
+        mask[:1] = True
+        mask[i:] = (offset % multi == 0) | (time_diff[i:] != cycle1)
+        group = np.cumsum(mask) - 1
+        starts = np.flatnonzero(mask)
+
+        # 组内累计：open=组首根开价，high/low=累计极值，close=当前收盘价，volume=累计成交量
+        grouped = data[["high", "low", "volume"]].reset_index(
+            drop=True).groupby(group, sort=False)
+        return pd.DataFrame({
+            "datetime": data.datetime.values,
+            "open": data.open.values[starts][group],
+            "high": grouped["high"].cummax().values,
+            "low": grouped["low"].cummin().values,
+            "close": data.close.values,
+            "volume": grouped["volume"].cumsum().values,
+        }, columns=FILED.ALL)
 
     def __multi_data_replay(self, data: KLine) -> tuple[list[str], pd.DataFrame]:
         """
@@ -1086,8 +1093,9 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
                 f"{int(cycle/60)}T" if cycle < 3600 else f"{int(cycle/3600)}H"
         )
 
-        # 调用核心回放逻辑，生成低周期回放数据
-        rdata = self._replay(main_cycle, cycle, df[FILED.ALL], cycle_string)
+        # 调用核心回放逻辑，生成低周期回放数据（源数据为共享数据集时，回放结果在各策略间共享）
+        rdata = shared_datas.derive(self.__shared_derived_key(data, "replay", cycle, cycle_string),
+                                    lambda: self._replay(main_cycle, cycle, df[FILED.ALL], cycle_string))
 
         # 生成新的指标ID（关联主数据ID，标记为回放数据）
         _id = self._btklinedataset.num
@@ -1098,8 +1106,8 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
         rdata.add_info(**symbolinfo_dict)
 
         # 生成重采样数据（用于回放时的时间对齐）
-        plot_index, resample_data = self._resample(
-            main_cycle, cycle, df[FILED.ALL], cycle_string)
+        plot_index, resample_data = shared_datas.derive(self.__shared_derived_key(data, "resample", cycle, cycle_string),
+                                                        lambda: self._resample(main_cycle, cycle, df[FILED.ALL], cycle_string))
         resample_data.add_info(**symbolinfo_dict)
         resample_data = resample_data[FILED.Quote]
 
@@ -1598,7 +1606,15 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
                     if name in self._btklinedataset:
                         return self._btklinedataset[name]
 
+            # 惰性运算表达式：赋值为策略属性时求值为指标
+            if type(value) is LazyExpr:
+                value = value.materialize()
             value_type = type(value)
+            # 同一指标对象（公共子表达式复用）已以其它属性名收录：只设置为别名属性，
+            # 不重复注册（否则sname被改写、画图与逐根更新重复处理同一对象）
+            if value_type in BtIndType and any(
+                    v is value and k != name for k, v in self._btindicatordataset.items()):
+                return super().__setattr__(name, value)
             # 收录内置指标：若值为指标类型且长度匹配，则添加到指标数据集
             if value_type in BtIndType and len(value) in self._btklinedataset.lengths:
                 value.sname = name  # 设置指标名称
@@ -1615,7 +1631,8 @@ class Strategy(Base, StrategyBase, metaclass=StrategyMeta):
                 if value._upsample_name:
                     for k, v in self._btindicatordataset.items():
                         if v._dataset.upsample_object is not None:
-                            if value.equals(v._dataset.upsample_object):
+                            # upsample()返回缓存的同一对象，按身份匹配（不逐元素比较数据）
+                            if value is v._dataset.upsample_object:
                                 v._upsample_name = name
                                 value._upsample_name = v.sname
                 self._btindicatordataset.add_data(name, value)
@@ -0,0 +1,241 @@
+# -*- encoding: utf-8 -*-
+"""
+## 目标仓位模式（向量化信号 + 编译撮合循环）
+
+- 策略 `__init__` 直接返回目标仓位数组（单合约）或各合约目标仓位数组（list/dict），
+  框架跳过 `next()`，由编译循环逐根K线执行目标仓位
+- 撮合规则与 `Broker.update` 完全一致：逐笔（后进先出）开平仓、保证金、手续费（tick/fixed/percent）、
+  滑点、资金不足拒单、反手，账户历史与 Stats 与事件驱动路径一致
+- 目标仓位为NaN的K线保持当前仓位不交易，非整数目标仓位按 `int()` 截断
+- 绑定了停止器（Stop）、开启交易日志或回放模式时，使用等价的Python循环执行
+  （同样跳过 `next()`，逐根调用 `set_target_size` 后更新停止器）
+
+### 等价的事件驱动写法：
+```python
+def next(self):
+    for kline, target in zip(klines, targets):
+        if not np.isnan(target[kline.btindex]):
+            kline.set_target_size(target[kline.btindex])
+```
+
+### 示例：
+```python
+class MA(Strategy):
+    params = dict(length1=10, length2=20)
+
+    def __init__(self):
+        self.data = self.get_kline(LocalDatas.test)
+        self.ma1 = self.data.close.sma(self.params.length1)
+        self.ma2 = self.data.close.sma(self.params.length2)
+        return np.where(self.ma1 > self.ma2, 1, -1)
+```
+
+### 编译：
+- 安装numba时以 `njit(cache=True)` 编译撮合循环，未安装时以纯Python执行同一函数（结果一致）
+"""
+from __future__ import annotations
+from math import isnan
+import numpy as np
+
+__all__ = ["target_positions_engine", "get_target_positions_engine"]
+
+
+# 手续费类型编码（与Broker.commission_keys顺序一致）
+COMMISSION_TYPES = {"tick_commission": 0,
+                    "fixed_commission": 1, "percent_commission": 2}
+
+
+def target_positions_engine(close, targets, lengths, start, end, available,
+                            total_profit, total_commission, margin_rate,
+                            volume_multiple, slip_point, commission_value,
+                            commission_type, direction, lots, nlots,
+                            cum_profits, broker_commission, history):
+    """## 目标仓位撮合循环（与Broker.update逐笔撮合规则一致）
+
+    Args:
+        close (np.ndarray): (n, m) 各合约收盘价（成交价）
+        targets (np.ndarray): (n, m) 目标仓位，NaN为不交易
+        lengths (np.ndarray): (m,) 各合约数据长度（超出长度的K线不交易）
+        start (int): 起始索引（执行start+1至end的K线）
+        end (int): 结束索引（含）
+        available (float): 账户可用资金
+        total_profit (float): 账户总盈亏
+        total_commission (float): 账户总手续费
+        margin_rate / volume_multiple / slip_point / commission_value (np.ndarray): (m,) 合约交易参数
+        commission_type (np.ndarray): (m,) 手续费类型（0:tick 1:fixed 2:percent）
+        direction (np.ndarray): (m,) 持仓方向（1/-1/0），原地更新
+        lots (np.ndarray): (m, cap, 4) 逐笔持仓[保证金, 成交价, 手数, 手续费]，原地更新
+        nlots (np.ndarray): (m,) 逐笔持仓数量，原地更新
+        cum_profits (np.ndarray): (m,) 各合约累计盈亏，原地更新
+        broker_commission (np.ndarray): (m,) 各合约累计手续费，原地更新
+        history (np.ndarray): (end-start, m, 6) 账户历史输出（列同Broker.cols）
+
+    Returns:
+        tuple: (可用资金, 总盈亏, 总手续费, 资金不足拒单次数)
+    """
+    m = close.shape[1]
+    fails = 0
+    profit = np.zeros(m)
+    for i in range(start + 1, end + 1):
+        for k in range(m):
+            if i >= lengths[k]:
+                continue
+            target = targets[i, k]
+            if isnan(target):
+                continue
+            size_total = 0.
+            for j in range(nlots[k]):
+                size_total += lots[k, j, 2]
+            diff = target - size_total * direction[k]
+            if diff == 0.:
+                continue
+            long = diff > 0.
+            size = abs(diff)
+            price = close[i, k]
+            vm = volume_multiple[k]
+            snapshot = available
+            # 滑点
+            exec_price = price
+            if slip_point[k] > 0.:
+                if long:
+                    exec_price += slip_point[k]
+                else:
+                    exec_price -= slip_point[k]
+            # 每手手续费
+            ctype = commission_type[k]
+            if ctype == 0:
+                unit_comm = vm * commission_value[k]
+            elif ctype == 1:
+                unit_comm = commission_value[k]
+            else:
+                unit_comm = commission_value[k] * exec_price * vm
+            unit_margin = exec_price * margin_rate[k] * vm
+            side = 1 if long else -1
+            # 开仓
+            if direction[k] == 0:
+                margin = size * unit_margin
+                comm = size * unit_comm
+                if snapshot < margin + comm:
+                    fails += 1
+                    continue
+                direction[k] = side
+                profit[k] = -comm
+                n = nlots[k]
+                lots[k, n, 0] = margin
+                lots[k, n, 1] = exec_price
+                lots[k, n, 2] = size
+                lots[k, n, 3] = comm
+                nlots[k] = n + 1
+                available -= margin + comm
+                total_commission += comm
+                broker_commission[k] += comm
+                total_profit -= comm
+            # 平仓（后进先出逐笔平仓）
+            elif direction[k] == -side:
+                value = 0.
+                comm = 0.
+                margin = 0.
+                while size > 0. and nlots[k] > 0:
+                    n = nlots[k] - 1
+                    m_ = lots[k, n, 0]
+                    p = lots[k, n, 1]
+                    s = lots[k, n, 2]
+                    close_size = min(size, s)
+                    size -= close_size
+                    diff_price = p - exec_price if long else exec_price - p
+                    value += close_size * diff_price * vm
+                    comm += close_size * unit_comm
+                    if close_size == s:
+                        margin += m_
+                        nlots[k] = n
+                    else:
+                        out_margin = m_ * close_size / s
+                        margin += out_margin
+                        lots[k, n, 0] = m_ - out_margin
+                        lots[k, n, 2] = s - close_size
+                        lots[k, n, 3] = comm
+                        break
+                if size == 0.:
+                    direction[k] = 0
+                value -= comm
+                available += value + margin
+                profit[k] = value
+                total_commission += comm
+                broker_commission[k] += comm
+                total_profit += value
+                # 反手
+                if size > 0.:
+                    margin = size * unit_margin
+                    comm = size * unit_comm
+                    if available < margin + comm:
+                        fails += 1
+                        continue
+                    profit[k] = -comm
+                    direction[k] = side
+                    n = nlots[k]
+                    lots[k, n, 0] = margin
+                    lots[k, n, 1] = exec_price
+                    lots[k, n, 2] = size
+                    lots[k, n, 3] = comm
+                    nlots[k] = n + 1
+                    available -= margin + comm
+                    value -= comm
+                    total_commission += comm
+                    broker_commission[k] += comm
+                    total_profit += value
+            # 加仓
+            else:
+                margin = size * unit_margin
+                comm = size * unit_comm
+                if snapshot < margin + comm:
+                    fails += 1
+                    continue
+                profit[k] = -comm
+                n = nlots[k]
+                lots[k, n, 0] = margin
+                lots[k, n, 1] = exec_price
+                lots[k, n, 2] = size
+                lots[k, n, 3] = comm
+                nlots[k] = n + 1
+                available -= margin + comm
+                total_commission += comm
+                broker_commission[k] += comm
+                total_profit -= comm
+            if profit[k] != 0.:
+                cum_profits[k] += profit[k]
+        # 账户历史（权益=可用资金+各合约逐笔保证金之和）
+        total_margin = 0.
+        for k in range(m):
+            broker_margin = 0.
+            for j in range(nlots[k]):
+                broker_margin += lots[k, j, 0]
+            total_margin += broker_margin
+        balance = available + total_margin
+        row = i - start - 1
+        for k in range(m):
+            size_total = 0.
+            for j in range(nlots[k]):
+                size_total += lots[k, j, 2]
+            history[row, k, 0] = balance
+            history[row, k, 1] = direction[k]
+            history[row, k, 2] = size_total * direction[k]
+            history[row, k, 3] = profit[k]
+            history[row, k, 4] = cum_profits[k]
+            history[row, k, 5] = broker_commission[k]
+            profit[k] = 0.
+    return available, total_profit, total_commission, fails
+
+
+_ENGINE = None
+
+
+def get_target_positions_engine():
+    """## 获取目标仓位撮合循环（优先numba编译，未安装numba时返回纯Python实现）"""
+    global _ENGINE
+    if _ENGINE is None:
+        try:
+            from numba import njit
+            _ENGINE = njit(cache=True)(target_positions_engine)
+        except ImportError:
+            _ENGINE = target_positions_engine
+    return _ENGINE
@@ -0,0 +1,346 @@
+# -*- encoding: utf-8 -*-
+"""
+## 滚动前进分析（Walk-Forward Optimization）
+
+- 每组候选参数只在全历史数据上初始化并回测一次（指标只计算一次），
+  各折（fold）的样本内寻优与样本外评估均在该组参数的权益序列上切片完成，
+  避免逐段重新加载数据、重新执行 `_strategy_init` 与重复寻优。
+- 支持滚动窗口（rolling）与锚定窗口（anchored）两种切分方式。
+- 各组候选参数的全历史回测相互独立，可在fork进程池中并行执行
+  （子进程写时复制继承已初始化的策略与数据，只返回权益序列）。
+- 输出拼接后的样本外权益曲线、各折最优参数、样本外指标及各折耗时。
+
+### 说明：
+- 由于采用全历史连续回测后切片的方式，样本外区间开始时可能带有前一区间延续的持仓，
+  这与实盘中参数切换而持仓延续的情形一致。
+- 步长小于样本外窗口时各折样本外区间重叠：各折指标按完整样本外窗口计算，
+  拼接的样本外权益曲线中重叠部分只取前一折（时间索引不重复）。
+"""
+from __future__ import annotations
+import time
+from itertools import product
+from typing import TYPE_CHECKING, Iterable
+from ..utils import Addict, Base, np, pd, MAX_WORKERS
+from .stats import Stats
+
+if TYPE_CHECKING:
+    from .strategy import Strategy
+
+
+# fork进程池回测：父进程在创建进程池前写入，子进程通过写时复制继承，无需序列化策略
+_FORK_STATE: tuple | None = None
+
+
+def _run_forked_candidate(index: int) -> tuple[int, np.ndarray, pd.Index | None]:
+    """fork子进程入口：以第index组候选参数全历史回测，返回权益序列（第0组附带时间索引）"""
+    strategy, candidates, ismax, target = _FORK_STATE
+    strategy(candidates[index], ismax, target)
+    profits = strategy.profits
+    return index, profits.values.astype(float), profits.index if index == 0 else None
+
+
+def param_grid(default_params: dict, params: dict) -> list[Addict]:
+    """## 按optstrategy参数格式生成候选参数网格
+
+    Args:
+        default_params (dict): 策略默认参数
+        params (dict): 待优化参数（range / (start, stop[, step]) / list / 固定值）
+
+    Returns:
+        list[Addict]: 候选参数列表（未优化的参数取默认值）
+    """
+    keys, values = [], []
+    fixed = dict(default_params)
+    for key, value in params.items():
+        if key not in default_params:
+            continue
+        if isinstance(value, range):
+            value = list(value)
+        elif isinstance(value, tuple):
+            assert len(value) >= 2 and all(isinstance(x, (float, int))
+                                           for x in value), f'参数{key}的tuple需为(start, stop[, step])数值格式'
+            start, stop, *step = value
+            isfloat = any(isinstance(x, float) for x in value)
+            step = step[0] if step else (
+                (stop-start)/10. if isfloat else 1)
+            assert step > 0, f'参数{key}的step必须为正数，当前{step}'
+            value = np.arange(start, stop+step*.5, step)
+            value = [round(float(x), 10) for x in value] if isfloat else [
+                int(x) for x in value]
+        elif not isinstance(value, list):
+            fixed[key] = value
+            continue
+        assert value, f'参数{key}取值为空'
+        keys.append(key)
+        values.append(value)
+    assert keys, '请设置待优化参数（参数名须为策略params中已定义的参数）'
+    return [Addict({**fixed, **dict(zip(keys, combo))}) for combo in product(*values)]
+
+
+class WalkForwardResult:
+    """## 滚动前进分析结果容器
+
+    通过 :meth:`Bt.walk_forward` 创建，无需手动实例化。
+
+    ### 核心属性：
+    - ``folds``: 各折明细 DataFrame（样本内/样本外区间、最优参数、样本内得分、样本外指标、耗时）
+    - ``equity``: 拼接后的样本外权益曲线 (pd.Series)
+    - ``stats``: 样本外权益曲线对应的 Stats 对象
+    - ``best_params``: 各折最优参数列表 (list[dict])
+    - ``target``: 优化目标指标名列表
+    - ``backtest_time``: 全部候选参数全历史回测耗时（秒，各折共享）
+    - ``total_time``: 总耗时（秒）
+
+    ### 分析接口：
+    - ``.pprint()``: 格式化打印各折结果
+    - ``.to_dataframe()``: 返回各折明细 DataFrame
+    """
+
+    def __init__(self, folds: pd.DataFrame, equity: pd.Series, stats: Stats,
+                 best_params: list, target: list, backtest_time: float = 0.,
+                 total_time: float = 0.):
+        self.folds = folds
+        self.equity = equity
+        self.stats = stats
+        self.best_params = best_params
+        self.target = target
+        self.backtest_time = backtest_time
+        self.total_time = total_time
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """返回各折明细 DataFrame"""
+        return self.folds.copy()
+
+    def pprint(self):
+        """格式化打印各折最优参数、样本外指标与耗时"""
+        print(f"\n{'='*60}")
+        print(f" 滚动前进分析  |  目标: {self.target}  |  折数: {len(self.folds)}")
+        print(f"{'='*60}")
+        with pd.option_context('display.max_columns', None, 'display.width', 200):
+            print(self.folds)
+        print(f"{'='*60}")
+        print(f" 样本外收益: {self.stats.profit():.2f}")
+        print(
+            f" 回测耗时: {self.backtest_time:.2f}秒  |  总耗时: {self.total_time:.2f}秒")
+        print(f"{'='*60}")
+
+
+class WalkForward:
+    """## 滚动前进分析器
+
+    Args:
+        strategy (type[Strategy]): 策略类（非实例）
+        target (str | list[str]): 优化目标（Stats指标名），多目标时以第一个目标寻优. 默认'profit_ratio'
+        weights (float | tuple[float]): 优化方向，正数最大化，负数最小化（多目标取第一个）. 默认1.
+        train_size (int | float): 样本内窗口长度，int为K线根数，float为占总长度比例. 默认0.5
+        test_size (int | float): 样本外窗口长度，int为K线根数，float为占总长度比例. 默认0.1
+        step (int | float | None): 窗口滚动步长，默认等于test_size
+        anchored (bool): 是否为锚定窗口（样本内起点固定，长度逐折增加）. 默认False
+        n_jobs (int): 候选参数回测的并行进程数（fork进程池，不支持fork的平台顺序执行），
+            'max'或-1为最大进程数. 默认1
+        show_bar (bool): 是否打印候选参数回测进度. 默认True
+        **params: 待优化参数，格式同 `Bt.optstrategy`
+            - range(1,10)：1到9步长1
+            - (10,30,2)：10到30（含）步长2
+            - [3,5,8,13]：仅从列表中选择
+            - 10：固定值
+    """
+
+    def __init__(self, strategy: type[Strategy], target: str | list[str] = 'profit_ratio',
+                 weights: float | tuple[float] = 1., train_size: int | float = .5,
+                 test_size: int | float = .1, step: int | float | None = None,
+                 anchored: bool = False, n_jobs: int | str = 1, show_bar: bool = True, **params):
+        if isinstance(target, str):
+            target = [target,]
+        if not (isinstance(target, (list, tuple)) and target and all(isinstance(x, str) for x in target)):
+            raise TypeError("target必须为字符串或字符串列表（QuantStats指标名）")
+        if not isinstance(weights, (float, int)):
+            assert isinstance(weights, (list, tuple)) and weights, 'weights为float | tuple[float]'
+            weights = weights[0]
+        assert weights, '权重不能为0（无法判断优化方向）'
+        self.strategy = strategy
+        self.target = list(target)
+        self.ismax = weights > 0.
+        self.train_size = train_size
+        self.test_size = test_size
+        self.step = step
+        self.anchored = bool(anchored)
+        self.n_jobs = MAX_WORKERS if n_jobs in ('max', -1) else max(int(n_jobs), 1)
+        self.show_bar = show_bar
+        self.params = params
+
+    @staticmethod
+    def _to_length(size: int | float, length: int, name: str) -> int:
+        """将窗口大小（根数或比例）转为K线根数"""
+        if isinstance(size, float):
+            assert 0. < size < 1., f"{name}为比例时必须在(0,1)之间"
+            size = int(length*size)
+        assert isinstance(size, int) and size > 0, f"{name}必须为正整数或(0,1)之间的比例"
+        return size
+
+    def split(self, length: int, start: int = 0) -> list[tuple[int, int, int, int]]:
+        """## 生成各折的索引区间
+
+        Args:
+            length (int): 数据总长度
+            start (int): 起始索引（跳过预热区间）. 默认0
+
+        Returns:
+            list[tuple[int, int, int, int]]: [(样本内起点, 样本内终点, 样本外起点, 样本外终点), ...]，左闭右开
+        """
+        valid_length = length - start
+        train = self._to_length(self.train_size, valid_length, 'train_size')
+        test = self._to_length(self.test_size, valid_length, 'test_size')
+        step = test if self.step is None else self._to_length(
+            self.step, valid_length, 'step')
+        folds = []
+        is_end = start + train
+        while is_end < length:
+            is_start = start if self.anchored else is_end - train
+            folds.append((is_start, is_end, is_end, min(is_end + test, length)))
+            is_end += step
+        assert folds, f"数据长度{length}不足以切分样本内({train})与样本外({test})窗口"
+        return folds
+
+    def _param_grid(self, default_params: dict) -> list[Addict]:
+        """按optstrategy参数格式生成候选参数网格"""
+        return param_grid(default_params, self.params)
+
+    def _score(self, equity: np.ndarray, index: pd.Index, start: int, end: int,
+               available: float, targets: Iterable[str]) -> list[float]:
+        """计算权益序列区间[start,end)的目标指标"""
+        base = equity[start-1] if start > 0 else available
+        stats = Stats(pd.Series(equity[start:end], index=index[start:end]),
+                      index=index[start:end], name='profit', available=base)
+        results = []
+        for target in targets:
+            try:
+                result = getattr(stats, target)()
+                result = result if isinstance(
+                    result, (float, int)) else list(result)[-1]
+                result = float(result) if result else 0.
+            except Exception:
+                result = np.nan
+            results.append(result)
+        return results
+
+    def _backtest(self, strategy: Strategy, candidates: list[Addict]) -> tuple[list[np.ndarray], pd.Index]:
+        """每组候选参数全历史回测一次，返回各组权益序列与时间索引"""
+        import multiprocessing as mp
+        global _FORK_STATE
+        num = len(candidates)
+        equities: list[np.ndarray | None] = [None]*num
+        index = None
+        n_jobs = min(self.n_jobs, num)
+        if n_jobs > 1 and 'fork' not in mp.get_all_start_methods():
+            print("当前平台不支持fork，已切换为顺序执行")
+            n_jobs = 1
+        if n_jobs > 1:
+            _FORK_STATE = (strategy, candidates, self.ismax, self.target)
+            try:
+                with mp.get_context('fork').Pool(processes=n_jobs) as pool:
+                    results = pool.imap_unordered(
+                        _run_forked_candidate, range(num), chunksize=max(num//(n_jobs*4), 1))
+                    for done, (i, equity, candidate_index) in enumerate(results, 1):
+                        equities[i] = equity
+                        if candidate_index is not None:
+                            index = candidate_index
+                        if self.show_bar:
+                            print(f"\r滚动前进分析回测进度：{done}/{num}", end="")
+            finally:
+                _FORK_STATE = None
+        else:
+            for i, params in enumerate(candidates):
+                strategy(params, self.ismax, self.target)
+                equities[i] = strategy.profits.values.astype(float).copy()
+                if index is None:
+                    index = strategy.profits.index
+                if self.show_bar:
+                    print(f"\r滚动前进分析回测进度：{i+1}/{num}", end="")
+        if self.show_bar:
+            print()
+        return equities, index
+
+    def _run_fold(self, fold: tuple[int, int, int, int], equities: list[np.ndarray],
+                  candidates: list[Addict], index: pd.Index, available: float) -> dict:
+        """单折：样本内选取最优参数，样本外评估"""
+        is_start, is_end, oos_start, oos_end = fold
+        start_time = time.perf_counter()
+        scores = np.array([self._score(equity, index, is_start, is_end, available, self.target[:1])[0]
+                           for equity in equities], dtype=float)
+        if np.isnan(scores).all():
+            best = 0
+        else:
+            best = int(np.nanargmax(scores) if self.ismax else np.nanargmin(scores))
+        is_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        oos_metrics = self._score(
+            equities[best], index, oos_start, oos_end, available, self.target)
+        oos_time = time.perf_counter() - start_time
+        return dict(
+            is_start=index[is_start], is_end=index[is_end-1],
+            oos_start=index[oos_start], oos_end=index[oos_end-1],
+            best=best, params=dict(candidates[best]), is_score=scores[best],
+            **{f"oos_{k}": v for k, v in zip(self.target, oos_metrics)},
+            is_time=round(is_time, 4), oos_time=round(oos_time, 4))
+
+    def run(self) -> WalkForwardResult:
+        """## 执行滚动前进分析
+
+        ### 执行步骤：
+        1. 以优化模式初始化策略（数据只加载一次）
+        2. 每组候选参数在全历史上回测一次，保存权益序列（n_jobs>1时在fork进程池中并行）
+        3. 各折在权益序列上切片：样本内寻优、样本外评估
+        4. 拼接各折样本外收益为连续权益曲线
+
+        Returns:
+            WalkForwardResult: 滚动前进分析结果
+        """
+        from ..utils import StrategyInstances
+        total_start = time.perf_counter()
+        Base._strategy_instances = StrategyInstances()
+        strategy: Strategy = self.strategy(
+            _isoptimize=True)._start_strategy_run()
+        if hasattr(strategy._api, "close"):
+            strategy._api.close()
+        candidates = self._param_grid(strategy.params)
+        available = strategy.config.value
+
+        # 每组候选参数全历史回测一次（指标在全历史上只计算一次，供所有折复用）
+        start_time = time.perf_counter()
+        equities, index = self._backtest(strategy, candidates)
+        backtest_time = time.perf_counter() - start_time
+        length = min(len(equity) for equity in equities)
+        index = index[:length]
+        equities = [equity[:length] for equity in equities]
+
+        # 各折样本内寻优与样本外评估
+        folds = self.split(length)
+        rows = [self._run_fold(fold, equities, candidates, index, available)
+                for fold in folds]
+
+        # 拼接样本外权益曲线（逐根收益累加）
+        # step < test_size 时相邻样本外窗口重叠，重叠部分只取前一折，保证时间索引不重复
+        pnls, oos_index = [], []
+        stitched_end = 0
+        for fold, row in zip(folds, rows):
+            _, _, oos_start, oos_end = fold
+            oos_start = max(oos_start, stitched_end)
+            if oos_start >= oos_end:
+                continue
+            stitched_end = oos_end
+            equity = equities[row['best']]
+            base = equity[oos_start-1] if oos_start > 0 else available
+            pnls.append(np.diff(np.r_[base, equity[oos_start:oos_end]]))
+            oos_index.append(index[oos_start:oos_end])
+        equity = pd.Series(available+np.cumsum(np.concatenate(pnls)),
+                           index=oos_index[0].append(oos_index[1:]), name='walk_forward')
+        stats = Stats(equity, index=equity.index,
+                      name='profit', available=available)
+
+        folds_df = pd.DataFrame(rows).drop(columns='best')
+        folds_df.index.name = 'fold'
+        Base._strategy_instances = StrategyInstances()
+        return WalkForwardResult(folds_df, equity, stats, [row['params'] for row in rows],
+                                 self.target, round(backtest_time, 4),
+                                 round(time.perf_counter()-total_start, 4))
@@ -22,6 +22,7 @@ from typing import Any
 from numpy import array as npArray
 from numpy.random import RandomState
 from .ta_ import LazyImport, Callable
+from .ta_kernels import get_kernel, as_float64
 if npVersion >= "1.20.0":
     from numpy.lib.stride_tricks import sliding_window_view
 np.seterr(divide='ignore', invalid='ignore')
@@ -283,6 +284,7 @@ def rolling_apply(
     window: int | np.integer | list[int] | np.ndarray,
     prepend_nans: bool = True,
     n_jobs: int = 1,
+    engine: str | None = None,
     **kwargs
 ) -> np.ndarray:
     """
@@ -291,13 +293,20 @@ def rolling_apply(
     对输入的DataFrame或Series应用滚动窗口计算，支持固定窗口和可变窗口大小，
     可并行处理提高计算效率。
 
+    - 固定窗口基于 `np.lib.stride_tricks.sliding_window_view` 生成窗口视图，不复制数据
+      （窗口为只读视图，func不可原地修改窗口）
+    - engine='numba' 时以numba编译func与窗口循环（func须可被njit编译且返回标量）；
+      func本身为numba函数时自动使用
+    - n_jobs>1 时输入数据放入共享内存，由进程池按区间分块计算，不再逐窗口序列化
+
     Args:
         df: 输入数据，支持pandas DataFrame或Series
         func: 应用于每个滚动窗口的函数
         window: 窗口大小，可以是固定整数或与数据长度相同的窗口大小数组
         prepend_nans: 是否在结果前填充NaN以匹配原始数据长度
-        n_jobs: 并行工作进程数，1表示串行执行，>1表示并行执行
-        **kwargs: 传递给func的额外参数
+        n_jobs: 并行工作进程数，1表示串行执行，>1表示并行执行，-1表示使用全部CPU核心
+        engine: 计算引擎，None（默认，Python逐窗口调用）或 'numba'
+        **kwargs: 传递给func的额外参数（numba引擎不支持，有额外参数时使用Python计算）
 
     Returns:
         np.ndarray: 函数应用于每个窗口的结果数组
@@ -314,6 +323,8 @@ def rolling_apply(
         >>> # 使用可变窗口
         >>> window_sizes = [2, 3, 2, 3, 2]
         >>> result = rolling_apply(df, np.mean, window=window_sizes)
+        >>> # numba编译
+        >>> result = rolling_apply(df, lambda x: x.max() - x.min(), window=3, engine="numba")
     """
     # ==================== 数据预处理 ====================
     # 统一数据格式：处理可能的包装对象
@@ -369,130 +380,209 @@ def rolling_apply(
             f"窗口类型错误({type(window)})，"
             f"支持类型：int、List[int]、np.ndarray[int]"
         )
-    # 预绑定kwargs参数到函数
-    if kwargs:
-        func = partial(func, **kwargs)
+    assert engine in (None, "numba"), f"engine须为None或'numba'，当前为{engine!r}"
+    if n_jobs == -1:
+        import os
+        n_jobs = os.cpu_count() or 1
 
     # ==================== 滚动计算核心逻辑 ====================
-
-    # --------------------------
-    # 1. 处理Series类型输入（核心修改：适配无NaN填充的窗口）
-    # --------------------------
+    # 窗口输入：arrays为传给func的数组（逐个一维数组），matrix=True时为单个二维数组
     if isinstance(df, pd.Series):
-        # 生成无NaN填充的窗口列表（每个元素是当前索引的有效数据窗口）
-        rolls = _rolling_window_1D(df.values, window, prepend_nans)
-        # 执行函数计算（直接传入有效窗口，无额外NaN）
-        if n_jobs == 1:
-            arr = list(map(func, rolls))
-        else:
-            arr = Parallel(n_jobs=n_jobs)(
-                delayed(func)(roll) for roll in rolls
-            )
-        result = np.array(arr)
-
-    # --------------------------
-    # 2. 处理DataFrame类型输入（同理适配无NaN填充）
-    # --------------------------
+        arrays, matrix = [df.values], False
     elif isinstance(df, pd.DataFrame) and all([col in df.columns for col in required_params]):
         if df.shape[1] == 1:
             # 单列DataFrame→按Series逻辑处理
-            rolls = _rolling_window_1D(df.values[:, 0], window, prepend_nans)
-            if n_jobs == 1:
-                # arr = [func(roll, **kwargs) for roll in rolls]
-                arr = list(map(func, rolls))
-            else:
-                arr = Parallel(n_jobs=n_jobs)(
-                    delayed(func)(roll) for roll in rolls
-                )
+            arrays = [df.values[:, 0]]
         else:
-            # 多列DataFrame→按列生成有效窗口后合并
-            df_filtered = df[required_params]
-            # 每列生成无NaN填充的窗口，结果为：[列1窗口列表, 列2窗口列表, ...]
-            col_rolls = [_rolling_window_1D(
-                df_filtered[col].values, window, prepend_nans) for col in df_filtered.columns]
-            # 按索引对齐多列窗口（每个索引对应多列的有效窗口）
-            merged_rolls = zip(*col_rolls)
-            if n_jobs == 1:
-                arr = [func(*cols) for cols in merged_rolls]
-            else:
-                arr = Parallel(n_jobs=n_jobs)(
-                    delayed(func)(*cols) for cols in merged_rolls
-                )
-        result = np.array(arr)
-
-    # --------------------------
-    # 3. 其他数据类型（兜底处理，同样移除NaN填充）
-    # --------------------------
+            # 多列DataFrame→按必填参数取列，每列窗口作为一个参数
+            arrays = [df[col].values for col in required_params]
+        matrix = False
     else:
-        # 统一的2D数据处理路径
-        col_rolls = _rolling_window_2D(df.values, window, prepend_nans)
-        if n_jobs == 1:
-            arr = list(map(func, col_rolls))
+        # 其他情况：窗口为二维数组（行=窗口，列=字段）
+        arrays, matrix = [df.values], True
+
+    # numba引擎：编译func与窗口循环
+    if engine == "numba" or (engine is None and hasattr(func, "py_func")):
+        if kwargs:
+            import warnings
+            warnings.warn("numba引擎不支持额外参数，已改用Python计算", UserWarning, stacklevel=2)
         else:
-            arr = Parallel(n_jobs=n_jobs)(delayed(func)(
-                cols) for cols in col_rolls)
-        result = np.array(arr)
+            result = _rolling_apply_numba(
+                arrays, matrix, func, window, prepend_nans)
+            if result is not None:
+                return result
 
-    return result
+    # 预绑定kwargs参数到函数
+    if kwargs:
+        func = partial(func, **kwargs)
+
+    if n_jobs > 1 and input_len > 1:
+        arr = _rolling_apply_parallel(
+            arrays, matrix, func, window, prepend_nans, n_jobs)
+    else:
+        arr = _apply_windows(arrays, matrix, func, window,
+                             prepend_nans, 0, input_len)
+    return np.array(arr)
 
 
-# --------------------------
-# 核心修改：_rolling_window_1D（移除所有无意义的NaN填充）
-# 功能：生成"仅包含有效数据"的窗口列表，每个窗口长度=当前索引的窗口大小
-# --------------------------
-def _rolling_window_1D(v: np.ndarray, window: np.ndarray, prepend_nans=True) -> list[np.ndarray]:
+def _rolling_windows(v: np.ndarray, window: np.ndarray, prepend_nans: bool = True,
+                     start: int = 0, stop: int | None = None) -> Sequence[np.ndarray]:
     """
-    生成1D数组的滚动窗口（无NaN填充）
+    生成索引区间[start, stop)的滚动窗口
     参数：
-        v: 输入1D数组
-        window: 窗口大小数组（长度=len(v)，每个元素为对应索引的窗口大小）
+        v: 输入数组（一维，或二维：窗口形状为(窗口大小, 列数)）
+        window: 区间内各索引的窗口大小（长度=stop-start，已确保<=len(v)）
+        prepend_nans: 窗口长度不足时是否在左侧补NaN
     返回：
-        窗口列表：每个元素是当前索引的有效数据窗口（长度=window[i]）
+        固定窗口时为 sliding_window_view 生成的只读视图（不复制数据），
+        可变窗口时为各索引窗口（切片视图，补NaN时为新数组）的列表
     """
-    input_len = len(v)
-    windows = []
-    for i in range(input_len):
-        # 当前索引的窗口大小（已确保<=input_len）
-        w = window[i]
-        # 计算窗口起始索引（确保不小于0）
-        start_idx = max(0, i - w + 1)
-        # 提取有效数据窗口（无任何NaN填充）
-        valid_window = v[start_idx:i+1]
-        if prepend_nans and valid_window.size < w:
-            # 计算需要补充的NaN数量
-            pad_length = w - valid_window.size
-            # 左侧补NaN（第一个参数为左侧填充数，第二个为右侧填充数）
-            valid_window = np.pad(
-                valid_window,
-                (pad_length, 0),  # 关键修改：左侧补pad_length个NaN，右侧不补
-                mode="constant",
-                constant_values=np.nan
-            )
-        windows.append(valid_window)
-    return windows
-
-
-def _rolling_window_2D(v: np.ndarray, window: np.ndarray, prepend_nans=True) -> list[np.ndarray]:
-    """生成2D数组的滚动窗口（作为整体二维数组返回）"""
-    rows, cols = v.shape
-    windows = []
-    for i in range(rows):
-        w = window[i]
-        start_idx = max(0, i - w + 1)
-        # 提取窗口内的所有列数据，shape=(window_size, cols)
-        valid_window = v[start_idx:i+1, :]
-        if prepend_nans and len(valid_window) < w:
-            # 计算需要补充的NaN数量
-            pad_length = w - len(valid_window)
-            # 左侧补NaN（第一个参数为左侧填充数，第二个为右侧填充数）
-            valid_window = np.pad(
-                valid_window,
-                ((pad_length, 0), (0, 0)),  # 关键修改：左侧补pad_length个NaN，右侧不补
-                mode="constant",
-                constant_values=np.nan
-            )
-        windows.append(valid_window)
-    return windows
+    stop = len(v) if stop is None else stop
+    if stop <= start:
+        return []
+    w = int(window[0])
+    if not (window == w).all():
+        windows = []
+        for i in range(start, stop):
+            size = window[i - start]
+            valid_window = v[max(0, i - size + 1):i + 1]
+            if prepend_nans and len(valid_window) < size:
+                # 左侧补NaN（第一个参数为左侧填充数，第二个为右侧填充数）
+                pad = [(size - len(valid_window), 0)] + [(0, 0)] * (v.ndim - 1)
+                valid_window = np.pad(
+                    valid_window, pad, mode="constant", constant_values=np.nan)
+            windows.append(valid_window)
+        return windows
+
+    def view(values: np.ndarray) -> np.ndarray:
+        windows = sliding_window_view(values, w, axis=0)
+        # 二维数据的视图形状为(n, 列数, 窗口)，转换为(n, 窗口, 列数)
+        return np.moveaxis(windows, -1, 1) if values.ndim > 1 else windows
+
+    lo = start - w + 1
+    if prepend_nans:
+        segment = v[max(lo, 0):stop]
+        if lo < 0:
+            # 只为区间开头不足窗口长度的部分补NaN
+            pad = np.full((-lo,) + v.shape[1:], np.nan)
+            segment = np.concatenate((pad, segment))
+        return view(segment)
+    # 不补NaN：前w-1个窗口长度不足，为数据开头的切片
+    head = [v[:i + 1] for i in range(start, min(stop, w - 1))]
+    first = start + len(head)
+    if first < stop:
+        windows = view(v[first - w + 1:stop])
+        return head + list(windows) if head else windows
+    return head
+
+
+def _apply_windows(arrays: list[np.ndarray], matrix: bool, func: Callable, window: np.ndarray,
+                   prepend_nans: bool, start: int, stop: int) -> list:
+    """对索引区间[start, stop)的窗口逐个调用func（window为区间内各索引的窗口大小）"""
+    if matrix or len(arrays) == 1:
+        return list(map(func, _rolling_windows(arrays[0], window, prepend_nans, start, stop)))
+    col_rolls = [_rolling_windows(v, window, prepend_nans, start, stop)
+                 for v in arrays]
+    return [func(*cols) for cols in zip(*col_rolls)]
+
+
+def _rolling_apply_numba(arrays: list[np.ndarray], matrix: bool, func: Callable, window: np.ndarray,
+                         prepend_nans: bool) -> np.ndarray | None:
+    """numba引擎：未安装numba或func无法编译时返回None（改用Python计算）"""
+    import warnings
+    from .ta_kernels import rolling_kernel
+    name = getattr(func, "__name__", type(func).__name__)
+    try:
+        driver = rolling_kernel(func, len(arrays), matrix)
+    except ImportError:
+        warnings.warn("未安装numba，rolling_apply已改用Python计算",
+                      UserWarning, stacklevel=3)
+        return None
+    except AssertionError as e:
+        warnings.warn(f"{e}，已改用Python计算", UserWarning, stacklevel=3)
+        return None
+    offset = int(window.max()) - 1
+    try:
+        columns = [np.concatenate((np.full((offset,) + v.shape[1:], np.nan), np.asarray(v, dtype=np.float64)))
+                   for v in arrays]
+        return driver(*columns, np.ascontiguousarray(window, dtype=np.int64), bool(prepend_nans), offset)
+    except Exception as e:
+        warnings.warn(f"函数{name}无法以numba编译（{type(e).__name__}），已改用Python计算",
+                      UserWarning, stacklevel=3)
+        return None
+
+
+def _rolling_apply_chunk(specs: list[tuple], matrix: bool, func: Callable, window: np.ndarray,
+                         prepend_nans: bool, start: int, stop: int, untrack: bool) -> list:
+    """进程池任务：从共享内存映射输入数组，计算区间[start, stop)的窗口"""
+    from multiprocessing import shared_memory, resource_tracker
+    blocks = []
+    try:
+        for name, shape, dtype in specs:
+            shm = shared_memory.SharedMemory(name=name)
+            if untrack:
+                # spawn子进程不负责释放共享内存，避免退出时被回收
+                resource_tracker.unregister(shm._name, "shared_memory")
+            blocks.append(shm)
+        arrays = [np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                  for (_, shape, dtype), shm in zip(specs, blocks)]
+        result = _apply_windows(arrays, matrix, func, window,
+                                prepend_nans, start, stop)
+        # 结果可能是窗口视图，关闭共享内存前复制
+        result = [np.array(r) if isinstance(r, np.ndarray) else r
+                  for r in result]
+        del arrays
+        return result
+    finally:
+        for shm in blocks:
+            try:
+                shm.close()
+            except BufferError:
+                ...  # 仍有引用时由进程退出释放
+
+
+def _rolling_apply_parallel(arrays: list[np.ndarray], matrix: bool, func: Callable, window: np.ndarray,
+                            prepend_nans: bool, n_jobs: int) -> list:
+    """
+    多进程滚动计算：输入数组只复制一次到共享内存，子进程直接映射，
+    任务只传递区间与区间内的窗口大小；func无法pickle或数据无法放入共享内存时使用joblib分块计算
+    """
+    import pickle
+    import multiprocessing as mp
+    from multiprocessing import shared_memory
+    from concurrent.futures import ProcessPoolExecutor
+    input_len = len(arrays[0])
+    edges = np.linspace(0, input_len, min(
+        input_len, n_jobs * 4) + 1).astype(int)
+    chunks = [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+    try:
+        pickle.dumps(func)
+        shareable = all(v.dtype.kind in "biufcmM" for v in arrays)
+    except Exception:
+        shareable = False
+    if not shareable:
+        parts = Parallel(n_jobs=n_jobs)(
+            delayed(_apply_windows)(arrays, matrix, func, window[a:b], prepend_nans, a, b) for a, b in chunks
+        )
+        return [r for part in parts for r in part]
+
+    method = 'fork' if 'fork' in mp.get_all_start_methods() else 'spawn'
+    blocks, specs = [], []
+    try:
+        for v in arrays:
+            v = np.ascontiguousarray(v)
+            shm = shared_memory.SharedMemory(create=True, size=max(v.nbytes, 1))
+            blocks.append(shm)
+            np.ndarray(v.shape, dtype=v.dtype, buffer=shm.buf)[...] = v
+            specs.append((shm.name, v.shape, v.dtype.str))
+        with ProcessPoolExecutor(n_jobs, mp_context=mp.get_context(method)) as executor:
+            futures = [executor.submit(_rolling_apply_chunk, specs, matrix, func, window[a:b],
+                                       prepend_nans, a, b, method != 'fork') for a, b in chunks]
+            return [r for future in futures for r in future.result()]
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
 
 
 def _stoch(high, low, close, k=None, d=None, smooth_k=None, mamode=None, offset=None, **kwargs):
@@ -576,18 +666,8 @@ def _mcgd(close, length=None, offset=None, c=None, **kwargs):
         return
 
     # Calculate Result
-    close = close.copy()
-
-    def mcg_(series):
-        denom = (c * length * (series.iloc[1] / series.iloc[0]) ** 4)
-        series.iloc[1] = (
-            series.iloc[0] + ((series.iloc[1] - series.iloc[0]) / denom))
-        return series.iloc[1]
-
-    mcg_cell = close[0:].rolling(2, min_periods=2).apply(mcg_, raw=False)
-
-    # 使用 pd.concat() 替代已弃用的 append()
-    mcg_ds = pd.concat([close[:1], mcg_cell[1:]])
+    mcg_ds = pd.Series(get_kernel("mcgd_kernel")(
+        as_float64(close), length, c), index=close.index, name=close.name)
 
     # 确保结果按原始索引排序
     mcg_ds = mcg_ds.sort_index()
@@ -645,19 +725,8 @@ class ZigZag:
     def zigzag_returns(high: pd.Series, low: pd.Series, close: pd.Series, up_thresh: float = 0., down_thresh: float = 0., multiplier: float = 1., limit: bool = True, **kwargs) -> pd.Series:
         pvp = ZigZag.zigzag(high, low, close, up_thresh,
                             down_thresh, multiplier, **kwargs).values
-        _close = close.values
-        size = _close.size
-        result = np.zeros(size)
-        last = _close[-1]
-        pre = pvp[0]
-        for (i,), p in np.ndenumerate(pvp[:-1]):
-            if not np.isnan(p):
-                result[i] = (p-pre)/pre
-                pre = p
-            else:
-                result[i] = (_close[i]-pre)/pre
-        else:
-            result[-1] = (last-pre)/pre
+        result = get_kernel("zigzag_returns_kernel")(
+            as_float64(pvp), as_float64(close))
         return pd.Series(result)
 
 
@@ -665,66 +734,19 @@ def abc(df: pd.DataFrame, lim: float = 5., price_tick: float = 0.01, **kwargs) -
     # df=pd.DataFrame(dict(open=open,high=high,low=low,close=close))
     col = FILED.OHLC.tolist()
     df = df[col]
-    frame = pd.DataFrame(columns=col)
-    max_line = lim*price_tick
-    for rows in df.itertuples():
-        index, open, high, low, close = rows
-        tick = abs(open-close)/price_tick
-        if index:
-            diff = open-preclose
-            open -= diff
-            high -= diff
-            low -= diff
-            close -= diff
-
-            if tick > lim:
-                if close >= open:
-                    up = min(high-close, max_line)
-                    close = open+lim*price_tick
-                    high = close+up
-                else:
-                    down = min(close-low, max_line)
-                    close = open-lim*price_tick
-                    low = close-down
-        else:
-            if tick > lim:
-                if close >= open:
-                    up = min(high-close, max_line)
-                    close = open+lim*price_tick
-                    high = close+up
-                else:
-                    down = min(close-low, max_line)
-                    close = open-lim*price_tick
-                    low = close-down
-        preclose = close
-        frame.loc[index, :] = [open, high, low, close]
-    frame = frame.astype(np.float64)
+    values = get_kernel("abc_kernel")(
+        *(as_float64(df[c]) for c in col), float(lim), float(price_tick))
+    frame = pd.DataFrame(dict(zip(col, values)), index=df.index)
     frame.category = 'candles'
     return frame
 
 
 def insidebar(high: pd.Series, low: pd.Series, close: pd.Series, length: int = 10, **kwargs):
     length = int(length) if length and length > 0 else 10
-    high = high.rolling(length).max().values
-    low = low.rolling(length).min().values
-    size = close.size
-    close = close.values
-    thrend = np.full((size,), np.nan)
-    line = np.full((size,), np.nan)
-    thrend[length-1] = 1.
-    for i in range(length, size):
-        _close, _low, _high = close[i], low[i-1], high[i-1]
-        diff = _high-_low
-        if close[i] > _high:
-            thrend[i] = 1.
-        elif close[i] < _low:
-            thrend[i] = -1.
-        else:
-            thrend[i] = thrend[i-1]
-        if thrend[i] > 0.:
-            line[i] = (_close-_low)/diff
-        else:
-            line[i] = (_close-_high)/diff
+    high = as_float64(high.rolling(length).max())
+    low = as_float64(low.rolling(length).min())
+    thrend, line = get_kernel("insidebar_kernel")(
+        as_float64(close), high, low, length)
     return pd.DataFrame(dict(thrend=thrend, line=line))
 
 
@@ -772,29 +794,10 @@ def smoothrng(x: pd.Series, t: int, m: float = 1.):
 
 def rngfilt(x: pd.Series, r: pd.Series):
     """过滤范围"""
-    _add = (x+r).values
-    _diff = (x-r).values
-    x = x.values
+    _add = as_float64(x+r)
     m = len(_add[pd.isna(_add)])
-    rngfilt = np.array([np.nan]*m)
-    rngfilt = np.insert(rngfilt, m, x[m])
-    dir = np.array([np.nan]*m)
-    dir = np.insert(dir, m, 1.)
-    # lennan = max(len(x[isnan(x)]), len(r[isnan(r)]))
-    for i in range(m+1, x.size):
-        pre_rngfilt = rngfilt[i-1]
-        add, diff = _add[i], _diff[i]
-        # 向上突破时时候保持收盘价与目标线在一个r值距离，如果收盘价上涨小于r值，则没突破，维持原值
-        y = pre_rngfilt if diff < pre_rngfilt else diff
-        # 向下突破时时候保持收盘价与目标线在一个r值距离，如果收盘价下跌小于r值，则没突破，维持原值
-        z = pre_rngfilt if add > pre_rngfilt else add
-        # 收盘价在前一值之上，则有可能向上突破，则取y，之下则有可能向下突破，取z
-        pre_dir = dir[i-1]
-        next_rngfilt = y if x[i] > pre_rngfilt else z
-        next_dir = pre_dir if pre_rngfilt == next_rngfilt else (
-            1. if next_rngfilt > pre_rngfilt else -1.)
-        rngfilt = np.insert(rngfilt, i, next_rngfilt)
-        dir = np.insert(dir, i, next_dir)
+    rngfilt, dir = get_kernel("rngfilt_kernel")(
+        as_float64(x), _add, as_float64(x-r), m)
     return pd.Series(rngfilt), pd.Series(dir)
 
 # 自定义内置指标
@@ -857,29 +860,10 @@ class BtFunc(LazyImport):
     def rngfilt(close: pd.Series, r: pd.Series = None, **kwargs):
         """过滤范围"""
 
-        _add = (close+r).values
-        _diff = (close-r).values
-        x = close.values
+        _add = as_float64(close+r)
         m = len(_add[pd.isna(_add)])
-        rngfilt = np.array([np.nan]*m)
-        rngfilt = np.insert(rngfilt, m, x[m])
-        dir = np.array([np.nan]*m)
-        dir = np.insert(dir, m, 1.)
-        # lennan = max(len(x[isnan(x)]), len(r[isnan(r)]))
-        for i in range(m+1, x.size):
-            pre_rngfilt = rngfilt[i-1]
-            add, diff = _add[i], _diff[i]
-            # 向上突破时时候保持收盘价与目标线在一个r值距离，如果收盘价上涨小于r值，则没突破，维持原值
-            y = pre_rngfilt if diff < pre_rngfilt else diff
-            # 向下突破时时候保持收盘价与目标线在一个r值距离，如果收盘价下跌小于r值，则没突破，维持原值
-            z = pre_rngfilt if add > pre_rngfilt else add
-            # 收盘价在前一值之上，则有可能向上突破，则取y，之下则有可能向下突破，取z
-            pre_dir = dir[i-1]
-            next_rngfilt = y if x[i] > pre_rngfilt else z
-            next_dir = pre_dir if pre_rngfilt == next_rngfilt else (
-                1. if next_rngfilt > pre_rngfilt else -1.)
-            rngfilt = np.insert(rngfilt, i, next_rngfilt)
-            dir = np.insert(dir, i, next_dir)
+        rngfilt, dir = get_kernel("rngfilt_kernel")(
+            as_float64(close), _add, as_float64(close-r), m)
         df = pd.concat([pd.Series(rngfilt, name="rngfilt"),
                        pd.Series(dir, name="dir")], axis=1)
         df.category = 'overlap'
@@ -954,13 +938,8 @@ class BtFunc(LazyImport):
         x = er * (fr - sr) + sr
         sc = x * x
 
-        m = close.size
-        result = [np.nan for _ in range(0, length - 1)] + [0]
-        for i in range(length, m):
-            result.append(sc.iloc[i] * close.iloc[i] +
-                          (1 - sc.iloc[i]) * result[i - 1])
-
-        kama = pd.Series(result, index=close.index)
+        kama = pd.Series(get_kernel("kama_kernel")(
+            as_float64(close), as_float64(sc), length), index=close.index)
 
         # Offset
         if offset != 0:
@@ -999,26 +978,9 @@ class BtFunc(LazyImport):
         std = getattr(pta, dev)(close, length)
         longStop = mavg-mult*std
         shortStop = mavg+mult*std
-        size = close.size
         length = get_lennan(longStop, shortStop)
-        maxlong = longStop[length]
-        minshort = shortStop[length]
-        long = np.full(size, np.nan)
-        short = np.full(size, np.nan)
-        thrend = np.zeros(size)
-        dir = 1
-        for i in range(length+1, size):
-            dir = (dir == -1 and mavg[i] > minshort) and 1 or (
-                (dir == 1 and mavg[i] < maxlong) and -1 or dir)
-            if dir == 1:
-                maxlong = max(maxlong, longStop[i])
-                minshort = shortStop[i]
-                long[i] = maxlong
-            else:
-                minshort = min(minshort, shortStop[i])
-                maxlong = longStop[i]
-                short[i] = minshort
-            thrend[i] = dir
+        long, short, thrend = get_kernel("pmax_kernel")(
+            as_float64(mavg), as_float64(longStop), as_float64(shortStop), length)
         df = pd.DataFrame(dict(long=long, short=short, thrend=thrend))
         df.category = "overlap"
         return df
@@ -1034,24 +996,9 @@ class BtFunc(LazyImport):
         longStop = mavg-mult*std
         shortStop = mavg+mult*std
         length = get_lennan(longStop, shortStop)
-        maxlong = longStop[length]
-        minshort = shortStop[length]
-        size = close.size
-        pmax = np.full(size, np.nan)
-        thrend = np.zeros(size)
-        dir = 1
-        for i in range(length+1, size):
-            dir = (dir == -1 and mavg[i] > minshort) and 1 or (
-                (dir == 1 and mavg[i] < maxlong) and -1 or dir)
-            if dir == 1:
-                maxlong = max(maxlong, longStop[i])
-                minshort = shortStop[i]
-                pmax[i] = maxlong
-            else:
-                minshort = min(minshort, shortStop[i])
-                maxlong = longStop[i]
-                pmax[i] = minshort
-            thrend[i] = dir
+        long, short, thrend = get_kernel("pmax_kernel")(
+            as_float64(mavg), as_float64(longStop), as_float64(shortStop), length)
+        pmax = np.where(thrend == 1., long, short)
         df = pd.DataFrame(dict(pmax=pmax, thrend=thrend))
         df.category = "overlap"
         return df
@@ -1066,19 +1013,9 @@ class BtFunc(LazyImport):
         std = getattr(pta, dev)(close, length)
         dn = mavg-mult*std
         up = mavg+mult*std
-        size = close.size
         length = get_lennan(dn, up)
-        pmax = np.full(size, np.nan)
-        pmax[length] = dn[length]
-        dir = np.ones(size)
-        thrend = np.ones(size)
-        for i in range(length+1, size):
-            dir[i] = (dir[i-1] == -1 and mavg[i] > pmax[i-1]
-                      ) and 1 or ((dir[i-1] == 1 and mavg[i] < pmax[i-1]) and -1 or dir[i-1])
-            pmax[i] = dir[i] == 1 and max(
-                dn[i], pmax[i-1]) or min(up[i], pmax[i-1])
-            thrend[i] = pmax[i] > pmax[i -
-                                       1] and 1 or (pmax[i] < pmax[i-1] and -1 or thrend[i-1])
+        pmax, thrend = get_kernel("pmax3_kernel")(
+            as_float64(mavg), as_float64(dn), as_float64(up), length)
         df = pd.DataFrame(dict(pmax=pmax, thrend=thrend))
         df.category = "overlap"
         return df
@@ -1110,32 +1047,11 @@ class BtFunc(LazyImport):
             -------
             bull,bear,signal = AndeanOsc(close,open,14,9)
             '''
-        N = len(close)
-
         alpha = 2/(length+1)
         alpha_signal = 2/(signal_length+1)
 
-        up1, up2, dn1, dn2, bull, bear, signal = np.zeros((7, N))
-
-        up1[0] = dn1[0] = signal[0] = close[0]
-        up2[0] = dn2[0] = close[0]**2
-
-        for i in range(1, N):
-            up1[i] = max(close[i], open[i], up1[i-1] -
-                         alpha*(up1[i-1] - close[i]))
-            dn1[i] = min(close[i], open[i], dn1[i-1] +
-                         alpha*(close[i] - dn1[i-1]))
-
-            up2[i] = max(close[i]**2, open[i]**2, up2[i-1] -
-                         alpha*(up2[i-1] - close[i]**2))
-            dn2[i] = min(close[i]**2, open[i]**2, dn2[i-1] +
-                         alpha*(close[i]**2 - dn2[i-1]))
-
-            bull[i] = np.sqrt(dn2[i] - dn1[i]**2)
-            bear[i] = np.sqrt(up2[i] - up1[i]**2)
-
-            signal[i] = signal[i-1] + alpha_signal * \
-                (np.maximum(bull[i], bear[i]) - signal[i-1])
+        up1, dn1, bull, bear, signal = get_kernel("andean_kernel")(
+            as_float64(open), as_float64(close), alpha, alpha_signal)
         result = pd.DataFrame(
             dict(up=up1, dn=dn1, bull=bull, bear=bear, signal=signal))
         result.overlap = dict(up=True, dn=True, bull=False,
@@ -1144,8 +1060,7 @@ class BtFunc(LazyImport):
 
     def Coral_Trend_Candles(close: pd.Series, smooth: int = 9., mult: float = .4, **kwargs) -> pd.Series:
         # string GROUP_3 = 'Config » Coral Trend Candles'
-        size = len(close)
-        src = close.values
+        src = as_float64(close)
         _sm = smooth if smooth and smooth > 0. else 9.
         cd = mult if mult and mult > 0. else .4
         di = (_sm) / 2.0 + 1.0
@@ -1154,22 +1069,8 @@ class BtFunc(LazyImport):
         c3 = 3.0 * (cd * cd + cd * cd * cd)
         c4 = -3.0 * (2.0 * cd * cd + cd + cd * cd * cd)
         c5 = 3.0 * cd + 1.0 + cd * cd * cd + 3.0 * cd * cd
-        i1 = np.zeros(size)
-        i2 = np.zeros(size)
-        i3 = np.zeros(size)
-        i4 = np.zeros(size)
-        i5 = np.zeros(size)
-        i6 = np.zeros(size)
-        bfr = np.zeros(size)
-        for i in range(1, size):
-            i1[i] = c1 * src[i] + c2 * i1[i-1]
-            i2[i] = c1 * i1[i] + c2 * i2[i-1]
-            i3[i] = c1 * i2[i] + c2 * i3[i-1]
-            i4[i] = c1 * i3[i] + c2 * i4[i-1]
-            i5[i] = c1 * i4[i] + c2 * i5[i-1]
-            i6[i] = c1 * i5[i] + c2 * i6[i-1]
-            bfr[i] = -cd * cd * cd * i6[i] + c3 * \
-                i5[i] + c4 * i4[i] + c5 * i3[i]
+        bfr = get_kernel("coral_kernel")(
+            src, c1, c2, c3, c4, c5, cd)
         return pd.Series(bfr)
 
     def rsrs(high: pd.Series, low: pd.Series, volume: pd.Series, length: int = 10, method='r1', weights=True, **kwargs):
@@ -1227,32 +1128,14 @@ class BtFunc(LazyImport):
         offset = v_offset(offset)
 
         # Calculate Results
-        m = close.size
-        dir_, trend = [1] * m, [0] * m
-        long, short = [npInf] * m, [npInf] * m
-
         hhv = (weights*high+low)/(weights+1.)
         llv = (weights*low+high)/(weights+1.)
         matr = multiplier * pta.atr(high, low, close, length)
         upperband = llv + matr
         lowerband = hhv - matr
 
-        for i in range(1, m):
-            if close.iloc[i] > upperband.iloc[i - 1]:
-                dir_[i] = 1
-            elif close.iloc[i] < lowerband.iloc[i - 1]:
-                dir_[i] = -1
-            else:
-                dir_[i] = dir_[i - 1]
-                if dir_[i] > 0 and lowerband.iloc[i] < lowerband.iloc[i - 1]:
-                    lowerband.iloc[i] = lowerband.iloc[i - 1]
-                if dir_[i] < 0 and upperband.iloc[i] > upperband.iloc[i - 1]:
-                    upperband.iloc[i] = upperband.iloc[i - 1]
-
-            if dir_[i] > 0:
-                trend[i] = long[i] = lowerband.iloc[i]
-            else:
-                trend[i] = short[i] = upperband.iloc[i]
+        trend, dir_, long, short = get_kernel("supertrend_kernel")(
+            as_float64(close), as_float64(upperband), as_float64(lowerband))
 
         # Prepare DataFrame to return
         _props = f"_{length}_{multiplier}"
@@ -1323,19 +1206,8 @@ class BtFunc(LazyImport):
         c1 = 1-c2-c3
 
         diff = close-2*close.shift(1)+close.shift(2)
-        filt = np.zeros(close.size)
-        hp = np.zeros(close.size)
-        em = np.zeros(close.size)
-        for i in range(close.size):
-            if i > 1:
-                hp[i] = deta*deta*diff.iloc[i]+2 * \
-                    (1-alpha)*hp[i-1]-(1-alpha)*(1-alpha)*hp[i-2]
-                filt[i] = c1*(hp[i]+hp[i-1])/2.+c2*filt[i-1]+c3*filt[i-2]
-                wave = (filt[i]+filt[i-1]+filt[i-2])/3.
-                pwr = (filt[i]*filt[i]+filt[i-1] *
-                       filt[i-1]+filt[i-2]*filt[i-2])/3.
-                em[i] = pwr if pwr == 0 else wave/np.sqrt(pwr)
-
+        em = get_kernel("emsa_kernel")(
+            as_float64(diff), alpha, deta, c1, c2, c3)
         return pd.Series(em)
 
     def highpassfilter(close: pd.Series, length: int = 10):
@@ -1343,22 +1215,16 @@ class BtFunc(LazyImport):
         alpha = (a+np.sin(.707*360/48)-1)/a
         deta = 1-alpha/2
         src = close-2*close.shift(1)+close.shift(2)
-        hp = np.zeros(close.size)
-        for i in range(close.size):
-            if i > 1:
-                hp[i] = deta*deta*src.iloc[i]+2 * \
-                    (1-alpha)*hp[i-1]-(1-alpha)*(1-alpha)*hp[i-2]
-        hp = pd.Series(hp)
+        hp = pd.Series(get_kernel("highpass_kernel")(
+            as_float64(src), alpha, deta))
 
         a = np.exp(-1.414*np.pi/length)
         b = 2*a*np.cos(1.414*180/length)
         c2, c3 = b, -a**2
         c1 = 1-c2-c3
         src = (hp+hp.shift(1))/2.
-        filt = np.zeros(close.size)
-        for i in range(close.size):
-            if i > 1:
-                filt[i] = c1*src.iloc[i]+c2*filt[i-1]+c3*filt[i-2]
+        filt = get_kernel("supersmoother_kernel")(
+            as_float64(src), c1, c2, c3)
         return pd.Series(filt)
 
     def mcd(open, high, low, close, volume, length: int):
@@ -1406,12 +1272,7 @@ class BtFunc(LazyImport):
         def func(x: pd.Series):
             return np.sqrt(x.mean())
         a, b = 5/35, 5/65
-        pb = np.zeros(close.size)
-        for i in range(close.size):
-            if i > 1:
-                pb[i] = (a-b)*close.iloc[i]+(b*(1-a)-a*(1-b)) * \
-                    close.iloc[i-1]+(2-a-b)*pb[i-1]-(1-a)*(1-b)*pb[i-2]
-        pb = pd.Series(pb)
+        pb = pd.Series(get_kernel("bandpass_kernel")(as_float64(close), a, b))
         return pb, pb.rolling(length).apply(lambda x: func(x*x))
 
     def supersmootherfilter(close: pd.Series, length: int):
@@ -1420,10 +1281,8 @@ class BtFunc(LazyImport):
         c2, c3 = b, -a**2
         c1 = 1-c2-c3
         src = (close+close.shift(1))/2.
-        filt = np.zeros(close.size)
-        for i in range(close.size):
-            if i > 1:
-                filt[i] = c1*src.iloc[i]+c2*filt[i-1]+c3*filt[i-2]
+        filt = get_kernel("supersmoother_kernel")(
+            as_float64(src), c1, c2, c3)
         return pd.Series(filt)
 
     def vwap(close: pd.Series, volume: pd.Series, length: int, mult: float = 2.):
@@ -1436,14 +1295,7 @@ class BtFunc(LazyImport):
         return vwap, sdup, sddn, vwapr
 
     def lowpass(close: pd.Series, length: int):
-        lp = np.zeros(close.size)
-        a = 2/(1+length)
-        powa = a*a
-        for i in range(close.size):
-            if i >= length-1:
-                lp[i] = (a-powa/4)*close.iloc[i]+powa*close.iloc[i-1]/2 - \
-                    (a-3*powa/4)*close.iloc[i-2]+2 * \
-                    (1-a)*lp[i-1]-(1-a)*(1-a)*lp[i-2]
+        lp = get_kernel("lowpass_kernel")(as_float64(close), length)
         return pd.Series(lp)
 
     def _rsrs(low: pd.Series, high: pd.Series, close: pd.Series, vol: pd.Series, length: int = None, weights: bool = False):
@@ -0,0 +1,489 @@
+# -*- coding: utf-8 -*-
+"""
+## ta.py 递推/路径依赖指标的编译内核
+
+`ta.py` 中的递推滤波与路径依赖指标（kama、rngfilt、supertrend、mcgd、pmax等）
+原实现逐元素通过pandas（`.iloc`、`np.insert`、`rolling.apply`）计算，
+百万级K线时单个指标耗时数秒至数分钟。
+
+本模块将这些循环改写为只操作 float64 `np.ndarray` 的内核函数：
+
+- 安装numba时以 `njit(cache=True, error_model="numpy")` 编译（除零返回inf/nan，与numpy一致）
+- 未安装numba时以纯Python执行同一函数（只操作ndarray，仍明显快于逐元素访问pandas）
+- `ta.py` 中对应函数只负责参数校验、预处理与结果封装，循环部分调用本模块内核
+- 原实现保留在 `minibt.ta_reference`，作为等价性测试的参照（结果在浮点误差范围内一致）
+
+### 示例：
+```python
+from minibt.ta_kernels import get_kernel
+kama = get_kernel("kama_kernel")(close_values, sc_values, 10)
+```
+"""
+from __future__ import annotations
+from typing import Callable
+import numpy as np
+
+__all__ = ["get_kernel", "as_float64", "KERNELS", "rolling_kernel"]
+
+
+def as_float64(values) -> np.ndarray:
+    """转换为连续的float64数组（内核输入）"""
+    values = getattr(values, "values", values)
+    return np.ascontiguousarray(np.asarray(values, dtype=np.float64))
+
+
+def mcgd_kernel(close, length, c):
+    """McGinley Dynamic：mcg[i] = close[i-1] + (close[i] - close[i-1]) / (c * length * (close[i] / close[i-1]) ** 4)
+
+    - 与原实现 `rolling(2).apply` 的实际结果一致：pandas_ta 0.4.x 导入时开启Copy-on-Write，
+      apply中写回窗口的值不会传回底层数组，前值始终为原始收盘价（不递推）
+    - 窗口含nan时结果为nan
+    """
+    n = close.size
+    out = np.full(n, np.nan)
+    if n == 0:
+        return out
+    out[0] = close[0]
+    for i in range(1, n):
+        prev = close[i - 1]
+        out[i] = prev + (close[i] - prev) / (c * length * (close[i] / prev) ** 4)
+    return out
+
+
+def insidebar_kernel(close, high, low, length):
+    """insidebar：突破前length根K线区间的趋势方向及区间内相对位置"""
+    size = close.size
+    thrend = np.full(size, np.nan)
+    line = np.full(size, np.nan)
+    if length - 1 < size:
+        thrend[length - 1] = 1.
+    for i in range(length, size):
+        _close, _low, _high = close[i], low[i - 1], high[i - 1]
+        diff = _high - _low
+        if _close > _high:
+            thrend[i] = 1.
+        elif _close < _low:
+            thrend[i] = -1.
+        else:
+            thrend[i] = thrend[i - 1]
+        if thrend[i] > 0.:
+            line[i] = (_close - _low) / diff
+        else:
+            line[i] = (_close - _high) / diff
+    return thrend, line
+
+
+def rngfilt_kernel(x, add, diff, m):
+    """过滤范围：m为 x+r 中nan的个数（起始位置）"""
+    size = x.size
+    filt = np.full(size, np.nan)
+    dir_ = np.full(size, np.nan)
+    if m >= size:
+        return filt, dir_
+    filt[m] = x[m]
+    dir_[m] = 1.
+    for i in range(m + 1, size):
+        pre = filt[i - 1]
+        y = pre if diff[i] < pre else diff[i]
+        z = pre if add[i] > pre else add[i]
+        value = y if x[i] > pre else z
+        if pre == value:
+            dir_[i] = dir_[i - 1]
+        elif value > pre:
+            dir_[i] = 1.
+        else:
+            dir_[i] = -1.
+        filt[i] = value
+    return filt, dir_
+
+
+def kama_kernel(close, sc, length):
+    """KAMA：kama[i] = sc[i] * close[i] + (1 - sc[i]) * kama[i-1]，kama[length-1] = 0"""
+    size = close.size
+    out = np.full(size, np.nan)
+    if length - 1 < size:
+        out[length - 1] = 0.
+    for i in range(length, size):
+        out[i] = sc[i] * close[i] + (1 - sc[i]) * out[i - 1]
+    return out
+
+
+def pmax_kernel(mavg, long_stop, short_stop, start):
+    """pmax/pmax2：返回 (多头止损线, 空头止损线, 趋势方向)"""
+    size = mavg.size
+    long = np.full(size, np.nan)
+    short = np.full(size, np.nan)
+    thrend = np.zeros(size)
+    if start >= size:
+        return long, short, thrend
+    maxlong = long_stop[start]
+    minshort = short_stop[start]
+    dir_ = 1.
+    for i in range(start + 1, size):
+        if dir_ == -1. and mavg[i] > minshort:
+            dir_ = 1.
+        elif dir_ == 1. and mavg[i] < maxlong:
+            dir_ = -1.
+        if dir_ == 1.:
+            if long_stop[i] > maxlong:
+                maxlong = long_stop[i]
+            minshort = short_stop[i]
+            long[i] = maxlong
+        else:
+            if short_stop[i] < minshort:
+                minshort = short_stop[i]
+            maxlong = long_stop[i]
+            short[i] = minshort
+        thrend[i] = dir_
+    return long, short, thrend
+
+
+def pmax3_kernel(mavg, dn, up, start):
+    """pmax3：返回 (pmax线, 趋势方向)"""
+    size = mavg.size
+    pmax = np.full(size, np.nan)
+    thrend = np.ones(size)
+    if start >= size:
+        return pmax, thrend
+    pmax[start] = dn[start]
+    dir_ = 1.
+    for i in range(start + 1, size):
+        prev = pmax[i - 1]
+        if dir_ == -1. and mavg[i] > prev:
+            dir_ = 1.
+        elif dir_ == 1. and mavg[i] < prev:
+            dir_ = -1.
+        # 与原实现 `cond and max(...) or min(...)` 一致：max结果为0.时取min结果
+        value = 0.
+        if dir_ == 1.:
+            value = prev if prev > dn[i] else dn[i]
+        if value == 0.:
+            value = prev if prev < up[i] else up[i]
+        pmax[i] = value
+        if value > prev:
+            thrend[i] = 1.
+        elif value < prev:
+            thrend[i] = -1.
+        else:
+            thrend[i] = thrend[i - 1]
+    return pmax, thrend
+
+
+def andean_kernel(open_, close, alpha, alpha_signal):
+    """Andean Oscillator：返回 (up, dn, bull, bear, signal)"""
+    n = close.size
+    up1 = np.zeros(n)
+    up2 = np.zeros(n)
+    dn1 = np.zeros(n)
+    dn2 = np.zeros(n)
+    bull = np.zeros(n)
+    bear = np.zeros(n)
+    signal = np.zeros(n)
+    if n == 0:
+        return up1, dn1, bull, bear, signal
+    up1[0] = dn1[0] = signal[0] = close[0]
+    up2[0] = dn2[0] = close[0] ** 2
+    for i in range(1, n):
+        c, o = close[i], open_[i]
+        c2, o2 = c ** 2, o ** 2
+        # 与内置max/min的比较顺序一致（含nan时结果相同）
+        value = c
+        if o > value:
+            value = o
+        other = up1[i - 1] - alpha * (up1[i - 1] - c)
+        up1[i] = other if other > value else value
+        value = c
+        if o < value:
+            value = o
+        other = dn1[i - 1] + alpha * (c - dn1[i - 1])
+        dn1[i] = other if other < value else value
+        value = c2
+        if o2 > value:
+            value = o2
+        other = up2[i - 1] - alpha * (up2[i - 1] - c2)
+        up2[i] = other if other > value else value
+        value = c2
+        if o2 < value:
+            value = o2
+        other = dn2[i - 1] + alpha * (c2 - dn2[i - 1])
+        dn2[i] = other if other < value else value
+
+        bull[i] = np.sqrt(dn2[i] - dn1[i] ** 2)
+        bear[i] = np.sqrt(up2[i] - up1[i] ** 2)
+        signal[i] = signal[i - 1] + alpha_signal * \
+            (np.maximum(bull[i], bear[i]) - signal[i - 1])
+    return up1, dn1, bull, bear, signal
+
+
+def coral_kernel(src, c1, c2, c3, c4, c5, cd):
+    """Coral Trend Candles：6级级联EMA"""
+    size = src.size
+    i1 = np.zeros(size)
+    i2 = np.zeros(size)
+    i3 = np.zeros(size)
+    i4 = np.zeros(size)
+    i5 = np.zeros(size)
+    i6 = np.zeros(size)
+    bfr = np.zeros(size)
+    for i in range(1, size):
+        i1[i] = c1 * src[i] + c2 * i1[i-1]
+        i2[i] = c1 * i1[i] + c2 * i2[i-1]
+        i3[i] = c1 * i2[i] + c2 * i3[i-1]
+        i4[i] = c1 * i3[i] + c2 * i4[i-1]
+        i5[i] = c1 * i4[i] + c2 * i5[i-1]
+        i6[i] = c1 * i5[i] + c2 * i6[i-1]
+        bfr[i] = -cd * cd * cd * i6[i] + c3 * i5[i] + c4 * i4[i] + c5 * i3[i]
+    return bfr
+
+
+def supertrend_kernel(close, upperband, lowerband):
+    """Supertrend：返回 (trend, dir, long, short)，上下轨为副本（递推中会被修改）"""
+    m = close.size
+    upper = upperband.copy()
+    lower = lowerband.copy()
+    dir_ = np.ones(m, dtype=np.int64)
+    trend = np.zeros(m)
+    long = np.full(m, np.inf)
+    short = np.full(m, np.inf)
+    for i in range(1, m):
+        if close[i] > upper[i - 1]:
+            dir_[i] = 1
+        elif close[i] < lower[i - 1]:
+            dir_[i] = -1
+        else:
+            dir_[i] = dir_[i - 1]
+            if dir_[i] > 0 and lower[i] < lower[i - 1]:
+                lower[i] = lower[i - 1]
+            if dir_[i] < 0 and upper[i] > upper[i - 1]:
+                upper[i] = upper[i - 1]
+        if dir_[i] > 0:
+            trend[i] = long[i] = lower[i]
+        else:
+            trend[i] = short[i] = upper[i]
+    return trend, dir_, long, short
+
+
+def highpass_kernel(src, alpha, deta):
+    """二阶高通滤波（src为二阶差分）"""
+    size = src.size
+    hp = np.zeros(size)
+    for i in range(2, size):
+        hp[i] = deta * deta * src[i] + 2 * \
+            (1 - alpha) * hp[i - 1] - (1 - alpha) * (1 - alpha) * hp[i - 2]
+    return hp
+
+
+def supersmoother_kernel(src, c1, c2, c3):
+    """二阶超级平滑滤波"""
+    size = src.size
+    filt = np.zeros(size)
+    for i in range(2, size):
+        filt[i] = c1 * src[i] + c2 * filt[i - 1] + c3 * filt[i - 2]
+    return filt
+
+
+def emsa_kernel(diff, alpha, deta, c1, c2, c3):
+    """EMSA：高通滤波 → 超级平滑 → 波形/能量归一化"""
+    size = diff.size
+    filt = np.zeros(size)
+    hp = np.zeros(size)
+    em = np.zeros(size)
+    for i in range(2, size):
+        hp[i] = deta * deta * diff[i] + 2 * \
+            (1 - alpha) * hp[i - 1] - (1 - alpha) * (1 - alpha) * hp[i - 2]
+        filt[i] = c1 * (hp[i] + hp[i - 1]) / 2. + \
+            c2 * filt[i - 1] + c3 * filt[i - 2]
+        wave = (filt[i] + filt[i - 1] + filt[i - 2]) / 3.
+        pwr = (filt[i] * filt[i] + filt[i - 1] *
+               filt[i - 1] + filt[i - 2] * filt[i - 2]) / 3.
+        em[i] = pwr if pwr == 0 else wave / np.sqrt(pwr)
+    return em
+
+
+def bandpass_kernel(close, a, b):
+    """超级带通滤波"""
+    size = close.size
+    pb = np.zeros(size)
+    for i in range(2, size):
+        pb[i] = (a - b) * close[i] + (b * (1 - a) - a * (1 - b)) * \
+            close[i - 1] + (2 - a - b) * pb[i - 1] - (1 - a) * (1 - b) * pb[i - 2]
+    return pb
+
+
+def lowpass_kernel(close, length):
+    """二阶低通滤波（length=1时与原实现一致地回绕取末尾元素）"""
+    size = close.size
+    lp = np.zeros(size)
+    a = 2 / (1 + length)
+    powa = a * a
+    for i in range(size):
+        if i >= length - 1:
+            lp[i] = (a - powa / 4) * close[i] + powa * close[i - 1] / 2 - \
+                (a - 3 * powa / 4) * close[i - 2] + 2 * \
+                (1 - a) * lp[i - 1] - (1 - a) * (1 - a) * lp[i - 2]
+    return lp
+
+
+def zigzag_returns_kernel(pvp, close):
+    """zigzag收益：相对上一个转折点的收益率"""
+    size = close.size
+    result = np.zeros(size)
+    if size == 0:
+        return result
+    pre = pvp[0]
+    for i in range(size - 1):
+        p = pvp[i]
+        if not np.isnan(p):
+            result[i] = (p - pre) / pre
+            pre = p
+        else:
+            result[i] = (close[i] - pre) / pre
+    result[size - 1] = (close[size - 1] - pre) / pre
+    return result
+
+
+def abc_kernel(open_, high, low, close, lim, price_tick):
+    """abc：以前收盘价平移K线并限制单根K线实体长度，返回 (open, high, low, close)"""
+    size = close.size
+    o = np.empty(size)
+    h = np.empty(size)
+    l = np.empty(size)
+    c = np.empty(size)
+    max_line = lim * price_tick
+    preclose = 0.
+    for i in range(size):
+        _open, _high, _low, _close = open_[i], high[i], low[i], close[i]
+        tick = abs(_open - _close) / price_tick
+        if i > 0:
+            diff = _open - preclose
+            _open -= diff
+            _high -= diff
+            _low -= diff
+            _close -= diff
+        if tick > lim:
+            if _close >= _open:
+                up = _high - _close
+                if max_line < up:
+                    up = max_line
+                _close = _open + lim * price_tick
+                _high = _close + up
+            else:
+                down = _close - _low
+                if max_line < down:
+                    down = max_line
+                _close = _open - lim * price_tick
+                _low = _close - down
+        preclose = _close
+        o[i] = _open
+        h[i] = _high
+        l[i] = _low
+        c[i] = _close
+    return o, h, l, c
+
+
+KERNELS: dict[str, Callable] = {
+    func.__name__: func for func in (
+        mcgd_kernel, insidebar_kernel, rngfilt_kernel, kama_kernel, pmax_kernel,
+        pmax3_kernel, andean_kernel, coral_kernel, supertrend_kernel, highpass_kernel,
+        supersmoother_kernel, emsa_kernel, bandpass_kernel, lowpass_kernel,
+        zigzag_returns_kernel, abc_kernel)
+}
+"""内核名称 -> 纯Python实现"""
+
+_COMPILED: dict[str, Callable] = {}
+
+
+def get_kernel(name: str) -> Callable:
+    """## 获取指标内核（优先numba编译，未安装numba时返回纯Python实现）
+
+    Args:
+        name (str): 内核名称（见 `KERNELS`）
+
+    Returns:
+        Callable: 内核函数
+    """
+    kernel = _COMPILED.get(name)
+    if kernel is None:
+        assert name in KERNELS, f"未知的指标内核：{name}"
+        try:
+            from numba import njit
+            kernel = njit(cache=True, error_model="numpy")(KERNELS[name])
+        except ImportError:
+            kernel = KERNELS[name]
+        _COMPILED[name] = kernel
+    return kernel
+
+
+_ROLLING: dict[tuple, Callable] = {}
+
+
+def rolling_kernel(func: Callable, nargs: int = 1, matrix: bool = False) -> Callable:
+    """## 获取 `rolling_apply` 的编译驱动循环（需要numba）
+
+    - 用户函数以 `njit` 编译（已是numba函数时直接使用），窗口循环在编译代码内完成，
+      每个窗口是输入数组的切片，不复制数据
+    - 驱动签名：`driver(columns, window, prepend_nans, offset) -> np.ndarray`，
+      columns为顶部填充了offset行nan的float64数组（nargs个一维数组，matrix时为一个二维数组），
+      用户函数须返回标量
+
+    Args:
+        func (Callable): 窗口函数
+        nargs (int): 传入的一维窗口个数（1~4），matrix=True时忽略. 默认1
+        matrix (bool): 是否以二维窗口（行=窗口，列=字段）调用. 默认False
+
+    Returns:
+        Callable: 编译后的驱动函数
+
+    Raises:
+        ImportError: 未安装numba
+    """
+    key = (func, 0 if matrix else nargs)
+    driver = _ROLLING.get(key)
+    if driver is not None:
+        return driver
+    assert matrix or 1 <= nargs <= 4, "numba滚动计算最多支持4个一维窗口参数"
+    from numba import njit
+    jfunc = func if hasattr(func, "py_func") else njit(func)
+
+    def bounds(i, w, prepend_nans, offset):
+        lo = i - w + 1
+        if not prepend_nans and lo < 0:
+            lo = 0
+        return lo + offset, i + offset + 1
+
+    bounds = njit(bounds)
+
+    if matrix or nargs == 1:
+        def driver(c0, window, prepend_nans, offset):
+            n = window.size
+            out = np.full(n, np.nan)
+            for i in range(n):
+                lo, hi = bounds(i, window[i], prepend_nans, offset)
+                out[i] = jfunc(c0[lo:hi])
+            return out
+    elif nargs == 2:
+        def driver(c0, c1, window, prepend_nans, offset):
+            n = window.size
+            out = np.full(n, np.nan)
+            for i in range(n):
+                lo, hi = bounds(i, window[i], prepend_nans, offset)
+                out[i] = jfunc(c0[lo:hi], c1[lo:hi])
+            return out
+    elif nargs == 3:
+        def driver(c0, c1, c2, window, prepend_nans, offset):
+            n = window.size
+            out = np.full(n, np.nan)
+            for i in range(n):
+                lo, hi = bounds(i, window[i], prepend_nans, offset)
+                out[i] = jfunc(c0[lo:hi], c1[lo:hi], c2[lo:hi])
+            return out
+    else:
+        def driver(c0, c1, c2, c3, window, prepend_nans, offset):
+            n = window.size
+            out = np.full(n, np.nan)
+            for i in range(n):
+                lo, hi = bounds(i, window[i], prepend_nans, offset)
+                out[i] = jfunc(c0[lo:hi], c1[lo:hi], c2[lo:hi], c3[lo:hi])
+            return out
+    driver = _ROLLING[key] = njit(driver)
+    return driver
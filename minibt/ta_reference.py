@@ -0,0 +1,613 @@
+# -*- coding: utf-8 -*-
+"""
+## ta.py 递推/路径依赖指标的参照实现
+
+`minibt.ta` 中以下函数的循环部分已改为调用 `minibt.ta_kernels` 的编译内核，
+此处保留改写前的原实现（逐元素访问pandas），仅用于等价性测试与问题排查，
+不在框架内部调用。
+
+### 等价性检查示例：
+```python
+import numpy as np
+from minibt.ta import BtFunc
+from minibt.ta_reference import BtFuncReference
+
+expected = BtFuncReference.kama(close, 10)
+np.testing.assert_allclose(BtFunc.kama(close, 10), expected, equal_nan=True)
+```
+"""
+from .ta import (pta, pd, np, v_offset, v_drift, non_zero_range,
+                 get_lennan, npInf, FILED, ZigZag)
+
+__all__ = ["mcgd", "insidebar", "rngfilt", "abc",
+           "ZigZagReference", "BtFuncReference"]
+
+
+def mcgd(close, length=None, offset=None, c=None, **kwargs):
+    """Indicator: McGinley Dynamic Indicator"""
+    # Validate arguments
+    length = int(length) if length and length > 0 else 10
+    c = float(c) if c and 0 < c <= 1 else 1
+    # close = verify_series(close, length)
+    # offset = get_offset(offset)
+    offset = v_offset(offset)
+
+    if close is None:
+        return
+
+    # Calculate Result
+    close = close.copy()
+
+    def mcg_(series):
+        denom = (c * length * (series.iloc[1] / series.iloc[0]) ** 4)
+        series.iloc[1] = (
+            series.iloc[0] + ((series.iloc[1] - series.iloc[0]) / denom))
+        return series.iloc[1]
+
+    mcg_cell = close[0:].rolling(2, min_periods=2).apply(mcg_, raw=False)
+
+    # 使用 pd.concat() 替代已弃用的 append()
+    mcg_ds = pd.concat([close[:1], mcg_cell[1:]])
+
+    # 确保结果按原始索引排序
+    mcg_ds = mcg_ds.sort_index()
+
+    # Offset
+    if offset != 0:
+        mcg_ds = mcg_ds.shift(offset)
+
+    # Handle fills
+    if "fillna" in kwargs:
+        mcg_ds.fillna(kwargs["fillna"], inplace=True)
+    if "fill_method" in kwargs:
+        _method = kwargs["fill_method"]
+        if _method in ('ffill', 'pad'):
+            mcg_ds.ffill(inplace=True)
+        elif _method in ('bfill', 'backfill'):
+            mcg_ds.bfill(inplace=True)
+
+    # Name & Category
+    mcg_ds.name = f"MCGD_{length}"
+    mcg_ds.category = "overlap"
+
+    return mcg_ds
+
+
+def insidebar(high: pd.Series, low: pd.Series, close: pd.Series, length: int = 10, **kwargs):
+    length = int(length) if length and length > 0 else 10
+    high = high.rolling(length).max().values
+    low = low.rolling(length).min().values
+    size = close.size
+    close = close.values
+    thrend = np.full((size,), np.nan)
+    line = np.full((size,), np.nan)
+    thrend[length-1] = 1.
+    for i in range(length, size):
+        _close, _low, _high = close[i], low[i-1], high[i-1]
+        diff = _high-_low
+        if close[i] > _high:
+            thrend[i] = 1.
+        elif close[i] < _low:
+            thrend[i] = -1.
+        else:
+            thrend[i] = thrend[i-1]
+        if thrend[i] > 0.:
+            line[i] = (_close-_low)/diff
+        else:
+            line[i] = (_close-_high)/diff
+    return pd.DataFrame(dict(thrend=thrend, line=line))
+
+
+def rngfilt(x: pd.Series, r: pd.Series):
+    """过滤范围"""
+    _add = (x+r).values
+    _diff = (x-r).values
+    x = x.values
+    m = len(_add[pd.isna(_add)])
+    rngfilt = np.array([np.nan]*m)
+    rngfilt = np.insert(rngfilt, m, x[m])
+    dir = np.array([np.nan]*m)
+    dir = np.insert(dir, m, 1.)
+    # lennan = max(len(x[isnan(x)]), len(r[isnan(r)]))
+    for i in range(m+1, x.size):
+        pre_rngfilt = rngfilt[i-1]
+        add, diff = _add[i], _diff[i]
+        # 向上突破时时候保持收盘价与目标线在一个r值距离，如果收盘价上涨小于r值，则没突破，维持原值
+        y = pre_rngfilt if diff < pre_rngfilt else diff
+        # 向下突破时时候保持收盘价与目标线在一个r值距离，如果收盘价下跌小于r值，则没突破，维持原值
+        z = pre_rngfilt if add > pre_rngfilt else add
+        # 收盘价在前一值之上，则有可能向上突破，则取y，之下则有可能向下突破，取z
+        pre_dir = dir[i-1]
+        next_rngfilt = y if x[i] > pre_rngfilt else z
+        next_dir = pre_dir if pre_rngfilt == next_rngfilt else (
+            1. if next_rngfilt > pre_rngfilt else -1.)
+        rngfilt = np.insert(rngfilt, i, next_rngfilt)
+        dir = np.insert(dir, i, next_dir)
+    return pd.Series(rngfilt), pd.Series(dir)
+
+
+def abc(df: pd.DataFrame, lim: float = 5., price_tick: float = 0.01, **kwargs) -> pd.DataFrame:
+    # df=pd.DataFrame(dict(open=open,high=high,low=low,close=close))
+    col = FILED.OHLC.tolist()
+    df = df[col]
+    frame = pd.DataFrame(columns=col)
+    max_line = lim*price_tick
+    for rows in df.itertuples():
+        index, open, high, low, close = rows
+        tick = abs(open-close)/price_tick
+        if index:
+            diff = open-preclose
+            open -= diff
+            high -= diff
+            low -= diff
+            close -= diff
+
+            if tick > lim:
+                if close >= open:
+                    up = min(high-close, max_line)
+                    close = open+lim*price_tick
+                    high = close+up
+                else:
+                    down = min(close-low, max_line)
+                    close = open-lim*price_tick
+                    low = close-down
+        else:
+            if tick > lim:
+                if close >= open:
+                    up = min(high-close, max_line)
+                    close = open+lim*price_tick
+                    high = close+up
+                else:
+                    down = min(close-low, max_line)
+                    close = open-lim*price_tick
+                    low = close-down
+        preclose = close
+        frame.loc[index, :] = [open, high, low, close]
+    frame = frame.astype(np.float64)
+    frame.category = 'candles'
+    return frame
+
+
+class ZigZagReference:
+
+    @staticmethod
+    def zigzag_returns(high: pd.Series, low: pd.Series, close: pd.Series, up_thresh: float = 0., down_thresh: float = 0., multiplier: float = 1., limit: bool = True, **kwargs) -> pd.Series:
+        pvp = ZigZag.zigzag(high, low, close, up_thresh,
+                            down_thresh, multiplier, **kwargs).values
+        _close = close.values
+        size = _close.size
+        result = np.zeros(size)
+        last = _close[-1]
+        pre = pvp[0]
+        for (i,), p in np.ndenumerate(pvp[:-1]):
+            if not np.isnan(p):
+                result[i] = (p-pre)/pre
+                pre = p
+            else:
+                result[i] = (_close[i]-pre)/pre
+        else:
+            result[-1] = (last-pre)/pre
+        return pd.Series(result)
+
+
+class BtFuncReference:
+
+    def rngfilt(close: pd.Series, r: pd.Series = None, **kwargs):
+        """过滤范围"""
+
+        _add = (close+r).values
+        _diff = (close-r).values
+        x = close.values
+        m = len(_add[pd.isna(_add)])
+        rngfilt = np.array([np.nan]*m)
+        rngfilt = np.insert(rngfilt, m, x[m])
+        dir = np.array([np.nan]*m)
+        dir = np.insert(dir, m, 1.)
+        # lennan = max(len(x[isnan(x)]), len(r[isnan(r)]))
+        for i in range(m+1, x.size):
+            pre_rngfilt = rngfilt[i-1]
+            add, diff = _add[i], _diff[i]
+            # 向上突破时时候保持收盘价与目标线在一个r值距离，如果收盘价上涨小于r值，则没突破，维持原值
+            y = pre_rngfilt if diff < pre_rngfilt else diff
+            # 向下突破时时候保持收盘价与目标线在一个r值距离，如果收盘价下跌小于r值，则没突破，维持原值
+            z = pre_rngfilt if add > pre_rngfilt else add
+            # 收盘价在前一值之上，则有可能向上突破，则取y，之下则有可能向下突破，取z
+            pre_dir = dir[i-1]
+            next_rngfilt = y if x[i] > pre_rngfilt else z
+            next_dir = pre_dir if pre_rngfilt == next_rngfilt else (
+                1. if next_rngfilt > pre_rngfilt else -1.)
+            rngfilt = np.insert(rngfilt, i, next_rngfilt)
+            dir = np.insert(dir, i, next_dir)
+        df = pd.concat([pd.Series(rngfilt, name="rngfilt"),
+                       pd.Series(dir, name="dir")], axis=1)
+        df.category = 'overlap'
+        return df
+
+    def kama(close: pd.Series, length=None, fast=None, slow=None, drift=None, offset=None, **kwargs):
+        """Indicator: Kaufman's Adaptive Moving Average (KAMA)"""
+        # Validate Arguments
+        length = int(length) if length and length > 0 else 10
+        fast = int(fast) if fast and fast > 0 else 2
+        slow = int(slow) if slow and slow > 0 else 30
+        # close = verify_series(close, max(fast, slow, length))
+        # drift = get_drift(drift)
+        # offset = get_offset(offset)
+        offset = v_offset(offset)
+        drift = v_drift(drift)
+
+        if close is None:
+            return
+
+        # Calculate Result
+        def weight(length: int) -> float:
+            return 2 / (length + 1)
+
+        fr = weight(fast)
+        sr = weight(slow)
+
+        abs_diff = non_zero_range(close, close.shift(length)).abs()
+        peer_diff = non_zero_range(close, close.shift(drift)).abs()
+        peer_diff_sum = peer_diff.rolling(length).sum()
+        er = np.divide(abs_diff, peer_diff_sum, out=np.zeros_like(
+            abs_diff, dtype=np.float32), where=peer_diff_sum != 0.)
+        x = er * (fr - sr) + sr
+        sc = x * x
+
+        m = close.size
+        result = [np.nan for _ in range(0, length - 1)] + [0]
+        for i in range(length, m):
+            result.append(sc.iloc[i] * close.iloc[i] +
+                          (1 - sc.iloc[i]) * result[i - 1])
+
+        kama = pd.Series(result, index=close.index)
+
+        # Offset
+        if offset != 0:
+            kama = kama.shift(offset)
+
+        # Handle fills
+        if "fillna" in kwargs:
+            kama.fillna(kwargs["fillna"], inplace=True)
+        if "fill_method" in kwargs:
+            _method = kwargs["fill_method"]
+            if _method in ('ffill', 'pad'):
+                kama.ffill(inplace=True)
+            elif _method in ('bfill', 'backfill'):
+                kama.bfill(inplace=True)
+
+        # Name & Category
+        kama.name = f"KAMA_{length}_{fast}_{slow}"
+        kama.category = 'overlap'
+
+        return kama
+
+    def pmax(close: pd.Series, length=10, mult=3., mode='hma', dev='stdev', **kwargs):
+        # Validate Arguments
+        length = length > 0 and int(length) or 10
+        mult = mult > 0. and float(mult) or 3.
+        mode = mode if mode else 'hma'
+        # Calculate Results
+        mavg = getattr(pta, mode)(close, length)
+        std = getattr(pta, dev)(close, length)
+        longStop = mavg-mult*std
+        shortStop = mavg+mult*std
+        size = close.size
+        length = get_lennan(longStop, shortStop)
+        maxlong = longStop[length]
+        minshort = shortStop[length]
+        long = np.full(size, np.nan)
+        short = np.full(size, np.nan)
+        thrend = np.zeros(size)
+        dir = 1
+        for i in range(length+1, size):
+            dir = (dir == -1 and mavg[i] > minshort) and 1 or (
+                (dir == 1 and mavg[i] < maxlong) and -1 or dir)
+            if dir == 1:
+                maxlong = max(maxlong, longStop[i])
+                minshort = shortStop[i]
+                long[i] = maxlong
+            else:
+                minshort = min(minshort, shortStop[i])
+                maxlong = longStop[i]
+                short[i] = minshort
+            thrend[i] = dir
+        df = pd.DataFrame(dict(long=long, short=short, thrend=thrend))
+        df.category = "overlap"
+        return df
+
+    def pmax2(close: pd.Series, length=None, mult=None, mode='hma', dev='stdev', **kwargs):
+        # Validate Arguments
+        length = length > 0 and length or 10
+        mult = mult > 0. and mult or 3.
+        mode = mode if mode else 'hma'
+        # Calculate Results
+        mavg = getattr(pta, mode)(close, length)
+        std = getattr(pta, dev)(close, length)
+        longStop = mavg-mult*std
+        shortStop = mavg+mult*std
+        length = get_lennan(longStop, shortStop)
+        maxlong = longStop[length]
+        minshort = shortStop[length]
+        size = close.size
+        pmax = np.full(size, np.nan)
+        thrend = np.zeros(size)
+        dir = 1
+        for i in range(length+1, size):
+            dir = (dir == -1 and mavg[i] > minshort) and 1 or (
+                (dir == 1 and mavg[i] < maxlong) and -1 or dir)
+            if dir == 1:
+                maxlong = max(maxlong, longStop[i])
+                minshort = shortStop[i]
+                pmax[i] = maxlong
+            else:
+                minshort = min(minshort, shortStop[i])
+                maxlong = longStop[i]
+                pmax[i] = minshort
+            thrend[i] = dir
+        df = pd.DataFrame(dict(pmax=pmax, thrend=thrend))
+        df.category = "overlap"
+        return df
+
+    def pmax3(close: pd.Series, length=10, mult=3., mode='hma', dev='stdev', **kwargs):
+        # Validate Arguments
+        length = length > 0 and length or 10
+        mult = mult > 0. and mult or 3.
+        mode = mode if mode else 'hma'
+        # Calculate Results
+        mavg = getattr(pta, mode)(close, length)
+        std = getattr(pta, dev)(close, length)
+        dn = mavg-mult*std
+        up = mavg+mult*std
+        size = close.size
+        length = get_lennan(dn, up)
+        pmax = np.full(size, np.nan)
+        pmax[length] = dn[length]
+        dir = np.ones(size)
+        thrend = np.ones(size)
+        for i in range(length+1, size):
+            dir[i] = (dir[i-1] == -1 and mavg[i] > pmax[i-1]
+                      ) and 1 or ((dir[i-1] == 1 and mavg[i] < pmax[i-1]) and -1 or dir[i-1])
+            pmax[i] = dir[i] == 1 and max(
+                dn[i], pmax[i-1]) or min(up[i], pmax[i-1])
+            thrend[i] = pmax[i] > pmax[i -
+                                       1] and 1 or (pmax[i] < pmax[i-1] and -1 or thrend[i-1])
+        df = pd.DataFrame(dict(pmax=pmax, thrend=thrend))
+        df.category = "overlap"
+        return df
+
+    def AndeanOsc(open: pd.Series, close: pd.Series, length: int = 14, signal_length: int = 9, **kwargs):
+        '''
+            Inputs
+            ------
+            close : Closing price (Array)
+            open  : Opening price (Array)
+
+            Settings
+            --------
+            length        : Indicator period (float)
+            signal_length : Signal line period (float)
+
+            Returns
+            -------
+            Bull   : Bullish component (Array)
+            Bear   : Bearish component (Array)
+            Signal : Signal line (Array)
+
+            Example
+            -------
+            bull,bear,signal = AndeanOsc(close,open,14,9)
+            '''
+        N = len(close)
+
+        alpha = 2/(length+1)
+        alpha_signal = 2/(signal_length+1)
+
+        up1, up2, dn1, dn2, bull, bear, signal = np.zeros((7, N))
+
+        up1[0] = dn1[0] = signal[0] = close[0]
+        up2[0] = dn2[0] = close[0]**2
+
+        for i in range(1, N):
+            up1[i] = max(close[i], open[i], up1[i-1] -
+                         alpha*(up1[i-1] - close[i]))
+            dn1[i] = min(close[i], open[i], dn1[i-1] +
+                         alpha*(close[i] - dn1[i-1]))
+
+            up2[i] = max(close[i]**2, open[i]**2, up2[i-1] -
+                         alpha*(up2[i-1] - close[i]**2))
+            dn2[i] = min(close[i]**2, open[i]**2, dn2[i-1] +
+                         alpha*(close[i]**2 - dn2[i-1]))
+
+            bull[i] = np.sqrt(dn2[i] - dn1[i]**2)
+            bear[i] = np.sqrt(up2[i] - up1[i]**2)
+
+            signal[i] = signal[i-1] + alpha_signal * \
+                (np.maximum(bull[i], bear[i]) - signal[i-1])
+        result = pd.DataFrame(
+            dict(up=up1, dn=dn1, bull=bull, bear=bear, signal=signal))
+        result.overlap = dict(up=True, dn=True, bull=False,
+                              bear=False, signal=False)
+        return result
+
+    def Coral_Trend_Candles(close: pd.Series, smooth: int = 9., mult: float = .4, **kwargs) -> pd.Series:
+        # string GROUP_3 = 'Config » Coral Trend Candles'
+        size = len(close)
+        src = close.values
+        _sm = smooth if smooth and smooth > 0. else 9.
+        cd = mult if mult and mult > 0. else .4
+        di = (_sm) / 2.0 + 1.0
+        c1 = 2. / (di + 1.0)
+        c2 = 1. - c1
+        c3 = 3.0 * (cd * cd + cd * cd * cd)
+        c4 = -3.0 * (2.0 * cd * cd + cd + cd * cd * cd)
+        c5 = 3.0 * cd + 1.0 + cd * cd * cd + 3.0 * cd * cd
+        i1 = np.zeros(size)
+        i2 = np.zeros(size)
+        i3 = np.zeros(size)
+        i4 = np.zeros(size)
+        i5 = np.zeros(size)
+        i6 = np.zeros(size)
+        bfr = np.zeros(size)
+        for i in range(1, size):
+            i1[i] = c1 * src[i] + c2 * i1[i-1]
+            i2[i] = c1 * i1[i] + c2 * i2[i-1]
+            i3[i] = c1 * i2[i] + c2 * i3[i-1]
+            i4[i] = c1 * i3[i] + c2 * i4[i-1]
+            i5[i] = c1 * i4[i] + c2 * i5[i-1]
+            i6[i] = c1 * i5[i] + c2 * i6[i-1]
+            bfr[i] = -cd * cd * cd * i6[i] + c3 * \
+                i5[i] + c4 * i4[i] + c5 * i3[i]
+        return pd.Series(bfr)
+
+    def supertrend(high: pd.Series, low: pd.Series, close: pd.Series, length=14, multiplier=2., weights=2., offset=None, **kwargs):
+        """Indicator: Supertrend"""
+        # Validate Arguments
+        length = int(length) if length and length > 0 else 7
+        multiplier = float(
+            multiplier) if multiplier and multiplier > 0 else 3.0
+        # offset = get_offset(offset)
+        offset = v_offset(offset)
+
+        # Calculate Results
+        m = close.size
+        dir_, trend = [1] * m, [0] * m
+        long, short = [npInf] * m, [npInf] * m
+
+        hhv = (weights*high+low)/(weights+1.)
+        llv = (weights*low+high)/(weights+1.)
+        matr = multiplier * pta.atr(high, low, close, length)
+        upperband = llv + matr
+        lowerband = hhv - matr
+
+        for i in range(1, m):
+            if close.iloc[i] > upperband.iloc[i - 1]:
+                dir_[i] = 1
+            elif close.iloc[i] < lowerband.iloc[i - 1]:
+                dir_[i] = -1
+            else:
+                dir_[i] = dir_[i - 1]
+                if dir_[i] > 0 and lowerband.iloc[i] < lowerband.iloc[i - 1]:
+                    lowerband.iloc[i] = lowerband.iloc[i - 1]
+                if dir_[i] < 0 and upperband.iloc[i] > upperband.iloc[i - 1]:
+                    upperband.iloc[i] = upperband.iloc[i - 1]
+
+            if dir_[i] > 0:
+                trend[i] = long[i] = lowerband.iloc[i]
+            else:
+                trend[i] = short[i] = upperband.iloc[i]
+
+        # Prepare DataFrame to return
+        _props = f"_{length}_{multiplier}"
+        df = pd.DataFrame({
+            f"SUPERT{_props}": trend,
+            f"SUPERTd{_props}": dir_,
+            f"SUPERTl{_props}": long,
+            f"SUPERTs{_props}": short,
+        }, index=close.index)
+
+        df.name = f"SUPERT{_props}"
+        df.category = "overlap"
+
+        # Apply offset if needed
+        if offset != 0:
+            df = df.shift(offset)
+
+        # Handle fills
+        if "fillna" in kwargs:
+            df.fillna(kwargs["fillna"], inplace=True)
+
+        if "fill_method" in kwargs:
+            _method = kwargs["fill_method"]
+            if _method in ('ffill', 'pad'):
+                df.ffill(inplace=True)
+            elif _method in ('bfill', 'backfill'):
+                df.bfill(inplace=True)
+
+        return df
+
+    def emsa(close: pd.Series, bar: int = 10, length: int = 48, al=True):
+        if al:
+            alpha = (1 - np.sin(360 / length)) / np.cos(360 / length)
+        else:
+            alpha = (np.cos(360/length)+np.sin(360/length)-1) / \
+                np.cos(360/length)
+
+        deta = 1-alpha/2
+        a = np.exp(-np.sqrt(2)*np.pi/bar)
+        b = 2*a*np.cos(np.sqrt(2)*180/bar)
+        c2, c3 = b, -a**2
+        c1 = 1-c2-c3
+
+        diff = close-2*close.shift(1)+close.shift(2)
+        filt = np.zeros(close.size)
+        hp = np.zeros(close.size)
+        em = np.zeros(close.size)
+        for i in range(close.size):
+            if i > 1:
+                hp[i] = deta*deta*diff.iloc[i]+2 * \
+                    (1-alpha)*hp[i-1]-(1-alpha)*(1-alpha)*hp[i-2]
+                filt[i] = c1*(hp[i]+hp[i-1])/2.+c2*filt[i-1]+c3*filt[i-2]
+                wave = (filt[i]+filt[i-1]+filt[i-2])/3.
+                pwr = (filt[i]*filt[i]+filt[i-1] *
+                       filt[i-1]+filt[i-2]*filt[i-2])/3.
+                em[i] = pwr if pwr == 0 else wave/np.sqrt(pwr)
+
+        return pd.Series(em)
+
+    def highpassfilter(close: pd.Series, length: int = 10):
+        a = np.cos(.707*360/48)
+        alpha = (a+np.sin(.707*360/48)-1)/a
+        deta = 1-alpha/2
+        src = close-2*close.shift(1)+close.shift(2)
+        hp = np.zeros(close.size)
+        for i in range(close.size):
+            if i > 1:
+                hp[i] = deta*deta*src.iloc[i]+2 * \
+                    (1-alpha)*hp[i-1]-(1-alpha)*(1-alpha)*hp[i-2]
+        hp = pd.Series(hp)
+
+        a = np.exp(-1.414*np.pi/length)
+        b = 2*a*np.cos(1.414*180/length)
+        c2, c3 = b, -a**2
+        c1 = 1-c2-c3
+        src = (hp+hp.shift(1))/2.
+        filt = np.zeros(close.size)
+        for i in range(close.size):
+            if i > 1:
+                filt[i] = c1*src.iloc[i]+c2*filt[i-1]+c3*filt[i-2]
+        return pd.Series(filt)
+
+    def superbandpassfilter(close: pd.Series, length: int = 10):
+        def func(x: pd.Series):
+            return np.sqrt(x.mean())
+        a, b = 5/35, 5/65
+        pb = np.zeros(close.size)
+        for i in range(close.size):
+            if i > 1:
+                pb[i] = (a-b)*close.iloc[i]+(b*(1-a)-a*(1-b)) * \
+                    close.iloc[i-1]+(2-a-b)*pb[i-1]-(1-a)*(1-b)*pb[i-2]
+        pb = pd.Series(pb)
+        return pb, pb.rolling(length).apply(lambda x: func(x*x))
+
+    def supersmootherfilter(close: pd.Series, length: int):
+        a = np.exp(-1.414*np.pi/length)
+        b = 2*a*np.cos(1.414*180/length)
+        c2, c3 = b, -a**2
+        c1 = 1-c2-c3
+        src = (close+close.shift(1))/2.
+        filt = np.zeros(close.size)
+        for i in range(close.size):
+            if i > 1:
+                filt[i] = c1*src.iloc[i]+c2*filt[i-1]+c3*filt[i-2]
+        return pd.Series(filt)
+
+    def lowpass(close: pd.Series, length: int):
+        lp = np.zeros(close.size)
+        a = 2/(1+length)
+        powa = a*a
+        for i in range(close.size):
+            if i >= length-1:
+                lp[i] = (a-powa/4)*close.iloc[i]+powa*close.iloc[i-1]/2 - \
+                    (a-3*powa/4)*close.iloc[i-2]+2 * \
+                    (1-a)*lp[i-1]-(1-a)*(1-a)*lp[i-2]
+        return pd.Series(lp)
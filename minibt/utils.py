@@ -53,6 +53,7 @@ if TYPE_CHECKING:
                              IndicatorsBase)
     from .strategy.strategy import Strategy
     from .indicators.tradingview import TradingView
+    from .data.clock import MasterClock
     from .core import CoreFunc
     from .logger import Logger
 
@@ -86,6 +87,16 @@ class MinibtOptions:
         set_data_patching: 是否启用数据二次替换/修补模式（默认：False）
             - True: 开启高频数据替换（适合next中二次处理，性能低）
             - False: 关闭自动替换（适合纯回测，性能高）
+        set_shared_datas: 是否在多策略间共享相同数据集（默认：True）
+        set_streaming_indicators: 实盘模式下内置指标是否流式更新（默认：True）
+        set_indicator_cache: 参数优化时是否跨参数组复用指标计算结果（默认：True）
+        set_indicator_cse: 策略初始化中相同指标调用是否返回同一对象（默认：True）
+        set_lazy_operators: 单线指标运算是否惰性记录并融合求值（默认：False）
+        set_raw_indicators: 指标轻量模式（默认：'auto'，参数优化与无图表回测时启用）
+        set_compiled_stops: 内置停止器是否以编译状态机内核逐K线更新（默认：True）
+        set_resample_cache: 周期转换结果是否跨策略、跨参数组缓存（默认：True）
+        set_master_clock: 多合约回测是否按合并时间轴逐事件推进（默认：'auto'，各合约时间索引不同时启用）
+        set_csv_cache: 本地CSV数据是否使用列式二进制缓存（默认：True）
 
     Examples:
         >>> # 全局设置
@@ -102,6 +113,26 @@ class MinibtOptions:
         self._conversion_mode = 'strict'
         # 新增：数据替换模式开关，默认开启以保持向后兼容
         self._data_patching = False
+        # 多策略共享数据集开关
+        self._shared_datas = True
+        # 实盘流式指标更新开关
+        self._streaming_indicators = True
+        # 参数优化指标缓存开关
+        self._indicator_cache = True
+        # 指标公共子表达式消除开关
+        self._indicator_cse = True
+        # 指标运算惰性求值开关
+        self._lazy_operators = False
+        # 指标轻量模式：'auto'/True/False
+        self._raw_indicators = 'auto'
+        # 内置停止器编译内核开关
+        self._compiled_stops = True
+        # 周期转换结果缓存开关
+        self._resample_cache = True
+        # 多合约主事件时钟：'auto'/True/False
+        self._master_clock = 'auto'
+        # 本地CSV列式缓存开关
+        self._csv_cache = True
 
     @property
     def set_conversion_mode(self) -> str:
@@ -151,6 +182,206 @@ class MinibtOptions:
     def set_data_patching(self, value: bool):
         self._data_patching = bool(value)
 
+    @property
+    def set_shared_datas(self) -> bool:
+        """## 共享数据集开关
+        回测模式下相同(数据来源, 合约, 周期, 数据范围)的K线数据在各策略间只加载、只保存一次，
+        各策略获得共享底层数组的只读视图，resample/replay结果同样共享。
+
+        Attributes:
+            set_shared_datas: True/False（默认：True）
+
+        Examples:
+            >>> minibt.options.set_shared_datas = False  # 每个策略独立加载数据
+            >>> from minibt.data.shared import shared_datas
+            >>> shared_datas.memory_report()  # 查看共享数据节省的内存
+        """
+        return self._shared_datas
+
+    @set_shared_datas.setter
+    def set_shared_datas(self, value: bool):
+        self._shared_datas = bool(value)
+
+    @property
+    def set_streaming_indicators(self) -> bool:
+        """## 实盘流式指标开关
+        实盘模式下每次行情更新重新执行策略 `__init__` 时，支持流式更新的内置指标
+        （SMA/EMA/RMA/STDDEV/ATR/RSI/MACD等，见 `minibt.indicators.streaming`）
+        只重算末端K线，不支持的指标仍全量计算。
+
+        Attributes:
+            set_streaming_indicators: True/False（默认：True）
+
+        Examples:
+            >>> minibt.options.set_streaming_indicators = False  # 每次更新全量重算指标
+        """
+        return self._streaming_indicators
+
+    @set_streaming_indicators.setter
+    def set_streaming_indicators(self, value: bool):
+        self._streaming_indicators = bool(value)
+
+    @property
+    def set_indicator_cache(self) -> bool:
+        """## 参数优化指标缓存开关
+        参数优化（含批量回测、滚动优化）中以(数据指纹, 指标库, 指标函数, 参数)为键
+        缓存指标计算结果，未参与优化的指标只计算一次。
+
+        Attributes:
+            set_indicator_cache: True/False（默认：True）
+
+        Examples:
+            >>> from minibt.indicators.memo import indicator_cache
+            >>> indicator_cache.configure(max_bytes=1 << 30)  # 内存预算
+            >>> indicator_cache.report()  # 命中统计
+        """
+        return self._indicator_cache
+
+    @set_indicator_cache.setter
+    def set_indicator_cache(self, value: bool):
+        self._indicator_cache = bool(value)
+
+    @property
+    def set_indicator_cse(self) -> bool:
+        """## 指标公共子表达式消除开关
+        策略初始化期间相同(数据源, 指标函数, 参数, 显示设置)的指标调用
+        直接返回首次计算的同一指标对象，不重复计算。
+
+        Attributes:
+            set_indicator_cse: True/False（默认：True）
+
+        Examples:
+            >>> minibt.options.set_indicator_cse = False  # 每次调用独立计算
+            >>> strategy.indicator_reuse_report()  # 查看复用次数
+        """
+        return self._indicator_cse
+
+    @set_indicator_cse.setter
+    def set_indicator_cse(self, value: bool):
+        self._indicator_cse = bool(value)
+
+    @property
+    def set_lazy_operators(self) -> bool:
+        """## 指标运算惰性求值开关
+        开启后单线指标之间及与标量的运算符返回惰性表达式（LazyExpr），
+        需要数值时整条表达式一次融合求值（优先numexpr），只生成最终指标。
+
+        Attributes:
+            set_lazy_operators: True/False（默认：False）
+
+        Examples:
+            >>> with minibt.options.context(set_lazy_operators=True):
+            ...     self.signal = (self.a - self.b) / (self.c + 1e-9) * 100 > self.d
+        """
+        return self._lazy_operators
+
+    @set_lazy_operators.setter
+    def set_lazy_operators(self, value: bool):
+        self._lazy_operators = bool(value)
+
+    @property
+    def set_raw_indicators(self) -> bool | str:
+        """## 指标轻量（raw）模式
+        raw模式下tobtind只生成数值数据与回测循环所需的最小属性，
+        不构建线型样式，不为指标保存完整数据副本（见minibt.indicators.raw）。
+
+        Attributes:
+            set_raw_indicators:
+                - 'auto'：参数优化与 `Bt.run(isplot=False)` 时启用（默认）
+                - True / False：强制开启 / 关闭
+
+        Examples:
+            >>> from minibt.indicators.raw import measure_init_speedup
+            >>> measure_init_speedup(MyStrategy)  # 测量初始化加速比
+        """
+        return self._raw_indicators
+
+    @set_raw_indicators.setter
+    def set_raw_indicators(self, value: bool | str):
+        if value == 'auto' or isinstance(value, bool):
+            self._raw_indicators = value
+
+    @property
+    def set_compiled_stops(self) -> bool:
+        """## 停止器编译内核开关
+        回测中内置停止器（CAC40/SegmentationTracking/FixedStop等，见 `minibt.stop.kernels`）
+        每根K线以编译状态机内核更新停止价与目标价，只读写numpy数组，不经过指标对象索引。
+        数据修补模式、实盘及重写了long/short的子类仍执行Python实现。
+
+        Attributes:
+            set_compiled_stops: True/False（默认：True）
+
+        Examples:
+            >>> minibt.options.set_compiled_stops = False  # 逐K线执行Python版long/short
+        """
+        return self._compiled_stops
+
+    @set_compiled_stops.setter
+    def set_compiled_stops(self, value: bool):
+        self._compiled_stops = bool(value)
+
+    @property
+    def set_resample_cache(self) -> bool:
+        """## 周期转换缓存开关
+        resample/replay及多周期对齐结果以(源数据指纹, 周期, 时间规则, 转换类型)为键缓存，
+        参数优化各组参数与多策略运行中相同的周期转换只计算一次（见 `minibt.data.resample_cache`）。
+
+        Attributes:
+            set_resample_cache: True/False（默认：True）
+
+        Examples:
+            >>> from minibt.data.resample_cache import resample_cache
+            >>> resample_cache.configure(max_bytes=1 << 30)  # 内存预算
+            >>> resample_cache.report()  # 命中统计
+        """
+        return self._resample_cache
+
+    @set_resample_cache.setter
+    def set_resample_cache(self, value: bool):
+        self._resample_cache = bool(value)
+
+    @property
+    def set_master_clock(self) -> bool | str:
+        """## 多合约主事件时钟
+        各合约K线的时间索引合并为一条事件时间轴（见 `minibt.data.clock`），
+        回测循环逐事件推进，每个KLine只在自身有K线的事件上前进，
+        Broker只在所属KLine真实更新时撮合订单、记录权益，不需要预先对齐与前向填充。
+
+        Attributes:
+            set_master_clock:
+                - 'auto'：各合约（非resample/replay）K线时间索引不同时启用（默认）
+                - True / False：强制开启 / 关闭
+
+        Examples:
+            >>> minibt.options.set_master_clock = True
+        """
+        return self._master_clock
+
+    @set_master_clock.setter
+    def set_master_clock(self, value: bool | str):
+        if value == 'auto' or isinstance(value, bool):
+            self._master_clock = value
+
+    @property
+    def set_csv_cache(self) -> bool:
+        """## 本地CSV列式缓存开关
+        `LocalDatas` 等本地CSV数据首次加载时解析并保存为按列的 `.npy` 文件，
+        之后以内存映射直接加载，源文件修改时间或大小变化时自动重建（见 `minibt.data.csv_cache`）。
+
+        Attributes:
+            set_csv_cache: True/False（默认：True）
+
+        Examples:
+            >>> from minibt.data.csv_cache import csv_cache
+            >>> csv_cache.configure(path="D:/minibt_cache")  # 缓存目录
+            >>> csv_cache.clear()  # 删除缓存
+        """
+        return self._csv_cache
+
+    @set_csv_cache.setter
+    def set_csv_cache(self, value: bool):
+        self._csv_cache = bool(value)
+
     def check_conversion_mode(self, data: pd.DataFrame | pd.Series, indicator: IndicatorsBase) -> bool:
         """## 判断是否应该将pandas对象转换为minibt指标
 
@@ -189,7 +420,17 @@ class MinibtOptions:
         # 映射外部set开头的属性名到内部私有变量名
         attr_mapping = {
             'set_conversion_mode': '_conversion_mode',
-            'set_data_patching': '_data_patching'
+            'set_data_patching': '_data_patching',
+            'set_shared_datas': '_shared_datas',
+            'set_streaming_indicators': '_streaming_indicators',
+            'set_indicator_cache': '_indicator_cache',
+            'set_indicator_cse': '_indicator_cse',
+            'set_lazy_operators': '_lazy_operators',
+            'set_raw_indicators': '_raw_indicators',
+            'set_compiled_stops': '_compiled_stops',
+            'set_resample_cache': '_resample_cache',
+            'set_master_clock': '_master_clock',
+            'set_csv_cache': '_csv_cache',
         }
 
         for key, value in kwargs.items():
@@ -214,6 +455,16 @@ class MinibtOptions:
         """## 重置所有配置为默认值"""
         self._conversion_mode = 'strict'
         self._data_patching = False
+        self._shared_datas = True
+        self._streaming_indicators = True
+        self._indicator_cache = True
+        self._indicator_cse = True
+        self._lazy_operators = False
+        self._raw_indicators = 'auto'
+        self._compiled_stops = True
+        self._resample_cache = True
+        self._master_clock = 'auto'
+        self._csv_cache = True
 
     def get_settings(self) -> dict:
         """## 获取当前所有配置
@@ -223,12 +474,32 @@ class MinibtOptions:
         """
         return {
             'set_conversion_mode': self._conversion_mode,
-            'set_data_patching': self._data_patching
+            'set_data_patching': self._data_patching,
+            'set_shared_datas': self._shared_datas,
+            'set_streaming_indicators': self._streaming_indicators,
+            'set_indicator_cache': self._indicator_cache,
+            'set_indicator_cse': self._indicator_cse,
+            'set_lazy_operators': self._lazy_operators,
+            'set_raw_indicators': self._raw_indicators,
+            'set_compiled_stops': self._compiled_stops,
+            'set_resample_cache': self._resample_cache,
+            'set_master_clock': self._master_clock,
+            'set_csv_cache': self._csv_cache,
         }
 
     def __repr__(self) -> str:
         return (f"MinibtOptions(set_conversion_mode='{self._conversion_mode}', "
-                f"set_data_patching={self._data_patching})")
+                f"set_data_patching={self._data_patching}, "
+                f"set_shared_datas={self._shared_datas}, "
+                f"set_streaming_indicators={self._streaming_indicators}, "
+                f"set_indicator_cache={self._indicator_cache}, "
+                f"set_indicator_cse={self._indicator_cse}, "
+                f"set_lazy_operators={self._lazy_operators}, "
+                f"set_raw_indicators={self._raw_indicators!r}, "
+                f"set_compiled_stops={self._compiled_stops}, "
+                f"set_resample_cache={self._resample_cache}, "
+                f"set_master_clock={self._master_clock!r}, "
+                f"set_csv_cache={self._csv_cache})")
 
 
 # 全局选项实例
@@ -3100,7 +3371,9 @@ class Broker(Base):
         """## 更新账户交易
         - exec_price: 执行价格，如果为None，则使用当前收盘价作为执行价格
         """
-        if self.btindex < self.length:
+        btindex = self.btindex
+        # 主事件时钟下游标为-1表示合约尚未上市，不能交易
+        if btindex < self.length and (btindex >= 0 or self.account.strategy._clock is None):
             # 如果未提供执行价格，则使用当前收盘价
             if exec_price is None:
                 exec_price = self.kline.current_close
@@ -3261,6 +3534,9 @@ class Broker(Base):
                      valid: datetime.datetime | datetime.timedelta | int | None = None,
                      oco: Order | None = None, **kwargs) -> Order:
         """## 创建订单"""
+        # 主事件时钟下游标为-1表示合约尚未上市，不创建订单
+        if self.btindex < 0 and self.account.strategy._clock is not None:
+            return
         if exectype is None:
             exectype = self._default_exectype
         if exectype == OrderType.Market:
@@ -4020,14 +4296,21 @@ class BtAccount(Base):
     def float_profit(self) -> float:
         return self.profit
 
-    def update_history(self):
-        """## 更新账户历史（现在包含订单处理）"""
+    def update_history(self, clock: MasterClock | None = None):
+        """## 更新账户历史（现在包含订单处理）
+
+        Args:
+            clock (MasterClock | None): 多合约主事件时钟，不为None时只处理本事件真实更新的KLine所属Broker
+        """
+        brokers = self.brokers
+        if clock is not None:
+            brokers = [broker for broker in brokers if clock.is_updated(broker.kline.data_id)]
         # 1. 处理所有broker的订单
-        for broker in self.brokers:
+        for broker in brokers:
             broker.process_orders()
 
         # 2. 更新历史记录（原有逻辑）
-        for broker in self.brokers:
+        for broker in brokers:
             broker.history_queue.put([
                 self.balance,
                 broker.position.value,
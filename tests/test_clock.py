@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""多合约主事件时钟下，合约上市前的数据访问与下单测试"""
+import numpy as np
+import pandas as pd
+
+from minibt import Bt, Strategy
+
+
+def _frame(start, size, seed):
+    rng = np.random.default_rng(seed)
+    close = 100. + rng.normal(0., 1., size).cumsum()
+    return pd.DataFrame(dict(
+        datetime=pd.date_range(start, periods=size, freq="1min"),
+        open=close, high=close + 1., low=close - 1., close=close,
+        volume=np.full(size, 10.)))
+
+
+def test_unlisted_symbol_has_no_data_and_no_orders():
+    early = _frame("2024-01-01 09:00", 300, 1)
+    late = _frame("2024-01-01 11:00", 180, 2)
+    records = []
+
+    class TwoSymbols(Strategy):
+        def __init__(self):
+            self.a = self.get_kline(early)
+            self.b = self.get_kline(late)
+
+        def next(self):
+            records.append((self.b.btindex, self.b.close.new,
+                           self.b.close[-2], self.b.current_time, self.b.buy()))
+
+    Bt().addstrategy(TwoSymbols).run(isplot=False)
+
+    unlisted = [r for r in records if r[0] < 0]
+    listed = [r for r in records if r[0] >= 0]
+    assert unlisted and listed
+    for _, new, prev, time, order in unlisted:
+        assert np.isnan(new) and np.isnan(prev)
+        assert time is None and order is None
+    first = listed[0]
+    assert first[0] == 0
+    assert first[1] == late.close.iloc[0]
+    assert np.isnan(first[2])
+    assert first[3] == late.datetime.iloc[0]
+    assert first[4] is not None
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""通用指标自动路由：非默认参数下的后端复核测试"""
+import pytest
+
+from minibt.indicators.dispatch import GENERIC_INDICATORS, REFERENCE_BACKEND, BackendDispatch, _Route
+
+
+@pytest.fixture
+def router(tmp_path):
+    return BackendDispatch(path=str(tmp_path / "calibration.json"), size=2000, repeat=1)
+
+
+def test_routed_backend_is_verified_per_parameter_set(router, monkeypatch):
+    pytest.importorskip("talib")
+    routes = dict(GENERIC_INDICATORS["ema"].routes)
+    # 仅在默认参数下与参照一致的后端
+    routes["talib"] = _Route("talib", "EMA", lambda p: dict(
+        timeperiod=p["length"] if p["length"] == 10 else p["length"] + 1))
+    monkeypatch.setattr(GENERIC_INDICATORS["ema"], "routes", routes)
+    monkeypatch.setattr(router, "choose", lambda name: "talib")
+
+    assert router.verify("ema", "talib", dict(length=10))
+    assert not router.verify("ema", "talib", dict(length=20))
+    assert router.verify("ema", REFERENCE_BACKEND, dict(length=20))
+
+    calls = []
+
+    class Source:
+        class talib:
+            @staticmethod
+            def EMA(**kwargs):
+                calls.append(("talib", kwargs))
+
+        class pta:
+            @staticmethod
+            def ema(**kwargs):
+                calls.append(("pandas_ta", kwargs))
+
+    router.call(Source, "ema", dict(length=10))
+    router.call(Source, "ema", dict(length=20))
+    router.call(Source, "ema", dict(length=20), backend="talib")
+    assert [backend for backend, _ in calls] == ["talib", "pandas_ta", "talib"]
+    assert calls[1][1]["length"] == 20
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""多周期批量指标与 pandas_ta 单周期结果的一致性测试"""
+import numpy as np
+import pandas as pd
+import pandas_ta as pta
+import pytest
+
+from minibt.indicators import multiparam as mp
+
+LENGTHS = [2, 5, 14, 30]
+
+
+@pytest.fixture(scope="module")
+def hlc():
+    rng = np.random.default_rng(11)
+    close = 100. + rng.normal(0., 1., 2000).cumsum()
+    spread = np.abs(rng.normal(0., .5, close.size))
+    return (pd.Series(close + spread), pd.Series(close - spread), pd.Series(close))
+
+
+def _check(block, scalar):
+    for j, length in enumerate(LENGTHS):
+        expected = np.asarray(scalar(length), dtype=np.float64)
+        result = block[:, j] if isinstance(block, np.ndarray) else \
+            np.column_stack([b[:, j] for b in block])
+        np.testing.assert_allclose(result, expected, rtol=1e-7, atol=1e-9, equal_nan=True)
+
+
+def test_rma_block(hlc):
+    close = hlc[2]
+    _check(mp.rma_block(close, LENGTHS), lambda n: pta.rma(close, n))
+
+
+@pytest.mark.parametrize("talib", [False, True])
+@pytest.mark.parametrize("ddof", [0, 1])
+def test_stdev_block(hlc, talib, ddof):
+    close = hlc[2]
+    _check(mp.stdev_block(close, LENGTHS, ddof, talib),
+           lambda n: pta.stdev(close, n, ddof, talib=talib))
+
+
+@pytest.mark.parametrize("talib", [False, True])
+@pytest.mark.parametrize("mamode", ["rma", "ema", "sma"])
+def test_atr_block(hlc, talib, mamode):
+    high, low, close = hlc
+    _check(mp.atr_block(high, low, close, LENGTHS, mamode, talib=talib),
+           lambda n: pta.atr(high, low, close, n, mamode=mamode, talib=talib))
+
+
+@pytest.mark.parametrize("talib", [False, True])
+def test_rsi_block(hlc, talib):
+    close = hlc[2]
+    _check(mp.rsi_block(close, LENGTHS, talib=talib),
+           lambda n: pta.rsi(close, n, talib=talib))
+
+
+@pytest.mark.parametrize("talib", [False, True])
+@pytest.mark.parametrize("mamode", ["sma", "ema"])
+def test_bbands_block(hlc, talib, mamode):
+    close = hlc[2]
+    _check(mp.bbands_block(close, LENGTHS, ddof=0, mamode=mamode, talib=talib),
+           lambda n: pta.bbands(close, n, ddof=0, mamode=mamode, talib=talib))
+
+
+def test_batch_candidates_follow_parameter():
+    batch = mp.MultiParamBatch({"length": [5, 10, 20], "threshold": [60, 70, 80]})
+    assert batch._candidates(10, 1000, 1) == [5, 10, 20]
+    assert batch._candidates(70, 1000, 1) == [60, 70, 80]
+    assert batch._candidates(15, 1000, 1) is None
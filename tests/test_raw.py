@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""raw模式：中间指标只保留数值数据，元数据在首次访问时创建"""
+import numpy as np
+import pandas as pd
+
+from minibt.indicators.core import IndFrame, IndSeries
+from minibt.indicators.raw import raw_indicators
+
+
+def _close():
+    rng = np.random.default_rng(5)
+    return IndSeries(100. + rng.normal(0., 1., 500).cumsum(), lines=["close"], sname="close")
+
+
+def test_raw_intermediates_skip_metadata():
+    close = _close()
+    with raw_indicators():
+        fast = close.sma(5)
+        slow = close.sma(20)
+        spread = fast - slow
+        signal = fast.cross_up(slow)
+        bands = close.bbands(20)
+        for ind in (fast, slow, spread, signal, bands):
+            assert "_rawmeta" in ind.__dict__
+            assert "_indsetting" not in ind.__dict__ and "_plotinfo" not in ind.__dict__
+    with raw_indicators(False):
+        expected = close.sma(5) - close.sma(20)
+        expected_signal = close.sma(5).cross_up(close.sma(20))
+        expected_bands = close.bbands(20)
+    np.testing.assert_allclose(spread.values, expected.values, equal_nan=True)
+    np.testing.assert_array_equal(signal.values, expected_signal.values)
+    np.testing.assert_allclose(bands.values, expected_bands.values, equal_nan=True)
+    assert isinstance(bands.pandas_object, pd.DataFrame)
+
+
+def test_raw_metadata_created_on_first_access():
+    close = _close()
+    with raw_indicators():
+        sma = close.sma(10)
+        bands = close.bbands(20)
+    assert sma._indsetting.id == close._indsetting.id
+    assert sma.sname == "pta_sma" and sma.lines == ["pta_sma"]
+    assert "_rawmeta" not in sma.__dict__
+    assert sma.pandas_object is sma._dataset.pandas_object
+    assert isinstance(bands, IndFrame) and "_rawmeta" in bands.__dict__
+    upper = getattr(bands, bands.columns[2])
+    assert "_rawmeta" not in bands.__dict__
+    np.testing.assert_array_equal(upper.values, bands.values[:, 2])
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""实盘流式更新与全量重算的一致性测试"""
+import numpy as np
+import pandas as pd
+import pandas_ta as pta
+import pytest
+
+from minibt.indicators.streaming import StreamingContext
+
+
+@pytest.fixture(scope="module")
+def close():
+    rng = np.random.default_rng(3)
+    return pd.Series(100. + rng.normal(0., 1., 1300).cumsum())
+
+
+@pytest.mark.parametrize("talib", [None, True, False])
+@pytest.mark.parametrize("ddof", [None, 0, 1])
+def test_pta_stdev_streams_like_full_recompute(close, talib, ddof):
+    if talib is not False:
+        pytest.importorskip("talib")
+    name, params, size = "pta_stdev", [20, ddof, talib], 1000
+
+    def full(window):
+        return pta.stdev(window, 20, ddof, talib).to_numpy()
+
+    ctx = StreamingContext()
+    window = close.iloc[:size]
+    ctx.init((1, name), name, window, params, {}, full(window), None)
+    streamed = 0
+    for end in range(size + 1, close.size + 1):
+        window = close.iloc[end - size:end].reset_index(drop=True)
+        result = ctx.update((1, name), name, window, params, {})
+        assert result is not None
+        streamed += 1
+        np.testing.assert_allclose(np.asarray(result[0])[-5:], full(window)[-5:], rtol=1e-9)
+    assert streamed == close.size - size
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""ta.py 编译内核与 ta_reference 参照实现的等价性测试"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from minibt import ta, ta_reference as ref
+from minibt.ta import _mcgd, BtFunc, ZigZag
+from minibt.ta_reference import mcgd as mcgd_reference, BtFuncReference, ZigZagReference
+
+
+def _close(size=3000, seed=7, nans=(500, 501, 1500)):
+    rng = np.random.default_rng(seed)
+    close = pd.Series(100. + rng.normal(0., 1., size).cumsum(),
+                      index=pd.date_range("2024-01-01", periods=size, freq="min"))
+    close.iloc[list(nans)] = np.nan
+    return close
+
+
+def test_mcgd_kernel_matches_reference():
+    close = _close()
+    for length, c in ((10, 1.), (20, 0.6)):
+        result = _mcgd(close, length=length, c=c)
+        # 参照实现的结果取决于Copy-on-Write（框架运行时由pandas_ta开启）
+        with pd.option_context("mode.copy_on_write", True):
+            expected = mcgd_reference(close, length=length, c=c)
+        np.testing.assert_allclose(result.values, expected.values,
+                                   rtol=1e-12, equal_nan=True)
+        assert result.index.equals(close.index)
+
+
+def test_mcgd_uses_raw_previous_close():
+    close = _close(size=10, nans=())
+    result = _mcgd(close, length=10).values
+    values = close.values
+    prev = values[1:-1]
+    expected = prev + (values[2:] - prev) / (10 * (values[2:] / prev) ** 4)
+    np.testing.assert_allclose(result[2:], expected, rtol=1e-12)
+
+
+@pytest.fixture(scope="module")
+def ohlc():
+    rng = np.random.default_rng(5)
+    size = 600
+    close = pd.Series(100. + rng.normal(0., 1., size).cumsum())
+    open_ = close.shift(1).fillna(close.iloc[0]) + rng.normal(0., .3, size)
+    body = pd.concat([open_, close], axis=1)
+    high = body.max(axis=1) + np.abs(rng.normal(0., .5, size))
+    low = body.min(axis=1) - np.abs(rng.normal(0., .5, size))
+    r = pd.Series(np.abs(rng.normal(1., .2, size)))
+    return pd.DataFrame(dict(open=open_, high=high, low=low, close=close, r=r))
+
+
+def _values(result) -> np.ndarray:
+    if isinstance(result, tuple):
+        return np.column_stack([np.asarray(v, dtype=np.float64) for v in result])
+    return np.asarray(result, dtype=np.float64)
+
+
+# (名称, 编译内核实现, 参照实现, 相对容差)
+CASES = [
+    ("insidebar", lambda d: ta.insidebar(d.high, d.low, d.close, 10),
+     lambda d: ref.insidebar(d.high, d.low, d.close, 10), 1e-12),
+    ("rngfilt", lambda d: ta.rngfilt(d.close, d.r), lambda d: ref.rngfilt(d.close, d.r), 1e-12),
+    ("abc", lambda d: ta.abc(d, 5., .01), lambda d: ref.abc(d, 5., .01), 1e-12),
+    ("BtFunc.rngfilt", lambda d: BtFunc.rngfilt(d.close, d.r),
+     lambda d: BtFuncReference.rngfilt(d.close, d.r), 1e-12),
+    # 原实现的平滑系数为float32，结果相差约1e-7量级
+    ("kama", lambda d: BtFunc.kama(d.close, 10), lambda d: BtFuncReference.kama(d.close, 10), 1e-6),
+    ("pmax", lambda d: BtFunc.pmax(d.close), lambda d: BtFuncReference.pmax(d.close), 1e-12),
+    ("pmax2", lambda d: BtFunc.pmax2(d.close, 10, 3.), lambda d: BtFuncReference.pmax2(d.close, 10, 3.), 1e-12),
+    ("pmax3", lambda d: BtFunc.pmax3(d.close), lambda d: BtFuncReference.pmax3(d.close), 1e-12),
+    ("AndeanOsc", lambda d: BtFunc.AndeanOsc(d.open, d.close),
+     lambda d: BtFuncReference.AndeanOsc(d.open, d.close), 1e-12),
+    ("Coral_Trend_Candles", lambda d: BtFunc.Coral_Trend_Candles(d.close),
+     lambda d: BtFuncReference.Coral_Trend_Candles(d.close), 1e-12),
+    ("supertrend", lambda d: BtFunc.supertrend(d.high, d.low, d.close),
+     lambda d: BtFuncReference.supertrend(d.high, d.low, d.close), 1e-12),
+    ("emsa", lambda d: BtFunc.emsa(d.close), lambda d: BtFuncReference.emsa(d.close), 1e-12),
+    ("highpassfilter", lambda d: BtFunc.highpassfilter(d.close),
+     lambda d: BtFuncReference.highpassfilter(d.close), 1e-12),
+    ("superbandpassfilter", lambda d: BtFunc.superbandpassfilter(d.close),
+     lambda d: BtFuncReference.superbandpassfilter(d.close), 1e-12),
+    ("supersmootherfilter", lambda d: BtFunc.supersmootherfilter(d.close, 10),
+     lambda d: BtFuncReference.supersmootherfilter(d.close, 10), 1e-12),
+    ("lowpass", lambda d: BtFunc.lowpass(d.close, 10), lambda d: BtFuncReference.lowpass(d.close, 10), 1e-12),
+]
+
+
+@pytest.mark.parametrize("name,kernel,reference,rtol", CASES, ids=[c[0] for c in CASES])
+def test_kernel_matches_reference(ohlc, name, kernel, reference, rtol):
+    result, expected = _values(kernel(ohlc)), _values(reference(ohlc))
+    assert result.shape == expected.shape
+    np.testing.assert_allclose(result, expected, rtol=rtol, atol=1e-12, equal_nan=True)
+
+
+def test_zigzag_returns_kernel_matches_reference(ohlc, monkeypatch):
+    # 转折点由zigzag扩展计算，此处以固定的转折点序列测试收益率递推
+    pivots = np.full(len(ohlc), np.nan)
+    pivots[[0, 37, 120, 121, 300, 598]] = ohlc.close.values[[0, 37, 120, 121, 300, 598]]
+    monkeypatch.setattr(ZigZag, "zigzag", staticmethod(lambda *args, **kwargs: pd.Series(pivots)))
+    result = ZigZag.zigzag_returns(ohlc.high, ohlc.low, ohlc.close)
+    expected = ZigZagReference.zigzag_returns(ohlc.high, ohlc.low, ohlc.close)
+    np.testing.assert_allclose(result.values, expected.values, rtol=1e-12)
@@ -9,18 +9,27 @@ class CCI(BtIndicator):
     isplot = dict(long_signal=False, short_signal=False)
     params = dict(CCI_PERIOD=10, CCI_UPPER=100, CCI_LOWER=-100)
 
+    @bt_jit
+    def cci_state(cci, start, upper, lower):
+        """CCI状态：上穿上轨为1，下穿下轨为-1，其余保持前值"""
+        state = np.ones(cci.size)
+        for i in range(start, cci.size):
+            if cci[i] > upper:
+                state[i] = 1.
+            elif cci[i] < lower:
+                state[i] = -1.
+            else:
+                state[i] = state[i - 1]
+        return state
+
     def next(self):
         p = self.params  # 使用类级别params
         CCI_PERIOD = p.CCI_PERIOD  # CCI计算周期
         CCI_UPPER = p.CCI_UPPER  # CCI上轨
         CCI_LOWER = p.CCI_LOWER  # CCI下轨
         cci = self.close.cci(CCI_PERIOD)
-        size = cci.size
-        cci_state = np.ones(size)  # self.ones
-        for i in range(CCI_PERIOD + 1, size):
-            cci_state[i] = cci[i] > CCI_UPPER and 1. or (
-                cci[i] < CCI_LOWER and -1. or cci_state[i - 1])
-        cci_state = IndSeries(cci_state)
+        # CCI状态机循环以numba编译执行，返回IndSeries
+        cci_state = self.cci_state(cci, CCI_PERIOD + 1, CCI_UPPER, CCI_LOWER)
         long_signal = cci_state.cross_up(0.)   # CCI状态从-1上穿到1 → 做多
         short_signal = cci_state.cross_down(0.)  # CCI状态从1下穿到-1 → 做空
         return cci, long_signal, short_signal